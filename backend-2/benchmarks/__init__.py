@@ -0,0 +1,4 @@
+"""
+Performance benchmarks for the DOIT backend.
+Run from backend-2/ as modules, e.g. `python -m benchmarks.doc_intel_pipeline --help`.
+"""
@@ -0,0 +1,133 @@
+"""
+Kanban reconnect benchmark (full reload vs delta sync)
+======================================================
+Seeds a project with N tasks, takes the board version a client would hold,
+applies K task changes (status moves, creates, deletes) through the models,
+then compares what a reconnecting client transfers:
+  - full_reload   task_controller.get_project_tasks (what clients refetched before)
+  - delta         task_controller.board_delta(since=version) (board_delta message)
+
+Usage (from backend-2/):
+    python -m benchmarks.board_delta --tasks 5000 --changes 50
+
+Seeded documents are tagged ``benchmark: "board_delta"``; they, the project's
+tasks and its change log are removed at the end.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from controllers import task_controller
+from database import db
+from models.board_change import BoardChange
+from models.task import Task
+
+BENCH_TAG = "board_delta"
+STATUSES = ["To Do", "In Progress", "Dev Complete", "Testing", "Done"]
+
+
+def seed(task_count: int) -> tuple:
+    rng = random.Random(8)
+    owner = str(db.users.insert_one({"name": "Bench Owner", "email": "bench-delta@example.com", "benchmark": BENCH_TAG}).inserted_id)
+    project_id = str(
+        db.projects.insert_one(
+            {"name": "Bench delta", "user_id": owner, "members": [],
+             "github_webhook_url": "https://example.com/bench", "benchmark": BENCH_TAG}
+        ).inserted_id
+    )
+    start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=90)
+    docs = [
+        {
+            "_id": ObjectId(),
+            "ticket_id": f"DLT-{i}",
+            "title": f"Benchmark task {i}",
+            "description": "x" * rng.randint(100, 800),
+            "project_id": project_id,
+            "status": rng.choice(STATUSES),
+            "priority": "Medium",
+            "created_by": owner,
+            "labels": [],
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=i),
+            "benchmark": BENCH_TAG,
+        }
+        for i in range(task_count)
+    ]
+    db.tasks.insert_many(docs)
+    return project_id, owner, [str(d["_id"]) for d in docs]
+
+
+def cleanup() -> None:
+    for project in db.projects.find({"benchmark": BENCH_TAG}, {"_id": 1}):
+        # Tasks created through Task.create carry no benchmark tag
+        Task.delete_by_project(str(project["_id"]))
+    for name in ("users", "projects", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def apply_changes(project_id: str, owner: str, task_ids: list, count: int) -> None:
+    rng = random.Random(3)
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            Task.create({"title": f"Added while offline {i}", "project_id": project_id, "created_by": owner})
+        elif roll < 0.15 and task_ids:
+            Task.delete(task_ids.pop(rng.randrange(len(task_ids))))
+        else:
+            Task.update_with_activities(rng.choice(task_ids), {"status": rng.choice(STATUSES)})
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    payload = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - started)
+        payload = len(body.encode())
+    ordered = sorted(samples)
+    return {
+        "runs": runs,
+        "payload_bytes": payload,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    cleanup()
+    project_id, owner, task_ids = seed(args.tasks)
+    try:
+        since = BoardChange.current_version(project_id)
+        apply_changes(project_id, owner, task_ids, args.changes)
+        delta = task_controller.board_delta(project_id, since)
+        report = {
+            "tasks": args.tasks,
+            "changes": args.changes,
+            "full_reload": _time(lambda: task_controller.get_project_tasks(project_id, owner)["body"], args.runs),
+            "delta": _time(lambda: json.dumps(task_controller.board_delta(project_id, since)), args.runs),
+            "delta_tasks": len(delta["tasks"]),
+            "delta_deleted": len(delta["deleted"]),
+        }
+        report["payload_ratio"] = round(
+            report["full_reload"]["payload_bytes"] / max(report["delta"]["payload_bytes"], 1), 1
+        )
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Bulk task creation benchmark (per-task loop vs bulk_create_tasks)
+=================================================================
+Seeds a project with N existing tasks, then creates B new tasks the way the
+agent tools do:
+  - loop    previous path: agent_create_task_sync per title (project lookup,
+            count_documents ticket id, insert_one, Slack lookup per task)
+  - bulk    agent_bulk_create_tasks_sync: one validation pass, ticket ids
+            reserved with one counter update, one insert_many, one
+            broadcast/Slack summary
+  - retry   the same bulk call again with the same idempotency keys (an LLM
+            retry): nothing is inserted, the first call's tasks come back
+
+Usage (from backend-2/):
+    python -m benchmarks.bulk_task_create --tasks 5000 --batch 50
+
+Seeded documents are tagged ``benchmark: "bulk_task_create"``; they, the
+projects' tasks and ticket counters are removed at the end.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from controllers.agent_task_controller import agent_bulk_create_tasks_sync, agent_create_task_sync
+from database import db
+from models.task import Task, ensure_task_create_indexes
+
+BENCH_TAG = "bulk_task_create"
+
+
+def seed(task_count: int) -> tuple:
+    owner = str(
+        db.users.insert_one(
+            {"name": "Bench Owner", "email": "bench-create@example.com", "role": "admin", "benchmark": BENCH_TAG}
+        ).inserted_id
+    )
+    project_ids = [
+        str(
+            db.projects.insert_one(
+                {"name": f"Bench create {name}", "user_id": owner, "members": [], "benchmark": BENCH_TAG}
+            ).inserted_id
+        )
+        for name in ("loop", "bulk")
+    ]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for project_id, prefix in zip(project_ids, ("BCL", "BCB")):
+        db.tasks.insert_many([
+            {
+                "_id": ObjectId(),
+                "ticket_id": f"{prefix}-{i + 1:03d}",
+                "title": f"Existing task {i}",
+                "project_id": project_id,
+                "status": "To Do",
+                "priority": "Medium",
+                "created_by": owner,
+                "labels": [],
+                "created_at": now,
+                "updated_at": now,
+                "benchmark": BENCH_TAG,
+            }
+            for i in range(task_count)
+        ])
+    return owner, project_ids
+
+
+def cleanup() -> None:
+    for project in db.projects.find({"benchmark": BENCH_TAG}, {"_id": 1}):
+        # Created tasks carry no benchmark tag
+        Task.delete_by_project(str(project["_id"]))
+        db.ticket_counters.delete_one({"_id": str(project["_id"])})
+    for name in ("users", "projects", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def _timed(fn) -> tuple:
+    started = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000, help="existing tasks per project")
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    cleanup()
+    ensure_task_create_indexes()
+    owner, (loop_project, bulk_project) = seed(args.tasks)
+    titles = [f"Generated task {i}" for i in range(args.batch)]
+    items = [{"title": title, "idempotency_key": f"bench-{i}"} for i, title in enumerate(titles)]
+    try:
+        _, loop_ms = _timed(lambda: [
+            agent_create_task_sync("bench-create@example.com", title, loop_project, owner) for title in titles
+        ])
+        bulk, bulk_ms = _timed(lambda: agent_bulk_create_tasks_sync(
+            "bench-create@example.com", bulk_project, owner, items
+        ))
+        retry, retry_ms = _timed(lambda: agent_bulk_create_tasks_sync(
+            "bench-create@example.com", bulk_project, owner, items
+        ))
+        report = {
+            "existing_tasks": args.tasks,
+            "batch": args.batch,
+            "loop": {"total_ms": loop_ms, "per_task_ms": round(loop_ms / args.batch, 3)},
+            "bulk": {
+                "created": bulk["created_count"],
+                "total_ms": bulk_ms,
+                "per_task_ms": round(bulk_ms / args.batch, 3),
+            },
+            "retry": {"created": retry["created_count"], "replayed": retry["replayed_count"], "total_ms": retry_ms},
+            "tasks_in_bulk_project": db.tasks.count_documents({"project_id": bulk_project}) - args.tasks,
+            "speedup": round(loop_ms / max(bulk_ms, 0.001), 1),
+        }
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
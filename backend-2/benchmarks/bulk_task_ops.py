@@ -0,0 +1,127 @@
+"""
+Bulk task operation benchmark (per-task loop vs bulk_mutate_tasks)
+==================================================================
+Seeds a project with N tasks and updates a batch of B of them, addressed by
+ticket id, the way the agent bulk endpoints are called:
+  - loop   previous path: resolve each identifier, then
+           task_controller.update_task per task (its own lookups, write and
+           WebSocket broadcast)
+  - bulk   task_controller.bulk_update_tasks: one $in lookup, cached role
+           check, one bulk_write, one coalesced broadcast
+  - sprint sprint_controller.bulk_add_tasks_to_sprint for the same batch
+
+Usage (from backend-2/):
+    python -m benchmarks.bulk_task_ops --tasks 5000 --batch 200
+
+Seeded documents are tagged ``benchmark: "bulk_task_ops"`` and removed at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from controllers import sprint_controller, task_controller
+from database import db
+from models.task import Task
+
+BENCH_TAG = "bulk_task_ops"
+STATUSES = ["To Do", "In Progress", "Dev Complete", "Testing"]
+
+
+def seed(task_count: int) -> tuple:
+    owner = str(db.users.insert_one({"name": "Bench Owner", "email": "bench-bulk@example.com", "benchmark": BENCH_TAG}).inserted_id)
+    project_id = str(
+        db.projects.insert_one(
+            {"name": "Bench bulk", "user_id": owner, "members": [], "benchmark": BENCH_TAG}
+        ).inserted_id
+    )
+    sprint = db.sprints.insert_one({"name": "Bench sprint", "project_id": project_id, "status": "planned", "benchmark": BENCH_TAG})
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.tasks.insert_many([
+        {
+            "_id": ObjectId(),
+            "ticket_id": f"BLK-{i:05d}",
+            "title": f"Benchmark task {i}",
+            "description": "x" * 400,
+            "project_id": project_id,
+            "status": "To Do",
+            "priority": "Medium",
+            "created_by": owner,
+            "labels": [],
+            "created_at": now,
+            "updated_at": now,
+            "benchmark": BENCH_TAG,
+        }
+        for i in range(task_count)
+    ])
+    return project_id, owner, db.sprints.find_one({"_id": sprint.inserted_id})
+
+
+def cleanup() -> None:
+    for project in db.projects.find({"benchmark": BENCH_TAG}, {"_id": 1}):
+        # Also drops the project's activity buckets and board change log
+        Task.delete_by_project(str(project["_id"]))
+    for name in ("users", "projects", "sprints", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def loop_update(identifiers: list, user_id: str, status: str) -> int:
+    updated = 0
+    for identifier in identifiers:
+        task = Task.find_by_identifier(identifier)
+        response = task_controller.update_task(json.dumps({"status": status}), str(task["_id"]), user_id)
+        updated += response["status"] < 400
+    return updated
+
+
+def _timed(fn) -> tuple:
+    started = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+async def run(args) -> dict:
+    project_id, owner, sprint = seed(args.tasks)
+    rng = random.Random(4)
+    batches = [
+        [f"BLK-{n:05d}" for n in rng.sample(range(args.tasks), args.batch)]
+        for _ in range(3)
+    ]
+
+    loop_updated, loop_ms = _timed(lambda: loop_update(batches[0], owner, rng.choice(STATUSES)))
+    bulk, bulk_ms = _timed(lambda: task_controller.bulk_update_tasks(owner, batches[1], {"status": "In Progress"}, project_id))
+    sprint_result, sprint_ms = _timed(lambda: sprint_controller.bulk_add_tasks_to_sprint(sprint, batches[2], owner))
+    # Let the scheduled broadcasts drain before tearing down
+    await asyncio.sleep(0)
+
+    return {
+        "tasks": args.tasks,
+        "batch": args.batch,
+        "loop": {"updated": loop_updated, "total_ms": loop_ms, "per_task_ms": round(loop_ms / args.batch, 3)},
+        "bulk": {"updated": bulk["updated_count"], "total_ms": bulk_ms, "per_task_ms": round(bulk_ms / args.batch, 3)},
+        "sprint_bulk_add": {"updated": sprint_result["updated_count"], "total_ms": sprint_ms},
+        "speedup": round(loop_ms / max(bulk_ms, 0.001), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=200)
+    args = parser.parse_args()
+
+    cleanup()
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+LangGraph agent latency benchmark
+=================================
+Measures cold vs. warm turn latency of the shared, compiled-once ReAct agent
+and compares it with the legacy behaviour of compiling a fresh agent (and
+re-binding every tool schema) per conversation.
+
+Usage (from backend-2/):
+    python -m benchmarks.langgraph_agent_latency --fake-llm --turns 20
+    python -m benchmarks.langgraph_agent_latency --turns 5 --message "List my overdue tasks"
+
+--fake-llm swaps Azure OpenAI for an offline echo model so only graph compile,
+tool binding, prompt injection and checkpointing are measured.
+--checkpointer memory (default) keeps checkpoints in-process; pass "mongo" to
+include checkpoint persistence. Chat history is always written to Mongo.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+from itertools import cycle
+
+
+def _summary(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "turns": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--message", default="Summarize my workload in one sentence.")
+    parser.add_argument("--fake-llm", action="store_true")
+    parser.add_argument("--checkpointer", choices=["memory", "mongo"], default="memory")
+    args = parser.parse_args()
+
+    # Must be set before the agent module reads its configuration.
+    os.environ["LANGGRAPH_CHECKPOINTER"] = args.checkpointer
+
+    from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    from langgraph.prebuilt import create_react_agent
+
+    import utils.langgraph_agent_utils as agent_utils
+    from utils.langgraph_agent_tools import get_all_langgraph_tools
+
+    tools = get_all_langgraph_tools()
+    context = {"user_name": "Benchmark User", "user_role": "member", "tasks_total": 12}
+
+    if args.fake_llm:
+
+        class _EchoModel(GenericFakeChatModel):
+            # Converts schemas exactly like the OpenAI chat model, so binding cost is real.
+            def bind_tools(self, tools, **kwargs):
+                return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+        agent_utils._llm = _EchoModel(messages=cycle([AIMessage(content="ok")]))
+        agent_utils._llm_provider = "fake"
+        agent_utils._llm_model = "fake-echo"
+
+    llm = agent_utils.get_llm()
+
+    # ── Legacy: compile + bind per conversation, context baked into prompt ──
+    legacy = []
+    for _ in range(args.turns):
+        started = time.perf_counter()
+        agent = create_react_agent(
+            model=llm,
+            tools=tools,
+            checkpointer=agent_utils.get_checkpointer(),
+            prompt=agent_utils.LANGGRAPH_AGENT_SYSTEM_PROMPT
+            + agent_utils._render_context_summary(context),
+        )
+        agent.invoke(
+            {"messages": [HumanMessage(content=args.message)]},
+            config={"configurable": {"thread_id": f"bench-legacy-{uuid.uuid4().hex}"}},
+        )
+        legacy.append(time.perf_counter() - started)
+
+    # ── Shared agent: first turn compiles (cold), the rest reuse it (warm) ──
+    agent_utils._agents.clear()
+    agent_utils._bound_llms.clear()
+    cold, warm = [], []
+    for _ in range(args.turns):
+        started = time.perf_counter()
+        result = agent_utils.send_message_to_langgraph_agent(
+            user_id="benchmark",
+            conversation_id=f"bench-shared-{uuid.uuid4().hex}",
+            message=args.message,
+            tools=tools,
+            context=context,
+        )
+        if not result.get("success"):
+            raise SystemExit(f"Agent turn failed: {result.get('error')}")
+        (cold if result["timings"]["cold"] else warm).append(time.perf_counter() - started)
+
+    report = {
+        "model": agent_utils._llm_model,
+        "tools": len(tools),
+        "checkpointer": args.checkpointer,
+        "legacy_per_conversation_compile": _summary(legacy),
+        "shared_cold": _summary(cold) if cold else None,
+        "shared_warm": _summary(warm) if warm else None,
+    }
+    if warm:
+        report["speedup_p50_vs_legacy"] = round(
+            report["legacy_per_conversation_compile"]["p50_ms"] / max(report["shared_warm"]["p50_ms"], 0.1), 2
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""
+End-to-end load suite for the FastAPI backend
+=============================================
+Seeds synthetic tenants: users, projects with members, tasks with activity
+buckets, sprints, team-chat channels and messages, and datasets. It then
+drives the hot HTTP endpoints at a fixed concurrency and reports, per scenario:
+  - throughput (requests/s) and p50 / p95 / p99 latency
+  - DB commands per request (X-DB-Query-Count, see utils.query_profiler)
+  - error count (any non-2xx response)
+A kanban_fanout scenario times utils.websocket_manager's broadcast_to_channel
+of one board message to --subscribers stub sockets registered on the channel
+(in-process only). It measures the fan-out and serialization, not the /ws
+route, its handshake or a network.
+
+Requests run in-process through httpx.ASGITransport against main.app (no
+lifespan), or against a running server with --base-url. Seeding always goes
+through database.db, so a remote server must use the same MONGO_URI. Every
+virtual user logs in with its own session (utils.auth_utils.create_token).
+
+Baselines make the suite a regression gate. --save-baseline NAME stores the
+report in benchmarks/baselines/NAME.json. --check NAME fails (exit code 1)
+when:
+  - a scenario of the baseline is missing from the run
+  - any request errors, whether or not the scenario is in the baseline
+  - for a scenario in both reports, p95 grows by more than --tolerance (and
+    more than --min-slack-ms)
+  - for a scenario in both reports, DB commands per request grow by more
+    than 0.5 (they are deterministic for a seed, so any real growth is a new
+    query per request)
+Compare like with like: same seed sizes, same machine class, same database.
+
+Usage (from backend-2/):
+    # in-process against MONGO_URI (point it at a local mongod, not production)
+    python -m benchmarks.load_suite --users 40 --projects 8 --tasks 4000 --concurrency 16
+    # without a database: mongomock stand-in (latency only, it emits no command events)
+    python -m benchmarks.load_suite --mongomock
+    # a running server started with QUERY_DEBUG_HEADERS=1
+    python -m benchmarks.load_suite --base-url http://localhost:5000
+    # regression gate
+    python -m benchmarks.load_suite --save-baseline local
+    python -m benchmarks.load_suite --check local --tolerance 0.25
+
+Seeded documents are tagged ``benchmark: "load_suite"`` and removed at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BENCH_TAG = "load_suite"
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+USER_AGENT = "load-suite/1.0"
+CLIENT_IP = "127.0.0.1"
+STATUSES = ["To Do", "In Progress", "Dev Complete", "Testing", "Done", "Closed"]
+
+# name -> path template; {project_id}, {task_id}, {channel_id}, {email} come from the virtual user
+SCENARIOS = {
+    "auth_profile": "/api/auth/profile",
+    "my_tasks": "/api/tasks/my",
+    "project_tasks_full": "/api/tasks/project/{project_id}",
+    "project_tasks_page": "/api/tasks/project/{project_id}?limit=50",
+    "task_detail": "/api/tasks/{task_id}",
+    "dashboard_bootstrap": "/api/dashboard/bootstrap",
+    "team_chat_sidebar": "/api/team-chat/projects",
+    "chat_messages": "/api/team-chat/channels/{channel_id}/messages",
+    "datasets": "/api/data-viz/datasets?requesting_user={email}",
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _insert_chunked(collection, docs, chunk=1000):
+    for start in range(0, len(docs), chunk):
+        collection.insert_many(docs[start:start + chunk])
+
+
+def seed(db, args) -> list:
+    """Returns one virtual user per seeded user: ids, token headers and what it can read"""
+    from bson import ObjectId
+    from utils.auth_utils import create_token
+
+    rng = random.Random(args.seed)
+    now = _now()
+    users = [
+        {
+            "_id": ObjectId(),
+            "name": f"Load User {i}",
+            "email": f"load-{i}@example.com",
+            "role": "admin" if i == 0 else "member",
+            "token_version": 1,
+            "created_at": now,
+            "benchmark": BENCH_TAG,
+        }
+        for i in range(args.users)
+    ]
+    db.users.insert_many(users)
+    user_ids = [str(u["_id"]) for u in users]
+
+    projects = []
+    for p in range(args.projects):
+        owner = user_ids[p % len(user_ids)]
+        members = rng.sample([u for u in user_ids if u != owner], min(args.members, len(user_ids) - 1))
+        projects.append({
+            "_id": ObjectId(),
+            "name": f"Load Project {p}",
+            "user_id": owner,
+            "members": [{"user_id": m, "role": "member", "added_at": now} for m in members],
+            # Keep the project-visit git sync out of the measurement
+            "github_webhook_url": "https://example.com/load-suite",
+            "created_at": now,
+            "benchmark": BENCH_TAG,
+        })
+    db.projects.insert_many(projects)
+
+    tasks, buckets, sprints, channels, messages = [], [], [], [], []
+    per_project = max(args.tasks // max(args.projects, 1), 1)
+    for project in projects:
+        project_id = str(project["_id"])
+        team = [project["user_id"]] + [m["user_id"] for m in project["members"]]
+        sprint_ids = [ObjectId() for _ in range(args.sprints)]
+        sprints.extend(
+            {
+                "_id": sprint_id,
+                "name": f"Sprint {n + 1}",
+                "project_id": project_id,
+                "status": "active" if n == len(sprint_ids) - 1 else "completed",
+                "start_date": (now - timedelta(days=14 * (len(sprint_ids) - n))).date().isoformat(),
+                "end_date": (now - timedelta(days=14 * (len(sprint_ids) - n - 1))).date().isoformat(),
+                "created_at": now,
+                "benchmark": BENCH_TAG,
+            }
+            for n, sprint_id in enumerate(sprint_ids)
+        )
+        for i in range(per_project):
+            task_id = ObjectId()
+            created = now - timedelta(minutes=(per_project - i) * 30)
+            assignee = rng.choice(team + [None])
+            tasks.append({
+                "_id": task_id,
+                "ticket_id": f"LD{project_id[-4:].upper()}-{i + 1:04d}",
+                "issue_type": rng.choice(["task", "bug", "story"]),
+                "title": f"Load task {i}",
+                "description": "x" * rng.randint(100, 600),
+                "project_id": project_id,
+                "sprint_id": str(rng.choice(sprint_ids)) if sprint_ids and rng.random() < 0.6 else None,
+                "status": rng.choice(STATUSES),
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "assignee_id": assignee,
+                "assignee_name": "Load User" if assignee else "Unassigned",
+                "assignee_email": "",
+                "created_by": rng.choice(team),
+                "labels": [],
+                "activity_count": args.activities,
+                "recent_comments": [],
+                "created_at": created,
+                "updated_at": created,
+                "benchmark": BENCH_TAG,
+            })
+            if args.activities:
+                buckets.append({
+                    "task_id": str(task_id),
+                    "project_id": project_id,
+                    "started_at": created,
+                    "last_at": created,
+                    "count": args.activities,
+                    "activities": [
+                        {
+                            "user_id": rng.choice(team),
+                            "user_name": "Load User",
+                            "action": "status_changed",
+                            "old_value": "To Do",
+                            "new_value": "In Progress",
+                            "comment": "",
+                            "timestamp": (created + timedelta(minutes=n)).isoformat(),
+                        }
+                        for n in range(args.activities)
+                    ],
+                    "benchmark": BENCH_TAG,
+                })
+        for c in range(args.channels):
+            channel_id = ObjectId()
+            channels.append({
+                "_id": channel_id,
+                "project_id": project_id,
+                "name": f"channel-{c}",
+                "description": "",
+                "created_by": project["user_id"],
+                "created_at": now,
+                "updated_at": now,
+                "benchmark": BENCH_TAG,
+            })
+            for m in range(args.messages):
+                author = rng.choice(team)
+                messages.append({
+                    "channel_id": str(channel_id),
+                    "project_id": project_id,
+                    "user_id": author,
+                    "text": f"Load message {m}",
+                    "read_by": [author],
+                    "edited": False,
+                    "reactions": {},
+                    "created_at": now - timedelta(minutes=args.messages - m),
+                    "updated_at": now - timedelta(minutes=args.messages - m),
+                    "benchmark": BENCH_TAG,
+                })
+
+    _insert_chunked(db.tasks, tasks)
+    _insert_chunked(db.task_activity_buckets, buckets)
+    _insert_chunked(db.chat_messages, messages)
+    if sprints:
+        db.sprints.insert_many(sprints)
+    if channels:
+        db.chat_channels.insert_many(channels)
+    if args.datasets:
+        db.datasets.insert_many([
+            {
+                "user_id": user_id,
+                "filename": f"load-{n}.csv",
+                "uploaded_at": now,
+                "rows": 100,
+                "columns": 3,
+                "column_names": ["a", "b", "c"],
+                "column_types": {"a": "int", "b": "float", "c": "str"},
+                "size_bytes": 2048,
+                "preview": [],
+                "storage_type": "inline",
+                "benchmark": BENCH_TAG,
+            }
+            for user_id in user_ids
+            for n in range(args.datasets)
+        ])
+
+    # What each user can read, then one login session per user
+    readable = {}
+    for project in projects:
+        project_id = str(project["_id"])
+        for member in [project["user_id"]] + [m["user_id"] for m in project["members"]]:
+            readable.setdefault(member, []).append(project_id)
+    tasks_by_project, channels_by_project = {}, {}
+    for task in tasks:
+        tasks_by_project.setdefault(task["project_id"], []).append(str(task["_id"]))
+    for channel in channels:
+        channels_by_project.setdefault(channel["project_id"], []).append(str(channel["_id"]))
+
+    virtual_users = []
+    for user in users:
+        user_id = str(user["_id"])
+        project_ids = readable.get(user_id)
+        if not project_ids:
+            continue
+        token, _, tab_key = create_token(user_id, CLIENT_IP, USER_AGENT)
+        virtual_users.append({
+            "user_id": user_id,
+            "email": user["email"],
+            "projects": project_ids,
+            "tasks": tasks_by_project,
+            "channels": channels_by_project,
+            "headers": {
+                "Authorization": f"Bearer {token}",
+                "X-Tab-Session-Key": tab_key,
+                "User-Agent": USER_AGENT,
+                "X-Forwarded-For": CLIENT_IP,
+            },
+        })
+    return virtual_users
+
+
+def cleanup(db) -> None:
+    from bson import ObjectId
+    from models.task import Task
+
+    for project in db.projects.find({"benchmark": BENCH_TAG}, {"_id": 1}):
+        # Also drops activity buckets and the board change log
+        Task.delete_by_project(str(project["_id"]))
+    user_ids = [u["_id"] for u in db.users.find({"benchmark": BENCH_TAG}, {"_id": 1})]
+    if user_ids:
+        db.sessions.delete_many({"user_id": {"$in": [ObjectId(u) for u in user_ids]}})
+    for name in ("users", "projects", "tasks", "task_activity_buckets", "sprints",
+                 "chat_channels", "chat_messages", "datasets"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def _path_for(template, user, rng):
+    project_id = rng.choice(user["projects"])
+    task_ids = user["tasks"].get(project_id) or [""]
+    channel_ids = user["channels"].get(project_id) or [""]
+    return template.format(
+        project_id=project_id,
+        task_id=rng.choice(task_ids),
+        channel_id=rng.choice(channel_ids),
+        email=user["email"],
+    )
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _summarize(samples, db_ops, errors, wall_seconds) -> dict:
+    ordered = sorted(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / max(wall_seconds, 1e-9), 1),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+        "db_ops_per_request": round(statistics.mean(db_ops), 2) if db_ops else None,
+    }
+
+
+async def run_scenario(client, template, virtual_users, args) -> dict:
+    rng = random.Random(args.seed)
+    plan = []
+    for _ in range(args.requests):
+        user = rng.choice(virtual_users)
+        plan.append((user, _path_for(template, user, rng)))
+    samples, db_ops = [], []
+    errors = 0
+    queue = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            user, path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path, headers=user["headers"])
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 300:
+                errors += 1
+                if errors <= 3:
+                    print(f"⚠️  {path} -> {response.status_code}: {response.text[:200]}", file=sys.stderr)
+            if "x-db-query-count" in response.headers:
+                db_ops.append(int(response.headers["x-db-query-count"]))
+
+    # Warm caches the way a running server would have them
+    for user, path in plan[:min(args.concurrency, len(plan))]:
+        await client.get(path, headers=user["headers"])
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return _summarize(samples, db_ops, errors, time.perf_counter() - started)
+
+
+class _CountingSocket:
+    """Stands in for a Kanban WebSocket: serializes what it is sent, like send_json"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_json(self, data):
+        self.bytes_sent += len(json.dumps(data))
+        await asyncio.sleep(0)
+
+
+async def run_kanban_fanout(db, args) -> dict:
+    from utils.websocket_manager import manager
+
+    project = db.projects.find_one({"benchmark": BENCH_TAG}, {"_id": 1})
+    task = db.tasks.find_one({"project_id": str(project["_id"])}, {"activities": 0})
+    task["_id"] = str(task["_id"])
+    channel = f"kanban_{project['_id']}"
+    sockets = {f"load-subscriber-{i}": _CountingSocket() for i in range(args.subscribers)}
+    manager.active_connections[channel] = dict(sockets)
+    message = json.loads(json.dumps({"type": "task_updated", "task": task, "updated_fields": ["status"]}, default=str))
+
+    samples = []
+    started = time.perf_counter()
+    try:
+        for _ in range(args.broadcasts):
+            sent = time.perf_counter()
+            await manager.broadcast_to_channel(message, channel)
+            samples.append(time.perf_counter() - sent)
+    finally:
+        manager.active_connections.pop(channel, None)
+    report = _summarize(samples, [], 0, time.perf_counter() - started)
+    report["subscribers"] = args.subscribers
+    report["bytes_per_broadcast"] = sum(s.bytes_sent for s in sockets.values()) // max(args.broadcasts, 1)
+    return report
+
+
+def compare(report, baseline, tolerance, min_slack_ms) -> list:
+    """Regressions of report against baseline (empty when the gate passes)"""
+    regressions = []
+    for name in baseline.get("scenarios", {}):
+        if name not in report["scenarios"]:
+            regressions.append(f"{name}: in the baseline but missing from this run")
+    for name, current in report["scenarios"].items():
+        if current["errors"]:
+            regressions.append(f"{name}: {current['errors']} failed requests")
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        allowed = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + min_slack_ms)
+        if current["p95_ms"] > allowed:
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms > {round(allowed, 3)} ms (baseline {base['p95_ms']})")
+        if (
+            current.get("db_ops_per_request") is not None
+            and base.get("db_ops_per_request") is not None
+            and current["db_ops_per_request"] > base["db_ops_per_request"] + 0.5
+        ):
+            regressions.append(
+                f"{name}: {current['db_ops_per_request']} DB commands/request "
+                f"(baseline {base['db_ops_per_request']})"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    import httpx
+    from database import db
+    from init_db import initialize_indexes
+
+    cleanup(db)
+    initialize_indexes()
+    virtual_users = seed(db, args)
+    selected = [s.strip() for s in args.scenarios.split(",")] if args.scenarios else list(SCENARIOS)
+    try:
+        if args.base_url:
+            transport = None
+            base_url = args.base_url.rstrip("/")
+        else:
+            from main import app
+
+            transport = httpx.ASGITransport(app=app, client=(CLIENT_IP, 50000))
+            base_url = "http://load-suite"
+        scenarios = {}
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+            for name in selected:
+                if name in SCENARIOS:
+                    scenarios[name] = await run_scenario(client, SCENARIOS[name], virtual_users, args)
+        if not args.base_url and (not args.scenarios or "kanban_fanout" in selected):
+            scenarios["kanban_fanout"] = await run_kanban_fanout(db, args)
+    finally:
+        cleanup(db)
+
+    return {
+        "meta": {
+            "users": args.users,
+            "projects": args.projects,
+            "tasks": args.tasks,
+            "activities": args.activities,
+            "messages": args.messages,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "target": args.base_url or ("in-process (mongomock)" if args.mongomock else "in-process"),
+            "recorded_at": _now().isoformat(),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--projects", type=int, default=8)
+    parser.add_argument("--members", type=int, default=8, help="members per project besides the owner")
+    parser.add_argument("--tasks", type=int, default=4000, help="tasks across all projects")
+    parser.add_argument("--activities", type=int, default=5, help="activity entries per task")
+    parser.add_argument("--sprints", type=int, default=3, help="sprints per project")
+    parser.add_argument("--channels", type=int, default=3, help="team-chat channels per project")
+    parser.add_argument("--messages", type=int, default=100, help="messages per channel")
+    parser.add_argument("--datasets", type=int, default=1, help="datasets per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--subscribers", type=int, default=200, help="kanban_fanout WebSocket clients")
+    parser.add_argument("--broadcasts", type=int, default=50, help="kanban_fanout messages")
+    parser.add_argument("--scenarios", help=f"comma-separated subset of: {', '.join(SCENARIOS)}, kanban_fanout")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--base-url", help="drive a running server instead of main.app in-process")
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock instead of MONGO_URI")
+    parser.add_argument("--save-baseline", metavar="NAME", help="store the report as benchmarks/baselines/NAME.json")
+    parser.add_argument("--check", metavar="NAME", help="compare against benchmarks/baselines/NAME.json; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 growth for --check")
+    parser.add_argument("--min-slack-ms", type=float, default=2.0, help="p95 growth below this is never a regression")
+    args = parser.parse_args()
+
+    if args.mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            parser.error("--mongomock needs the mongomock package (pip install mongomock)")
+        import pymongo
+
+        # Must happen before database.py creates the client
+        pymongo.MongoClient = mongomock.MongoClient
+    # X-DB-Query-Count on every in-process response
+    os.environ.setdefault("QUERY_DEBUG_HEADERS", "1")
+
+    baseline = None
+    if args.check:
+        baseline_path = BASELINE_DIR / f"{args.check}.json"
+        if not baseline_path.exists():
+            parser.error(f"no baseline at {baseline_path}; record one with --save-baseline {args.check}")
+        baseline = json.loads(baseline_path.read_text())
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path = BASELINE_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"✓ Baseline saved to {path}")
+
+    if baseline is not None:
+        if baseline.get("meta", {}).get("tasks") != args.tasks or baseline.get("meta", {}).get("users") != args.users:
+            print("⚠️  Baseline was recorded with different seed sizes; latency comparison is not like for like")
+        regressions = compare(report, baseline, args.tolerance, args.min_slack_ms)
+        if regressions:
+            print("❌ Performance regressions against baseline:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"✓ No regressions against baseline '{args.check}'")
+
+
+if __name__ == "__main__":
+    main()
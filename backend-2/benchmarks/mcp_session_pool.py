@@ -0,0 +1,127 @@
+"""
+MCP session pool benchmark
+==========================
+Compares per-call latency of the legacy spawn-a-subprocess-per-call path,
+pooled stdio sessions and (for first-party servers) in-process dispatch.
+
+Usage (from backend-2/):
+    python -m benchmarks.mcp_session_pool
+    python -m benchmarks.mcp_session_pool --server task --calls 20 --concurrency 4
+    python -m benchmarks.mcp_session_pool --server task --tool list_tasks \\
+        --args '{"requesting_user_id": "<user id>", "limit": 5}'
+
+Without --tool the benchmark issues tools/list, which exercises the full
+transport without touching Mongo.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from utils.mcp_client_utils import (
+    call_mcp_tool,
+    get_mcp_runtime_diagnostics,
+    list_mcp_tools,
+    shutdown_mcp_session_pool,
+)
+
+
+def _summarize(latencies: list, wall_seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "calls": len(ordered),
+        "wall_seconds": round(wall_seconds, 3),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+MODES = {
+    "spawn_per_call": {"pooled": False, "inprocess": False},
+    "pooled": {"pooled": True, "inprocess": False},
+    "inprocess": {"inprocess": True},
+}
+
+
+async def _run(server: str, tool: str, arguments: dict, calls: int, concurrency: int, mode: str) -> dict:
+    options = MODES[mode]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = []
+
+    async def one_call():
+        async with semaphore:
+            started = time.perf_counter()
+            if tool:
+                result = await call_mcp_tool(server, tool, arguments, **options)
+            else:
+                result = await list_mcp_tools(server, **options)
+            latencies.append(time.perf_counter() - started)
+            if not result.get("success"):
+                failures.append(result.get("error"))
+
+    cold_start = None
+    if mode != "spawn_per_call":
+        # First call pays the subprocess spawn / module import — report it separately.
+        started = time.perf_counter()
+        await list_mcp_tools(server, **options)
+        cold_start = round((time.perf_counter() - started) * 1000, 1)
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    summary = _summarize(latencies, time.perf_counter() - wall_started)
+    summary["failures"] = len(failures)
+    if failures:
+        summary["first_error"] = failures[0]
+    if cold_start is not None:
+        summary["cold_start_ms"] = cold_start
+    return summary
+
+
+async def main_async(args) -> None:
+    arguments = json.loads(args.args) if args.args else {}
+    result = {"server": args.server, "tool": args.tool or "tools/list", "concurrency": args.concurrency}
+
+    try:
+        diagnostics = get_mcp_runtime_diagnostics()
+        if not args.skip_spawn:
+            result["spawn_per_call"] = await _run(
+                args.server, args.tool, arguments, args.spawn_calls, args.concurrency, "spawn_per_call"
+            )
+        result["pooled"] = await _run(args.server, args.tool, arguments, args.calls, args.concurrency, "pooled")
+        if args.server in diagnostics["inprocess_servers"]:
+            result["inprocess"] = await _run(
+                args.server, args.tool, arguments, args.calls, args.concurrency, "inprocess"
+            )
+        result["pool"] = get_mcp_runtime_diagnostics()["session_pool"]
+    finally:
+        await shutdown_mcp_session_pool()
+
+    if "spawn_per_call" in result:
+        for mode in ("pooled", "inprocess"):
+            if mode in result:
+                result[f"speedup_p50_{mode}"] = round(
+                    result["spawn_per_call"]["p50_ms"] / max(result[mode]["p50_ms"], 0.1), 1
+                )
+    print(json.dumps(result, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", default="task")
+    parser.add_argument("--tool", default="", help="Tool to call (default: tools/list)")
+    parser.add_argument("--args", default="", help="JSON arguments for --tool")
+    parser.add_argument("--calls", type=int, default=50, help="Pooled / in-process calls")
+    parser.add_argument("--spawn-calls", type=int, default=5, help="Spawn-per-call calls (slow)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--skip-spawn", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Project membership check benchmark
+==================================
+Seeds N projects with M members each (plus integration config, as real
+projects carry) and measures checks per second for:
+  - legacy        the old Project.is_member: full projects.find_one, then a
+                  Python scan of the members array
+  - cached        Project.is_member on a warm membership cache
+  - cold          first check per user (one indexed load of the role map)
+  - denied        non-member checks (cache miss confirmed by an _id probe)
+  - after_change  add_member / remove_member invalidation, then a check
+
+Usage (from backend-2/):
+    python -m benchmarks.membership --projects 200 --members 50 --checks 20000
+
+Seeded documents are tagged ``benchmark: "membership"`` and removed at the end.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bson import ObjectId
+
+from database import db
+from models.project import Project
+from utils.membership_cache import get_membership_stats, invalidate_membership
+
+BENCH_TAG = "membership"
+
+
+def seed(project_count: int, members: int) -> tuple:
+    rng = random.Random(11)
+    users = [f"bench-member-{i}" for i in range(members * 4)]
+    project_ids = []
+    teams = {}
+    docs = []
+    for p in range(project_count):
+        team = rng.sample(users, members)
+        project_id = ObjectId()
+        project_ids.append(str(project_id))
+        teams[str(project_id)] = team
+        docs.append(
+            {
+                "_id": project_id,
+                "name": f"Bench project {p}",
+                "user_id": team[0],
+                "members": [
+                    {"user_id": u, "email": f"{u}@example.com", "name": u, "added_at": "2026-01-01T00:00:00"}
+                    for u in team[1:]
+                ],
+                "git_repo_url": "https://github.com/example/repo",
+                "git_access_token": "x" * 40,
+                "slack_integration": {"channel_id": "C000", "config": "y" * 2000},
+                "benchmark": BENCH_TAG,
+            }
+        )
+    db.projects.insert_many(docs)
+    return project_ids, teams
+
+
+def cleanup() -> None:
+    db.projects.delete_many({"benchmark": BENCH_TAG})
+
+
+def legacy_is_member(project_id, user_id):
+    project = db.projects.find_one({"_id": ObjectId(project_id)})
+    if not project:
+        return False
+    if project["user_id"] == user_id:
+        return True
+    return any(member["user_id"] == user_id for member in project.get("members", []))
+
+
+def _rate(fn, pairs) -> dict:
+    started = time.perf_counter()
+    granted = sum(1 for project_id, user_id in pairs if fn(project_id, user_id))
+    seconds = time.perf_counter() - started
+    return {
+        "checks": len(pairs),
+        "granted": granted,
+        "checks_per_second": round(len(pairs) / seconds) if seconds else None,
+        "mean_us": round(seconds / len(pairs) * 1_000_000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    cleanup()
+    project_ids, teams = seed(args.projects, args.members)
+    try:
+        rng = random.Random(3)
+        # Authorised requests dominate real traffic: sample actual memberships
+        pairs = []
+        for _ in range(args.checks):
+            project_id = rng.choice(project_ids)
+            pairs.append((project_id, rng.choice(teams[project_id])))
+        home_project = {user_id: project_id for project_id, user_id in pairs}
+        active_users = sorted(home_project)
+        denied = [(project_id, "bench-outsider") for project_id, _ in pairs[: max(args.checks // 20, 1)]]
+
+        invalidate_membership()
+        report = {
+            "projects": args.projects,
+            "members_per_project": args.members,
+            "legacy": _rate(legacy_is_member, pairs[: max(args.checks // 10, 1)]),
+            "cold": _rate(Project.is_member, [(home_project[u], u) for u in active_users]),
+            "cached": _rate(Project.is_member, pairs),
+            "denied": _rate(Project.is_member, denied),
+        }
+
+        def after_change(project_id, user_id):
+            Project.add_member(project_id, {"user_id": user_id})
+            granted = Project.is_member(project_id, user_id)
+            Project.remove_member(project_id, user_id)
+            return granted and not Project.is_member(project_id, user_id)
+
+        report["after_change"] = _rate(
+            after_change, [(project_ids[i % len(project_ids)], "bench-newcomer") for i in range(200)]
+        )
+        report["speedup_cached_vs_legacy"] = round(
+            report["cached"]["checks_per_second"] / max(report["legacy"]["checks_per_second"], 1), 1
+        )
+        report["cache"] = get_membership_stats()
+    finally:
+        cleanup()
+        invalidate_membership()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
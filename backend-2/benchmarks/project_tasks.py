@@ -0,0 +1,161 @@
+"""
+Project task listing benchmark (full list vs server-side pages)
+==============================================================
+Seeds one project with N tasks (default 20000) and measures payload size and
+latency of task_controller.get_project_tasks for:
+  - full         no parameters: every task in one response (legacy clients)
+  - first_page   limit=50, newest first
+  - deep_page    the page reached after following next_cursor --pages times
+  - per_column   per_column=25: the first cards of each Kanban column + totals
+  - filtered     status + assignee_id filter, limit=50
+  - fields       first page restricted to fields=title,status,assignee_id,priority
+
+Usage (from backend-2/):
+    python -m benchmarks.project_tasks --tasks 20000 --runs 10
+
+Seeded documents are tagged ``benchmark: "project_tasks"`` and removed at the end.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from controllers import task_controller
+from database import db
+from models.task import ensure_task_list_indexes
+
+BENCH_TAG = "project_tasks"
+STATUSES = ["To Do", "In Progress", "Dev Complete", "Testing", "Done", "Closed"]
+LABELS = ["bug", "frontend", "backend", "infra", "ux"]
+
+
+def seed(task_count: int, members: int) -> tuple:
+    rng = random.Random(21)
+    user_ids = [
+        str(
+            db.users.insert_one(
+                {"name": f"Bench User {i}", "email": f"bench-list-{i}@example.com", "benchmark": BENCH_TAG}
+            ).inserted_id
+        )
+        for i in range(members)
+    ]
+    project_id = str(
+        db.projects.insert_one(
+            {
+                "name": "Bench listing",
+                "user_id": user_ids[0],
+                "members": [{"user_id": u} for u in user_ids[1:]],
+                # Keep the project-visit git sync out of the measurement
+                "github_webhook_url": "https://example.com/bench",
+                "benchmark": BENCH_TAG,
+            }
+        ).inserted_id
+    )
+    start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=365)
+    docs = []
+    for i in range(task_count):
+        assignee = rng.choice(user_ids + [None])
+        docs.append(
+            {
+                "_id": ObjectId(),
+                "ticket_id": f"LIST-{i}",
+                "issue_type": rng.choice(["task", "bug", "story"]),
+                "title": f"Benchmark task {i}",
+                "description": "x" * rng.randint(100, 800),
+                "project_id": project_id,
+                "status": rng.choice(STATUSES),
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "assignee_id": assignee,
+                "assignee_name": "Bench User" if assignee else "Unassigned",
+                "assignee_email": "",
+                "created_by": rng.choice(user_ids),
+                "labels": rng.sample(LABELS, rng.randint(0, 2)),
+                "created_at": start + timedelta(minutes=i * 20),
+                "updated_at": start + timedelta(minutes=i * 20 + rng.randint(0, 5000)),
+                "benchmark": BENCH_TAG,
+            }
+        )
+        if len(docs) == 1000:
+            db.tasks.insert_many(docs)
+            docs = []
+    if docs:
+        db.tasks.insert_many(docs)
+    return project_id, user_ids
+
+
+def cleanup() -> None:
+    for name in ("users", "projects", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    payload = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = fn()
+        samples.append(time.perf_counter() - started)
+        assert response["status"] == 200, response["body"]
+        payload = len(response["body"].encode())
+    ordered = sorted(samples)
+    return {
+        "runs": runs,
+        "payload_bytes": payload,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--members", type=int, default=25)
+    parser.add_argument("--pages", type=int, default=20, help="cursor hops before the deep_page measurement")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    cleanup()
+    ensure_task_list_indexes()
+    project_id, user_ids = seed(args.tasks, args.members)
+    owner = user_ids[0]
+
+    def listing(**params):
+        return lambda: task_controller.get_project_tasks(project_id, owner, params)
+
+    try:
+        cursor = None
+        for _ in range(args.pages):
+            body = json.loads(listing(limit=50, cursor=cursor)()["body"])
+            cursor = body["next_cursor"] or cursor
+
+        report = {
+            "tasks": args.tasks,
+            "full": _time(listing(), args.runs),
+            "first_page": _time(listing(limit=50), args.runs),
+            "deep_page": _time(listing(limit=50, cursor=cursor), args.runs),
+            "per_column": _time(listing(per_column=25), args.runs),
+            "filtered": _time(listing(status="In Progress", assignee_id=user_ids[1], limit=50), args.runs),
+            "fields": _time(listing(limit=50, fields="title,status,assignee_id,priority"), args.runs),
+        }
+        report["payload_ratio_first_page"] = round(
+            report["full"]["payload_bytes"] / max(report["first_page"]["payload_bytes"], 1), 1
+        )
+        report["speedup_p50_first_page"] = round(
+            report["full"]["p50_ms"] / max(report["first_page"]["p50_ms"], 0.001), 1
+        )
+        report["speedup_p50_per_column"] = round(
+            report["full"]["p50_ms"] / max(report["per_column"]["p50_ms"], 0.001), 1
+        )
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
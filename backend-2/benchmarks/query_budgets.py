@@ -0,0 +1,80 @@
+"""
+Query budget route check
+========================
+utils.query_profiler looks up a request's budget by "METHOD route-template",
+so a budget only applies when the profiler attributes the request to exactly
+that key. For every entry of QUERY_BUDGETS (the _DEFAULT_BUDGETS plus the
+QUERY_BUDGETS env overrides) this sends one request in-process through
+main.app, with placeholder path parameters and no credentials. Routing happens
+before the auth dependency rejects the request, so the profiler still records
+the route. The run exits with code 1 if any budget was recorded under a
+different key (for example without its router prefix).
+
+Nothing is seeded; unauthenticated requests are rejected before they read data.
+
+Usage (from backend-2/):
+    python -m benchmarks.query_budgets
+    # without a database: mongomock stand-in
+    python -m benchmarks.query_budgets --mongomock
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+
+PLACEHOLDER_ID = "0" * 24
+
+
+async def resolve(app, budgets) -> dict:
+    import httpx
+    from utils.query_profiler import get_query_profiler_stats, reset_query_profiler_stats
+
+    results = {}
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 50000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://query-budgets") as client:
+        for key in budgets:
+            method, template = key.split(" ", 1)
+            reset_query_profiler_stats()
+            response = await client.request(method, re.sub(r"\{[^}]+\}", PLACEHOLDER_ID, template))
+            recorded = list(get_query_profiler_stats()["routes"])
+            results[key] = {"status": response.status_code, "recorded_as": recorded[0] if recorded else None}
+    reset_query_profiler_stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock instead of MONGO_URI")
+    args = parser.parse_args()
+
+    if args.mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            parser.error("--mongomock needs the mongomock package (pip install mongomock)")
+        import pymongo
+
+        # Must happen before database.py creates the client
+        pymongo.MongoClient = mongomock.MongoClient
+
+    from main import app
+    from utils.query_profiler import QUERY_BUDGETS, QUERY_PROFILER_ENABLED
+
+    if not QUERY_PROFILER_ENABLED:
+        parser.error("the query profiler is disabled (QUERY_PROFILER_ENABLED=0)")
+
+    results = asyncio.run(resolve(app, QUERY_BUDGETS))
+    print(json.dumps(results, indent=2))
+
+    unmatched = [key for key, result in results.items() if result["recorded_as"] != key]
+    if unmatched:
+        for key in unmatched:
+            print(f"❌ {key} was recorded as {results[key]['recorded_as']}")
+        sys.exit(1)
+    print(f"✓ All {len(results)} query budgets resolve to their route keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Response cache benchmark and semantic-path check
+================================================
+Seeds one user and drives utils.response_cache the way the assistant does
+(response_cache_key → lookup_response → store_response):
+  - miss       lookup for a new prompt, including the embedding call and
+               the similarity scan
+  - exact      the same prompt again, normalized to the same key
+  - semantic   a paraphrase that misses the exact key and must be served by
+               cosine similarity over the user's entries
+
+Embeddings come from a deterministic stub client (hashed bag of words) that is
+swapped in for utils.azure_ai_utils.get_azure_client with the same signature.
+The whole semantic lookup path therefore runs without Azure; --live uses the
+configured AZURE_OPENAI_EMBEDDING_DEPLOYMENT instead. The run exits with code 1
+if the paraphrase is not a semantic hit.
+
+Usage (from backend-2/):
+    python -m benchmarks.response_cache --entries 500
+    python -m benchmarks.response_cache --live
+
+Seeded documents are tagged ``benchmark: "response_cache"`` and removed at the end.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+BENCH_TAG = "response_cache"
+STUB_DIMENSIONS = 256
+PROMPT = "What are my overdue tasks this week?"
+PARAPHRASE = "which of my tasks are overdue this week"
+
+
+class _StubEmbeddings:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def create(self, model, input):
+        self.calls.append(model)
+        vector = [0.0] * STUB_DIMENSIONS
+        for word in re.findall(r"\w+", input.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % STUB_DIMENSIONS] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[v / norm for v in vector])])
+
+
+def stub_azure_client(calls):
+    """Drop-in for get_azure_client(api_version, endpoint=None, deployment=None)"""
+
+    def get_azure_client(api_version, endpoint=None, deployment=None):
+        if not api_version:
+            raise ValueError("api_version is required")
+        return SimpleNamespace(embeddings=_StubEmbeddings(calls))
+
+    return get_azure_client
+
+
+def seed(db) -> str:
+    user_id = str(
+        db.users.insert_one(
+            {"name": "Bench Cache", "email": "bench-cache@example.com", "role": "member", "benchmark": BENCH_TAG}
+        ).inserted_id
+    )
+    db.projects.insert_one({"name": "Bench cache", "user_id": user_id, "members": [], "benchmark": BENCH_TAG})
+    return user_id
+
+
+def cleanup(db) -> None:
+    for name in ("users", "projects"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": runs,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=500, help="unrelated cached prompts for the user")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--live", action="store_true", help="embed with the configured Azure deployment")
+    args = parser.parse_args()
+
+    # Read at import by utils.response_cache
+    os.environ["RESPONSE_CACHE_ENABLED"] = "true"
+    os.environ["RESPONSE_CACHE_SEMANTIC"] = "true"
+    os.environ.setdefault("RESPONSE_CACHE_SIMILARITY", "0.7")
+    os.environ.setdefault("RESPONSE_CACHE_MAX_ENTRIES", str(args.entries + args.runs + 10))
+    if not args.live:
+        os.environ.setdefault("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "stub-embedding")
+
+    from database import db
+    from utils import azure_ai_utils, response_cache
+
+    calls = []
+    if not args.live:
+        azure_ai_utils.get_azure_client = stub_azure_client(calls)
+
+    cleanup(db)
+    user_id = seed(db)
+    try:
+        response_cache.clear_response_cache()
+        for i in range(args.entries):
+            handle = response_cache.response_cache_key(
+                "bench", user_id, f"summarize sprint {i} velocity for project alpha", "bench-model"
+            )
+            response_cache.store_response(handle, f"answer {i}", {"total": 500})
+
+        handle = response_cache.response_cache_key("bench", user_id, PROMPT, "bench-model")
+        miss = response_cache.lookup_response(handle)
+        response_cache.store_response(handle, "You have 3 overdue tasks.", {"total": 800})
+
+        def lookup(prompt):
+            return response_cache.lookup_response(
+                response_cache.response_cache_key("bench", user_id, prompt, "bench-model")
+            )
+
+        exact, semantic = lookup(PROMPT.lower()), lookup(PARAPHRASE)
+        report = {
+            "entries": args.entries,
+            "embeddings": "azure" if args.live else "stub",
+            "first_lookup": "miss" if miss is None else miss["match"],
+            "exact_match": exact and exact["match"],
+            "paraphrase_match": semantic and semantic["match"],
+            "miss": _time(lambda: lookup(f"unrelated question {time.perf_counter_ns()}"), args.runs),
+            "exact": _time(lambda: lookup(PROMPT), args.runs),
+            "semantic": _time(lambda: lookup(PARAPHRASE), args.runs),
+            "embedding_calls": len(calls) if not args.live else None,
+            "cache": response_cache.get_response_cache_stats(),
+        }
+    finally:
+        response_cache.clear_response_cache()
+        cleanup(db)
+    print(json.dumps(report, indent=2))
+
+    if report["first_lookup"] != "miss" or report["exact_match"] != "exact" or report["paraphrase_match"] != "semantic":
+        print("❌ Semantic lookup path did not serve the paraphrase")
+        sys.exit(1)
+    print("✓ Semantic lookup path served the paraphrase")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Sprint statistics benchmark
+===========================
+Seeds a project with S sprints of T tasks each and compares:
+  - legacy_list    get_project_sprints' old loop: two count_documents per sprint
+  - legacy_detail  the old Sprint.get_sprint_stats: four count_documents
+  - project_stats  utils.sprint_stats.get_project_sprint_stats, one $group
+  - sprint_stats   utils.sprint_stats.get_sprint_stats for one sprint
+  - burndown       get_sprint_burndown for a two-week sprint
+  - velocity       get_project_velocity over the completed sprints
+
+Usage (from backend-2/):
+    python -m benchmarks.sprint_stats --sprints 30 --tasks-per-sprint 200
+
+Seeded documents are tagged ``benchmark: "sprint_stats"`` and removed at the end.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from database import db
+from utils.sprint_stats import (
+    get_project_sprint_stats,
+    get_project_velocity,
+    get_sprint_burndown,
+    get_sprint_stats,
+)
+
+BENCH_TAG = "sprint_stats"
+STATUSES = ["To Do", "In Progress", "Testing", "Done", "Closed"]
+
+
+def seed(sprint_count: int, tasks_per_sprint: int) -> tuple:
+    rng = random.Random(17)
+    project_id = str(db.projects.insert_one({"name": "Bench sprints", "benchmark": BENCH_TAG}).inserted_id)
+    now = datetime.utcnow()
+    sprint_ids = []
+    for s in range(sprint_count):
+        start = now - timedelta(days=14 * (sprint_count - s))
+        status = "completed" if s < sprint_count - 1 else "active"
+        sprint_id = db.sprints.insert_one(
+            {
+                "name": f"Sprint {s}",
+                "project_id": project_id,
+                "status": status,
+                "start_date": start.strftime("%Y-%m-%d"),
+                "end_date": (start + timedelta(days=14)).strftime("%Y-%m-%d"),
+                "completed_at": start + timedelta(days=14) if status == "completed" else None,
+                "total_tasks_snapshot": tasks_per_sprint if status == "completed" else 0,
+                "created_at": start,
+                "benchmark": BENCH_TAG,
+            }
+        ).inserted_id
+        sprint_ids.append(str(sprint_id))
+        docs = []
+        for i in range(tasks_per_sprint):
+            finished_at = start + timedelta(days=rng.randint(0, 13), hours=rng.randint(0, 23))
+            docs.append(
+                {
+                    "_id": ObjectId(),
+                    "title": f"Sprint {s} task {i}",
+                    "description": "x" * 400,
+                    "project_id": project_id,
+                    "sprint_id": str(sprint_id),
+                    "status": rng.choice(STATUSES),
+                    "completed_at": finished_at,
+                    "updated_at": finished_at,
+                    "benchmark": BENCH_TAG,
+                }
+            )
+        db.tasks.insert_many(docs)
+    return project_id, sprint_ids
+
+
+def cleanup() -> None:
+    for name in ("projects", "sprints", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def legacy_list(sprint_ids) -> None:
+    for sprint_id in sprint_ids:
+        db.tasks.count_documents({"sprint_id": sprint_id})
+        db.tasks.count_documents({"sprint_id": sprint_id, "status": "Done"})
+
+
+def legacy_detail(sprint_id) -> None:
+    for status in (None, "Done", "In Progress", "To Do"):
+        query = {"sprint_id": sprint_id}
+        if status:
+            query["status"] = status
+        db.tasks.count_documents(query)
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sprints", type=int, default=30)
+    parser.add_argument("--tasks-per-sprint", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    cleanup()
+    project_id, sprint_ids = seed(args.sprints, args.tasks_per_sprint)
+    try:
+        active = db.sprints.find_one({"_id": ObjectId(sprint_ids[-1])})
+        completed = db.sprints.find_one({"_id": ObjectId(sprint_ids[-2])})
+        report = {
+            "sprints": args.sprints,
+            "tasks": args.sprints * args.tasks_per_sprint,
+            "legacy_list": _time(lambda: legacy_list(sprint_ids), args.runs),
+            "project_stats": _time(lambda: get_project_sprint_stats(project_id, sprint_ids), args.runs),
+            "legacy_detail": _time(lambda: legacy_detail(sprint_ids[-1]), args.runs),
+            "sprint_stats": _time(lambda: get_sprint_stats(sprint_ids[-1]), args.runs),
+            "burndown_active": _time(lambda: get_sprint_burndown(active), args.runs),
+            "burndown_completed": _time(lambda: get_sprint_burndown(completed), args.runs),
+            "velocity": _time(lambda: get_project_velocity(project_id), args.runs),
+        }
+        report["speedup_p50_list"] = round(
+            report["legacy_list"]["p50_ms"] / max(report["project_stats"]["p50_ms"], 0.01), 1
+        )
+        report["sample_velocity"] = get_project_velocity(project_id, 3)["series"]
+        report["sample_burndown_tail"] = get_sprint_burndown(completed)["series"][-3:]
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
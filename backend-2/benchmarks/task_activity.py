@@ -0,0 +1,148 @@
+"""
+Task activity storage benchmark (embedded array vs buckets)
+===========================================================
+Seeds one task whose ``activities`` array holds N events (the pre-bucket
+layout), measures it, migrates it with TaskActivity.migrate_task, then
+compares:
+  - task_bytes     BSON size of the task document
+  - find_by_id     Task.find_by_id latency (what every task read ships)
+  - detail_page    the activity page the detail view needs (latest 100)
+  - older_page     a page deep in the history (offset N/2)
+  - append         adding one comment ($push onto the array vs bucket upsert)
+
+Usage (from backend-2/):
+    python -m benchmarks.task_activity --events 5000
+
+Seeded documents are tagged ``benchmark: "task_activity"`` and removed at the end.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import bson
+from bson import ObjectId
+
+from database import db
+from models.task import Task
+from models.task_activity import TASK_ACTIVITY_BUCKET_SIZE, TaskActivity, task_activity_buckets
+
+BENCH_TAG = "task_activity"
+ACTIONS = ["comment", "status_change", "label_add", "attachment_add"]
+
+
+def _events(count: int) -> list:
+    rng = random.Random(13)
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    return [
+        {
+            "user_id": f"bench-user-{rng.randint(0, 20)}",
+            "user_name": "Bench User",
+            "action": rng.choice(ACTIONS),
+            "comment": "z" * rng.randint(20, 240),
+            "old_value": "To Do",
+            "new_value": "In Progress",
+            "timestamp": (start + timedelta(minutes=i * 90)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def seed(events: int) -> ObjectId:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return db.tasks.insert_one(
+        {
+            "ticket_id": "ACT-1",
+            "title": "Hot task",
+            "description": "x" * 600,
+            "project_id": "bench-activity-project",
+            "status": "In Progress",
+            "activities": _events(events),
+            "created_at": now,
+            "updated_at": now,
+            "benchmark": BENCH_TAG,
+        }
+    ).inserted_id
+
+
+def cleanup() -> None:
+    ids = [str(t["_id"]) for t in db.tasks.find({"benchmark": BENCH_TAG}, {"_id": 1})]
+    task_activity_buckets.delete_many({"task_id": {"$in": ids}})
+    db.tasks.delete_many({"benchmark": BENCH_TAG})
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+    }
+
+
+def _task_bytes(task_id) -> int:
+    return len(bson.encode(db.tasks.find_one({"_id": task_id})))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    cleanup()
+    task_id = seed(args.events)
+    key = str(task_id)
+    comment = {"user_id": "bench-user-0", "user_name": "Bench User", "action": "comment", "comment": "new"}
+    try:
+        embedded = {
+            "task_bytes": _task_bytes(task_id),
+            "find_by_id": _time(lambda: Task.find_by_id(key), args.runs),
+            # The detail view rendered the whole array
+            "detail_page": _time(lambda: db.tasks.find_one({"_id": task_id}, {"activities": 1}), args.runs),
+            "append": _time(
+                lambda: db.tasks.update_one({"_id": task_id}, {"$push": {"activities": comment}}), args.runs
+            ),
+        }
+        # Drop the appended samples so both layouts hold the same N events
+        db.tasks.update_one({"_id": task_id}, {"$push": {"activities": {"$each": [], "$slice": args.events}}})
+
+        started = time.perf_counter()
+        TaskActivity.migrate_task(db.tasks.find_one({"_id": task_id}))
+        migrate_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        bucketed = {
+            "task_bytes": _task_bytes(task_id),
+            "find_by_id": _time(lambda: Task.find_by_id(key), args.runs),
+            "detail_page": _time(lambda: TaskActivity.get_page(key, 0, 100), args.runs),
+            "older_page": _time(lambda: TaskActivity.get_page(key, args.events // 2, 100), args.runs),
+            "append": _time(lambda: Task.add_activity(key, comment), args.runs),
+            "buckets": task_activity_buckets.count_documents({"task_id": key}),
+            "bucket_size": TASK_ACTIVITY_BUCKET_SIZE,
+        }
+        report = {
+            "events": args.events,
+            "embedded": embedded,
+            "bucketed": bucketed,
+            "migrate_task_ms": migrate_ms,
+            "task_bytes_ratio": round(embedded["task_bytes"] / max(bucketed["task_bytes"], 1), 1),
+            "speedup_p50_find_by_id": round(
+                embedded["find_by_id"]["p50_ms"] / max(bucketed["find_by_id"]["p50_ms"], 0.001), 1
+            ),
+        }
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Kanban drag (task status change) latency benchmark
+==================================================
+Seeds a project with members and N tasks carrying a realistic activity log,
+then moves random tasks between columns and reports p50/p99 for:
+  - legacy   the round trips update_task issued before the single-write path:
+             full task load, project load for membership, user load, $set,
+             one $push per activity, full task reload, creator/assignee loads
+  - current  task_controller.update_task (projected pre-read, cached role and
+             user names, one find_one_and_update returning the new document)
+  - comment  a status change that also carries a comment
+
+Usage (from backend-2/):
+    python -m benchmarks.task_mutation --tasks 2000 --moves 500
+
+Seeded documents are tagged ``benchmark: "task_mutation"`` and removed at the end.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from controllers import task_controller
+from database import db
+from utils.membership_cache import get_membership_stats
+from utils.user_display_cache import get_user_display_stats
+
+BENCH_TAG = "task_mutation"
+COLUMNS = ["To Do", "In Progress", "Testing", "Dev Complete", "Done"]
+
+
+def seed(task_count: int, members: int) -> tuple:
+    rng = random.Random(5)
+    user_ids = [
+        str(
+            db.users.insert_one(
+                {"name": f"Bench User {i}", "email": f"bench-drag-{i}@example.com", "role": "member", "benchmark": BENCH_TAG}
+            ).inserted_id
+        )
+        for i in range(members)
+    ]
+    project_id = str(
+        db.projects.insert_one(
+            {
+                "name": "Bench board",
+                "user_id": user_ids[0],
+                "members": [{"user_id": u, "name": f"Bench User {i}"} for i, u in enumerate(user_ids[1:], 1)],
+                "benchmark": BENCH_TAG,
+            }
+        ).inserted_id
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    task_ids = []
+    docs = []
+    for i in range(task_count):
+        task_id = ObjectId()
+        task_ids.append(str(task_id))
+        assignee = rng.choice(user_ids)
+        docs.append(
+            {
+                "_id": task_id,
+                "ticket_id": f"DRAG-{i}",
+                "title": f"Benchmark task {i}",
+                "description": "x" * 600,
+                "project_id": project_id,
+                "status": rng.choice(COLUMNS),
+                "priority": "Medium",
+                "assignee_id": assignee,
+                "assignee_name": "Bench",
+                "assignee_email": "",
+                "created_by": rng.choice(user_ids),
+                "activities": [{"action": "comment", "comment": "y" * 200, "user_id": assignee}] * (i % 30),
+                "created_at": now,
+                "updated_at": now,
+                "benchmark": BENCH_TAG,
+            }
+        )
+    db.tasks.insert_many(docs)
+    return project_id, user_ids, task_ids
+
+
+def cleanup() -> None:
+    for name in ("users", "projects", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def legacy_move(task_id: str, user_id: str, status: str) -> None:
+    task = db.tasks.find_one({"_id": ObjectId(task_id)})
+    project = db.projects.find_one({"_id": ObjectId(task["project_id"])})
+    assert project["user_id"] == user_id or any(m["user_id"] == user_id for m in project.get("members", []))
+    user = db.users.find_one({"_id": ObjectId(user_id)})
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.tasks.find_one_and_update({"_id": task["_id"]}, {"$set": {"status": status, "updated_at": now}})
+    db.tasks.find_one_and_update(
+        {"_id": task["_id"]},
+        {
+            "$push": {"activities": {"user_id": user_id, "user_name": user["name"], "action": "status_change",
+                                     "old_value": task.get("status"), "new_value": status}},
+            "$set": {"updated_at": now},
+        },
+    )
+    updated = db.tasks.find_one({"_id": task["_id"]})
+    db.users.find_one({"_id": ObjectId(updated["created_by"])})
+    db.users.find_one({"_id": ObjectId(updated["assignee_id"])})
+
+
+def _time(fn, calls) -> dict:
+    samples = []
+    for args in calls:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "moves": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def run(args) -> dict:
+    _, user_ids, task_ids = seed(args.tasks, args.members)
+    rng = random.Random(9)
+    moves = [(rng.choice(task_ids), rng.choice(user_ids), rng.choice(COLUMNS)) for _ in range(args.moves)]
+
+    def current_move(task_id, user_id, status, comment=""):
+        response = task_controller.update_task(json.dumps({"status": status, "comment": comment}), task_id, user_id)
+        assert response["status"] == 200, response["body"]
+
+    report = {
+        "tasks": args.tasks,
+        "legacy": _time(legacy_move, moves),
+        "current": _time(current_move, moves),
+        "comment": _time(current_move, [m + ("moved after review",) for m in moves[: max(args.moves // 5, 1)]]),
+    }
+    # Let the scheduled Kanban broadcasts drain before tearing down
+    await asyncio.sleep(0)
+    report["speedup_p50"] = round(report["legacy"]["p50_ms"] / max(report["current"]["p50_ms"], 0.001), 1)
+    report["membership_cache"] = get_membership_stats()
+    report["user_display_cache"] = get_user_display_stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--members", type=int, default=12)
+    parser.add_argument("--moves", type=int, default=500)
+    args = parser.parse_args()
+
+    cleanup()
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Task knowledge search benchmark
+===============================
+Seeds a synthetic task history and compares the legacy unanchored $regex scan
+used by search_project_knowledge_tool with the text-index search in
+utils.task_search.
+
+Usage (from backend-2/):
+    python -m benchmarks.task_search --tasks 500000
+    python -m benchmarks.task_search --tasks 50000 --queries 50 --keep
+
+Seeded documents are tagged ``benchmark: "task_search"`` and removed at the
+end unless --keep is passed (re-runs reuse a kept seed of the same size).
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from database import db
+from utils.task_search import ensure_task_search_indexes, search_tasks
+
+BENCH_TAG = "task_search"
+BENCH_USER = "benchmark-task-search"
+
+_WORDS = (
+    "login oauth token refresh cache redis timeout retry webhook slack payment invoice "
+    "export csv pdf upload s3 bucket migration index query latency dashboard chart "
+    "sprint burndown velocity notification email queue worker deadlock memory leak "
+    "pagination filter sort permission role admin audit crash android ios release"
+).split()
+QUERIES = ["oauth token refresh", "memory leak", "csv export", "deadlock", "webhook retry", "burndown chart"]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def seed(total: int, projects: int, batch: int = 5000) -> list:
+    existing = db.tasks.count_documents({"benchmark": BENCH_TAG})
+    project_ids = [
+        str(p["_id"]) for p in db.projects.find({"benchmark": BENCH_TAG}, {"_id": 1})
+    ]
+    if existing == total and len(project_ids) == projects:
+        return project_ids
+    cleanup()
+    project_ids = [
+        str(
+            db.projects.insert_one(
+                {"name": f"Bench {i}", "user_id": BENCH_USER, "members": [], "benchmark": BENCH_TAG}
+            ).inserted_id
+        )
+        for i in range(projects)
+    ]
+    rng = random.Random(42)
+    docs = []
+    for i in range(total):
+        docs.append(
+            {
+                "_id": ObjectId(),
+                "ticket_id": f"BENCH-{i}",
+                "title": _sentence(rng, 6),
+                "description": _sentence(rng, 60),
+                "status": rng.choice(["To Do", "In Progress", "Done"]),
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "project_id": project_ids[i % projects],
+                "recent_comments": [{"comment": _sentence(rng, 15)} for _ in range(i % 3)],
+                "updated_at": datetime.utcnow() - timedelta(minutes=i),
+                "benchmark": BENCH_TAG,
+            }
+        )
+        if len(docs) == batch:
+            db.tasks.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        db.tasks.insert_many(docs, ordered=False)
+    return project_ids
+
+
+def cleanup() -> None:
+    db.tasks.delete_many({"benchmark": BENCH_TAG})
+    db.projects.delete_many({"benchmark": BENCH_TAG})
+
+
+def legacy_search(query: str) -> list:
+    """The pre-index implementation: full project docs + three unanchored regexes."""
+    projects = list(
+        db.projects.find({"$or": [{"user_id": BENCH_USER}, {"members.user_id": BENCH_USER}]})
+    )
+    pids = [str(p["_id"]) for p in projects]
+    return list(
+        db.tasks.find(
+            {
+                "project_id": {"$in": pids},
+                "$or": [
+                    {"title": {"$regex": query, "$options": "i"}},
+                    {"description": {"$regex": query, "$options": "i"}},
+                    {"comments.text": {"$regex": query, "$options": "i"}},
+                ],
+            }
+        )
+        .sort("updated_at", -1)
+        .limit(6)
+    )
+
+
+def _time(fn, queries: list) -> dict:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "queries": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500000)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded data for re-runs")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.tasks, args.projects)
+    seed_seconds = round(time.perf_counter() - started, 1)
+    started = time.perf_counter()
+    ensure_task_search_indexes()
+    index_seconds = round(time.perf_counter() - started, 1)
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+    try:
+        report = {
+            "tasks": args.tasks,
+            "projects": args.projects,
+            "seed_seconds": seed_seconds,
+            "index_build_seconds": index_seconds,
+            "legacy_regex": _time(legacy_search, queries),
+            "text_index_page1": _time(lambda q: search_tasks(BENCH_USER, q), queries),
+            "text_index_page5": _time(lambda q: search_tasks(BENCH_USER, q, page=5), queries),
+        }
+        report["speedup_p50"] = round(
+            report["legacy_regex"]["p50_ms"] / max(report["text_index_page1"]["p50_ms"], 0.1), 1
+        )
+        report["sample"] = search_tasks(BENCH_USER, QUERIES[0], page_size=2)["results"]
+    finally:
+        if not args.keep:
+            cleanup()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+User-context snapshot benchmark
+===============================
+Seeds a user who belongs to N projects and compares:
+  - legacy_fetch     the queries the pre-aggregation analyzer issued (every
+                     project, every project task minus activities/attachments/
+                     links, every sprint) — transfer only, so a lower bound
+                     for the old per-message cost
+  - aggregate_build  analyze_user_data_for_ai(), aggregation pipelines
+  - cached           get_user_snapshot() on a warm cache
+  - after_write      a task write invalidates the user, next call rebuilds
+
+Usage (from backend-2/):
+    python -m benchmarks.user_context --projects 40 --tasks-per-project 500
+
+Seeded documents are tagged ``benchmark: "user_context"`` and removed at the end.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from database import db
+from models.task import Task
+from utils.ai_data_analyzer import analyze_user_data_for_ai
+from utils.user_context_service import (
+    get_user_context_stats,
+    get_user_snapshot,
+    invalidate_user_context,
+)
+
+BENCH_TAG = "user_context"
+
+
+def seed(projects: int, tasks_per_project: int, members: int) -> str:
+    rng = random.Random(7)
+    user_id = str(
+        db.users.insert_one(
+            {"name": "Benchmark User", "email": "bench-context@example.com", "role": "member", "benchmark": BENCH_TAG}
+        ).inserted_id
+    )
+    teammates = [f"bench-member-{i}" for i in range(members)]
+    now = datetime.utcnow()
+    for p in range(projects):
+        project_id = str(
+            db.projects.insert_one(
+                {
+                    "name": f"Bench project {p}",
+                    "user_id": user_id if p % 4 == 0 else rng.choice(teammates),
+                    "members": [{"user_id": user_id}] + [{"user_id": m} for m in teammates[:8]],
+                    "benchmark": BENCH_TAG,
+                }
+            ).inserted_id
+        )
+        sprint_ids = [
+            str(
+                db.sprints.insert_one(
+                    {"project_id": project_id, "name": f"Sprint {s}", "status": status, "benchmark": BENCH_TAG}
+                ).inserted_id
+            )
+            for s, status in enumerate(["completed", "completed", "active", "planned"])
+        ]
+        db.tasks.insert_many(
+            [
+                {
+                    "_id": ObjectId(),
+                    "ticket_id": f"B{p}-{i}",
+                    "title": f"Benchmark task {i}",
+                    "description": "x" * 400,
+                    "project_id": project_id,
+                    "sprint_id": rng.choice(sprint_ids + [None]),
+                    "assignee_id": rng.choice([user_id] + teammates),
+                    "status": rng.choice(["To Do", "In Progress", "Done", "Closed"]),
+                    "priority": rng.choice(["Low", "Medium", "High"]),
+                    "due_date": (now + timedelta(days=rng.randint(-30, 30))).strftime("%Y-%m-%d"),
+                    "updated_at": now - timedelta(days=rng.randint(0, 90)),
+                    "links": [{"type": "blocked-by"}] if i % 17 == 0 else [],
+                    "activities": [{"action": "comment", "comment": "y" * 200}] * (i % 5),
+                    "benchmark": BENCH_TAG,
+                }
+                for i in range(tasks_per_project)
+            ]
+        )
+    return user_id
+
+
+def cleanup() -> None:
+    for name in ("users", "projects", "sprints", "tasks"):
+        db[name].delete_many({"benchmark": BENCH_TAG})
+
+
+def legacy_fetch(user_id: str) -> None:
+    projects = list(db.projects.find({"$or": [{"user_id": user_id}, {"members.user_id": user_id}]}))
+    project_ids = [str(p["_id"]) for p in projects]
+    projection = {"activities": 0, "attachments": 0, "links": 0}
+    list(db.tasks.find({"assignee_id": user_id}, projection))
+    list(db.tasks.find({"project_id": {"$in": project_ids}}, projection))
+    list(db.sprints.find({"project_id": {"$in": project_ids}}))
+
+
+def _time(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "runs": runs,
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--tasks-per-project", type=int, default=500)
+    parser.add_argument("--members", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    cleanup()
+    user_id = seed(args.projects, args.tasks_per_project, args.members)
+    try:
+        probe_task = db.tasks.find_one({"benchmark": BENCH_TAG}, {"_id": 1})["_id"]
+
+        def after_write():
+            Task.update(str(probe_task), {"priority": "High"})
+            get_user_snapshot(user_id)
+
+        invalidate_user_context(user_id)
+        get_user_snapshot(user_id)
+        report = {
+            "projects": args.projects,
+            "tasks": args.projects * args.tasks_per_project,
+            "legacy_fetch": _time(lambda: legacy_fetch(user_id), args.runs),
+            "aggregate_build": _time(lambda: analyze_user_data_for_ai(user_id), args.runs),
+            "cached": _time(lambda: get_user_snapshot(user_id), args.runs * 50),
+            "after_write": _time(after_write, args.runs),
+        }
+        report["speedup_p50_build_vs_legacy"] = round(
+            report["legacy_fetch"]["p50_ms"] / max(report["aggregate_build"]["p50_ms"], 0.01), 1
+        )
+        report["cache"] = get_user_context_stats()
+    finally:
+        cleanup()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -525,76 +525,25 @@ def agent_bulk_add_tasks_to_sprint(
 
         sprint_id_resolved = str(sprint["_id"])
 
+        # One $in lookup, cached membership checks and a single bulk_write
+        outcome = sprint_controller.bulk_add_tasks_to_sprint(
+            sprint, task_identifiers, actual_user_id
+        )
+
         updated_tasks = []
         errors = []
-
-        for raw_identifier in task_identifiers:
-            task_identifier = str(raw_identifier or "").strip()
-            if not task_identifier:
-                errors.append(
-                    {
-                        "task_identifier": raw_identifier,
-                        "error": "Task identifier is empty",
-                    }
-                )
-                continue
-
-            is_object_id_like = bool(
-                re.fullmatch(r"[0-9a-fA-F]{24}", task_identifier)
-            )
-
-            if is_object_id_like:
-                task = Task.find_by_id(task_identifier) or Task.find_by_ticket_id(
-                    task_identifier
-                )
-            else:
-                task = Task.find_by_ticket_id(task_identifier) or Task.find_by_id(
-                    task_identifier
-                )
-
-            if not task:
-                errors.append(
-                    {"task_identifier": task_identifier, "error": "Task not found"}
-                )
-                continue
-
-            if task.get("project_id") != project_id:
-                errors.append(
-                    {
-                        "task_identifier": task_identifier,
-                        "error": "Task does not belong to provided project_id",
-                    }
-                )
-                continue
-
-            task_id_resolved = str(task["_id"])
-
-            response = sprint_controller.add_task_to_sprint(
-                sprint_id_resolved,
-                json.dumps({"task_id": task_id_resolved}),
-                actual_user_id,
-            )
-
-            status_code = response.get("statusCode", 200)
-            if status_code >= 400:
-                if isinstance(response.get("body"), str):
-                    error_body = json.loads(response["body"])
-                else:
-                    error_body = response.get("body", {})
-
+        for result in outcome["results"]:
+            if not result["ok"]:
                 errors.append(
-                    {
-                        "task_identifier": task_identifier,
-                        "error": error_body.get("error", "Failed to add task to sprint"),
-                    }
+                    {"task_identifier": result["task_identifier"], "error": result["error"]}
                 )
                 continue
 
             updated_tasks.append(
                 {
-                    "task_identifier": task_identifier,
-                    "task_id": task_id_resolved,
-                    "ticket_id": task.get("ticket_id"),
+                    "task_identifier": result["task_identifier"],
+                    "task_id": result["task_id"],
+                    "ticket_id": result["ticket_id"],
                     "sprint_id": sprint_id_resolved,
                     "sprint_name": sprint.get("name"),
                 }
@@ -820,78 +769,25 @@ def agent_bulk_remove_tasks_from_sprint(
 
         sprint_id_resolved = str(sprint["_id"])
 
+        # One $in lookup, cached membership checks and a single bulk_write
+        outcome = sprint_controller.bulk_remove_tasks_from_sprint(
+            sprint, task_identifiers, actual_user_id
+        )
+
         removed_tasks = []
         errors = []
-
-        for raw_identifier in task_identifiers:
-            task_identifier = str(raw_identifier or "").strip()
-            if not task_identifier:
-                errors.append(
-                    {
-                        "task_identifier": raw_identifier,
-                        "error": "Task identifier is empty",
-                    }
-                )
-                continue
-
-            is_object_id_like = bool(
-                re.fullmatch(r"[0-9a-fA-F]{24}", task_identifier)
-            )
-
-            if is_object_id_like:
-                task = Task.find_by_id(task_identifier) or Task.find_by_ticket_id(
-                    task_identifier
-                )
-            else:
-                task = Task.find_by_ticket_id(task_identifier) or Task.find_by_id(
-                    task_identifier
-                )
-
-            if not task:
-                errors.append(
-                    {"task_identifier": task_identifier, "error": "Task not found"}
-                )
-                continue
-
-            if task.get("project_id") != project_id:
-                errors.append(
-                    {
-                        "task_identifier": task_identifier,
-                        "error": "Task does not belong to provided project_id",
-                    }
-                )
-                continue
-
-            task_id_resolved = str(task["_id"])
-
-            response = sprint_controller.remove_task_from_sprint(
-                sprint_id_resolved,
-                task_id_resolved,
-                actual_user_id,
-            )
-
-            status_code = response.get("statusCode", 200)
-            if status_code >= 400:
-                if isinstance(response.get("body"), str):
-                    error_body = json.loads(response["body"])
-                else:
-                    error_body = response.get("body", {})
-
+        for result in outcome["results"]:
+            if not result["ok"]:
                 errors.append(
-                    {
-                        "task_identifier": task_identifier,
-                        "error": error_body.get(
-                            "error", "Failed to remove task from sprint"
-                        ),
-                    }
+                    {"task_identifier": result["task_identifier"], "error": result["error"]}
                 )
                 continue
 
             removed_tasks.append(
                 {
-                    "task_identifier": task_identifier,
-                    "task_id": task_id_resolved,
-                    "ticket_id": task.get("ticket_id"),
+                    "task_identifier": result["task_identifier"],
+                    "task_id": result["task_id"],
+                    "ticket_id": result["ticket_id"],
                     "sprint_id": sprint_id_resolved,
                     "sprint_name": sprint.get("name"),
                 }
@@ -443,58 +443,26 @@ def agent_bulk_update_task_due_dates(
 
         normalized_due_date = _normalize_due_date_to_iso(due_date)
 
+        # One $in lookup, cached membership checks and a single bulk_write
+        outcome = task_controller.bulk_update_tasks(
+            modifier_id, task_identifiers, {"due_date": normalized_due_date}, project_id
+        )
+
         updated_tasks = []
         errors = []
-
-        for identifier in task_identifiers:
-            task = _resolve_task_by_identifier(identifier)
-            if not task:
+        for result in outcome["results"]:
+            if not result["ok"]:
                 errors.append(
-                    {"task_identifier": identifier, "error": "Task not found"}
+                    {"task_identifier": result["task_identifier"], "error": result["error"]}
                 )
                 continue
 
-            if task.get("project_id") != project_id:
-                errors.append(
-                    {
-                        "task_identifier": identifier,
-                        "error": "Task does not belong to provided project_id",
-                    }
-                )
-                continue
-
-            actual_task_id = str(task["_id"])
-            response = task_controller.update_task(
-                json.dumps({"due_date": normalized_due_date}),
-                actual_task_id,
-                modifier_id,
-            )
-
-            status_code = response.get("statusCode", 200)
-            if status_code >= 400:
-                if isinstance(response.get("body"), str):
-                    error_body = json.loads(response["body"])
-                else:
-                    error_body = response.get("body", {})
-                errors.append(
-                    {
-                        "task_identifier": identifier,
-                        "error": error_body.get("error", "Task update failed"),
-                    }
-                )
-                continue
-
-            if isinstance(response.get("body"), str):
-                success_body = json.loads(response["body"])
-            else:
-                success_body = response.get("body", {})
-
-            task_payload = success_body.get("task", {})
+            task_payload = result.get("task") or {}
             updated_tasks.append(
                 {
-                    "task_identifier": identifier,
-                    "task_id": str(task_payload.get("_id", actual_task_id)),
-                    "ticket_id": task_payload.get("ticket_id", task.get("ticket_id")),
+                    "task_identifier": result["task_identifier"],
+                    "task_id": result["task_id"],
+                    "ticket_id": result["ticket_id"],
                     "due_date": task_payload.get("due_date", normalized_due_date),
                 }
             )
@@ -603,58 +571,27 @@ def agent_bulk_update_tasks(
                 str(normalized_updates.get("due_date"))
             )
 
+        # One $in lookup, cached membership checks and a single bulk_write
+        outcome = task_controller.bulk_update_tasks(
+            modifier_id, task_identifiers, normalized_updates, project_id
+        )
+
         updated_tasks = []
         errors = []
-
-        for identifier in task_identifiers:
-            task = _resolve_task_by_identifier(identifier)
-            if not task:
-                errors.append(
-                    {"task_identifier": identifier, "error": "Task not found"}
-                )
-                continue
-
-            if task.get("project_id") != project_id:
+        for result in outcome["results"]:
+            if not result["ok"]:
                 errors.append(
-                    {
-                        "task_identifier": identifier,
-                        "error": "Task does not belong to provided project_id",
-                    }
+                    {"task_identifier": result["task_identifier"], "error": result["error"]}
                 )
                 continue
 
-            actual_task_id = str(task["_id"])
-            response = task_controller.update_task(
-                json.dumps(normalized_updates), actual_task_id, modifier_id
-            )
-
-            status_code = response.get("statusCode", 200)
-            if status_code >= 400:
-                if isinstance(response.get("body"), str):
-                    error_body = json.loads(response["body"])
-                else:
-                    error_body = response.get("body", {})
-                errors.append(
-                    {
-                        "task_identifier": identifier,
-                        "error": error_body.get("error", "Task update failed"),
-                    }
-                )
-                continue
-
-            if isinstance(response.get("body"), str):
-                success_body = json.loads(response["body"])
-            else:
-                success_body = response.get("body", {})
-
-            task_payload = success_body.get("task", {})
             updated_tasks.append(
                 {
-                    "task_identifier": identifier,
-                    "task_id": str(task_payload.get("_id", actual_task_id)),
-                    "ticket_id": task_payload.get("ticket_id", task.get("ticket_id")),
+                    "task_identifier": result["task_identifier"],
+                    "task_id": result["task_id"],
+                    "ticket_id": result["ticket_id"],
                     "updated_fields": sorted(list(normalized_updates.keys())),
-                    "task": task_payload,
+                    "task": result.get("task") or {},
                 }
             )
 
@@ -678,6 +615,162 @@ def agent_bulk_update_tasks(
         )
 
 
+def _prepare_bulk_create_items(tasks: List[Dict[str, Any]]):
+    """
+    Turn agent task items (assignee_email / assignee_name, human due dates) into
+    task_controller.bulk_create_tasks items, resolving every assignee with one
+    users query. Returns (items, errors) where errors maps item index to message.
+    """
+    tasks = [t if isinstance(t, dict) else {} for t in tasks]
+    emails = {str(t["assignee_email"]).strip().lower() for t in tasks if t.get("assignee_email")}
+    names = {
+        str(t["assignee_name"]).strip()
+        for t in tasks
+        if t.get("assignee_name") and not t.get("assignee_email")
+    }
+    clauses = [{"email": {"$in": list(emails)}}] if emails else []
+    clauses += [{"name": {"$regex": f"^{re.escape(name)}$", "$options": "i"}} for name in names]
+
+    by_email, by_name = {}, {}
+    if clauses:
+        for user in db.users.find({"$or": clauses}, {"email": 1, "name": 1}):
+            by_email[str(user.get("email", "")).lower()] = str(user["_id"])
+            by_name.setdefault(str(user.get("name", "")).lower(), str(user["_id"]))
+
+    items = []
+    errors = {}
+    for index, task in enumerate(tasks):
+        item = {k: v for k, v in task.items() if k not in ("assignee_email", "assignee_name")}
+        if task.get("assignee_email"):
+            item["assignee_id"] = by_email.get(str(task["assignee_email"]).strip().lower())
+            if not item["assignee_id"]:
+                errors[index] = f"User with email '{task['assignee_email']}' not found"
+        elif task.get("assignee_name"):
+            item["assignee_id"] = by_name.get(str(task["assignee_name"]).strip().lower())
+            if not item["assignee_id"]:
+                errors[index] = f"User '{task['assignee_name']}' not found"
+        if item.get("due_date"):
+            try:
+                item["due_date"] = _normalize_due_date_to_iso(str(item["due_date"]))
+            except HTTPException as e:
+                errors[index] = e.detail
+        items.append(item)
+    return items, errors
+
+
+def _bulk_create_agent_tasks(
+    creator_id: str,
+    project_id: str,
+    tasks: List[Dict[str, Any]],
+    idempotency_key: Optional[str] = None,
+):
+    """
+    Shared body of agent_bulk_create_tasks and agent_bulk_create_tasks_sync.
+    Items whose assignee or due date cannot be resolved fail on their own; the
+    rest go to task_controller.bulk_create_tasks in one batch.
+    Returns (summary, None) or (None, (message, status_code)).
+    """
+    items, item_errors = _prepare_bulk_create_items(tasks)
+    valid = [index for index in range(len(items)) if index not in item_errors]
+
+    results = {}
+    if valid:
+        # Idempotency keys from the request key use the item's original position
+        batch = []
+        for index in valid:
+            item = dict(items[index])
+            if idempotency_key and not item.get("idempotency_key"):
+                item["idempotency_key"] = f"{idempotency_key}:{index}"
+            batch.append(item)
+        outcome, error = task_controller.bulk_create_tasks(creator_id, project_id, batch)
+        if error:
+            return None, error
+        results = dict(zip(valid, outcome["results"]))
+
+    created = []
+    errors = []
+    for index, item in enumerate(items):
+        result = results.get(index)
+        if result and result["ok"]:
+            created.append(
+                {
+                    "index": index,
+                    "task_id": result["task_id"],
+                    "ticket_id": result["ticket_id"],
+                    "replayed": result["replayed"],
+                    "task": result.get("task") or {},
+                }
+            )
+        else:
+            errors.append(
+                {
+                    "index": index,
+                    "title": item.get("title"),
+                    "error": result["error"] if result else item_errors[index],
+                }
+            )
+
+    return {
+        "success": len(created) > 0,
+        "message": "Bulk task creation completed",
+        "project_id": project_id,
+        "total_requested": len(items),
+        "created_count": sum(1 for task in created if not task["replayed"]),
+        "replayed_count": sum(1 for task in created if task["replayed"]),
+        "failed_count": len(errors),
+        "created_tasks": created,
+        "errors": errors,
+    }, None
+
+
+def agent_bulk_create_tasks(
+    requesting_user: str,
+    project_id: str,
+    tasks: List[Dict[str, Any]],
+    user_id: str,
+    idempotency_key: Optional[str] = None,
+):
+    """
+    Create many tasks in one project with a single validation pass, one ticket
+    id reservation and one insert.
+
+    Each task accepts the agent_create_task fields (title, description,
+    assignee_email / assignee_name, priority, status, due_date, issue_type,
+    labels) plus an optional idempotency_key; retrying with the same keys
+    returns the tasks created the first time instead of duplicating them.
+    """
+    try:
+        actual_user = User.find_by_email(requesting_user)
+        if not actual_user:
+            raise HTTPException(
+                status_code=404, detail=f"User with email '{requesting_user}' not found"
+            )
+
+        user_role = actual_user.get("role", "").lower()
+        if user_role not in ["admin", "member", "super-admin"]:
+            raise HTTPException(
+                status_code=403,
+                detail=(
+                    "Only Admin, Member, and Super-Admin users can create tasks. "
+                    f"Your role is '{actual_user.get('role')}'"
+                ),
+            )
+
+        summary, error = _bulk_create_agent_tasks(
+            str(actual_user["_id"]), project_id, tasks, idempotency_key
+        )
+        if error:
+            raise HTTPException(status_code=error[1], detail=error[0])
+        return summary
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed bulk task creation: {str(e)}"
+        )
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # SYNCHRONOUS VERSIONS FOR LANGGRAPH TOOLS
 # ─────────────────────────────────────────────────────────────────────────────
@@ -788,6 +881,27 @@ def agent_create_task_sync(
         raise Exception(f"Failed to create task: {str(e)}")
 
 
+def agent_bulk_create_tasks_sync(
+    requesting_user: str,
+    project_id: str,
+    user_id: str,
+    tasks: List[Dict[str, Any]],
+    idempotency_key: Optional[str] = None,
+):
+    """
+    Synchronous bulk task creation for LangGraph tools (see agent_bulk_create_tasks).
+    user_id is the creator; a tool retried with the same idempotency keys gets
+    the tasks it already created back.
+    """
+    try:
+        summary, error = _bulk_create_agent_tasks(user_id, project_id, tasks, idempotency_key)
+    except Exception as e:
+        raise Exception(f"Failed to create tasks: {str(e)}")
+    if error:
+        raise Exception(error[0])
+    return summary
+
+
 def agent_assign_task_sync(
     requesting_user: str,
     task_id: str,
@@ -4,21 +4,26 @@ Handles ChatGPT-like AI interactions using env-configured Azure OpenAI + FLUX mo
 NOW with: Task automation, Sprint management, Member management, and intelligent insights
 """
 
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from models.ai_conversation import AIConversation, AIMessage
 from utils.azure_ai_utils import (
+    AZURE_OPENAI_DEPLOYMENT,
+    achat_completion_streaming,
     chat_completion,
-    chat_completion_streaming,
     generate_image,
     get_context_with_system_prompt,
     truncate_context,
+    truncate_to_tokens,
 )
 from utils.ai_data_analyzer import (
-    analyze_user_data_for_ai,
     build_ai_system_prompt,
+    build_ai_user_data_prompt,
     extract_insights_from_data,
 )
+from utils.user_context_service import get_user_snapshot
+from utils.response_cache import lookup_response, response_cache_key, store_response
 from controllers.agent_task_controller import agent_create_task, agent_assign_task
 from controllers.agent_sprint_controller import agent_create_sprint
 from controllers import task_controller, sprint_controller, member_controller
@@ -29,6 +34,8 @@ from models.sprint import Sprint
 from database import db
 from bson import ObjectId
 import json
+import threading
+import time
 from typing import Optional, List
 import os
 from datetime import datetime, timezone
@@ -1412,7 +1419,11 @@ def handle_list_members(user_id: str, params: dict):
 
 
 def send_message(
-    conversation_id: str, user_id: str, content: str, stream: bool = False
+    conversation_id: str,
+    user_id: str,
+    content: str,
+    stream: bool = False,
+    request: Optional[Request] = None,
 ):
     """
     Send a message and get AI response with intelligent data-driven insights
@@ -1630,14 +1641,28 @@ def send_message(
         recent_messages = AIMessage.get_recent_context(conversation_id, limit=20)
         print(f"   📚 Loaded {len(recent_messages)} previous messages")
 
+        # Repeated read-only questions are answered without an LLM call
+        cache_handle = response_cache_key(
+            "assistant",
+            user_id,
+            content,
+            AZURE_OPENAI_DEPLOYMENT,
+            has_history=len(recent_messages) > 1,
+        )
+        cached = lookup_response(cache_handle)
+        if cached:
+            print(f"   ⚡ Response cache hit ({cached['match']})")
+
         # 🆕 ANALYZE USER DATA for intelligent insights
         print(f"   🔍 Analyzing user data from MongoDB...")
 
-        user_data = analyze_user_data_for_ai(user_id)
+        user_data = get_user_snapshot(user_id)
 
-        # Build system prompt with user's data context
+        # Build system prompt; the data block is budgeted as its own section
+        user_data_prompt = None
         if user_data:
-            system_prompt = build_ai_system_prompt(user_data)
+            system_prompt = build_ai_system_prompt(user_data, include_data=False)
+            user_data_prompt = build_ai_user_data_prompt(user_data)
             print(f"   ✅ Enhanced system prompt with user data:")
             print(f"      - Tasks: {user_data['stats']['tasks']['total']}")
             print(f"      - Projects: {user_data['stats']['projects']['total']}")
@@ -1651,13 +1676,32 @@ def send_message(
 
         # Prepare messages for API with enhanced context
         api_messages = get_context_with_system_prompt(
-            recent_messages, system_prompt=system_prompt
+            recent_messages,
+            system_prompt=system_prompt,
+            user_data_prompt=user_data_prompt,
         )
         print(f"   📝 Prepared {len(api_messages)} messages for API")
 
-        # Truncate if needed
-        api_messages = truncate_context(api_messages, max_tokens=8000)
-        print(f"   ✂️ Truncated to {len(api_messages)} messages")
+        # Fit the token budget; older turns live on in the rolling summary
+        history_summary = conversation.get("history_summary") or {}
+        context_budget = {}
+        api_messages = truncate_context(
+            api_messages,
+            max_tokens=8000,
+            summary=history_summary.get("text"),
+            report=context_budget,
+        )
+        print(
+            f"   ✂️ Budgeted to {len(api_messages)} messages, "
+            f"{context_budget['final_tokens']} tokens ({context_budget['tokens_saved']} saved)"
+        )
+        schedule_history_summary(
+            conversation_id,
+            history_summary,
+            recent_messages,
+            context_budget["evicted_messages"],
+            conversation.get("message_count", 0) + 1,
+        )
 
         # Handle streaming vs non-streaming (streaming enabled for better UX)
         if stream:
@@ -1668,10 +1712,18 @@ def send_message(
                 user_content=content,
                 user_data=user_data,
                 conversation_message_count=conversation.get("message_count", 0),
+                request=request,
+                cached=cached,
+                cache_handle=cache_handle,
+                context_budget=context_budget,
             )
         else:
-            print(f"   🚀 Calling Azure OpenAI with data-driven context...")
-            response = chat_completion(messages=api_messages, max_tokens=2000)
+            if cached:
+                response = {"content": cached["content"]}
+            else:
+                print(f"   🚀 Calling Azure OpenAI with data-driven context...")
+                response = chat_completion(messages=api_messages, max_tokens=2000)
+                store_response(cache_handle, response["content"], response.get("tokens"))
             print(f"   ✅ Got AI response: {response['content'][:100]}...")
 
             # Save AI response
@@ -1705,6 +1757,8 @@ def send_message(
                 },
                 "tokens": response.get("tokens", {}),
                 "insights": insights,
+                "cached": bool(cached),
+                "context_budget": context_budget,
                 "user_data_summary": {
                     "tasks_total": user_data["stats"]["tasks"]["total"]
                     if user_data
@@ -1734,78 +1788,128 @@ def send_message(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def generate_voice_assistant_reply(
+def _prepare_voice_reply(
     user_id: str,
     content: str,
-    conversation_history: Optional[List[dict]] = None,
-    max_tokens: int = 160,
-):
+    conversation_history: Optional[List[dict]],
+    max_tokens: int,
+) -> dict:
     """
-    Lightweight DOIT AI Assistant reply path for voice usage.
-    Reuses existing LLM/data-insight stack, but skips conversation persistence.
+    Shared front half of the voice reply paths. Returns {"result": ...} when
+    the reply is already known (task command, response-cache hit), otherwise
+    {"api_messages": ..., "cache_handle": ...} ready for the LLM call.
     """
-    try:
-        if not content or not content.strip():
-            return {"success": False, "error": "Empty prompt"}
-
-        # Keep command capabilities available in voice mode.
-        if detect_task_command(content):
-            command_result = execute_task_command(user_id, content)
-            if command_result.get("success"):
-                command_message = command_result.get(
-                    "message", "Command executed successfully."
-                )
-                return {
+    # Keep command capabilities available in voice mode.
+    if detect_task_command(content):
+        command_result = execute_task_command(user_id, content)
+        if command_result.get("success"):
+            command_message = command_result.get(
+                "message", "Command executed successfully."
+            )
+            return {
+                "result": {
                     "success": True,
                     "response": command_message,
                     "command_executed": True,
                     "command_result": command_result,
                 }
+            }
 
-            return {
+        return {
+            "result": {
                 "success": False,
                 "error": command_result.get("error", "Command execution failed"),
                 "command_executed": True,
             }
+        }
 
-        compact_history = []
-        for msg in (conversation_history or [])[-6:]:
-            if not isinstance(msg, dict):
-                continue
+    compact_history = []
+    for msg in (conversation_history or [])[-6:]:
+        if not isinstance(msg, dict):
+            continue
 
-            role = str(msg.get("role", "user")).strip().lower()
-            role = "assistant" if role == "assistant" else "user"
-            text = str(msg.get("content", "")).replace("\n", " ").strip()
-            if not text:
-                continue
+        role = str(msg.get("role", "user")).strip().lower()
+        role = "assistant" if role == "assistant" else "user"
+        text = str(msg.get("content", "")).replace("\n", " ").strip()
+        if not text:
+            continue
 
-            compact_history.append({"role": role, "content": text[:300]})
+        compact_history.append({"role": role, "content": text[:300]})
 
-        compact_history.append({"role": "user", "content": content.strip()})
+    compact_history.append({"role": "user", "content": content.strip()})
 
-        user_data = analyze_user_data_for_ai(user_id)
-        voice_system_prompt = (
-            "You are DOIT voice assistant. Reply in plain spoken English only. "
-            "No markdown, no headings, no bullet points, no emojis, and no special symbols. "
-            "Keep answers concise and actionable, ideally under 35 words unless explicitly asked for detail."
-        )
-        data_context = build_ai_system_prompt(user_data) if user_data else ""
-        system_prompt = (
-            f"{voice_system_prompt}\n\n{data_context}"
-            if data_context
-            else voice_system_prompt
-        )
+    cache_handle = response_cache_key(
+        "voice",
+        user_id,
+        content,
+        f"{AZURE_OPENAI_DEPLOYMENT}:{max_tokens}",
+        has_history=len(compact_history) > 1,
+    )
+    cached = lookup_response(cache_handle)
+    if cached:
+        return {
+            "result": {
+                "success": True,
+                "response": cached["content"],
+                "tokens": {},
+                "command_executed": False,
+                "cached": True,
+            }
+        }
 
-        api_messages = get_context_with_system_prompt(
-            compact_history,
-            system_prompt=system_prompt,
-        )
-        api_messages = truncate_context(api_messages, max_tokens=1800)
+    user_data = get_user_snapshot(user_id)
+    voice_system_prompt = (
+        "You are DOIT voice assistant. Reply in plain spoken English only. "
+        "No markdown, no headings, no bullet points, no emojis, and no special symbols. "
+        "Keep answers concise and actionable, ideally under 35 words unless explicitly asked for detail."
+    )
+    data_context = (
+        build_ai_system_prompt(user_data, include_data=False) if user_data else ""
+    )
+    system_prompt = (
+        f"{voice_system_prompt}\n\n{data_context}"
+        if data_context
+        else voice_system_prompt
+    )
+
+    api_messages = get_context_with_system_prompt(
+        compact_history,
+        system_prompt=system_prompt,
+        user_data_prompt=build_ai_user_data_prompt(user_data) if user_data else None,
+    )
+    # Voice history is short; the instructions need most of the budget.
+    api_messages = truncate_context(
+        api_messages,
+        max_tokens=1800,
+        budgets={"system": 0.55, "user_data": 0.30},
+    )
+    return {"api_messages": api_messages, "cache_handle": cache_handle}
 
-        response = chat_completion(messages=api_messages, max_tokens=max_tokens)
+
+def generate_voice_assistant_reply(
+    user_id: str,
+    content: str,
+    conversation_history: Optional[List[dict]] = None,
+    max_tokens: int = 160,
+):
+    """
+    Lightweight DOIT AI Assistant reply path for voice usage.
+    Reuses existing LLM/data-insight stack, but skips conversation persistence.
+    """
+    try:
+        if not content or not content.strip():
+            return {"success": False, "error": "Empty prompt"}
+
+        prepared = _prepare_voice_reply(user_id, content, conversation_history, max_tokens)
+        if "result" in prepared:
+            return prepared["result"]
+
+        response = chat_completion(messages=prepared["api_messages"], max_tokens=max_tokens)
+        reply = (response.get("content") or "").strip()
+        store_response(prepared["cache_handle"], reply, response.get("tokens"))
         return {
             "success": True,
-            "response": (response.get("content") or "").strip(),
+            "response": reply,
             "tokens": response.get("tokens", {}),
             "command_executed": False,
         }
@@ -1815,11 +1919,164 @@ def generate_voice_assistant_reply(
         return {"success": False, "error": str(e)}
 
 
+async def stream_voice_assistant_reply(
+    user_id: str,
+    content: str,
+    conversation_history: Optional[List[dict]] = None,
+    max_tokens: int = 160,
+):
+    """
+    Async generator over reply text deltas for the streaming voice loop.
+    Command results and response-cache hits arrive as a single delta;
+    errors are raised (RuntimeError) rather than returned.
+    """
+    if not content or not content.strip():
+        raise RuntimeError("Empty prompt")
+
+    prepared = await run_in_threadpool(
+        _prepare_voice_reply, user_id, content, conversation_history, max_tokens
+    )
+    if "result" in prepared:
+        result = prepared["result"]
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "Voice assistant error"))
+        yield result.get("response", "")
+        return
+
+    usage = {}
+    parts: List[str] = []
+    upstream = achat_completion_streaming(
+        prepared["api_messages"], max_tokens=max_tokens, usage_out=usage
+    )
+    completed = False
+    try:
+        async for delta in upstream:
+            parts.append(delta)
+            yield delta
+        completed = True
+    finally:
+        await upstream.aclose()
+        if completed:
+            store_response(prepared["cache_handle"], "".join(parts).strip(), usage)
+
+
+# ============================================================================
+# ROLLING HISTORY SUMMARY
+# ============================================================================
+
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("AI_HISTORY_SUMMARY_MAX_TOKENS", "300"))
+HISTORY_SUMMARY_MAX_MESSAGES = int(os.getenv("AI_HISTORY_SUMMARY_MAX_MESSAGES", "40"))
+
+_summary_lock = threading.Lock()
+_summaries_in_flight = set()
+
+
+def schedule_history_summary(
+    conversation_id: str,
+    previous: dict,
+    recent_messages: list,
+    evicted: int,
+    message_count: int,
+):
+    """
+    Fold turns that no longer reach the prompt (evicted by the token budget
+    or older than the loaded window) into the conversation's rolling summary.
+    Runs on a background thread so the extra completion never delays the reply.
+    """
+    if not evicted and message_count <= len(recent_messages):
+        return
+    before = recent_messages[evicted]["created_at"] if evicted < len(recent_messages) else None
+
+    with _summary_lock:
+        if conversation_id in _summaries_in_flight:
+            return
+        _summaries_in_flight.add(conversation_id)
+    threading.Thread(
+        target=_refresh_history_summary,
+        args=(conversation_id, previous, before),
+        daemon=True,
+    ).start()
+
+
+def _refresh_history_summary(conversation_id: str, previous: dict, before):
+    try:
+        older = AIMessage.get_messages_between(
+            conversation_id,
+            after=previous.get("through"),
+            before=before,
+            limit=HISTORY_SUMMARY_MAX_MESSAGES,
+        )
+        if not older:
+            return
+
+        transcript = "\n".join(
+            f"{m.get('role', 'user')}: {truncate_to_tokens(m.get('content') or '', 200)}"
+            for m in older
+        )
+        response = chat_completion(
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Maintain a running summary of a project-management assistant "
+                    "conversation. Merge the new turns into the existing summary. Keep "
+                    "task IDs, names, decisions, numbers and open questions; drop small talk. "
+                    f"Reply with the summary only, under {HISTORY_SUMMARY_MAX_TOKENS} tokens.",
+                },
+                {
+                    "role": "user",
+                    "content": f"Existing summary:\n{previous.get('text') or '(none)'}\n\n"
+                    f"New turns:\n{transcript}",
+                },
+            ],
+            max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+        )
+        text = (response.get("content") or "").strip()
+        if text:
+            AIConversation.update_history_summary(
+                conversation_id, text, older[-1]["created_at"]
+            )
+            print(f"   🧾 History summary updated ({len(older)} turns folded)")
+    except Exception as e:
+        print(f"⚠️ History summary refresh failed for {conversation_id}: {str(e)}")
+    finally:
+        with _summary_lock:
+            _summaries_in_flight.discard(conversation_id)
+
+
 # ============================================================================
 # STREAMING & OTHER FEATURES (Keep existing implementations)
 # ============================================================================
 
 
+# Small deltas are coalesced into one SSE frame until either threshold is hit.
+STREAM_FLUSH_MIN_CHARS = int(os.getenv("AI_STREAM_FLUSH_MIN_CHARS", "24"))
+STREAM_FLUSH_INTERVAL_SECONDS = float(os.getenv("AI_STREAM_FLUSH_INTERVAL_MS", "50")) / 1000
+
+
+def _save_streamed_reply(
+    conversation_id: str,
+    content: str,
+    usage: dict,
+    metrics: dict,
+    user_content: Optional[str],
+    conversation_message_count: int,
+):
+    ai_message_id = AIMessage.create(
+        conversation_id=conversation_id,
+        role="assistant",
+        content=content,
+        tokens_used=usage.get("total", 0),
+        metrics=metrics,
+    )
+    AIConversation.record_stream_metrics(conversation_id, metrics)
+
+    # Update conversation title if it's the first message
+    if user_content and conversation_message_count <= 2:
+        title = user_content[:50] + ("..." if len(user_content) > 50 else "")
+        AIConversation.update_title(conversation_id, title)
+    return ai_message_id
+
+
 def stream_ai_response(
     conversation_id: str,
     api_messages: List[dict],
@@ -1827,40 +2084,123 @@ def stream_ai_response(
     user_content: str = None,
     user_data: dict = None,
     conversation_message_count: int = 0,
+    request: Optional[Request] = None,
+    cached: Optional[dict] = None,
+    cache_handle: Optional[dict] = None,
+    context_budget: Optional[dict] = None,
 ):
     """
     Stream AI response chunks - COMPATIBLE with existing frontend
 
     🚀 OPTIMIZED: Uses existing SSE format for backwards compatibility
+    ⚡ Fully async: tokens come from the async Azure client, so waiting for
+    the next delta never blocks the event loop. Small deltas are batched
+    into one frame, a client disconnect cancels the upstream completion, and
+    time-to-first-token / tokens-per-second are stored per conversation.
+    A response-cache hit (``cached``) is replayed through the same path.
     """
 
-    async def generate():
-        try:
-            # Stream AI response chunks as they arrive (original format)
-            full_content = ""
-            for chunk in chat_completion_streaming(api_messages):
-                full_content += chunk
-                yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-
-            # Save complete AI response
-            ai_message_id = AIMessage.create(
-                conversation_id=conversation_id, role="assistant", content=full_content
-            )
+    async def _replay(text: str):
+        yield text
 
-            # Update conversation title if it's the first message
-            if user_content and conversation_message_count <= 2:
-                title = user_content[:50] + ("..." if len(user_content) > 50 else "")
-                AIConversation.update_title(conversation_id, title)
-
-            # Emit completion (original format)
-            yield f"data: {json.dumps({'done': True, 'message_id': str(ai_message_id)})}\n\n"
+    async def generate():
+        started = time.perf_counter()
+        first_token_at = None
+        last_flush = started
+        usage: dict = {}
+        parts: List[str] = []
+        pending: List[str] = []
+        pending_chars = 0
+        disconnected = False
+        upstream = (
+            _replay(cached["content"])
+            if cached
+            else achat_completion_streaming(api_messages, usage_out=usage)
+        )
 
+        try:
+            async for chunk in upstream:
+                now = time.perf_counter()
+                if first_token_at is None:
+                    first_token_at = now
+                parts.append(chunk)
+                pending.append(chunk)
+                pending_chars += len(chunk)
+
+                # Always flush the first delta so time-to-first-token stays minimal.
+                if (
+                    len(parts) > 1
+                    and pending_chars < STREAM_FLUSH_MIN_CHARS
+                    and now - last_flush < STREAM_FLUSH_INTERVAL_SECONDS
+                ):
+                    continue
+
+                if request is not None and await request.is_disconnected():
+                    disconnected = True
+                    break
+
+                # Stream AI response chunks as they arrive (original format)
+                yield f"data: {json.dumps({'chunk': ''.join(pending)})}\n\n"
+                pending, pending_chars, last_flush = [], 0, now
+
+            if pending and not disconnected:
+                yield f"data: {json.dumps({'chunk': ''.join(pending)})}\n\n"
         except Exception as e:
             print(f"❌ Error in stream: {str(e)}")
             import traceback
 
             traceback.print_exc()
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+        finally:
+            # Closes the upstream HTTP stream → Azure stops generating.
+            await upstream.aclose()
+
+        finished = time.perf_counter()
+        full_content = "".join(parts)
+        completion_tokens = usage.get("completion") or len(parts)
+        generation_seconds = finished - (first_token_at or finished)
+        metrics = {
+            "ttft_ms": round((first_token_at - started) * 1000, 1) if first_token_at else None,
+            "duration_seconds": round(finished - started, 3),
+            "completion_tokens": completion_tokens,
+            "tokens_per_second": round(completion_tokens / generation_seconds, 1)
+            if generation_seconds > 0
+            else None,
+            "cancelled": disconnected,
+            "cache_hit": bool(cached),
+            "prompt_tokens_saved": (context_budget or {}).get("tokens_saved"),
+        }
+        print(
+            f"   ⚡ Stream metrics: TTFT={metrics['ttft_ms']}ms, "
+            f"{metrics['tokens_per_second']} tok/s, cancelled={disconnected}"
+        )
+
+        if not full_content:
+            return
+        if not cached and not disconnected:
+            store_response(cache_handle, full_content, usage)
+
+        try:
+            # Save complete (or partial, if the client left) AI response
+            ai_message_id = await run_in_threadpool(
+                _save_streamed_reply,
+                conversation_id,
+                full_content,
+                usage,
+                metrics,
+                user_content,
+                conversation_message_count,
+            )
+        except Exception as e:
+            print(f"❌ Error saving streamed reply: {str(e)}")
+            if not disconnected:
+                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+
+        if not disconnected:
+            # Emit completion (original format)
+            yield f"data: {json.dumps({'done': True, 'message_id': str(ai_message_id), 'metrics': metrics})}\n\n"
 
     return StreamingResponse(
         generate(),
@@ -2079,7 +2419,7 @@ def update_conversation_title(conversation_id: str, user_id: str, title: str):
 def get_user_insights(user_id: str):
     """Get data-driven insights for user"""
     try:
-        user_data = analyze_user_data_for_ai(user_id)
+        user_data = get_user_snapshot(user_id)
 
         if not user_data:
             return {"success": False, "error": "Could not analyze user data"}
@@ -2139,7 +2479,7 @@ def handle_bulk_approve_close(user_id: str, params: dict):
                 query["project_id"] = str(project["_id"])
 
         # Find all tasks matching criteria
-        tasks = list(db.tasks.find(query))
+        tasks = list(db.tasks.find(query, {"ticket_id": 1, "title": 1, "status": 1}))
 
         if not tasks:
             return {
@@ -2149,29 +2489,21 @@ def handle_bulk_approve_close(user_id: str, params: dict):
                 "message": "No tasks found pending approval",
             }
 
-        # Update all tasks to Closed
-        updated_count = 0
-        closed_tasks = []
-
-        for task in tasks:
-            task_id = str(task["_id"])
-
-            # Update task to Closed
-            update_data = {"status": "Closed"}
-            body = json.dumps(update_data)
-
-            response = task_controller.update_task(body, task_id, user_id)
-
-            if response.get("statusCode", 200) < 400:
-                updated_count += 1
-                closed_tasks.append(
-                    {
-                        "ticket_id": task.get("ticket_id", ""),
-                        "title": task.get("title", ""),
-                        "old_status": task.get("status", ""),
-                        "new_status": "Closed",
-                    }
-                )
+        # Close all tasks with one bulk_write (owner-only rule checked per project)
+        outcome = task_controller.bulk_update_tasks(
+            user_id, [str(task["_id"]) for task in tasks], {"status": "Closed"}
+        )
+        updated_count = outcome["updated_count"]
+        closed_tasks = [
+            {
+                "ticket_id": task.get("ticket_id", ""),
+                "title": task.get("title", ""),
+                "old_status": task.get("status", ""),
+                "new_status": "Closed",
+            }
+            for task, result in zip(tasks, outcome["results"])
+            if result["ok"]
+        ]
 
         return {
             "success": True,
@@ -2225,7 +2557,7 @@ def handle_bulk_status_update(user_id: str, params: dict):
                 query["project_id"] = str(project["_id"])
 
         # Find matching tasks
-        tasks = list(db.tasks.find(query))
+        tasks = list(db.tasks.find(query, {"ticket_id": 1, "title": 1, "status": 1}))
 
         if not tasks:
             return {
@@ -2235,28 +2567,21 @@ def handle_bulk_status_update(user_id: str, params: dict):
                 "message": "No tasks found matching criteria",
             }
 
-        # Update all tasks
-        updated_count = 0
-        updated_tasks = []
-
-        for task in tasks:
-            task_id = str(task["_id"])
-
-            update_data = {"status": target_status}
-            body = json.dumps(update_data)
-
-            response = task_controller.update_task(body, task_id, user_id)
-
-            if response.get("statusCode", 200) < 400:
-                updated_count += 1
-                updated_tasks.append(
-                    {
-                        "ticket_id": task.get("ticket_id", ""),
-                        "title": task.get("title", ""),
-                        "old_status": task.get("status", ""),
-                        "new_status": target_status,
-                    }
-                )
+        # Update all tasks with one bulk_write
+        outcome = task_controller.bulk_update_tasks(
+            user_id, [str(task["_id"]) for task in tasks], {"status": target_status}
+        )
+        updated_count = outcome["updated_count"]
+        updated_tasks = [
+            {
+                "ticket_id": task.get("ticket_id", ""),
+                "title": task.get("title", ""),
+                "old_status": task.get("status", ""),
+                "new_status": target_status,
+            }
+            for task, result in zip(tasks, outcome["results"])
+            if result["ok"]
+        ]
 
         return {
             "success": True,
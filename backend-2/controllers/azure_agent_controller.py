@@ -21,7 +21,7 @@ from utils.azure_agent_utils import (
     check_agent_health,
     _thread_cache,
 )
-from utils.ai_data_analyzer import analyze_user_data_for_ai
+from utils.user_context_service import get_user_snapshot
 import json
 
 
@@ -123,7 +123,7 @@ def send_message_to_foundry_agent(
         # ── Optionally build user context ────────────────────────────────
         context = None
         if include_user_context:
-            user_data = analyze_user_data_for_ai(user_id)
+            user_data = get_user_snapshot(user_id)
             if user_data:
                 stats = user_data.get("stats", {})
                 tasks = stats.get("tasks", {})
@@ -29,10 +29,10 @@ from utils.azure_ai_utils import (
     AZURE_OPENAI_DEPLOYMENT,
 )
 from utils.ai_data_analyzer import (
-    analyze_user_data_for_ai,
     build_ai_system_prompt,
     extract_insights_from_data,
 )
+from utils.user_context_service import get_user_snapshot
 from fastapi.responses import StreamingResponse
 import asyncio
 
@@ -139,7 +139,7 @@ def chat_ask(body_str: str, user_id: str):
             system_prompt = build_pm_system_prompt(persona, context)
         else:
             # General mode: Get personal task/project data with AI-optimized analyzer
-            user_data = analyze_user_data_for_ai(user_id)
+            user_data = get_user_snapshot(user_id)
             if not user_data:
                 return error_response("Failed to analyze user data", 500)
             system_prompt = build_ai_system_prompt(user_data)
@@ -243,7 +243,7 @@ def chat_ask_streaming(body_str: str, user_id: str):
             system_prompt = build_pm_system_prompt(persona, context)
         else:
             # Use AI-optimized data analyzer for better performance
-            user_data = analyze_user_data_for_ai(user_id)
+            user_data = get_user_snapshot(user_id)
             if not user_data:
                 return error_response("Failed to analyze user data", 500)
             system_prompt = build_ai_system_prompt(user_data)
@@ -339,7 +339,7 @@ def get_chat_suggestions(user_id: str):
         return error_response("Unauthorized. Please login.", 401)
     
     try:
-        user_data = analyze_user_data_for_ai(user_id)
+        user_data = get_user_snapshot(user_id)
         if not user_data:
             return error_response("Failed to analyze user data", 500)
         
@@ -19,6 +19,9 @@ _project_sync_state = {}
 def _run_project_sync_job(project_id, tasks_list, min_interval_seconds):
     """Internal worker for asynchronous project git sync."""
     try:
+        # Paginated task listings pass a loader so the ticket query runs off the request path
+        if callable(tasks_list):
+            tasks_list = tasks_list()
         sync_project_git_notifications(project_id, tasks_list)
     finally:
         with _project_sync_lock:
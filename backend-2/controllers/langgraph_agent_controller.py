@@ -15,17 +15,14 @@ from utils.langgraph_agent_utils import (
     clear_chat_history,
     get_chat_history,
     check_langgraph_agent_health,
+    get_langgraph_state_stats,
 )
 from utils.langgraph_agent_tools import (
     get_all_langgraph_tools,
     set_tool_context,
 )
-from utils.ai_data_analyzer import analyze_user_data_for_ai
-from utils.cache_utils import (
-    get_cached_user_context,
-    cache_user_context,
-    clear_user_context_cache,
-)
+from utils.user_context_service import get_agent_context, invalidate_user_context
+from utils.response_cache import get_response_cache_stats
 from models.user import User
 import json
 
@@ -73,7 +70,7 @@ def delete_langgraph_conversation(conversation_id: str, user_id: str):
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         clear_chat_history(conversation_id)
-        clear_user_context_cache(user_id)
+        invalidate_user_context(user_id)
         AIConversation.delete(conversation_id)
         return {"success": True, "message": "Conversation deleted"}
     except HTTPException:
@@ -122,50 +119,14 @@ def send_message_to_langgraph(
         user_role = user.get("role", "member")
 
         # Set tool context
-        set_tool_context(user_id, user_email, user_role)
+        set_tool_context(user_id, user_email, user_role, conversation_id)
 
         # ── Build user context ───────────────────────────────────────────────
         context = None
         if include_user_context:
-            context = get_cached_user_context(user_id)
-
-            if context is None:
-                user_data = analyze_user_data_for_ai(user_id)
-                if user_data:
-                    stats = user_data.get("stats", {})
-                    tasks = stats.get("tasks", {})
-                    projects = stats.get("projects", {})
-                    sprints = stats.get("sprints", {})
-                    velocity = user_data.get("velocity", {})
-                    blockers = user_data.get("blockers", {})
-
-                    context = {
-                        "user_name": user_data["user"]["name"],
-                        "user_role": user_data["user"]["role"],
-                        "tasks_total": tasks.get("total", 0),
-                        "tasks_overdue": tasks.get("overdue", 0),
-                        "tasks_due_soon": tasks.get("dueSoon", 0),
-                        "tasks_done_week": tasks.get("completedWeek", 0),
-                        "status_breakdown": tasks.get("statusBreakdown", {}),
-                        "priority_breakdown": tasks.get("priorityBreakdown", {}),
-                        "projects_total": projects.get("total", 0),
-                        "sprints_active": sprints.get("active", 0),
-                        "velocity_30d": velocity.get("completed_last_30_days", 0),
-                        "blocked_tasks": blockers.get("blocked_tasks", 0),
-                        "recent_tasks": [
-                            {
-                                "ticket": t.get("ticket_id"),
-                                "title": t.get("title"),
-                                "status": t.get("status"),
-                                "due": t.get("dueDate"),
-                            }
-                            for t in user_data.get("recentTasks", [])[:8]
-                        ],
-                    }
-                    cache_user_context(user_id, context, ttl=60)
-                    print(f"   📊 Context: {tasks.get('total')} tasks [from DB]")
-            else:
-                print(f"   ⚡ Context cached: {context.get('tasks_total')} tasks")
+            context = get_agent_context(user_id)
+            if context:
+                print(f"   📊 Context: {context.get('tasks_total')} tasks")
 
         # ── Get tools ────────────────────────────────────────────────────────
         tools = get_all_langgraph_tools()
@@ -223,6 +184,7 @@ def send_message_to_langgraph(
             "model": result.get("model"),
             "tool_calls": result.get("tool_calls", []),
             "tokens": tokens,
+            "cached": result.get("cached", False),
         }
 
     except HTTPException:
@@ -239,7 +201,7 @@ def send_message_to_langgraph(
 
 
 def reset_langgraph_history(conversation_id: str):
-    """Wipe the in-memory chat history for this conversation."""
+    """Wipe the chat history and checkpointed agent memory for this conversation."""
     clear_chat_history(conversation_id)
     return {
         "success": True,
@@ -248,7 +210,7 @@ def reset_langgraph_history(conversation_id: str):
 
 
 def get_langgraph_history(conversation_id: str):
-    """Return the current in-memory chat history."""
+    """Return the current (persisted) chat history."""
     history = get_chat_history(conversation_id)
     return {"success": True, "history": history, "turns": len(history) // 2}
 
@@ -265,4 +227,6 @@ def langgraph_agent_health_check():
         "deployment": health.get("deployment"),
         "api_version": health.get("api_version"),
         "error": health.get("error"),
+        "state_store": get_langgraph_state_stats(),
+        "response_cache": get_response_cache_stats(),
     }
@@ -17,11 +17,10 @@ from utils.local_agent_utils import (
     OLLAMA_MODEL,
     CHROMA_DB_PATH,
 )
-from utils.ai_data_analyzer import analyze_user_data_for_ai
-from utils.cache_utils import (
-    get_cached_user_context,
-    cache_user_context,
-    clear_user_context_cache,
+from utils.user_context_service import (
+    get_agent_context,
+    get_user_snapshot,
+    invalidate_user_context,
 )
 from utils.local_agent_automation import (
     detect_task_automation,
@@ -84,7 +83,7 @@ def delete_local_conversation(conversation_id: str, user_id: str):
 
         # Clear in-memory chat history so the next conversation starts clean
         clear_chat_history(user_id)
-        clear_user_context_cache(user_id)  # Also clear user context cache
+        invalidate_user_context(user_id)  # Also clear user context cache
         AIConversation.delete(conversation_id)
         return {"success": True, "message": "Conversation deleted"}
     except HTTPException:
@@ -156,54 +155,15 @@ def send_message_to_local(
         # ── Build user context (identical shape to Foundry controller) ───────
         context = None
         if include_user_context:
-            # Check cache first (60s TTL) to avoid database hit on every message
-            context = get_cached_user_context(user_id)
-
-            if context is None:
-                # Cache miss — fetch and cache user data
-                user_data = analyze_user_data_for_ai(user_id)
-                if user_data:
-                    stats = user_data.get("stats", {})
-                    tasks = stats.get("tasks", {})
-                    projects = stats.get("projects", {})
-                    sprints = stats.get("sprints", {})
-                    velocity = user_data.get("velocity", {})
-                    blockers = user_data.get("blockers", {})
-
-                    context = {
-                        "user_name": user_data["user"]["name"],
-                        "user_role": user_data["user"]["role"],
-                        "tasks_total": tasks.get("total", 0),
-                        "tasks_overdue": tasks.get("overdue", 0),
-                        "tasks_due_soon": tasks.get("dueSoon", 0),
-                        "tasks_done_week": tasks.get("completedWeek", 0),
-                        "status_breakdown": tasks.get("statusBreakdown", {}),
-                        "priority_breakdown": tasks.get("priorityBreakdown", {}),
-                        "projects_total": projects.get("total", 0),
-                        "sprints_active": sprints.get("active", 0),
-                        "velocity_30d": velocity.get("completed_last_30_days", 0),
-                        "blocked_tasks": blockers.get("blocked_tasks", 0),
-                        "recent_tasks": [
-                            {
-                                "ticket": t.get("ticket_id"),
-                                "title": t.get("title"),
-                                "status": t.get("status"),
-                                "due": t.get("dueDate"),
-                            }
-                            for t in user_data.get("recentTasks", [])[:8]
-                        ],
-                    }
-                    # Cache for 60 seconds to reduce DB queries
-                    cache_user_context(user_id, context, ttl=60)
-                    print(
-                        f"   📊 Context: {tasks.get('total')} tasks, "
-                        f"{tasks.get('overdue')} overdue [from DB]"
-                    )
-                else:
-                    print("   ⚠️  User context unavailable")
+            # Shared snapshot, cached per user and invalidated on writes
+            context = get_agent_context(user_id)
+            if context:
+                print(
+                    f"   📊 Context: {context.get('tasks_total')} tasks, "
+                    f"{context.get('tasks_overdue')} overdue"
+                )
             else:
-                # Cache hit — faster path
-                print(f"   ⚡ Context cached: {context.get('tasks_total')} tasks")
+                print("   ⚠️  User context unavailable")
 
         # ── Call local agent (Ollama + RAG) ──────────────────────────────────
         result = send_message_to_local_agent(
@@ -320,18 +280,16 @@ def handle_local_automation(user_id: str, command: str):
         user_role = user.get("role", "member").lower()
 
         # Get user context for command parsing
-        context = get_cached_user_context(user_id)
-        if not context:
-            user_data = analyze_user_data_for_ai(user_id)
-            if user_data:
-                stats = user_data.get("stats", {})
-                context = {
-                    "user_role": user_role,
-                    "projects": stats.get("projects", {}),
-                    "sprints": stats.get("sprints", {}),
-                }
-            else:
-                context = {"user_role": user_role}
+        user_data = get_user_snapshot(user_id)
+        if user_data:
+            stats = user_data.get("stats", {})
+            context = {
+                "user_role": user_role,
+                "projects": stats.get("projects", {}),
+                "sprints": stats.get("sprints", {}),
+            }
+        else:
+            context = {"user_role": user_role}
 
         # Parse command using Ollama
         from utils.local_agent_utils import get_llm
@@ -18,20 +18,21 @@ from datetime import datetime
 from typing import Any, Dict
 
 from dotenv import load_dotenv
-from openai import AzureOpenAI
 
+from utils.azure_ai_utils import get_azure_client
 from utils.schedule_tool_client import call_schedule_tool
 
 load_dotenv()
 
-# ── Azure OpenAI client (reuses DOIT's env vars) ─────────────────────────────
-_client = AzureOpenAI(
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-    api_key=os.getenv("AZURE_OPENAI_KEY"),
-)
 MODEL = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o")
 
+# ── Azure OpenAI client (reuses DOIT's env vars + shared connection pool) ────
+_client = get_azure_client(
+    os.getenv("AZURE_OPENAI_API_VERSION"),
+    endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    deployment=MODEL,
+)
+
 # ── Tool definitions ──────────────────────────────────────────────────────────
 # jwt_token / user_id are NEVER included here — injected by the controller.
 
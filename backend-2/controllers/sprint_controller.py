@@ -2,8 +2,16 @@ import json
 from models.sprint import Sprint
 from models.project import Project
 from models.task import Task
+from models.board_change import record_task_changes
+from controllers import task_controller
 from utils.response import success_response, error_response
 from utils.validators import validate_required_fields
+from utils.sprint_stats import (
+    get_project_sprint_stats,
+    get_project_velocity,
+    get_sprint_burndown,
+    get_sprint_stats,
+)
 from database import db
 from bson import ObjectId
 
@@ -74,8 +82,8 @@ def get_project_sprints(project_id, user_id):
 
     sprints = Sprint.find_by_project(project_id)
 
-    # Get task counts for each sprint
-    from database import db
+    # Task counts for every sprint in one aggregation
+    sprint_stats = get_project_sprint_stats(project_id, [s["_id"] for s in sprints])
 
     # Convert ObjectId and datetime to strings, add task stats
     for sprint in sprints:
@@ -95,23 +103,11 @@ def get_project_sprints(project_id, user_id):
         sprint.setdefault("start_date", None)
         sprint.setdefault("end_date", None)
 
-        # Calculate real-time task statistics
-        sprint_id_str = str(sprint["_id"])
-        total_tasks = db.tasks.count_documents({"sprint_id": sprint_id_str})
-        completed_tasks = db.tasks.count_documents(
-            {"sprint_id": sprint_id_str, "status": "Done"}
-        )
-
-        sprint["total_tasks"] = total_tasks
-        sprint["completed_tasks"] = completed_tasks
-
-        # Calculate completion percentage - handle division by zero
-        if total_tasks > 0:
-            sprint["completion_percentage"] = round(
-                (completed_tasks / total_tasks) * 100, 1
-            )
-        else:
-            sprint["completion_percentage"] = 0  # 0% when no tasks
+        # Real-time task statistics
+        stats = sprint_stats[sprint["_id"]]
+        sprint["total_tasks"] = stats["total_tasks"]
+        sprint["completed_tasks"] = stats["completed_tasks"]
+        sprint["completion_percentage"] = stats["completion_percentage"]
 
     return success_response({"sprints": sprints, "count": len(sprints)})
 
@@ -288,26 +284,62 @@ def complete_sprint(sprint_id, user_id):
 
     # Get task counts for snapshot
     sprint_id_str = str(sprint_id)
-    total_tasks = db.tasks.count_documents({"sprint_id": sprint_id_str})
-    completed_tasks = db.tasks.count_documents(
-        {"sprint_id": sprint_id_str, "status": "Done"}
-    )
+    stats = get_sprint_stats(sprint_id_str)
 
     # Complete the sprint with snapshot
-    success = Sprint.complete_sprint(sprint_id, total_tasks, completed_tasks)
+    success = Sprint.complete_sprint(
+        sprint_id, stats["total_tasks"], stats["completed_tasks"]
+    )
 
     if success:
         # Move incomplete tasks to backlog
+        unfinished = {"sprint_id": sprint_id_str, "status": {"$ne": "Done"}}
+        moved = db.tasks.distinct("_id", unfinished)
         db.tasks.update_many(
-            {"sprint_id": sprint_id_str, "status": {"$ne": "Done"}},
+            unfinished,
             {"$unset": {"sprint_id": ""}, "$set": {"in_backlog": True}},
         )
+        record_task_changes(sprint["project_id"], "updated", moved)
 
         return success_response({"message": "Sprint completed successfully"})
     else:
         return error_response("Failed to complete sprint", 500)
 
 
+def get_sprint_burndown_chart(sprint_id, user_id):
+    """Daily remaining-work series for a sprint"""
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    sprint = Sprint.find_by_id(sprint_id)
+    if not sprint:
+        return error_response("Sprint not found", 404)
+
+    if not Project.is_member(sprint["project_id"], user_id):
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
+
+    return success_response({"burndown": get_sprint_burndown(sprint)})
+
+
+def get_project_velocity_chart(project_id, user_id, limit=8):
+    """Finished vs committed tasks over the project's last completed sprints"""
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    if not Project.is_member(project_id, user_id):
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
+
+    velocity = get_project_velocity(project_id, max(1, min(int(limit or 8), 26)))
+    for point in velocity["series"]:
+        if point.get("completed_at"):
+            point["completed_at"] = point["completed_at"].isoformat()
+    return success_response({"velocity": velocity})
+
+
 def add_task_to_sprint(sprint_id, body_str, user_id):
     """Add a task to a sprint"""
     if not user_id:
@@ -354,6 +386,7 @@ def add_task_to_sprint(sprint_id, body_str, user_id):
     )
 
     if result.modified_count > 0:
+        record_task_changes(sprint["project_id"], "updated", [task_id])
         return success_response({"message": "Task added to sprint successfully"})
     else:
         return error_response("Failed to add task to sprint", 500)
@@ -384,11 +417,46 @@ def remove_task_from_sprint(sprint_id, task_id, user_id):
     )
 
     if result.modified_count > 0:
+        record_task_changes(sprint["project_id"], "updated", [task_id])
         return success_response({"message": "Task removed from sprint successfully"})
     else:
         return error_response("Task not found in sprint", 404)
 
 
+def bulk_add_tasks_to_sprint(sprint, task_identifiers, user_id, ordered=False):
+    """
+    Add many tasks (Mongo _ids or ticket ids) to ``sprint`` in one bulk_write.
+    Returns task_controller.bulk_mutate_tasks results.
+    """
+    sprint_id = str(sprint["_id"])
+
+    def build_change(task, role):
+        if task.get("sprint_id") == sprint_id:
+            return "Task is already in this sprint"
+        return {"set": {"sprint_id": sprint_id}, "unset": ["in_backlog"]}
+
+    return task_controller.bulk_mutate_tasks(
+        user_id, task_identifiers, build_change, sprint["project_id"], ordered
+    )
+
+
+def bulk_remove_tasks_from_sprint(sprint, task_identifiers, user_id, ordered=False):
+    """
+    Remove many tasks from ``sprint`` in one bulk_write.
+    Returns task_controller.bulk_mutate_tasks results.
+    """
+    sprint_id = str(sprint["_id"])
+
+    def build_change(task, role):
+        if task.get("sprint_id") != sprint_id:
+            return "Task not found in sprint"
+        return {"unset": ["sprint_id"], "match": {"sprint_id": sprint_id}}
+
+    return task_controller.bulk_mutate_tasks(
+        user_id, task_identifiers, build_change, sprint["project_id"], ordered
+    )
+
+
 def get_sprint_tasks(sprint_id, user_id):
     """Get all tasks in a sprint"""
     if not user_id:
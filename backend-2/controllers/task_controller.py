@@ -1,24 +1,49 @@
 import json
-import asyncio
 import logging
 import os
-from models.task import Task
+from models.task import Task, TASK_LIST_FIELDS, decode_task_cursor
+from models.task_activity import TaskActivity
+from models.board_change import BoardChange
 from models.project import Project
 from models.user import User
 from models.team_integration import TeamIntegration
 from utils.platform_apis import SlackAPI
 from utils.response import success_response, error_response, datetime_to_iso
 from utils.validators import validate_required_fields
-from utils.ticket_utils import generate_ticket_id
+from utils.ticket_utils import generate_ticket_id, reserve_ticket_ids
 from utils.label_utils import validate_label, normalize_label
 from utils.websocket_manager import manager
 from utils.notification_utils import send_slack_notification
+from utils.user_display_cache import get_user_display, get_user_displays
 from bson import ObjectId
 from datetime import datetime, timezone
 
 
 logger = logging.getLogger(__name__)
 
+# update_task only compares against these before its single find_one_and_update
+_UPDATE_PRECHECK_FIELDS = {"project_id": 1, "status": 1, "assignee_id": 1}
+
+# Loaded once per task by bulk_mutate_tasks (one $in query for the whole batch)
+_BULK_PRECHECK_FIELDS = {**_UPDATE_PRECHECK_FIELDS, "sprint_id": 1, "ticket_id": 1, "title": 1}
+
+# Newest activity entries embedded in the task detail payload; older pages via get_task_activities
+TASK_DETAIL_ACTIVITY_LIMIT = int(os.getenv("TASK_DETAIL_ACTIVITY_LIMIT", "100"))
+
+# Paginated project task listing (get_project_tasks with query parameters)
+TASK_LIST_DEFAULT_PAGE_SIZE = int(os.getenv("TASK_LIST_DEFAULT_PAGE_SIZE", "50"))
+TASK_LIST_MAX_PAGE_SIZE = int(os.getenv("TASK_LIST_MAX_PAGE_SIZE", "200"))
+
+# Most change-log entries read per delta-sync response; clients follow has_more
+BOARD_DELTA_MAX_CHANGES = int(os.getenv("BOARD_DELTA_MAX_CHANGES", "500"))
+
+# Most tasks accepted by one bulk_create_tasks call; tickets listed in its Slack summary
+BULK_CREATE_MAX_TASKS = int(os.getenv("BULK_CREATE_MAX_TASKS", "100"))
+BULK_CREATE_SLACK_LIST_LIMIT = 15
+
+# Kanban board columns, in board order
+KANBAN_COLUMNS = ["To Do", "In Progress", "Dev Complete", "Testing", "Done", "Closed"]
+
 
 def _serialize_datetimes(value):
     """Recursively convert datetime instances to ISO strings for JSON safety."""
@@ -168,7 +193,7 @@ def _enrich_task_display_fields(task):
 
     # Creator details
     if task.get("created_by"):
-        creator = User.find_by_id(task["created_by"])
+        creator = get_user_display(task["created_by"])
         if creator:
             task["created_by_name"] = creator.get("name", "Unknown")
             task["created_by_email"] = creator.get("email", "")
@@ -183,7 +208,7 @@ def _enrich_task_display_fields(task):
     if not task.get("assignee_name"):
         task["assignee_name"] = "Unassigned"
     if task.get("assignee_id") and not task.get("assignee_email"):
-        assignee = User.find_by_id(task["assignee_id"])
+        assignee = get_user_display(task["assignee_id"])
         task["assignee_email"] = assignee.get("email", "") if assignee else ""
     elif not task.get("assignee_id"):
         task["assignee_email"] = task.get("assignee_email", "")
@@ -191,62 +216,36 @@ def _enrich_task_display_fields(task):
     return task
 
 
-def create_task(body_str, user_id):
-    """Create a new task - requires authentication"""
-    if not user_id:
-        return error_response("Unauthorized. Please login.", 401)
-
-    try:
-        data = json.loads(body_str)
-    except:
-        return error_response("Invalid JSON", 400)
-
-    # Validate required fields
-    required = ["title", "project_id"]
-    validation_error = validate_required_fields(data, required)
-    if validation_error:
-        return error_response(validation_error, 400)
-
+def _build_new_task(data, project_id, user_id, find_user):
+    """
+    Validate one create_task body for a project the caller belongs to.
+    find_user(user_id) returns a user document (name, email, role) or None; it
+    is asked for the assignee and the creator.
+    Returns (task_data without ticket_id, None) or (None, (message, status_code)).
+    Shared by create_task and bulk_create_tasks.
+    """
     # Validate title length
-    if len(data["title"].strip()) < 3:
-        return error_response("Task title must be at least 3 characters", 400)
-
-    project_id = data["project_id"]
-
-    # Check if project exists
-    project = Project.find_by_id(project_id)
-    if not project:
-        return error_response("Project not found", 404)
-
-    # Check if user is member or owner
-    if not Project.is_member(project_id, user_id):
-        return error_response(
-            "Access denied. You are not a member of this project.", 403
-        )
+    title = data.get("title")
+    if not isinstance(title, str) or len(title.strip()) < 3:
+        return None, ("Task title must be at least 3 characters", 400)
 
     # Validate priority
     valid_priorities = ["Low", "Medium", "High"]
     priority = data.get("priority", "Medium")
     if priority not in valid_priorities:
-        return error_response(
-            f"Priority must be one of: {', '.join(valid_priorities)}", 400
-        )
+        return None, (f"Priority must be one of: {', '.join(valid_priorities)}", 400)
 
     # Validate issue type
     valid_issue_types = ["task", "bug", "story", "epic"]
-    issue_type = data.get("issue_type", "task").lower()
+    issue_type = (data.get("issue_type") or "task").lower()
     if issue_type not in valid_issue_types:
-        return error_response(
-            f"Issue type must be one of: {', '.join(valid_issue_types)}", 400
-        )
+        return None, (f"Issue type must be one of: {', '.join(valid_issue_types)}", 400)
 
     # Validate status
     valid_statuses = ["To Do", "In Progress", "Testing", "Dev Complete", "Done"]
     status = data.get("status", "To Do")
     if status not in valid_statuses:
-        return error_response(
-            f"Status must be one of: {', '.join(valid_statuses)}", 400
-        )
+        return None, (f"Status must be one of: {', '.join(valid_statuses)}", 400)
 
     # Validate assignee if provided
     assignee_id = data.get("assignee_id")
@@ -256,57 +255,47 @@ def create_task(body_str, user_id):
     if assignee_id:
         # Check if assignee is a project member
         if not Project.is_member(project_id, assignee_id):
-            return error_response("Assignee must be a project member", 400)
+            return None, ("Assignee must be a project member", 400)
 
         # Get assignee info
-        assignee = User.find_by_id(assignee_id)
+        assignee = find_user(assignee_id)
         if assignee:
             # Check if creator is member trying to assign to admin
-            creator = User.find_by_id(user_id)
+            creator = find_user(user_id)
             creator_role = creator.get("role", "member") if creator else "member"
             assignee_role = assignee.get("role", "member")
 
             # Members cannot assign tasks to admin or super-admin users
             if creator_role == "member" and assignee_role in ["admin", "super-admin"]:
-                return error_response(
-                    "Members cannot assign tasks to admin or super-admin users", 403
-                )
+                return None, ("Members cannot assign tasks to admin or super-admin users", 403)
 
             assignee_name = assignee["name"]
             assignee_email = assignee["email"]
 
-    # Generate unique ticket ID
-    try:
-        ticket_id = generate_ticket_id(project_id, issue_type)
-    except Exception as e:
-        return error_response(f"Failed to generate ticket ID: {str(e)}", 500)
-
     # Validate and normalize labels
     labels = data.get("labels", [])
     if labels:
         if not isinstance(labels, list):
-            return error_response("Labels must be an array", 400)
+            return None, ("Labels must be an array", 400)
 
         normalized_labels = []
         for label in labels:
             if not isinstance(label, str):
-                return error_response("Each label must be a string", 400)
+                return None, ("Each label must be a string", 400)
 
             is_valid, error_msg = validate_label(label)
             if not is_valid:
-                return error_response(f"Invalid label '{label}': {error_msg}", 400)
+                return None, (f"Invalid label '{label}': {error_msg}", 400)
 
             normalized_labels.append(normalize_label(label))
 
         # Remove duplicates
         labels = list(set(normalized_labels))
 
-    # Create task
-    task_data = {
-        "ticket_id": ticket_id,
+    return {
         "issue_type": issue_type,
-        "title": data["title"].strip(),
-        "description": data.get("description", "").strip(),
+        "title": title.strip(),
+        "description": (data.get("description") or "").strip(),
         "project_id": project_id,
         "priority": priority,
         "status": status,
@@ -316,7 +305,47 @@ def create_task(body_str, user_id):
         "due_date": data.get("due_date"),
         "labels": labels,
         "created_by": user_id,
-    }
+    }, None
+
+
+def create_task(body_str, user_id):
+    """Create a new task - requires authentication"""
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    try:
+        data = json.loads(body_str)
+    except:
+        return error_response("Invalid JSON", 400)
+
+    # Validate required fields
+    required = ["title", "project_id"]
+    validation_error = validate_required_fields(data, required)
+    if validation_error:
+        return error_response(validation_error, 400)
+
+    project_id = data["project_id"]
+
+    # Check if project exists
+    project = Project.find_by_id(project_id)
+    if not project:
+        return error_response("Project not found", 404)
+
+    # Check if user is member or owner
+    if not Project.is_member(project_id, user_id):
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
+
+    task_data, error = _build_new_task(data, project_id, user_id, User.find_by_id)
+    if error:
+        return error_response(*error)
+
+    # Generate unique ticket ID
+    try:
+        task_data["ticket_id"] = generate_ticket_id(project_id, task_data["issue_type"])
+    except Exception as e:
+        return error_response(f"Failed to generate ticket ID: {str(e)}", 500)
 
     task = Task.create(task_data)
 
@@ -328,17 +357,16 @@ def create_task(body_str, user_id):
     task = _serialize_datetimes(task)
 
     # Broadcast task creation to Kanban board
-    asyncio.create_task(
-        manager.broadcast_to_channel(
-            {
-                "type": "task_created",
-                "task": task,
-                "user_name": User.find_by_id(user_id).get("name", "Unknown")
-                if User.find_by_id(user_id)
-                else "Unknown",
-            },
-            f"kanban_{project_id}",
-        )
+    _broadcast_to_board(
+        project_id,
+        {
+            "type": "task_created",
+            "task": task,
+            "version": task.get("board_version"),
+            "user_name": User.find_by_id(user_id).get("name", "Unknown")
+            if User.find_by_id(user_id)
+            else "Unknown",
+        },
     )
 
     creator = User.find_by_id(user_id)
@@ -350,143 +378,399 @@ def create_task(body_str, user_id):
     return success_response({"message": "Task created successfully", "task": task}, 201)
 
 
-def get_project_tasks(project_id, user_id):
-    """Get all tasks for a project - OPTIMIZED"""
-    if not user_id:
-        return error_response("Unauthorized. Please login.", 401)
+def _notify_bulk_created_to_slack(project_id, tasks_list, actor_name):
+    """One Slack summary for a bulk creation instead of a message per task."""
+    bot_token, channel_id = _get_project_slack_bot_credentials(project_id)
+    if not all([bot_token, channel_id]) or not tasks_list:
+        return
+
+    lines = [
+        f"• *{task.get('ticket_id', '-')}* {task.get('title', 'Untitled task')} "
+        f"(*{task.get('status', '-')}*, *{task.get('priority', '-')}*) 👤 {task.get('assignee_name') or 'Unassigned'}"
+        for task in tasks_list[:BULK_CREATE_SLACK_LIST_LIMIT]
+    ]
+    if len(tasks_list) > BULK_CREATE_SLACK_LIST_LIMIT:
+        lines.append(f"…and {len(tasks_list) - BULK_CREATE_SLACK_LIST_LIMIT} more")
+    body = f"{len(tasks_list)} tasks were created by *{actor_name}*\n" + "\n".join(lines)
+
+    result = send_slack_notification(
+        bot_token=bot_token,
+        channel_id=channel_id,
+        text=body,
+        title="➡️Tasks Created",
+    )
+    if isinstance(result, str) and result.startswith("❌"):
+        logger.warning(
+            "Slack bulk task notification failed for project %s: %s",
+            project_id,
+            result,
+        )
+
+
+def bulk_create_tasks(user_id, project_id, items, idempotency_key=None):
+    """
+    Create many tasks in one project: one project/membership check, every item
+    validated like create_task, ticket ids reserved with one counter update,
+    one insert_many, one tasks_bulk_created broadcast and one Slack summary.
+
+    Each item may carry an "idempotency_key"; when it doesn't and the request
+    has ``idempotency_key``, the item's key is "{idempotency_key}:{index}".
+    An item whose key was already used in the project is not created again:
+    its result returns the existing task with "replayed": True.
+
+    Returns ({"results": [per item, in request order], "created_count",
+    "replayed_count", "failed_count"}, None) or (None, (message, status_code));
+    each result has index, idempotency_key, ok, replayed, error, task_id,
+    ticket_id and (when ok) the list document as "task".
+    """
+    if not isinstance(items, list) or not items:
+        return None, ("tasks must be a non-empty array", 400)
+    if len(items) > BULK_CREATE_MAX_TASKS:
+        return None, (f"At most {BULK_CREATE_MAX_TASKS} tasks can be created at once", 400)
 
-    # Check if project exists
     project = Project.find_by_id(project_id)
     if not project:
-        return error_response("Project not found", 404)
-
-    # Check if user is member or owner
+        return None, ("Project not found", 404)
     if not Project.is_member(project_id, user_id):
-        return error_response(
-            "Access denied. You are not a member of this project.", 403
-        )
+        return None, ("Access denied. You are not a member of this project.", 403)
+
+    results = []
+    keys = []
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        key = item.get("idempotency_key") or (f"{idempotency_key}:{index}" if idempotency_key else None)
+        key = str(key)[:200] if key else None
+        keys.append(key)
+        results.append({
+            "index": index, "idempotency_key": key, "ok": False, "replayed": False,
+            "error": None, "task_id": None, "ticket_id": None,
+        })
+
+    # Keys used by an earlier attempt: answer with what that attempt created
+    list_projection = {f: 1 for f in TASK_LIST_FIELDS + ["idempotency_key"]}
+    existing = Task.find_by_idempotency_keys(project_id, set(keys), list_projection)
 
-    # ⚡ OPTIMIZED: Only fetch necessary fields, exclude large arrays
     from database import db
-    from models.sprint import Sprint
 
-    # Projection: Exclude activities, attachments, and links arrays to reduce data transfer
-    task_projection = {
-        "_id": 1,
-        "ticket_id": 1,
-        "issue_type": 1,
-        "title": 1,
-        "description": 1,
-        "project_id": 1,
-        "sprint_id": 1,
-        "priority": 1,
-        "status": 1,
-        "assignee_id": 1,
-        "assignee_name": 1,
-        "assignee_email": 1,
-        "due_date": 1,
-        "created_by": 1,
-        "labels": 1,
-        "created_at": 1,
-        "updated_at": 1,
-        "moved_to_backlog_at": 1,
-        "in_backlog": 1,
-        # Exclude: activities, attachments, links (fetch these only when viewing task details)
-    }
-
-    # Fetch tasks with projection
-    tasks_list = list(
-        db.tasks.find({"project_id": project_id}, task_projection).sort(
-            "created_at", -1
+    # Assignees and the creator in one query (role decides who members may assign)
+    user_ids = {str(item.get("assignee_id")) for item in items if isinstance(item, dict) and item.get("assignee_id")}
+    user_ids.add(str(user_id))
+    user_map = {
+        str(u["_id"]): u
+        for u in db.users.find(
+            {"_id": {"$in": [ObjectId(u) for u in user_ids if ObjectId.is_valid(u)]}},
+            {"name": 1, "email": 1, "role": 1}
         )
-    )
-
-    print(f"[TASKS] Fetched {len(tasks_list)} tasks for project {project_id}")
+    }
 
-    # Batch fetch sprints and users to avoid N+1 queries
-    # Collect unique sprint IDs and creator IDs
-    sprint_ids = list(
-        set([task["sprint_id"] for task in tasks_list if task.get("sprint_id")])
-    )
-    creator_ids = list(
-        set([task["created_by"] for task in tasks_list if task.get("created_by")])
-    )
+    pending = []
+    seen_keys = set()
+    for result, item, key in zip(results, items, keys):
+        if key and key in existing:
+            result.update(ok=True, replayed=True, task=existing[key])
+            continue
+        if key and key in seen_keys:
+            result["error"] = "Duplicate idempotency_key in request"
+            continue
+        if not isinstance(item, dict):
+            result["error"] = "Each task must be an object"
+            continue
+        task_data, error = _build_new_task(item, project_id, user_id, lambda uid: user_map.get(str(uid)))
+        if error:
+            result["error"] = error[0]
+            continue
+        if key:
+            seen_keys.add(key)
+            task_data["idempotency_key"] = key
+        pending.append((result, task_data))
+
+    if pending:
+        try:
+            ticket_ids = reserve_ticket_ids(project_id, len(pending), project)
+        except Exception as e:
+            return None, (f"Failed to generate ticket IDs: {str(e)}", 500)
+        for (_, task_data), ticket_id in zip(pending, ticket_ids):
+            task_data["ticket_id"] = ticket_id
+
+    created = Task.create_many([task_data for _, task_data in pending])
+    raced = []
+    version = None
+    for (result, task_data), outcome in zip(pending, created):
+        if outcome["ok"]:
+            task = outcome["task"]
+            version = task.get("board_version")
+            result.update(ok=True, task={f: task[f] for f in ["_id", *TASK_LIST_FIELDS] if f in task})
+        elif outcome["duplicate"] and task_data.get("idempotency_key"):
+            # A concurrent retry inserted the same key first
+            raced.append((result, task_data["idempotency_key"]))
+        else:
+            result["error"] = outcome["error"]
+    if raced:
+        winners = Task.find_by_idempotency_keys(project_id, [key for _, key in raced], list_projection)
+        for result, key in raced:
+            if key in winners:
+                result.update(ok=True, replayed=True, task=winners[key])
+            else:
+                result["error"] = "Task creation failed"
+
+    returned = [result for result in results if result["ok"]]
+    decorated = _decorate_task_list([result["task"] for result in returned])
+    for result, task in zip(returned, decorated):
+        task.pop("idempotency_key", None)
+        result.update(task=task, task_id=task["_id"], ticket_id=task.get("ticket_id"))
+
+    new_tasks = [result["task"] for result in returned if not result["replayed"]]
+    if new_tasks:
+        creator = user_map.get(str(user_id))
+        creator_name = creator.get("name", "Unknown") if creator else "Unknown"
+        _broadcast_to_board(project_id, {
+            "type": "tasks_bulk_created",
+            "tasks": new_tasks,
+            "version": version,
+            "user_id": user_id,
+            "user_name": creator_name,
+        })
+        _notify_bulk_created_to_slack(project_id, new_tasks, creator_name)
+
+    created_count = len(new_tasks)
+    replayed_count = len(returned) - created_count
+    return {
+        "results": results,
+        "created_count": created_count,
+        "replayed_count": replayed_count,
+        "failed_count": len(results) - len(returned),
+    }, None
+
+
+def _decorate_task_list(tasks_list, with_creator=True):
+    """Serialize listed tasks and add sprint_name / creator display fields (batched lookups)"""
+    from database import db
 
-    # Batch fetch sprints with projection
+    sprint_ids = list(set([task["sprint_id"] for task in tasks_list if task.get("sprint_id")]))
     sprint_map = {}
     if sprint_ids:
-        sprints = list(
-            db.sprints.find(
-                {"_id": {"$in": [ObjectId(sid) for sid in sprint_ids]}},
-                {"_id": 1, "name": 1},
-            )
-        )
+        valid_ids = [ObjectId(sid) for sid in sprint_ids if ObjectId.is_valid(sid)]
+        sprints = list(db.sprints.find({"_id": {"$in": valid_ids}}, {"_id": 1, "name": 1}))
         sprint_map = {str(s["_id"]): s["name"] for s in sprints}
 
-    # Batch fetch users with projection
     user_map = {}
-    if creator_ids:
-        users = list(
-            db.users.find(
-                {"_id": {"$in": [ObjectId(uid) for uid in creator_ids]}},
-                {"_id": 1, "name": 1, "email": 1},
-            )
-        )
-        user_map = {
-            str(u["_id"]): {
-                "name": u.get("name", "Unknown"),
-                "email": u.get("email", ""),
-            }
-            for u in users
-        }
+    if with_creator:
+        user_map = get_user_displays(task["created_by"] for task in tasks_list if task.get("created_by"))
 
     # Convert ObjectId and datetime to strings, add creator details
     for idx, task in enumerate(tasks_list):
         task["_id"] = str(task["_id"])
-        task["created_at"] = datetime_to_iso(task["created_at"])
-        task["updated_at"] = datetime_to_iso(task["updated_at"])
-
-        # Convert moved_to_backlog_at if present
-        if "moved_to_backlog_at" in task and task["moved_to_backlog_at"]:
-            task["moved_to_backlog_at"] = datetime_to_iso(task["moved_to_backlog_at"])
-
-        tasks_list[idx] = _serialize_datetimes(task)
+        task = tasks_list[idx] = _serialize_datetimes(task)
 
         # Add sprint name from batch-fetched data
         if task.get("sprint_id"):
             task["sprint_name"] = sprint_map.get(task["sprint_id"], "")
 
         # Add creator details from batch-fetched data
-        if task.get("created_by"):
-            creator = user_map.get(task["created_by"])
-            if creator:
-                task["created_by_name"] = creator["name"]
-                task["created_by_email"] = creator["email"]
-            else:
-                task["created_by_name"] = "Unknown"
-                task["created_by_email"] = ""
-        else:
-            task["created_by_name"] = "Unknown"
-            task["created_by_email"] = ""
+        if with_creator:
+            creator = user_map.get(task["created_by"]) if task.get("created_by") else None
+            task["created_by_name"] = creator["name"] if creator else "Unknown"
+            task["created_by_email"] = creator["email"] if creator else ""
+    return tasks_list
 
-    print(f"[TASKS] Processed tasks successfully")
 
-    # Trigger fallback Git sync on project visit only when webhook is NOT configured.
-    # With webhook configured, events arrive instantly and polling is unnecessary.
-    if not (project.get("github_webhook_url") or "").strip():
+def _parse_task_list_params(params):
+    """
+    Validate get_project_tasks query parameters.
+    Returns (filters, projection, limit, per_column, cursor_filter) or an error message.
+    """
+    filters = {
+        key: params.get(key)
+        for key in ("status", "assignee_id", "sprint_id", "label", "issue_type")
+        if params.get(key)
+    }
+    if params.get("updated_since"):
         try:
-            from controllers import git_controller
-
-            lightweight_tasks = [
-                {"_id": task.get("_id"), "ticket_id": task.get("ticket_id")}
-                for task in tasks_list
-                if task.get("_id") and task.get("ticket_id")
-            ]
-            git_controller.schedule_project_git_sync(project_id, lightweight_tasks)
-        except Exception as e:
-            logger.warning("Git project-visit sync skipped for project %s: %s", project_id, e)
+            since = datetime.fromisoformat(params["updated_since"].replace("Z", "+00:00"))
+        except ValueError:
+            return "updated_since must be an ISO 8601 timestamp"
+        filters["updated_since"] = since.astimezone(timezone.utc).replace(tzinfo=None) if since.tzinfo else since
 
-    return success_response({"tasks": tasks_list, "count": len(tasks_list)})
+    projection = {field: 1 for field in TASK_LIST_FIELDS}
+    if params.get("fields"):
+        wanted = {f.strip() for f in params["fields"].split(",")} & set(TASK_LIST_FIELDS)
+        # Cursors are built from created_at
+        projection = {field: 1 for field in wanted | {"created_at"}}
+
+    try:
+        limit = int(params.get("limit") or TASK_LIST_DEFAULT_PAGE_SIZE)
+        per_column = int(params.get("per_column") or 0)
+    except (TypeError, ValueError):
+        return "limit and per_column must be integers"
+    limit = min(max(limit, 1), TASK_LIST_MAX_PAGE_SIZE)
+    per_column = min(max(per_column, 0), TASK_LIST_MAX_PAGE_SIZE)
+
+    cursor_filter = None
+    if params.get("cursor"):
+        cursor_filter = decode_task_cursor(params["cursor"])
+        if cursor_filter is None:
+            return "Invalid cursor"
+    return filters, projection, limit, per_column, cursor_filter
+
+
+def _schedule_project_git_sync(project, project_id, tasks_list):
+    """
+    Fallback Git sync on project visit, only when webhook is NOT configured.
+    With webhook configured, events arrive instantly and polling is unnecessary.
+    tasks_list may be a callable; it is then resolved in the sync worker thread.
+    """
+    if (project.get("github_webhook_url") or "").strip():
+        return
+    try:
+        from controllers import git_controller
+
+        git_controller.schedule_project_git_sync(project_id, tasks_list)
+    except Exception as e:
+        logger.warning("Git project-visit sync skipped for project %s: %s", project_id, e)
+
+
+def _git_sync_task_refs(project_id):
+    return [
+        task for task in Task.find_page({"project_id": project_id}, {"ticket_id": 1})[0]
+        if task.get("ticket_id")
+    ]
+
+
+def get_project_tasks(project_id, user_id, params=None):
+    """
+    Get tasks for a project.
+    Without params the full list is returned (legacy clients). With params:
+      cursor/limit      page through tasks newest first (next_cursor, has_more)
+      status, assignee_id, sprint_id, label, issue_type, updated_since   filters
+      fields            comma-separated subset of TASK_LIST_FIELDS
+      per_column=N      first N tasks of each Kanban column plus column totals
+    """
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    # Check if project exists
+    project = Project.find_by_id(project_id)
+    if not project:
+        return error_response("Project not found", 404)
+
+    # Check if user is member or owner
+    if not Project.is_member(project_id, user_id):
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
+
+    params = {key: value for key, value in (params or {}).items() if value not in (None, "")}
+    # Read before the tasks: a client resuming from here may see a change twice, never miss one
+    version = BoardChange.current_version(project_id)
+    if not params:
+        # ⚡ Projection excludes activities, attachments and links (fetched only for task details)
+        tasks_list, _ = Task.find_page({"project_id": project_id}, {f: 1 for f in TASK_LIST_FIELDS})
+        print(f"[TASKS] Fetched {len(tasks_list)} tasks for project {project_id}")
+        _decorate_task_list(tasks_list)
+
+        _schedule_project_git_sync(project, project_id, [
+            {"_id": task.get("_id"), "ticket_id": task.get("ticket_id")}
+            for task in tasks_list
+            if task.get("_id") and task.get("ticket_id")
+        ])
+        return success_response({"tasks": tasks_list, "count": len(tasks_list), "version": version})
+
+    parsed = _parse_task_list_params(params)
+    if isinstance(parsed, str):
+        return error_response(parsed, 400)
+    filters, projection, limit, per_column, cursor_filter = parsed
+    query = Task.build_list_filter(project_id, **filters)
+
+    # The page only covers part of the project; the sync worker loads ticket ids itself
+    _schedule_project_git_sync(project, project_id, lambda: _git_sync_task_refs(project_id))
+
+    if per_column:
+        # One indexed query per Kanban column plus a single $group for the totals
+        counts = Task.count_by_status(query)
+        columns = {}
+        for status in KANBAN_COLUMNS:
+            if filters.get("status") and status not in counts:
+                continue
+            page, next_cursor = Task.find_page(dict(query, status=status), projection, per_column)
+            columns[status] = {
+                "tasks": _decorate_task_list(page, "created_by" in projection),
+                "count": counts.get(status, 0),
+                "next_cursor": next_cursor,
+            }
+        return success_response({
+            "columns": columns,
+            "count": sum(counts.values()),
+            "limit": per_column,
+            "version": version,
+        })
+
+    tasks_list, next_cursor = Task.find_page(query, projection, limit, cursor_filter)
+    return success_response({
+        "tasks": _decorate_task_list(tasks_list, "created_by" in projection),
+        "count": len(tasks_list),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+        "limit": limit,
+    })
+
+
+def board_delta(project_id, since, limit=None):
+    """
+    Kanban delta since change-log version ``since``: current list documents of the
+    created/updated tasks plus ids of deleted ones. When the log no longer covers
+    ``since`` (or ``since`` is None) the whole board is returned with reset=True.
+    """
+    if since is None:
+        delta = {"version": BoardChange.current_version(project_id), "reset": True}
+    else:
+        delta = BoardChange.since(project_id, since, limit or BOARD_DELTA_MAX_CHANGES)
+    projection = {f: 1 for f in TASK_LIST_FIELDS}
+    if delta["reset"]:
+        tasks_list, _ = Task.find_page({"project_id": project_id}, projection)
+        return {
+            "version": delta["version"],
+            "reset": True,
+            "tasks": _decorate_task_list(tasks_list),
+            "deleted": [],
+            "has_more": False,
+        }
+
+    changed = [
+        ObjectId(task_id) for task_id, op in delta["changes"].items()
+        if op != "deleted" and ObjectId.is_valid(task_id)
+    ]
+    tasks_list = []
+    if changed:
+        tasks_list, _ = Task.find_page({"project_id": project_id, "_id": {"$in": changed}}, projection)
+    found = {str(task["_id"]) for task in tasks_list}
+    return {
+        "version": delta["version"],
+        "reset": False,
+        "tasks": _decorate_task_list(tasks_list),
+        # Also covers tasks deleted or moved out of the project after their last change
+        "deleted": [task_id for task_id in delta["changes"] if task_id not in found],
+        "has_more": delta["has_more"],
+    }
+
+
+def get_board_changes(project_id, user_id, since=0):
+    """Task changes on a project's board after version ``since`` (see board_delta)"""
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    if not Project.find_by_id(project_id):
+        return error_response("Project not found", 404)
+
+    if not Project.is_member(project_id, user_id):
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
+
+    try:
+        since = int(since or 0)
+    except (TypeError, ValueError):
+        return error_response("since must be an integer version", 400)
+    return success_response(board_delta(project_id, max(since, 0)))
 
 
 def get_task_by_id(task_id, user_id):
@@ -505,6 +789,17 @@ def get_task_by_id(task_id, user_id):
             "Access denied. You are not a member of this project.", 403
         )
 
+    # Tasks written before bucketed activity storage migrate on first view
+    if "activities" in task:
+        TaskActivity.migrate_task(task)
+
+    # Latest page of the activity log (oldest first, as the detail view renders it)
+    page = TaskActivity.get_page(task_id, 0, TASK_DETAIL_ACTIVITY_LIMIT)
+    task["activities"] = page["activities"]
+    task["activity_count"] = page["total"]
+    task["activities_has_more"] = page["has_more"]
+    task.pop("recent_comments", None)
+
     # Add sprint name if task is in a sprint
     if task.get("sprint_id"):
         from models.sprint import Sprint
@@ -554,27 +849,36 @@ def get_task_by_id(task_id, user_id):
     return success_response({"task": task})
 
 
-def update_task(body_str, task_id, user_id):
-    """Update a task"""
+def get_task_activities(task_id, user_id, offset=0, limit=50):
+    """Page through a task's activity log, newest first (entries oldest first within a page)"""
     if not user_id:
         return error_response("Unauthorized. Please login.", 401)
 
-    try:
-        data = json.loads(body_str)
-    except:
-        return error_response("Invalid JSON", 400)
-
-    # Check if task exists
-    task = Task.find_by_id(task_id)
+    task = Task.find_by_id(task_id, {"project_id": 1, "activities": 1, "created_at": 1, "updated_at": 1})
     if not task:
         return error_response("Task not found", 404)
 
-    # Check if user is member of the project
     if not Project.is_member(task["project_id"], user_id):
         return error_response(
             "Access denied. You are not a member of this project.", 403
         )
 
+    if "activities" in task:
+        TaskActivity.migrate_task(task)
+
+    offset = max(int(offset or 0), 0)
+    limit = min(max(int(limit or 50), 1), 200)
+    page = TaskActivity.get_page(task_id, offset, limit)
+    return success_response(_serialize_datetimes(page))
+
+
+def _build_task_update(data, task, role, user_id, user_name):
+    """
+    Validate a task update request against the current task (project_id,
+    status, assignee_id) and the caller's project role.
+    Returns (update_data, activities, None) or (None, None, (message, status_code)).
+    Shared by update_task and bulk_update_tasks.
+    """
     # Prepare update data
     update_data = {}
 
@@ -583,11 +887,11 @@ def update_task(body_str, task_id, user_id):
             data["title"] is not None and data["title"].strip()
         ):  # Only update if non-empty
             if len(data["title"].strip()) < 3:
-                return error_response("Task title must be at least 3 characters", 400)
+                return None, None, ("Task title must be at least 3 characters", 400)
             update_data["title"] = data["title"].strip()
         elif data["title"] is not None and not data["title"].strip():
             # If empty string is explicitly sent, reject it
-            return error_response("Task title cannot be empty", 400)
+            return None, None, ("Task title cannot be empty", 400)
 
     if "description" in data:
         # Description can be empty, but only update if provided
@@ -601,9 +905,7 @@ def update_task(body_str, task_id, user_id):
     ):  # Only validate if priority is not None/empty
         valid_priorities = ["Low", "Medium", "High"]
         if data["priority"] not in valid_priorities:
-            return error_response(
-                f"Priority must be one of: {', '.join(valid_priorities)}", 400
-            )
+            return None, None, (f"Priority must be one of: {', '.join(valid_priorities)}", 400)
         update_data["priority"] = data["priority"]
 
     if "status" in data:
@@ -616,30 +918,28 @@ def update_task(body_str, task_id, user_id):
             "Closed",
         ]
         if data["status"] not in valid_statuses:
-            return error_response(
-                f"Status must be one of: {', '.join(valid_statuses)}", 400
-            )
+            return None, None, (f"Status must be one of: {', '.join(valid_statuses)}", 400)
 
         # If task is being marked as Done or Closed, remove from backlog
         if data["status"] in ["Done", "Closed"]:
             update_data["in_backlog"] = False
             update_data["moved_to_backlog_at"] = None
 
+        # Finish time for sprint burndown/velocity (utils.sprint_stats)
+        finished = ["Done", "Closed"]
+        if data["status"] in finished and task.get("status") not in finished:
+            update_data["completed_at"] = datetime.now(timezone.utc).replace(tzinfo=None)
+        elif data["status"] not in finished and task.get("status") in finished:
+            update_data["completed_at"] = None
+
         # Only project owner can set status to "Closed"
         if data["status"] == "Closed":
-            project = Project.find_by_id(task["project_id"])
-            if not project:
-                return error_response("Project not found", 404)
-
-            if project["user_id"] != user_id:
-                return error_response("Only project owner can close tasks", 403)
+            if role != "owner":
+                return None, None, ("Only project owner can close tasks", 403)
 
             # Add approval metadata
-            current_user = User.find_by_id(user_id)
             update_data["approved_by"] = user_id
-            update_data["approved_by_name"] = (
-                current_user["name"] if current_user else "Unknown"
-            )
+            update_data["approved_by_name"] = user_name
             update_data["approved_at"] = (
                 datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
             )
@@ -653,10 +953,10 @@ def update_task(body_str, task_id, user_id):
         if assignee_id:
             # Check if assignee is a project member
             if not Project.is_member(task["project_id"], assignee_id):
-                return error_response("Assignee must be a project member", 400)
+                return None, None, ("Assignee must be a project member", 400)
 
             # Get assignee info
-            assignee = User.find_by_id(assignee_id)
+            assignee = get_user_display(assignee_id)
             if assignee:
                 update_data["assignee_id"] = assignee_id
                 update_data["assignee_name"] = assignee["name"]
@@ -673,56 +973,83 @@ def update_task(body_str, task_id, user_id):
     if "issue_type" in data and data["issue_type"]:
         valid_issue_types = ["bug", "task", "story", "epic"]
         if data["issue_type"] not in valid_issue_types:
-            return error_response(
-                f"Issue type must be one of: {', '.join(valid_issue_types)}", 400
-            )
+            return None, None, (f"Issue type must be one of: {', '.join(valid_issue_types)}", 400)
         update_data["issue_type"] = data["issue_type"]
 
     if "labels" in data and data["labels"] is not None:
         # Validate labels if provided
         labels = data["labels"]
         if not isinstance(labels, list):
-            return error_response("Labels must be a list", 400)
+            return None, None, ("Labels must be a list", 400)
         update_data["labels"] = labels
 
     if not update_data and not data.get("comment"):
-        return error_response("No valid fields to update", 400)
+        return None, None, ("No valid fields to update", 400)
+
+    activities = []
+    # Add activity log for status change with comment
+    if "status" in data:
+        old_status = task.get("status", "To Do")
+        # Only log if status actually changed
+        if old_status != data["status"]:
+            activities.append({
+                "user_id": user_id,
+                "user_name": user_name,
+                "action": "status_change",
+                "comment": data.get("comment", ""),
+                "old_value": old_status,
+                "new_value": data["status"],
+            })
+    # Add activity log for comment only (no status change)
+    elif data.get("comment", "").strip():
+        activities.append({
+            "user_id": user_id,
+            "user_name": user_name,
+            "action": "comment",
+            "comment": data.get("comment", "").strip(),
+            "old_value": None,
+            "new_value": None,
+        })
+
+    return update_data, activities, None
+
+
+def update_task(body_str, task_id, user_id):
+    """Update a task"""
+    if not user_id:
+        return error_response("Unauthorized. Please login.", 401)
+
+    try:
+        data = json.loads(body_str)
+    except:
+        return error_response("Invalid JSON", 400)
+
+    # Check if task exists
+    task = Task.find_by_id(task_id, _UPDATE_PRECHECK_FIELDS)
+    if not task:
+        return error_response("Task not found", 404)
+
+    # Check if user is member of the project (cached role, no project load)
+    role = Project.get_member_role(task["project_id"], user_id)
+    if role is None:
+        return error_response(
+            "Access denied. You are not a member of this project.", 403
+        )
 
     # Get user info for activity log
-    current_user = User.find_by_id(user_id)
+    current_user = get_user_display(user_id)
     user_name = current_user["name"] if current_user else "Unknown"
 
-    # Update task
-    success = Task.update(task_id, update_data)
+    update_data, activities, error = _build_task_update(data, task, role, user_id, user_name)
+    if error:
+        return error_response(*error)
 
-    if success:
-        # Add activity log for status change with comment
-        if "status" in data:
-            old_status = task.get("status", "To Do")
-            # Only log if status actually changed
-            if old_status != data["status"]:
-                activity_data = {
-                    "user_id": user_id,
-                    "user_name": user_name,
-                    "action": "status_change",
-                    "comment": data.get("comment", ""),
-                    "old_value": old_status,
-                    "new_value": data["status"],
-                }
-                Task.add_activity(task_id, activity_data)
-        # Add activity log for comment only (no status change)
-        elif data.get("comment", "").strip():
-            activity_data = {
-                "user_id": user_id,
-                "user_name": user_name,
-                "action": "comment",
-                "comment": data.get("comment", "").strip(),
-                "old_value": None,
-                "new_value": None,
-            }
-            Task.add_activity(task_id, activity_data)
+    # Fields, activities and the refreshed document in a single round trip
+    updated_task = Task.update_with_activities(
+        task_id, update_data, activities, previous=task
+    )
 
-        updated_task = Task.find_by_id(task_id)
+    if updated_task:
         updated_task["_id"] = str(updated_task["_id"])
         updated_task["created_at"] = datetime_to_iso(updated_task["created_at"])
         updated_task["updated_at"] = datetime_to_iso(updated_task["updated_at"])
@@ -739,20 +1066,19 @@ def update_task(body_str, task_id, user_id):
         updated_task = _serialize_datetimes(updated_task)
 
         # Broadcast task update to Kanban board
-        asyncio.create_task(
-            manager.broadcast_to_channel(
-                {
-                    "type": "task_updated",
-                    "task": updated_task,
-                    "updated_fields": list(update_data.keys()),
-                    "user_id": user_id,
-                    "user_name": user_name,
-                    "old_status": task.get("status")
-                    if "status" in update_data
-                    else None,
-                },
-                f"kanban_{task['project_id']}",
-            )
+        _broadcast_to_board(
+            task["project_id"],
+            {
+                "type": "task_updated",
+                "task": updated_task,
+                "version": updated_task.get("board_version"),
+                "updated_fields": list(update_data.keys()),
+                "user_id": user_id,
+                "user_name": user_name,
+                "old_status": task.get("status")
+                if "status" in update_data
+                else None,
+            },
         )
 
         if update_data:
@@ -782,6 +1108,139 @@ def update_task(body_str, task_id, user_id):
         return error_response("Failed to update task", 500)
 
 
+def _broadcast_bulk_update(project_id, tasks_list, updated_fields, user_id, user_name, version):
+    """One coalesced tasks_bulk_updated message per project instead of one per task"""
+    _broadcast_to_board(project_id, {
+        "type": "tasks_bulk_updated",
+        "tasks": tasks_list,
+        "updated_fields": updated_fields,
+        "user_id": user_id,
+        "user_name": user_name,
+        "version": version,
+    })
+
+
+def _broadcast_to_board(project_id, message):
+    """Schedule a Kanban broadcast on the app loop, from the loop or any worker thread"""
+    manager.schedule_broadcast(message, f"kanban_{project_id}")
+
+
+def bulk_mutate_tasks(user_id, task_identifiers, build_change, project_id=None, ordered=False):
+    """
+    Shared engine for bulk task mutations.
+    Resolves every identifier (Mongo _id or ticket id) with one $in query,
+    checks the caller's cached project role, asks ``build_change(task, role)``
+    for each task's change ({"set", "unset", "activities", "match"}) or an
+    error message, and applies all changes with one bulk_write.
+    ordered=True stops at the first failed write.
+
+    Returns {"results": [per identifier, in request order], "updated_count",
+    "failed_count"}; each result has task_identifier, task_id, ticket_id,
+    ok, error, conflict=True when a "match" guard no longer held, and (when
+    ok) the updated list document as "task".
+    """
+    identifiers = [str(i or "").strip() for i in task_identifiers]
+    found = Task.find_by_identifiers(identifiers, _BULK_PRECHECK_FIELDS, project_id)
+    roles = {}
+
+    results = []
+    changes = []
+    pending = []
+    seen = {}
+    for raw, identifier in zip(task_identifiers, identifiers):
+        result = {"task_identifier": identifier or raw, "task_id": None, "ticket_id": None, "ok": False, "error": None}
+        results.append(result)
+        task = found.get(identifier)
+        if not identifier:
+            result["error"] = "Task identifier is empty"
+            continue
+        if not task:
+            result["error"] = "Task not found"
+            continue
+        task_id = str(task["_id"])
+        result.update(task_id=task_id, ticket_id=task.get("ticket_id"))
+        if project_id and task.get("project_id") != project_id:
+            result["error"] = "Task does not belong to provided project_id"
+            continue
+        if task_id in seen:
+            result["error"] = f"Duplicate of {seen[task_id]}"
+            continue
+        seen[task_id] = identifier
+
+        task_project = task.get("project_id")
+        if task_project not in roles:
+            roles[task_project] = Project.get_member_role(task_project, user_id)
+        if roles[task_project] is None:
+            result["error"] = "Access denied. You are not a member of this project."
+            continue
+
+        change = build_change(task, roles[task_project])
+        if isinstance(change, str):
+            result["error"] = change
+            continue
+        changes.append({**change, "task": task})
+        pending.append(result)
+
+    written = Task.bulk_update(changes, ordered)
+
+    updated_ids = []
+    versions = {}
+    for result, change, outcome in zip(pending, changes, written):
+        result["ok"] = outcome["ok"]
+        result["error"] = outcome["error"]
+        if outcome.get("conflict"):
+            result["conflict"] = True
+        if outcome["ok"]:
+            updated_ids.append(change["task"]["_id"])
+            versions[change["task"].get("project_id")] = outcome.get("board_version")
+
+    if updated_ids:
+        # Refreshed list documents for the caller and the coalesced board events
+        refreshed, _ = Task.find_page({"_id": {"$in": updated_ids}}, {f: 1 for f in TASK_LIST_FIELDS})
+        by_id = {task["_id"]: task for task in _decorate_task_list(refreshed)}
+        for result in pending:
+            if result["ok"]:
+                result["task"] = by_id.get(result["task_id"])
+
+        current_user = get_user_display(user_id)
+        user_name = current_user["name"] if current_user else "Unknown"
+        updated_fields = sorted({
+            field for change in changes for field in list(change.get("set", {})) + list(change.get("unset", ()))
+        })
+        by_project = {}
+        for task in by_id.values():
+            by_project.setdefault(task.get("project_id"), []).append(task)
+        for task_project, project_tasks in by_project.items():
+            _broadcast_bulk_update(
+                task_project, project_tasks, updated_fields, user_id, user_name, versions.get(task_project)
+            )
+
+    updated_count = sum(1 for result in results if result["ok"])
+    return {
+        "results": results,
+        "updated_count": updated_count,
+        "failed_count": len(results) - updated_count,
+    }
+
+
+def bulk_update_tasks(user_id, task_identifiers, data, project_id=None, ordered=False):
+    """
+    Apply the same update_task body (status, assignee_id, due_date, ...,
+    comment) to many tasks through bulk_mutate_tasks; validation and activity
+    entries match update_task for each task.
+    """
+    current_user = get_user_display(user_id)
+    user_name = current_user["name"] if current_user else "Unknown"
+
+    def build_change(task, role):
+        update_data, activities, error = _build_task_update(data, task, role, user_id, user_name)
+        if error:
+            return error[0]
+        return {"set": update_data, "activities": activities}
+
+    return bulk_mutate_tasks(user_id, task_identifiers, build_change, project_id, ordered)
+
+
 def delete_task(task_id, user_id):
     """Delete a task"""
     if not user_id:
@@ -806,15 +1265,13 @@ def delete_task(task_id, user_id):
     if success:
         # Broadcast task deletion to Kanban board
         user = User.find_by_id(user_id)
-        asyncio.create_task(
-            manager.broadcast_to_channel(
-                {
-                    "type": "task_deleted",
-                    "task_id": task_id,
-                    "user_name": user.get("name", "Unknown") if user else "Unknown",
-                },
-                f"kanban_{project_id}",
-            )
+        _broadcast_to_board(
+            project_id,
+            {
+                "type": "task_deleted",
+                "task_id": task_id,
+                "user_name": user.get("name", "Unknown") if user else "Unknown",
+            },
         )
 
         return success_response({"message": "Task deleted successfully"})
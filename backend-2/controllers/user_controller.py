@@ -3,6 +3,7 @@ from utils.response import success_response, error_response
 from models.user import User
 from models.project import Project
 from middleware.role_middleware import check_super_admin
+from utils.membership_cache import invalidate_membership
 from bson import ObjectId
 import json
 
@@ -142,6 +143,7 @@ def delete_user(requesting_user_id, target_user_id, confirmation_text):
 
     # Remove this user from all project member lists.
     db.projects.update_many({}, {"$pull": {"members": {"user_id": target_user_id}}})
+    invalidate_membership(target_user_id)
 
     # Deactivate user sessions and blacklist entries cleanup.
     db.sessions.update_many(
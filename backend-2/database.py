@@ -1,8 +1,9 @@
 from pymongo import MongoClient
 from config import MONGO_URI
+from utils.query_profiler import query_event_listeners
 
-# Connect to MongoDB Atlas Cloud
-client = MongoClient(MONGO_URI)
+# Connect to MongoDB Atlas Cloud (commands are attributed to requests by utils.query_profiler)
+client = MongoClient(MONGO_URI, event_listeners=query_event_listeners())
 db = client["taskdb"]  # Explicitly specify database name
 
 # Collections
@@ -27,14 +27,21 @@ import json
 import os
 import tempfile
 import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, Optional, List
+from typing import Annotated, Any, Callable, Dict, Optional, List
 
 from fastapi import HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from utils.azure_ai_utils import chat_completion_gpt4_mini, get_gpt4_mini_chat_config
+from utils import document_cache
+from utils.azure_ai_utils import (
+    chat_completion_gpt4_mini,
+    estimate_tokens,
+    get_gpt4_mini_chat_config,
+)
 
 load_dotenv()
 
@@ -60,6 +67,20 @@ AZURE_DI_ENDPOINT = os.getenv(
 AZURE_DI_KEY = os.getenv("DOCUMENT_INTELLIGENCE_KEY", "")
 AZURE_DI_TIMEOUT_SECONDS = int(os.getenv("DOCUMENT_INTELLIGENCE_TIMEOUT_SECONDS", "120"))
 
+# ── Chunked (map-reduce) analysis budgets ─────────────────────────────────
+# Documents that fit in DOC_INTEL_DIRECT_MAX_TOKENS go straight to the final
+# extraction call. Larger ones are split into DOC_INTEL_CHUNK_TOKENS chunks,
+# each summarized in parallel (map), then the summaries are folded until they
+# fit DOC_INTEL_REDUCE_MAX_TOKENS and handed to the final extraction (reduce).
+DOC_INTEL_DIRECT_MAX_TOKENS = int(os.getenv("DOC_INTEL_DIRECT_MAX_TOKENS", "6000"))
+DOC_INTEL_CHUNK_TOKENS = int(os.getenv("DOC_INTEL_CHUNK_TOKENS", "6000"))
+DOC_INTEL_MAP_SUMMARY_TOKENS = int(os.getenv("DOC_INTEL_MAP_SUMMARY_TOKENS", "700"))
+DOC_INTEL_REDUCE_MAX_TOKENS = int(os.getenv("DOC_INTEL_REDUCE_MAX_TOKENS", "12000"))
+DOC_INTEL_EXTRACT_MAX_TOKENS = int(os.getenv("DOC_INTEL_EXTRACT_MAX_TOKENS", "4000"))
+DOC_INTEL_MAP_CONCURRENCY = int(os.getenv("DOC_INTEL_MAP_CONCURRENCY", "4"))
+DOC_INTEL_MAX_REDUCE_DEPTH = 3
+DOC_INTEL_MAX_CATEGORY_VALUES = int(os.getenv("DOC_INTEL_MAX_CATEGORY_VALUES", "15"))
+
 # ── Azure OpenAI Configuration (GPT-4.1-mini profile) ─────────────────────
 DOC_INTEL_CONFIG = get_gpt4_mini_chat_config()
 print(
@@ -135,6 +156,7 @@ class InsightReport(BaseModel):
     score_distribution: Optional[ScoreDistribution] = None
     generated_at: str
     parser_used: str = "unknown"  # NEW: tracks which parser was used
+    pipeline_stats: Optional[Dict[str, Any]] = None  # chunking + token spend per stage
 
 
 # ── Azure Document Intelligence Parser ────────────────────────────────────
@@ -279,9 +301,17 @@ def parse_csv_excel(source: str) -> str:
             for col in text_cols[:8]:
                 vc = df[col].value_counts()
                 pct = (vc / rows * 100).round(1)
-                lines.append(f"\n### {col}")
-                for val, cnt in vc.items():
+                lines.append(f"\n### {col} ({len(vc)} distinct values)")
+                # High-cardinality columns (ids, free text) only add prompt
+                # tokens — keep the head of the distribution and summarize the tail.
+                for val, cnt in vc.head(DOC_INTEL_MAX_CATEGORY_VALUES).items():
                     lines.append(f"  {val}: {cnt} ({pct[val]}%)")
+                if len(vc) > DOC_INTEL_MAX_CATEGORY_VALUES:
+                    tail = vc.iloc[DOC_INTEL_MAX_CATEGORY_VALUES:]
+                    lines.append(
+                        f"  … {len(tail)} more values covering {int(tail.sum())} rows "
+                        f"({tail.sum() / rows * 100:.1f}%)"
+                    )
             lines.append("")
 
         if numeric_cols:
@@ -542,8 +572,228 @@ CRITICAL RULES — violating these makes the analysis useless:
 """
 
 
-def extract_insights_azure(doc_text: str, question: str) -> dict:
-    """Extract insights using Azure OpenAI."""
+MAP_PROMPT = """You are summarizing ONE section of a larger business document.
+The summaries of all sections will later be merged into a single analysis.
+
+Rules:
+- Keep every number, percentage, date, name, ID and score that appears — they are needed downstream.
+- Keep table rows that carry individual results (names + scores); compress repetitive rows into ranges.
+- Drop boilerplate (headers, footers, legal text, navigation).
+- Output concise markdown bullet points only. No preamble.
+"""
+
+
+def _parse_json_response(raw: str) -> dict:
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.split("```")[1]
+        if raw.startswith("json"):
+            raw = raw[4:]
+    return json.loads(raw)
+
+
+def _record_stage_usage(
+    stats: Optional[dict], stage: str, response: dict, seconds: float
+) -> None:
+    if stats is None:
+        return
+    bucket = stats.setdefault("stages", {}).setdefault(
+        stage,
+        {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0},
+    )
+    tokens = response.get("tokens") or {}
+    bucket["calls"] += 1
+    bucket["prompt_tokens"] += tokens.get("prompt", 0) or 0
+    bucket["completion_tokens"] += tokens.get("completion", 0) or 0
+    bucket["seconds"] = round(bucket["seconds"] + seconds, 3)
+
+
+def _split_into_sections(doc_text: str) -> List[str]:
+    """Split markdown-ish parser output on headings so tables stay with their caption."""
+    sections, current = [], []
+    for line in doc_text.split("\n"):
+        if line.lstrip().startswith("#") and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return [section for section in sections if section.strip()]
+
+
+def _split_oversized_section(section: str, max_tokens: int) -> List[str]:
+    """
+    Split a section that alone exceeds the chunk budget on line boundaries.
+    When a split lands inside a markdown table, the table header row is
+    repeated at the top of the next piece so every chunk stays self-describing.
+    """
+    max_chars = max_tokens * 4
+    pieces, current, current_tokens = [], [], 0
+    table_header: List[str] = []
+    prev_is_table = False
+
+    for line in section.split("\n"):
+        is_table = line.startswith("|")
+        if is_table and not prev_is_table:
+            table_header = [line]
+        elif is_table and len(table_header) == 1:
+            table_header.append(line)  # markdown separator row
+        elif not is_table:
+            table_header = []
+        prev_is_table = is_table
+
+        # A single enormous line (e.g. OCR without newlines) is hard-wrapped.
+        segments = (
+            [line[i : i + max_chars] for i in range(0, len(line), max_chars)]
+            if len(line) > max_chars
+            else [line]
+        )
+        for segment in segments:
+            segment_tokens = estimate_tokens(segment) + 1
+            if current and current_tokens + segment_tokens > max_tokens:
+                pieces.append("\n".join(current))
+                carry = (
+                    table_header
+                    if is_table and len(table_header) == 2 and line not in table_header
+                    else []
+                )
+                current = list(carry)
+                current_tokens = sum(estimate_tokens(c) + 1 for c in carry)
+            current.append(segment)
+            current_tokens += segment_tokens
+
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_document_into_chunks(
+    doc_text: str, max_tokens: int = DOC_INTEL_CHUNK_TOKENS
+) -> List[str]:
+    """
+    Pack heading-delimited sections into chunks of at most ``max_tokens``.
+    Small neighbouring sections are merged; oversized ones are split further.
+    """
+    chunks, current, current_tokens = [], [], 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens = [], 0
+
+    for section in _split_into_sections(doc_text):
+        section_tokens = estimate_tokens(section)
+        if section_tokens > max_tokens:
+            flush()
+            chunks.extend(_split_oversized_section(section, max_tokens))
+            continue
+        if current and current_tokens + section_tokens > max_tokens:
+            flush()
+        current.append(section)
+        current_tokens += section_tokens
+    flush()
+
+    # Fold tiny fragments (e.g. a lone heading before a split table) into a neighbour.
+    merged: List[str] = []
+    for chunk in chunks:
+        if merged and estimate_tokens(merged[-1]) + estimate_tokens(chunk) <= max_tokens:
+            merged[-1] = f"{merged[-1]}\n{chunk}"
+        else:
+            merged.append(chunk)
+    return merged
+
+
+def _summarize_chunk(
+    chunk: str, index: int, total: int, question: str
+) -> tuple[str, dict, float]:
+    started = time.perf_counter()
+    focus = question or "General business analysis: KPIs, performers, risks, trends."
+    try:
+        response = chat_completion_gpt4_mini(
+            messages=[
+                {"role": "system", "content": MAP_PROMPT},
+                {
+                    "role": "user",
+                    "content": (
+                        f"Analysis focus: {focus}\n\n"
+                        f"Section {index + 1} of {total}:\n{chunk}"
+                    ),
+                },
+            ],
+            max_tokens=DOC_INTEL_MAP_SUMMARY_TOKENS,
+        )
+        return response["content"].strip(), response, time.perf_counter() - started
+    except Exception as e:
+        # One failed section must not sink the whole report — keep its head verbatim.
+        print(f"⚠️  Chunk {index + 1}/{total} summary failed, using excerpt: {e}")
+        excerpt = chunk[: DOC_INTEL_MAP_SUMMARY_TOKENS * 4]
+        return excerpt, {}, time.perf_counter() - started
+
+
+def summarize_chunks(
+    chunks: List[str], question: str, stats: Optional[dict] = None, stage: str = "map"
+) -> List[str]:
+    """Summarize chunks concurrently (bounded by DOC_INTEL_MAP_CONCURRENCY), preserving order."""
+    workers = max(1, min(DOC_INTEL_MAP_CONCURRENCY, len(chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(
+            executor.map(
+                lambda item: _summarize_chunk(item[1], item[0], len(chunks), question),
+                enumerate(chunks),
+            )
+        )
+
+    summaries = []
+    for summary, response, seconds in results:
+        _record_stage_usage(stats, stage, response, seconds)
+        summaries.append(summary)
+    return summaries
+
+
+def condense_document(doc_text: str, question: str, stats: Optional[dict] = None) -> str:
+    """
+    Map-reduce a large document down to a digest that fits the final
+    extraction budget. Returns the text unchanged when it already fits.
+    """
+    text = doc_text
+    for depth in range(DOC_INTEL_MAX_REDUCE_DEPTH):
+        budget = DOC_INTEL_DIRECT_MAX_TOKENS if depth == 0 else DOC_INTEL_REDUCE_MAX_TOKENS
+        if estimate_tokens(text) <= budget:
+            break
+
+        chunks = split_document_into_chunks(text, DOC_INTEL_CHUNK_TOKENS)
+        stage = "map" if depth == 0 else f"reduce_{depth}"
+        if stats is not None:
+            stats["strategy"] = "map-reduce"
+            stats.setdefault("chunks", {})[stage] = len(chunks)
+        print(
+            f"📚 Document Intelligence {stage}: {len(chunks)} chunks "
+            f"(~{estimate_tokens(text)} tokens, concurrency={DOC_INTEL_MAP_CONCURRENCY})"
+        )
+
+        summaries = summarize_chunks(chunks, question, stats, stage)
+        text = "\n\n".join(
+            f"## Section {i + 1}/{len(summaries)}\n{summary}"
+            for i, summary in enumerate(summaries)
+        )
+
+    if estimate_tokens(text) > DOC_INTEL_REDUCE_MAX_TOKENS:
+        # Folding did not converge (pathological input) — hard cap as a last resort.
+        text = text[: DOC_INTEL_REDUCE_MAX_TOKENS * 4]
+    return text
+
+
+def extract_insights_azure(
+    doc_text: str, question: str, stats: Optional[dict] = None
+) -> dict:
+    """
+    Extract insights using Azure OpenAI.
+
+    Large documents are condensed with a chunked map-reduce pass first instead
+    of being truncated. Pass a dict as ``stats`` to collect per-stage token
+    spend and latency.
+    """
     cfg = get_document_intelligence_llm_config()
     if (
         not cfg.get("endpoint")
@@ -558,29 +808,45 @@ def extract_insights_azure(doc_text: str, question: str) -> dict:
             ),
         )
 
-    user_prompt = f"""Business question: {question or "Provide a comprehensive, deep analysis. Identify every named top and bottom performer explicitly. Leave nothing vague."}
+    started = time.perf_counter()
+    if stats is not None:
+        stats.setdefault("strategy", "single-pass")
+        stats["input_tokens_estimate"] = estimate_tokens(doc_text)
+
+    try:
+        condensed = condense_document(doc_text, question, stats)
+
+        user_prompt = f"""Business question: {question or "Provide a comprehensive, deep analysis. Identify every named top and bottom performer explicitly. Leave nothing vague."}
 
 Document content:
-{doc_text[:20000]}
+{condensed}
 """
-    try:
+        extract_started = time.perf_counter()
         response = chat_completion_gpt4_mini(
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
-            max_tokens=4000,
+            max_tokens=DOC_INTEL_EXTRACT_MAX_TOKENS,
+        )
+        _record_stage_usage(
+            stats, "extract", response, time.perf_counter() - extract_started
         )
-        raw = response["content"].strip()
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
-        return json.loads(raw)
+        return _parse_json_response(response["content"])
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=500, detail=f"AI returned invalid JSON: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Azure OpenAI error: {str(e)}")
+    finally:
+        if stats is not None:
+            stages = stats.get("stages", {})
+            stats["total_prompt_tokens"] = sum(
+                s["prompt_tokens"] for s in stages.values()
+            )
+            stats["total_completion_tokens"] = sum(
+                s["completion_tokens"] for s in stages.values()
+            )
+            stats["total_seconds"] = round(time.perf_counter() - started, 3)
 
 
 # ── ReportLab PDF builder (unchanged) ─────────────────────────────────────
@@ -1151,7 +1417,11 @@ def generate_pdf_report(report: InsightReport) -> bytes:
 
 
 def _build_report(
-    filename: str, question: str, raw: dict, parser_used: str = "unknown"
+    filename: str,
+    question: str,
+    raw: dict,
+    parser_used: str = "unknown",
+    pipeline_stats: Optional[dict] = None,
 ) -> InsightReport:
     """Build InsightReport from raw AI JSON, safely handling optional new fields."""
     performers_top = [Performer(**p) for p in raw.get("top_performers", [])]
@@ -1171,13 +1441,12 @@ def _build_report(
         score_distribution=dist,
         generated_at=datetime.now().strftime("%B %d, %Y %H:%M"),
         parser_used=parser_used,
+        pipeline_stats=pipeline_stats,
     )
 
 
-def analyze_document_from_file(
-    file_bytes: bytes, filename: str, question: str = ""
-) -> InsightReport:
-    """Parse uploaded file + run Azure OpenAI analysis."""
+def _parse_uploaded_file(file_bytes: bytes, filename: str) -> tuple[str, str]:
+    """Parse uploaded bytes: Azure DI first for supported formats, then the generic chain."""
     suffix = Path(filename).suffix.lower()
 
     # For Azure DI supported formats, pass bytes directly (no temp file needed)
@@ -1194,9 +1463,7 @@ def analyze_document_from_file(
 
     if suffix in AZURE_DI_FORMATS and AZURE_DI_KEY:
         try:
-            doc_text = parse_with_azure_di(file_bytes, filename)
-            raw = extract_insights_azure(doc_text, question)
-            return _build_report(filename, question, raw, "Azure Document Intelligence")
+            return parse_with_azure_di(file_bytes, filename), "Azure Document Intelligence"
         except Exception as e:
             print(
                 "⚠️  Azure DI failed, falling back to Docling: "
@@ -1209,16 +1476,118 @@ def analyze_document_from_file(
         tmp_path = tmp.name
 
     try:
-        doc_text, parser_used = parse_document(tmp_path, file_bytes)
+        return parse_document(tmp_path, file_bytes)
     finally:
         os.unlink(tmp_path)
 
-    raw = extract_insights_azure(doc_text, question)
-    return _build_report(filename, question, raw, parser_used)
+
+def _is_cacheable_parse(doc_text: str, parser_used: str) -> bool:
+    # Parse errors are returned as bracketed placeholders — never cache those.
+    return parser_used != "failed" and not doc_text.startswith(
+        ("[CSV/Excel parse error", "[Could not parse document")
+    )
+
+
+ProgressCallback = Callable[[str], None]
+
+
+def _notify(on_progress: Optional[ProgressCallback], stage: str) -> None:
+    if on_progress:
+        try:
+            on_progress(stage)
+        except Exception as e:
+            print(f"⚠️  Document Intelligence progress callback failed: {e}")
+
+
+def _analyze_text(
+    doc_name: str,
+    question: str,
+    doc_text: str,
+    parser_used: str,
+    use_cache: bool,
+    parse_cache: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> InsightReport:
+    _notify(on_progress, "extracting")
+    key = document_cache.insights_key(
+        doc_text, question, DOC_INTEL_CONFIG.get("deployment")
+    )
+    cached = document_cache.get_insights(key) if use_cache else None
+    stats: dict
+    if cached:
+        raw, stats = cached
+        stats = {**stats, "insights_cache": "hit"}
+        print(f"⚡ Document Intelligence insights cache hit for {doc_name}")
+    else:
+        stats = {}
+        raw = extract_insights_azure(doc_text, question, stats)
+        document_cache.set_insights(key, raw, stats)
+        stats = {**stats, "insights_cache": "miss" if use_cache else "bypass"}
+    stats["parse_cache"] = parse_cache
+    return _build_report(doc_name, question, raw, parser_used, stats)
+
+
+def analyze_document_from_file(
+    file_bytes: bytes,
+    filename: str,
+    question: str = "",
+    use_cache: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+) -> InsightReport:
+    """
+    Parse uploaded file + run Azure OpenAI analysis.
+    Parsed text and insights are cached by content hash; ``use_cache=False``
+    forces a fresh parse + extraction (the fresh results still refresh the cache).
+    ``on_progress`` is called with the stage name ("parsing", "extracting").
+    """
+    _notify(on_progress, "parsing")
+    parse_key = document_cache.file_parse_key(file_bytes, filename)
+    cached = document_cache.get_parsed(parse_key) if use_cache else None
+    if cached:
+        doc_text, parser_used = cached
+        parse_cache = "hit"
+    else:
+        doc_text, parser_used = _parse_uploaded_file(file_bytes, filename)
+        if _is_cacheable_parse(doc_text, parser_used):
+            document_cache.set_parsed(parse_key, doc_text, parser_used)
+        parse_cache = "miss" if use_cache else "bypass"
+
+    return _analyze_text(
+        filename, question, doc_text, parser_used, use_cache, parse_cache, on_progress
+    )
+
+
+def analyze_document_from_url(
+    url: str,
+    question: str = "",
+    use_cache: bool = True,
+    on_progress: Optional[ProgressCallback] = None,
+) -> InsightReport:
+    """Parse URL with Docling + run Azure OpenAI analysis (cached by URL + ETag)."""
+    _notify(on_progress, "parsing")
+    parse_key, ttl = document_cache.url_parse_key(url)
+    cached = document_cache.get_parsed(parse_key) if use_cache else None
+    if cached:
+        doc_text, parser_used = cached
+        parse_cache = "hit"
+    else:
+        doc_text, parser_used = parse_document(url)
+        if _is_cacheable_parse(doc_text, parser_used):
+            document_cache.set_parsed(parse_key, doc_text, parser_used, ttl)
+        parse_cache = "miss" if use_cache else "bypass"
+
+    return _analyze_text(
+        url, question, doc_text, parser_used, use_cache, parse_cache, on_progress
+    )
 
 
-def analyze_document_from_url(url: str, question: str = "") -> InsightReport:
-    """Parse URL with Docling + run Azure OpenAI analysis."""
-    doc_text, parser_used = parse_document(url)
-    raw = extract_insights_azure(doc_text, question)
-    return _build_report(url, question, raw, parser_used)
+def render_pdf_report(report: InsightReport, use_cache: bool = True) -> bytes:
+    """generate_pdf_report with a content-hash cache so re-exports are instant."""
+    key = document_cache.pdf_key(report.model_dump_json())
+    if use_cache:
+        cached = document_cache.get_pdf(key)
+        if cached:
+            return cached
+    pdf_bytes = generate_pdf_report(report)
+    document_cache.set_pdf(key, pdf_bytes)
+    return pdf_bytes
@@ -2,6 +2,7 @@
 Database initialization script
 Creates the hardcoded super-admin account and Azure AI Agent if they don't exist
 Initializes default chat channels for projects
+Ensures the indexes used by caches and hot query paths
 """
 
 import os
@@ -124,6 +125,52 @@ def initialize_default_channels():
         print(f"⚠️  Error initializing default channels: {str(e)}")
 
 
+def initialize_indexes():
+    """
+    Create (idempotently) the indexes that caches and hot query paths rely on.
+    create_index is a no-op when the index already exists.
+    """
+    try:
+        from models.ai_conversation import ensure_ai_conversation_indexes
+        from models.board_change import ensure_board_change_indexes
+        from utils.document_cache import ensure_document_cache_indexes
+        from utils.document_jobs import ensure_document_job_indexes
+        from utils.langgraph_agent_utils import ensure_langgraph_state_indexes
+        from models.task import ensure_task_create_indexes, ensure_task_list_indexes
+        from models.task_activity import ensure_task_activity_indexes
+        from utils.membership_cache import ensure_membership_indexes
+        from utils.sprint_stats import ensure_sprint_stats_indexes
+        from utils.task_search import ensure_task_search_indexes
+
+        ensure_ai_conversation_indexes()
+        ensure_board_change_indexes()
+        ensure_document_cache_indexes()
+        ensure_document_job_indexes()
+        ensure_langgraph_state_indexes()
+        ensure_membership_indexes()
+        ensure_sprint_stats_indexes()
+        ensure_task_activity_indexes()
+        ensure_task_create_indexes()
+        ensure_task_list_indexes()
+        ensure_task_search_indexes()
+        print("✓ Indexes ensured")
+    except Exception as e:
+        print(f"⚠️  Error ensuring indexes: {str(e)}")
+
+
+def migrate_task_activities():
+    """
+    Move embedded task ``activities`` arrays into task_activity_buckets.
+    Idempotent; tasks not yet migrated are also migrated when first opened.
+    """
+    try:
+        from models.task_activity import TaskActivity
+
+        TaskActivity.migrate_embedded_activities()
+    except Exception as e:
+        print(f"⚠️  Error migrating task activities: {str(e)}")
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("DATABASE INITIALIZATION")
@@ -131,6 +178,8 @@ if __name__ == "__main__":
     initialize_super_admin()
     initialize_azure_agent()
     initialize_default_channels()
+    initialize_indexes()
+    migrate_task_activities()
     print("=" * 70)
     print("✅ Database initialization complete!")
     print("=" * 70)
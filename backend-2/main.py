@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import traceback
 from pathlib import Path
@@ -28,13 +29,21 @@ from routers.voice_chat_router import router as voice_chat_router
 from routers.local_agent_router import router as local_agent_router
 from routers.agent_data_router import router as agent_data_router
 from routers.team_integration_router import router as team_integration_router
-from init_db import initialize_super_admin, initialize_default_channels
+from init_db import (
+    initialize_super_admin,
+    initialize_default_channels,
+    initialize_indexes,
+)
 from routers.langgraph_agent_router import router as langgraph_agent_router
 from routers.mcp_agent_router import router as mcp_agent_router
 # from routers.global_insights_router import router as global_insights_router
 from routers.document_intelligence_router import router as document_intelligence_router
 from routers.meeting_router        import meeting_router
 from routers.schedule_agent_router import schedule_agent_router
+from utils.mcp_client_utils import shutdown_mcp_session_pool
+from utils.query_profiler import query_profiler_middleware
+from utils.websocket_manager import manager
+from routers.voice_chat_router import close_voice_http_client
 
 
 @asynccontextmanager
@@ -44,9 +53,13 @@ async def lifespan(app: FastAPI):
     print("Initializing database...")
     initialize_super_admin()
     initialize_default_channels()
+    initialize_indexes()
     print("Database initialized successfully!")
     print("=" * 50)
 
+    # Broadcasts from worker threads and in-process MCP tools go to this loop
+    manager.bind_loop(asyncio.get_running_loop())
+
     # ── Warm-up: test Azure AI Foundry Agent connectivity ──────────────
     try:
         from controllers.azure_agent_controller import agent_health_check
@@ -63,6 +76,8 @@ async def lifespan(app: FastAPI):
 
     yield
     print("Shutting down...")
+    await shutdown_mcp_session_pool()
+    await close_voice_http_client()
 
 
 app = FastAPI(
@@ -203,6 +218,10 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Per-request Mongo query count / DB time, budgets and slow-query log
+app.middleware("http")(query_profiler_middleware)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     print(f"[REQUEST] {request.method} {request.url.path}")
@@ -17,6 +17,7 @@ with contextlib.redirect_stdout(sys.stderr):
     from database import db
     from utils.github_utils import calculate_time_ago
     from utils.local_agent_automation import find_task_by_title_or_id, resolve_project_id
+    from utils.mcp_server_utils import run_silenced, run_stdio_server
 
 mcp = FastMCP("doit-github-server")
 
@@ -32,11 +33,6 @@ def _controller_payload(response: Dict[str, Any]) -> Dict[str, Any]:
     return {"success": 200 <= status < 300, "status": status, **body}
 
 
-def _run_silenced(func, *args, **kwargs):
-    with contextlib.redirect_stdout(sys.stderr):
-        return func(*args, **kwargs)
-
-
 def _format_prs(docs: list) -> list:
     result = []
     for pr in docs:
@@ -82,7 +78,7 @@ def get_task_git_activity_tool(
         if not task:
             return json.dumps({"success": False, "error": f"Task '{task_identifier}' not found."})
 
-        response = _run_silenced(get_task_git_activity, str(task["_id"]), requesting_user_id)
+        response = run_silenced(get_task_git_activity, str(task["_id"]), requesting_user_id)
         payload = _controller_payload(response)
         return json.dumps(payload, default=str)
     except Exception as exc:
@@ -203,4 +199,4 @@ def list_project_branches(
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio_server(mcp)
@@ -15,6 +15,7 @@ if str(ROOT_DIR) not in sys.path:
 with contextlib.redirect_stdout(sys.stderr):
     from controllers import member_controller
     from utils.local_agent_automation import find_user_by_email_or_name, resolve_project_id
+    from utils.mcp_server_utils import run_silenced, run_stdio_server
 
 mcp = FastMCP("doit-member-server")
 
@@ -36,11 +37,6 @@ def _controller_payload(response: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _run_silenced(func, *args, **kwargs):
-    with contextlib.redirect_stdout(sys.stderr):
-        return func(*args, **kwargs)
-
-
 @mcp.tool()
 def list_members(
     requesting_user_id: str,
@@ -63,7 +59,7 @@ def list_members(
             )
 
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 member_controller.get_project_members,
                 resolved_project_id,
                 requesting_user_id,
@@ -97,7 +93,7 @@ def add_member(
             )
 
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 member_controller.add_project_member,
                 json.dumps({"email": member_email}),
                 resolved_project_id,
@@ -141,7 +137,7 @@ def remove_member(
             )
 
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 member_controller.remove_project_member,
                 resolved_project_id,
                 member["_id"],
@@ -154,4 +150,4 @@ def remove_member(
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio_server(mcp)
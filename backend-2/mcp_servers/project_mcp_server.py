@@ -14,6 +14,7 @@ if str(ROOT_DIR) not in sys.path:
 
 with contextlib.redirect_stdout(sys.stderr):
     from controllers import project_controller
+    from utils.mcp_server_utils import run_silenced, run_stdio_server
 
 mcp = FastMCP("doit-project-server")
 
@@ -35,17 +36,12 @@ def _controller_payload(response: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _run_silenced(func, *args, **kwargs):
-    with contextlib.redirect_stdout(sys.stderr):
-        return func(*args, **kwargs)
-
-
 @mcp.tool()
 def list_projects(requesting_user_id: str) -> str:
     """List all projects visible to the authenticated user."""
     try:
         payload = _controller_payload(
-            _run_silenced(project_controller.get_user_projects, requesting_user_id)
+            run_silenced(project_controller.get_user_projects, requesting_user_id)
         )
         return json.dumps(payload, default=str)
     except Exception as exc:
@@ -62,7 +58,7 @@ def create_project(
     try:
         body = json.dumps({"name": name, "description": description})
         payload = _controller_payload(
-            _run_silenced(project_controller.create_project, body, requesting_user_id)
+            run_silenced(project_controller.create_project, body, requesting_user_id)
         )
         return json.dumps(payload, default=str)
     except Exception as exc:
@@ -70,4 +66,4 @@ def create_project(
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio_server(mcp)
@@ -22,6 +22,8 @@ with contextlib.redirect_stdout(sys.stderr):
         find_task_by_title_or_id,
         resolve_project_id,
     )
+    from utils.mcp_server_utils import run_silenced, run_stdio_server
+    from utils.sprint_stats import get_sprint_stats_map
 
 mcp = FastMCP("doit-sprint-server")
 
@@ -43,11 +45,6 @@ def _controller_payload(response: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _run_silenced(func, *args, **kwargs):
-    with contextlib.redirect_stdout(sys.stderr):
-        return func(*args, **kwargs)
-
-
 @mcp.tool()
 def create_sprint(
     requesting_user_id: str,
@@ -74,7 +71,7 @@ def create_sprint(
                 }
             )
 
-        result = _run_silenced(
+        result = run_silenced(
             agent_create_sprint,
             requesting_user=requesting_user_email,
             name=name,
@@ -121,7 +118,7 @@ def list_sprints(
                         "error": f"Project '{project_name}' not found.",
                     }
                 )
-            response = _run_silenced(
+            response = run_silenced(
                 sprint_controller.get_project_sprints, project_id, requesting_user_id
             )
             payload = _controller_payload(response)
@@ -140,6 +137,7 @@ def list_sprints(
         project_ids = [str(project["_id"]) for project in projects]
 
         docs = list(db.sprints.find({"project_id": {"$in": project_ids}}).sort("created_at", -1))
+        stats = get_sprint_stats_map(sprint["_id"] for sprint in docs)
         sprints = []
         for sprint in docs:
             sprint_id = str(sprint.get("_id"))
@@ -152,10 +150,8 @@ def list_sprints(
                     "start_date": sprint.get("start_date"),
                     "end_date": sprint.get("end_date"),
                     "goal": sprint.get("goal", ""),
-                    "total_tasks": db.tasks.count_documents({"sprint_id": sprint_id}),
-                    "completed_tasks": db.tasks.count_documents(
-                        {"sprint_id": sprint_id, "status": "Done"}
-                    ),
+                    "total_tasks": stats[sprint_id]["total_tasks"],
+                    "completed_tasks": stats[sprint_id]["completed_tasks"],
                 }
             )
 
@@ -186,7 +182,7 @@ def start_sprint(
             return json.dumps({"success": False, "error": "Sprint not found."})
 
         payload = _controller_payload(
-            _run_silenced(sprint_controller.start_sprint, sprint["_id"], requesting_user_id)
+            run_silenced(sprint_controller.start_sprint, sprint["_id"], requesting_user_id)
         )
         return json.dumps(payload, default=str)
     except Exception as exc:
@@ -215,7 +211,7 @@ def complete_sprint(
             return json.dumps({"success": False, "error": "Sprint not found."})
 
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 sprint_controller.complete_sprint, sprint["_id"], requesting_user_id
             )
         )
@@ -257,7 +253,7 @@ def add_ticket_to_sprint(
 
         body = json.dumps({"task_id": task["_id"]})
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 sprint_controller.add_task_to_sprint,
                 sprint["_id"],
                 body,
@@ -301,7 +297,7 @@ def remove_ticket_from_sprint(
             return json.dumps({"success": False, "error": "Task not found."})
 
         payload = _controller_payload(
-            _run_silenced(
+            run_silenced(
                 sprint_controller.remove_task_from_sprint,
                 sprint["_id"],
                 task["_id"],
@@ -314,4 +310,4 @@ def remove_ticket_from_sprint(
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio_server(mcp)
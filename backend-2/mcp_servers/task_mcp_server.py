@@ -22,6 +22,7 @@ with contextlib.redirect_stdout(sys.stderr):
         find_task_by_title_or_id,
         resolve_project_id,
     )
+    from utils.mcp_server_utils import run_silenced, run_stdio_server
 
 mcp = FastMCP("doit-task-server")
 
@@ -55,11 +56,6 @@ def _normalize_priority(priority: Optional[str]) -> str:
     return allowed.get(value, "Medium")
 
 
-def _run_silenced(func, *args, **kwargs):
-    with contextlib.redirect_stdout(sys.stderr):
-        return func(*args, **kwargs)
-
-
 @mcp.tool()
 def list_tasks(
     requesting_user_id: str,
@@ -177,7 +173,7 @@ def create_ticket(
         if labels:
             kwargs["labels"] = labels
 
-        result = _run_silenced(
+        result = run_silenced(
             agent_create_task,
             requesting_user=requesting_user_email,
             title=title,
@@ -232,7 +228,7 @@ def assign_ticket(
                 }
             )
 
-        result = _run_silenced(
+        result = run_silenced(
             agent_assign_task,
             requesting_user=requesting_user_email,
             task_id=task.get("ticket_id") or task["_id"],
@@ -287,7 +283,7 @@ def update_ticket_status(
         if comment:
             body["comment"] = comment
 
-        response = _run_silenced(
+        response = run_silenced(
             task_controller.update_task,
             json.dumps(body),
             task["_id"],
@@ -300,4 +296,4 @@ def update_ticket_status(
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_stdio_server(mcp)
@@ -7,6 +7,12 @@ from datetime import timezone
 ai_conversations_collection = db.ai_conversations
 ai_messages_collection = db.ai_messages
 
+
+def ensure_ai_conversation_indexes():
+    """Serves get_recent_context and the rolling-summary range reads"""
+    ai_messages_collection.create_index([("conversation_id", 1), ("created_at", 1)])
+
+
 class AIConversation:
     """Model for AI Assistant conversations (separate from team chat and chatbot)"""
     
@@ -63,6 +69,41 @@ class AIConversation:
             }
         )
     
+    @staticmethod
+    def record_stream_metrics(conversation_id, metrics):
+        """Accumulate streaming latency stats (TTFT, tokens/sec) on the conversation"""
+        return ai_conversations_collection.update_one(
+            {"_id": ObjectId(conversation_id)},
+            {
+                "$set": {"stream_metrics.last": metrics},
+                "$inc": {
+                    "stream_metrics.streams": 1,
+                    "stream_metrics.total_ttft_ms": metrics.get("ttft_ms") or 0,
+                    "stream_metrics.total_completion_tokens": metrics.get("completion_tokens") or 0,
+                    "stream_metrics.total_stream_seconds": metrics.get("duration_seconds") or 0,
+                },
+            }
+        )
+    
+    @staticmethod
+    def update_history_summary(conversation_id, text, through):
+        """
+        Store the rolling summary of turns that no longer fit in the prompt.
+        through: created_at of the newest message folded into the summary
+        """
+        return ai_conversations_collection.update_one(
+            {"_id": ObjectId(conversation_id)},
+            {
+                "$set": {
+                    "history_summary": {
+                        "text": text,
+                        "through": through,
+                        "updated_at": datetime.datetime.now(timezone.utc).replace(tzinfo=None),
+                    }
+                }
+            }
+        )
+    
     @staticmethod
     def delete(conversation_id):
         """Delete a conversation and all its messages"""
@@ -76,13 +117,14 @@ class AIMessage:
     """Model for messages in AI Assistant conversations"""
     
     @staticmethod
-    def create(conversation_id, role, content, attachments=None, image_url=None):
+    def create(conversation_id, role, content, attachments=None, image_url=None, tokens_used=0, metrics=None):
         """
         Create a new message
         role: 'user' or 'assistant'
         content: text content
         attachments: list of file attachments (optional)
         image_url: URL of generated image (optional)
+        metrics: streaming stats such as ttft_ms / tokens_per_second (optional)
         """
         message_data = {
             "conversation_id": str(conversation_id),
@@ -91,8 +133,10 @@ class AIMessage:
             "attachments": attachments or [],
             "image_url": image_url,
             "created_at": datetime.datetime.now(timezone.utc).replace(tzinfo=None),
-            "tokens_used": 0  # Will be updated after API call
+            "tokens_used": tokens_used  # Will be updated after API call
         }
+        if metrics:
+            message_data["metrics"] = metrics
         result = ai_messages_collection.insert_one(message_data)
         
         # Update conversation timestamp
@@ -132,3 +176,24 @@ class AIMessage:
         )
         # Reverse to get chronological order
         return list(reversed(messages))
+    
+    @staticmethod
+    def get_messages_between(conversation_id, after=None, before=None, limit=40):
+        """
+        Messages created after ``after`` and before ``before`` (both exclusive,
+        either optional), oldest first, capped to the newest ``limit``
+        """
+        created_at = {}
+        if after is not None:
+            created_at["$gt"] = after
+        if before is not None:
+            created_at["$lt"] = before
+        query = {"conversation_id": str(conversation_id)}
+        if created_at:
+            query["created_at"] = created_at
+        messages = list(
+            ai_messages_collection.find(query, {"role": 1, "content": 1, "created_at": 1})
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+        return list(reversed(messages))
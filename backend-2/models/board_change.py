@@ -0,0 +1,121 @@
+"""
+Per-project Kanban change log (board_changes) for delta sync.
+
+Every task write that can change a board card records ``(project_id, version,
+op, task_id)``, where ``version`` comes from a per-project counter in
+board_versions and only ever increases. A client that knows the version it
+last saw asks for the changes after it and refetches just those tasks.
+
+Entries only carry ids: readers load the current task documents, so several
+changes to one task collapse into one. Entries expire after
+BOARD_CHANGE_RETENTION_HOURS; a client older than that gets ``reset`` and
+reloads the board.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ReturnDocument
+
+from database import db
+
+board_changes = db.board_changes
+board_versions = db.board_versions
+
+BOARD_CHANGE_RETENTION_HOURS = int(os.getenv("BOARD_CHANGE_RETENTION_HOURS", "72"))
+
+# A version reserved by a writer that never inserted its entry is skipped after this
+BOARD_CHANGE_GAP_GRACE_SECONDS = int(os.getenv("BOARD_CHANGE_GAP_GRACE_SECONDS", "10"))
+
+
+def ensure_board_change_indexes():
+    """Serves ``since`` reads; TTL index drops entries past the retention window"""
+    board_changes.create_index([("project_id", 1), ("version", 1)], unique=True)
+    board_changes.create_index("at", expireAfterSeconds=BOARD_CHANGE_RETENTION_HOURS * 3600)
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def record_task_changes(project_id, op, task_ids):
+    """BoardChange.record for model write paths: a failed log write never fails the task write"""
+    try:
+        return BoardChange.record(project_id, op, task_ids)
+    except Exception as e:
+        print(f"⚠️  Board change log write failed for project {project_id}: {e}")
+        return None
+
+
+class BoardChange:
+    """Versioned task change log per project"""
+
+    @staticmethod
+    def record(project_id, op, task_ids):
+        """
+        Append one entry per task (op: created|updated|deleted).
+        Returns the project's version after the entries, or None if nothing was recorded.
+        """
+        task_ids = [str(t) for t in task_ids if t]
+        if not project_id or not task_ids:
+            return None
+        counter = board_versions.find_one_and_update(
+            {"_id": str(project_id)},
+            {"$inc": {"version": len(task_ids)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        version = counter["version"]
+        now = _now()
+        first = version - len(task_ids) + 1
+        board_changes.insert_many([
+            {"project_id": str(project_id), "version": first + i, "op": op, "task_id": task_id, "at": now}
+            for i, task_id in enumerate(task_ids)
+        ], ordered=False)
+        return version
+
+    @staticmethod
+    def current_version(project_id):
+        counter = board_versions.find_one({"_id": str(project_id)})
+        return counter["version"] if counter else 0
+
+    @staticmethod
+    def since(project_id, version, limit=500):
+        """
+        Changes after ``version``, collapsed to the last op per task.
+        Returns {"version", "changes": {task_id: op}, "has_more", "reset"}; ``version``
+        is the next resume point (the last contiguous version read).
+        """
+        project_id = str(project_id)
+        current = BoardChange.current_version(project_id)
+        if version > current:
+            # Counter was reset (or the client holds another deployment's token)
+            return {"version": current, "changes": {}, "has_more": False, "reset": True}
+
+        entries = list(
+            board_changes.find(
+                {"project_id": project_id, "version": {"$gt": version}},
+                {"version": 1, "op": 1, "task_id": 1, "at": 1}
+            ).sort("version", 1).limit(limit)
+        )
+        if version < current and (not entries or entries[0]["version"] != version + 1):
+            oldest = board_changes.find_one({"project_id": project_id}, {"version": 1}, sort=[("version", 1)])
+            if oldest is None or oldest["version"] > version + 1:
+                # The entries the client missed have expired
+                return {"version": current, "changes": {}, "has_more": False, "reset": True}
+
+        changes = {}
+        reached = version
+        grace = _now() - timedelta(seconds=BOARD_CHANGE_GAP_GRACE_SECONDS)
+        for entry in entries:
+            # Concurrent writers insert out of order; stop at a gap that may still fill
+            if entry["version"] != reached + 1 and entry["at"] > grace:
+                break
+            changes[entry["task_id"]] = entry["op"]
+            reached = entry["version"]
+        return {"version": reached, "changes": changes, "has_more": reached < current, "reset": False}
+
+    @staticmethod
+    def delete_for_project(project_id):
+        board_versions.delete_one({"_id": str(project_id)})
+        return board_changes.delete_many({"project_id": str(project_id)}).deleted_count
@@ -2,6 +2,8 @@ from database import projects
 from bson import ObjectId
 from datetime import datetime, timezone
 from utils.ticket_utils import generate_project_prefix
+from utils.task_events import publish_project_event
+from utils.membership_cache import get_project_role
 
 class Project:
     @staticmethod
@@ -24,6 +26,7 @@ class Project:
         }
         result = projects.insert_one(project)
         project["_id"] = result.inserted_id
+        publish_project_event("created", project["_id"], project)
         return project
 
     @staticmethod
@@ -58,12 +61,18 @@ class Project:
             {"_id": ObjectId(project_id)},
             {"$set": update_data}
         )
+        if result.modified_count > 0:
+            # Carry the new owner so membership caches pick up the transfer.
+            owner = {"user_id": update_data["user_id"]} if update_data.get("user_id") else None
+            publish_project_event("updated", project_id, owner)
         return result.modified_count > 0
 
     @staticmethod
     def delete(project_id):
         """Delete a project"""
         result = projects.delete_one({"_id": ObjectId(project_id)})
+        if result.deleted_count > 0:
+            publish_project_event("deleted", project_id)
         return result.deleted_count > 0
 
     @staticmethod
@@ -78,6 +87,8 @@ class Project:
             {"_id": ObjectId(project_id)},
             {"$addToSet": {"members": member_data}}
         )
+        if result.modified_count > 0:
+            publish_project_event("member_added", project_id, {"user_id": member_data.get("user_id")})
         return result.modified_count > 0
     
     @staticmethod
@@ -87,19 +98,20 @@ class Project:
             {"_id": ObjectId(project_id)},
             {"$pull": {"members": {"user_id": user_id}}}
         )
+        if result.modified_count > 0:
+            publish_project_event("member_removed", project_id, {"user_id": user_id})
         return result.modified_count > 0
     
     @staticmethod
     def is_member(project_id, user_id):
         """Check if user is a member or owner of the project"""
-        project = projects.find_one({"_id": ObjectId(project_id)})
-        if not project:
-            return False
         # Owner is automatically a member
-        if project["user_id"] == user_id:
-            return True
-        # Check if user is in members list
-        return any(member["user_id"] == user_id for member in project.get("members", []))
+        return get_project_role(project_id, user_id) is not None
+    
+    @staticmethod
+    def get_member_role(project_id, user_id):
+        """Return "owner", "member" or None (cached, see utils.membership_cache)"""
+        return get_project_role(project_id, user_id)
     
     @staticmethod
     def find_by_repo_url(repo_url):
@@ -6,6 +6,8 @@ Handles sprint data and operations in MongoDB
 from database import sprints
 from bson import ObjectId
 from datetime import datetime, timezone
+from models.board_change import record_task_changes
+from utils.task_events import publish_sprint_event
 
 
 class Sprint:
@@ -35,6 +37,7 @@ class Sprint:
 
         result = sprints.insert_one(sprint)
         sprint["_id"] = result.inserted_id
+        publish_sprint_event("created", sprint["_id"], sprint)
         return sprint
 
     @staticmethod
@@ -120,9 +123,13 @@ class Sprint:
         """Update sprint details"""
         update_data["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None)
 
-        result = sprints.update_one({"_id": ObjectId(sprint_id)}, {"$set": update_data})
-
-        return result.modified_count > 0
+        sprint = sprints.find_one_and_update(
+            {"_id": ObjectId(sprint_id)}, {"$set": update_data}, projection={"project_id": 1}
+        )
+        if sprint is None:
+            return False
+        publish_sprint_event("updated", sprint_id, sprint)
+        return True
 
     @staticmethod
     def delete(sprint_id):
@@ -130,13 +137,20 @@ class Sprint:
         # First, remove sprint_id from all associated tasks
         from database import db
 
+        unlinked = db.tasks.distinct("_id", {"sprint_id": str(sprint_id)})
         db.tasks.update_many(
             {"sprint_id": str(sprint_id)}, {"$unset": {"sprint_id": ""}}
         )
 
         # Then delete the sprint
-        result = sprints.delete_one({"_id": ObjectId(sprint_id)})
-        return result.deleted_count > 0
+        sprint = sprints.find_one_and_delete(
+            {"_id": ObjectId(sprint_id)}, projection={"project_id": 1}
+        )
+        if sprint is None:
+            return False
+        record_task_changes(sprint.get("project_id"), "updated", unlinked)
+        publish_sprint_event("deleted", sprint_id, sprint)
+        return True
 
     @staticmethod
     def delete_by_project(project_id):
@@ -180,6 +194,7 @@ class Sprint:
         }
 
         result = sprints.update_one({"_id": ObjectId(sprint_id)}, {"$set": update_data})
+        publish_sprint_event("updated", sprint_id, sprint)
 
         return result.modified_count > 0
 
@@ -194,39 +209,20 @@ class Sprint:
             "completed_tasks_snapshot": completed_tasks,
         }
 
-        result = sprints.update_one({"_id": ObjectId(sprint_id)}, {"$set": update_data})
-
-        return result.modified_count > 0
+        sprint = sprints.find_one_and_update(
+            {"_id": ObjectId(sprint_id)}, {"$set": update_data}, projection={"project_id": 1}
+        )
+        if sprint is None:
+            return False
+        publish_sprint_event("updated", sprint_id, sprint)
+        return True
 
     @staticmethod
     def get_sprint_stats(sprint_id):
-        """Get statistics for a sprint"""
-        from database import db
-
-        # Count tasks in this sprint
-        total_tasks = db.tasks.count_documents({"sprint_id": str(sprint_id)})
-        completed_tasks = db.tasks.count_documents(
-            {"sprint_id": str(sprint_id), "status": "Done"}
-        )
-        in_progress_tasks = db.tasks.count_documents(
-            {"sprint_id": str(sprint_id), "status": "In Progress"}
-        )
-        todo_tasks = db.tasks.count_documents(
-            {"sprint_id": str(sprint_id), "status": "To Do"}
-        )
+        """Get statistics for a sprint (one aggregation, see utils.sprint_stats)"""
+        from utils.sprint_stats import get_sprint_stats
 
-        # Calculate completion percentage - handle division by zero
-        completion_percentage = (
-            (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        )
-
-        return {
-            "total_tasks": total_tasks,
-            "completed_tasks": completed_tasks,
-            "in_progress_tasks": in_progress_tasks,
-            "todo_tasks": todo_tasks,
-            "completion_percentage": round(completion_percentage, 1),
-        }
+        return get_sprint_stats(sprint_id)
 
     @staticmethod
     def add_task_to_sprint(sprint_id, task_id):
@@ -1,41 +1,191 @@
+import base64
 from database import tasks
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone
+from models.board_change import BoardChange, record_task_changes
+from models.task_activity import TaskActivity, task_activity_update
+from utils.task_events import publish_task_event
+
+# Fields returned by find_one_and_* so write events know which project/user changed
+_EVENT_FIELDS = {"project_id": 1, "assignee_id": 1}
+
+# Board/list fields (activity log, attachments and links are detail-only)
+TASK_LIST_FIELDS = [
+    "ticket_id", "issue_type", "title", "description", "project_id", "sprint_id",
+    "priority", "status", "assignee_id", "assignee_name", "assignee_email",
+    "due_date", "created_by", "labels", "created_at", "updated_at",
+    "moved_to_backlog_at", "in_backlog",
+]
+
+# Project task listing order; the cursor encodes the last (created_at, _id) seen
+_LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def ensure_task_list_indexes():
+    """Serve get_project_tasks pages and filters in _LIST_SORT order"""
+    tasks.create_index([("project_id", 1), ("created_at", -1), ("_id", -1)])
+    tasks.create_index([("project_id", 1), ("status", 1), ("created_at", -1), ("_id", -1)])
+    tasks.create_index([("project_id", 1), ("assignee_id", 1), ("created_at", -1), ("_id", -1)])
+    tasks.create_index([("project_id", 1), ("sprint_id", 1), ("created_at", -1), ("_id", -1)])
+    tasks.create_index([("project_id", 1), ("labels", 1), ("created_at", -1), ("_id", -1)])
+
+
+def ensure_task_create_indexes():
+    """Client idempotency keys are unique per project (tasks without a key are not indexed)"""
+    tasks.create_index(
+        [("project_id", 1), ("idempotency_key", 1)],
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}}
+    )
+
+
+def encode_task_cursor(task):
+    created_at = task.get("created_at")
+    stamp = created_at.isoformat() if isinstance(created_at, datetime) else ""
+    return base64.urlsafe_b64encode(f"{stamp}|{task['_id']}".encode()).decode()
+
+
+def decode_task_cursor(cursor):
+    """Return a filter selecting tasks after the cursor, or None if it is malformed"""
+    try:
+        stamp, task_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        task_id = ObjectId(task_id)
+        created_at = datetime.fromisoformat(stamp) if stamp else None
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        return None
+    if created_at is None:
+        # Tasks without created_at sort last
+        return {"created_at": None, "_id": {"$lt": task_id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": task_id}},
+        {"created_at": None},
+    ]}
+
+def _build_activity(activity_data):
+    """Normalise an activity/comment entry before it is pushed onto a task"""
+    # Start with all data from activity_data to preserve additional fields
+    activity = dict(activity_data)
+
+    # Ensure required fields are present
+    activity.setdefault("user_id", activity_data.get("user_id"))
+    activity.setdefault("user_name", activity_data.get("user_name"))
+    activity.setdefault("action", activity_data.get("action"))
+    activity.setdefault("comment", "")
+    activity.setdefault("old_value", None)
+    activity.setdefault("new_value", None)
+
+    # Set timestamp if not already provided
+    if "timestamp" not in activity:
+        activity["timestamp"] = datetime.now(timezone.utc).isoformat()
+    elif isinstance(activity["timestamp"], datetime):
+        # If naive datetime, assume it's UTC and add 'Z' suffix
+        if activity["timestamp"].tzinfo is None:
+            activity["timestamp"] = activity["timestamp"].isoformat() + 'Z'
+        else:
+            activity["timestamp"] = activity["timestamp"].isoformat()
+    return activity
+
+def _new_task_document(task_data):
+    """Full task document for Task.create / Task.create_many"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)  # Store as naive UTC
+    task = {
+        "_id": task_data.get("_id") or ObjectId(),
+        "ticket_id": task_data.get("ticket_id"),  # Unique ticket ID (e.g., PROJ-123)
+        "issue_type": task_data.get("issue_type", "task"),  # bug, task, story, epic
+        "title": task_data.get("title"),
+        "description": task_data.get("description", ""),
+        "project_id": task_data.get("project_id"),
+        "sprint_id": task_data.get("sprint_id"),  # Sprint ID or None for backlog
+        "priority": task_data.get("priority", "Medium"),  # Low, Medium, High
+        "status": task_data.get("status", "To Do"),  # To Do, In Progress, Done
+        "assignee_id": task_data.get("assignee_id"),  # User ID of assignee
+        "assignee_name": task_data.get("assignee_name", "Unassigned"),
+        "assignee_email": task_data.get("assignee_email", ""),
+        "due_date": task_data.get("due_date"),  # ISO format date string
+        "created_by": task_data.get("created_by"),  # User ID of creator
+        "labels": task_data.get("labels", []),  # List of labels/tags
+        "attachments": task_data.get("attachments", []),  # List of attachments {name, url, added_by, added_at}
+        "links": task_data.get("links", []),  # Ticket relationships {type, linked_task_id, linked_ticket_id}
+        "activity_count": 0,  # Activity log lives in task_activity_buckets (models.task_activity)
+        "recent_comments": [],  # Last TASK_RECENT_COMMENTS comments, for search
+        "created_at": now,
+        "updated_at": now,
+    }
+    if task_data.get("idempotency_key"):
+        task["idempotency_key"] = task_data["idempotency_key"]  # Client retry key, unique per project
+    return task
 
 class Task:
     @staticmethod
     def create(task_data):
         """Create a new task"""
-        task = {
-            "ticket_id": task_data.get("ticket_id"),  # Unique ticket ID (e.g., PROJ-123)
-            "issue_type": task_data.get("issue_type", "task"),  # bug, task, story, epic
-            "title": task_data.get("title"),
-            "description": task_data.get("description", ""),
-            "project_id": task_data.get("project_id"),
-            "sprint_id": task_data.get("sprint_id"),  # Sprint ID or None for backlog
-            "priority": task_data.get("priority", "Medium"),  # Low, Medium, High
-            "status": task_data.get("status", "To Do"),  # To Do, In Progress, Done
-            "assignee_id": task_data.get("assignee_id"),  # User ID of assignee
-            "assignee_name": task_data.get("assignee_name", "Unassigned"),
-            "assignee_email": task_data.get("assignee_email", ""),
-            "due_date": task_data.get("due_date"),  # ISO format date string
-            "created_by": task_data.get("created_by"),  # User ID of creator
-            "labels": task_data.get("labels", []),  # List of labels/tags
-            "attachments": task_data.get("attachments", []),  # List of attachments {name, url, added_by, added_at}
-            "links": task_data.get("links", []),  # Ticket relationships {type, linked_task_id, linked_ticket_id}
-            "activities": [],  # Activity log with comments and status changes
-            "created_at": datetime.now(timezone.utc).replace(tzinfo=None),  # Store as naive UTC
-            "updated_at": datetime.now(timezone.utc).replace(tzinfo=None)  # Store as naive UTC
-        }
+        task = _new_task_document(task_data)
         result = tasks.insert_one(task)
         task["_id"] = result.inserted_id
+        publish_task_event("created", task["_id"], task)
+        task["board_version"] = record_task_changes(task["project_id"], "created", [task["_id"]])
         return task
 
     @staticmethod
-    def find_by_id(task_id):
-        """Find task by ID"""
+    def create_many(task_datas):
+        """
+        Create many tasks with one insert_many (unordered).
+        A task_data may carry an "idempotency_key"; a key already used in the
+        project fails that task with DuplicateKeyError's code instead of
+        inserting it again.
+        Returns one {"ok", "task", "error", "duplicate"} per task_data, in order;
+        created tasks carry the project's "board_version".
+        """
+        docs = [_new_task_document(task_data) for task_data in task_datas]
+        if not docs:
+            return []
+        results = [{"ok": True, "task": doc, "error": None, "duplicate": False} for doc in docs]
         try:
-            return tasks.find_one({"_id": ObjectId(task_id)})
+            tasks.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                results[err["index"]] = {
+                    "ok": False,
+                    "task": None,
+                    "error": err.get("errmsg", "Insert failed"),
+                    "duplicate": err.get("code") == 11000,
+                }
+
+        by_project = {}
+        for result in results:
+            if result["ok"]:
+                by_project.setdefault(result["task"]["project_id"], []).append(result["task"]["_id"])
+        versions = {
+            project_id: record_task_changes(project_id, "created", task_ids)
+            for project_id, task_ids in by_project.items()
+        }
+        for result in results:
+            if result["ok"]:
+                task = result["task"]
+                task["board_version"] = versions.get(task["project_id"])
+                publish_task_event("created", task["_id"], task)
+        return results
+
+    @staticmethod
+    def find_by_idempotency_keys(project_id, keys, projection=None):
+        """{idempotency_key: task} for the keys already used in the project"""
+        keys = [k for k in keys if k]
+        if not keys:
+            return {}
+        return {
+            task["idempotency_key"]: task
+            for task in tasks.find({"project_id": project_id, "idempotency_key": {"$in": keys}}, projection)
+        }
+
+    @staticmethod
+    def find_by_id(task_id, projection=None):
+        """Find task by ID (optionally only the projected fields)"""
+        try:
+            return tasks.find_one({"_id": ObjectId(task_id)}, projection)
         except:
             return None
 
@@ -67,11 +217,99 @@ class Task:
 
         return tasks.find_one({"task_id": identifier})
 
+    @staticmethod
+    def find_by_identifiers(identifiers, projection=None, project_id=None):
+        """
+        Resolve many Mongo _ids / ticket ids with one $in query.
+        Returns {identifier: task} for the identifiers that matched; an _id-like
+        identifier prefers the _id match, duplicate ticket ids prefer project_id.
+        """
+        identifiers = [str(i or "").strip() for i in identifiers]
+        object_ids = [ObjectId(i) for i in identifiers if ObjectId.is_valid(i)]
+        tickets = list({i.upper() for i in identifiers if i})
+        clauses = []
+        if object_ids:
+            clauses.append({"_id": {"$in": object_ids}})
+        if tickets:
+            clauses.append({"ticket_id": {"$in": tickets}})
+        if not clauses:
+            return {}
+        if projection is not None:
+            projection = {**projection, "ticket_id": 1, "project_id": 1}
+
+        by_id = {}
+        by_ticket = {}
+        for task in tasks.find({"$or": clauses}, projection):
+            by_id[str(task["_id"])] = task
+            ticket = task.get("ticket_id")
+            if ticket and (ticket not in by_ticket or task.get("project_id") == project_id):
+                by_ticket[ticket] = task
+
+        found = {}
+        for identifier in identifiers:
+            task = by_id.get(identifier) or by_ticket.get(identifier.upper())
+            if task:
+                found[identifier] = task
+        return found
+
     @staticmethod
     def find_by_project(project_id):
         """Get all tasks for a project"""
         return list(tasks.find({"project_id": project_id}).sort("created_at", -1))
 
+    @staticmethod
+    def build_list_filter(project_id, status=None, assignee_id=None, sprint_id=None,
+                          label=None, issue_type=None, updated_since=None):
+        """
+        Mongo filter for project task listings.
+        status/issue_type accept comma-separated values; assignee_id "unassigned"
+        and sprint_id "none" select tasks without one; updated_since is a datetime.
+        """
+        query = {"project_id": project_id}
+        if status:
+            statuses = [s.strip() for s in status.split(",") if s.strip()]
+            query["status"] = statuses[0] if len(statuses) == 1 else {"$in": statuses}
+        if assignee_id:
+            query["assignee_id"] = None if assignee_id == "unassigned" else assignee_id
+        if sprint_id:
+            query["sprint_id"] = None if sprint_id == "none" else sprint_id
+        if label:
+            query["labels"] = label
+        if issue_type:
+            types = [t.strip() for t in issue_type.split(",") if t.strip()]
+            query["issue_type"] = types[0] if len(types) == 1 else {"$in": types}
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+        return query
+
+    @staticmethod
+    def find_page(query, projection=None, limit=None, cursor_filter=None):
+        """
+        Tasks matching ``query`` newest first, at most ``limit`` (all when None).
+        Returns (tasks, next_cursor); next_cursor is None on the last page.
+        """
+        if cursor_filter:
+            query = {"$and": [query, cursor_filter]}
+        found = tasks.find(query, projection).sort(_LIST_SORT)
+        if limit is None:
+            return list(found), None
+        page = list(found.limit(limit + 1))
+        if len(page) <= limit:
+            return page, None
+        page = page[:limit]
+        return page, encode_task_cursor(page[-1])
+
+    @staticmethod
+    def count_by_status(query):
+        """{status: count} for a list filter, one aggregation"""
+        return {
+            row["_id"]: row["n"]
+            for row in tasks.aggregate([
+                {"$match": query},
+                {"$group": {"_id": "$status", "n": {"$sum": 1}}},
+            ])
+        }
+
     @staticmethod
     def find_by_sprint(sprint_id):
         """Get all tasks in a sprint"""
@@ -105,47 +343,178 @@ class Task:
     def update(task_id, update_data):
         """Update task details"""
         update_data["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None)  # Store as naive UTC
-        result = tasks.update_one(
+        before = tasks.find_one_and_update(
             {"_id": ObjectId(task_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=_EVENT_FIELDS
         )
-        return result.modified_count > 0
+        if before is None:
+            return False
+        record_task_changes(before.get("project_id"), "updated", [task_id])
+        publish_task_event("updated", task_id, {**before, **update_data, "previous_assignee_id": before.get("assignee_id")})
+        return True
 
     @staticmethod
     def add_activity(task_id, activity_data):
         """Add an activity/comment to task"""
-        # Start with all data from activity_data to preserve additional fields
-        activity = dict(activity_data)
-        
-        # Ensure required fields are present
-        activity.setdefault("user_id", activity_data.get("user_id"))
-        activity.setdefault("user_name", activity_data.get("user_name"))
-        activity.setdefault("action", activity_data.get("action"))
-        activity.setdefault("comment", "")
-        activity.setdefault("old_value", None)
-        activity.setdefault("new_value", None)
-        
-        # Set timestamp if not already provided
-        if "timestamp" not in activity:
-            activity["timestamp"] = datetime.now(timezone.utc).isoformat()
-        elif isinstance(activity["timestamp"], datetime):
-            # If naive datetime, assume it's UTC and add 'Z' suffix
-            if activity["timestamp"].tzinfo is None:
-                activity["timestamp"] = activity["timestamp"].isoformat() + 'Z'
-            else:
-                activity["timestamp"] = activity["timestamp"].isoformat()
-        
-        result = tasks.update_one(
+        activity = _build_activity(activity_data)
+        update = task_activity_update([activity])
+        update["$set"] = {"updated_at": datetime.now(timezone.utc).replace(tzinfo=None)}
+        task = tasks.find_one_and_update(
             {"_id": ObjectId(task_id)},
-            {"$push": {"activities": activity}, "$set": {"updated_at": datetime.now(timezone.utc).replace(tzinfo=None)}}
+            update,
+            projection=_EVENT_FIELDS
         )
-        return result.modified_count > 0
+        if task is None:
+            return False
+        TaskActivity.append(task_id, [activity], task.get("project_id"))
+        record_task_changes(task.get("project_id"), "updated", [task_id])
+        publish_task_event("updated", task_id, task)
+        return True
+
+    @staticmethod
+    def update_with_activities(task_id, update_data, activities=(), previous=None):
+        """
+        Apply field changes and activity counters in one task write, then append
+        the entries to the activity bucket.
+        Returns the updated task document, or None if the task does not exist.
+        previous: the task as loaded before the change (for assignee events)
+        """
+        activities = [_build_activity(a) for a in activities]
+        update_data = dict(update_data)
+        update_data["updated_at"] = datetime.now(timezone.utc).replace(tzinfo=None)  # Store as naive UTC
+        update = task_activity_update(activities) if activities else {}
+        update["$set"] = update_data
+        task = tasks.find_one_and_update(
+            {"_id": ObjectId(task_id)},
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+        if task is None:
+            return None
+        TaskActivity.append(task_id, activities, task.get("project_id"))
+        publish_task_event("updated", task_id, {
+            **task,
+            "previous_assignee_id": (previous or task).get("assignee_id"),
+        })
+        task["board_version"] = record_task_changes(task.get("project_id"), "updated", [task_id])
+        return task
+
+    @staticmethod
+    def bulk_update(changes, ordered=False):
+        """
+        Apply many task updates in one bulk_write.
+        changes: dicts with "task" (the pre-loaded task, needs _id/project_id),
+        "set", optional "unset", "activities" and "match" (extra filter).
+        With ordered=True the batch stops at the first failing write or conflict.
+        Returns one {"ok", "error", "conflict"} per change, in order; conflict is
+        True when the task no longer matched its "match" guard (nothing written).
+        """
+        if not changes:
+            return []
+        now = datetime.now(timezone.utc).replace(tzinfo=None)  # Store as naive UTC
+        # Millisecond precision, as stored, so the post-write check can match on it
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        operations = []
+        for change in changes:
+            activities = [_build_activity(a) for a in change.get("activities") or ()]
+            change["activities"] = activities
+            update = task_activity_update(activities) if activities else {}
+            update["$set"] = {**change.get("set", {}), "updated_at": now}
+            if change.get("unset"):
+                update["$unset"] = {field: "" for field in change["unset"]}
+            operations.append(UpdateOne({"_id": change["task"]["_id"], **change.get("match", {})}, update))
+
+        results = [{"ok": True, "error": None, "conflict": False} for _ in changes]
+        conflict = {"ok": False, "error": "Conflict: the task changed since it was read", "conflict": True}
+        not_applied = {"ok": False, "error": "Not applied: an earlier update in the batch failed", "conflict": False}
+
+        # BulkWriteResult only has aggregate counts, so guards are checked per task up front
+        guarded = [i for i, change in enumerate(changes) if change.get("match")]
+        if guarded:
+            holding = {
+                task["_id"] for task in tasks.find(
+                    {"$or": [{"_id": changes[i]["task"]["_id"], **changes[i]["match"]} for i in guarded]},
+                    {"_id": 1}
+                )
+            }
+            for i in guarded:
+                if changes[i]["task"]["_id"] not in holding:
+                    results[i] = dict(conflict)
+            if ordered:
+                first = next((i for i in guarded if results[i]["conflict"]), None)
+                if first is not None:
+                    for index in range(first + 1, len(changes)):
+                        results[index] = dict(not_applied)
+
+        sent = [i for i, result in enumerate(results) if result["ok"]]
+        matched = 0
+        if sent:
+            try:
+                matched = tasks.bulk_write([operations[i] for i in sent], ordered=ordered).matched_count
+            except BulkWriteError as e:
+                matched = e.details.get("nMatched", 0)
+                failed = {
+                    sent[err["index"]]: err.get("errmsg", "Write failed")
+                    for err in e.details.get("writeErrors", [])
+                }
+                for index, message in failed.items():
+                    results[index] = {"ok": False, "error": message, "conflict": False}
+                if ordered and failed:
+                    # Ordered batches stop at the first error
+                    for index in sent:
+                        if index > min(failed):
+                            results[index] = dict(not_applied)
+
+        written = [i for i in sent if results[i]["ok"]]
+        if matched < len(written):
+            # A task changed (or was deleted) between the guard check and the write
+            stamped = {
+                task["_id"] for task in tasks.find(
+                    {"_id": {"$in": [changes[i]["task"]["_id"] for i in written]}, "updated_at": now},
+                    {"_id": 1}
+                )
+            }
+            for i in written:
+                if changes[i]["task"]["_id"] not in stamped:
+                    results[i] = dict(conflict) if changes[i].get("match") else {
+                        "ok": False, "error": "Task not found", "conflict": False
+                    }
+
+        applied = [change for change, result in zip(changes, results) if result["ok"]]
+        TaskActivity.append_many(
+            (change["task"]["_id"], change["activities"], change["task"].get("project_id"))
+            for change in applied
+        )
+        by_project = {}
+        for change in applied:
+            by_project.setdefault(change["task"].get("project_id"), []).append(change["task"]["_id"])
+        versions = {
+            project_id: record_task_changes(project_id, "updated", task_ids)
+            for project_id, task_ids in by_project.items()
+        }
+        for change, result in zip(changes, results):
+            if result["ok"]:
+                result["board_version"] = versions.get(change["task"].get("project_id"))
+        for change in applied:
+            task = change["task"]
+            publish_task_event("updated", task["_id"], {
+                **task,
+                **change.get("set", {}),
+                "previous_assignee_id": task.get("assignee_id"),
+            })
+        return results
 
     @staticmethod
     def delete(task_id):
         """Delete a task"""
-        result = tasks.delete_one({"_id": ObjectId(task_id)})
-        return result.deleted_count > 0
+        task = tasks.find_one_and_delete({"_id": ObjectId(task_id)}, projection=_EVENT_FIELDS)
+        if task is None:
+            return False
+        TaskActivity.delete_for_task(task_id)
+        record_task_changes(task.get("project_id"), "deleted", [task_id])
+        publish_task_event("deleted", task_id, task)
+        return True
     
     @staticmethod
     def add_label(task_id, label):
@@ -233,16 +602,17 @@ class Task:
     def delete_by_project(project_id):
         """Delete all tasks for a project"""
         result = tasks.delete_many({"project_id": project_id})
+        TaskActivity.delete_for_project(project_id)
+        BoardChange.delete_for_project(project_id)
         return result.deleted_count
 
     @staticmethod
     def unassign_user_tasks(project_id, user_id):
         """Unassign all tasks assigned to a specific user in a project"""
+        query = {"project_id": project_id, "assignee_id": user_id}
+        task_ids = tasks.distinct("_id", query)
         result = tasks.update_many(
-            {
-                "project_id": project_id,
-                "assignee_id": user_id
-            },
+            query,
             {
                 "$set": {
                     "assignee_id": None,
@@ -252,4 +622,5 @@ class Task:
                 }
             }
         )
+        record_task_changes(project_id, "updated", task_ids)
         return result.modified_count
@@ -0,0 +1,241 @@
+"""
+Task activity log stored in fixed-size buckets (task_activity_buckets) instead
+of an ever-growing ``activities`` array on the task document.
+
+Each bucket holds up to TASK_ACTIVITY_BUCKET_SIZE entries for one task, oldest
+first; new entries are appended to the task's open bucket with a single
+upsert. Buckets are ordered by ``started_at`` (time of their first entry), so
+pages can be read newest-first by loading only the buckets a page touches.
+
+The task document keeps ``activity_count`` and the last
+TASK_RECENT_COMMENTS comments (``recent_comments``, used by comment search).
+"""
+
+import os
+from datetime import datetime, timezone
+
+from pymongo import ReplaceOne, UpdateOne
+
+from database import db, tasks
+
+task_activity_buckets = db.task_activity_buckets
+
+TASK_ACTIVITY_BUCKET_SIZE = int(os.getenv("TASK_ACTIVITY_BUCKET_SIZE", "100"))
+TASK_RECENT_COMMENTS = int(os.getenv("TASK_RECENT_COMMENTS", "50"))
+
+_BUCKET_ORDER = [("started_at", -1), ("_id", -1)]
+
+
+def ensure_task_activity_indexes():
+    """Serves open-bucket upserts and newest-first page reads"""
+    task_activity_buckets.create_index([("task_id", 1), ("started_at", -1), ("_id", -1)])
+    task_activity_buckets.create_index("project_id")
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_timestamp(value):
+    """Activity timestamps are ISO strings; return naive UTC or None"""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def recent_comment_entries(activities):
+    """The searchable subset of activity entries kept on the task document"""
+    return [
+        {
+            "user_id": a.get("user_id"),
+            "user_name": a.get("user_name"),
+            "comment": a["comment"],
+            "timestamp": a.get("timestamp"),
+        }
+        for a in activities
+        if (a.get("comment") or "").strip()
+    ]
+
+
+def task_activity_update(activities):
+    """Update operators that keep activity_count / recent_comments in step"""
+    update = {"$inc": {"activity_count": len(activities)}}
+    comments = recent_comment_entries(activities)
+    if comments:
+        update["$push"] = {"recent_comments": {"$each": comments, "$slice": -TASK_RECENT_COMMENTS}}
+    return update
+
+
+class TaskActivity:
+    """Bucketed activity/comment log for tasks"""
+
+    @staticmethod
+    def append(task_id, activities, project_id=None):
+        """Append normalised activity entries to the task's open bucket"""
+        if not activities:
+            return
+        task_activity_buckets.update_one(
+            {
+                "task_id": str(task_id),
+                "count": {"$lt": TASK_ACTIVITY_BUCKET_SIZE},
+                "migrated": {"$exists": False},
+            },
+            {
+                "$push": {"activities": {"$each": list(activities)}},
+                "$inc": {"count": len(activities)},
+                "$set": {"last_at": _now()},
+                "$setOnInsert": {"project_id": project_id, "started_at": _now()},
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def append_many(entries):
+        """Batch form of append: (task_id, activities, project_id) per task, one bulk_write"""
+        operations = [
+            UpdateOne(
+                {
+                    "task_id": str(task_id),
+                    "count": {"$lt": TASK_ACTIVITY_BUCKET_SIZE},
+                    "migrated": {"$exists": False},
+                },
+                {
+                    "$push": {"activities": {"$each": list(activities)}},
+                    "$inc": {"count": len(activities)},
+                    "$set": {"last_at": _now()},
+                    "$setOnInsert": {"project_id": project_id, "started_at": _now()},
+                },
+                upsert=True
+            )
+            for task_id, activities, project_id in entries
+            if activities
+        ]
+        if operations:
+            task_activity_buckets.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def get_page(task_id, offset=0, limit=50):
+        """
+        Activities newest-first by offset, returned oldest-first within the page
+        (the order the task detail view renders).
+        Returns {"activities", "total", "offset", "limit", "has_more"}
+        """
+        task_id = str(task_id)
+        headers = list(
+            task_activity_buckets.find({"task_id": task_id}, {"count": 1}).sort(_BUCKET_ORDER)
+        )
+        total = sum(h.get("count", 0) for h in headers)
+
+        # Pick the buckets covering [offset, offset + limit) counted from the newest entry
+        wanted = {}
+        seen = 0
+        for header in headers:
+            count = header.get("count", 0)
+            if seen + count > offset and seen < offset + limit:
+                wanted[header["_id"]] = (seen, count)
+            seen += count
+            if seen >= offset + limit:
+                break
+
+        page = []
+        if wanted:
+            buckets = {
+                b["_id"]: b
+                for b in task_activity_buckets.find({"_id": {"$in": list(wanted)}}, {"activities": 1})
+            }
+            for bucket_id, (newer, count) in wanted.items():
+                entries = (buckets.get(bucket_id) or {}).get("activities", [])
+                # Bucket entries are oldest-first; newer = entries ahead of it from the top
+                end = count - max(offset - newer, 0)
+                start = max(count - (offset + limit - newer), 0)
+                page = entries[start:end] + page
+        return {
+            "activities": page,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + len(page) < total,
+        }
+
+    @staticmethod
+    def delete_for_task(task_id):
+        return task_activity_buckets.delete_many({"task_id": str(task_id)}).deleted_count
+
+    @staticmethod
+    def delete_for_project(project_id):
+        return task_activity_buckets.delete_many({"project_id": project_id}).deleted_count
+
+    @staticmethod
+    def migrate_task(task):
+        """
+        Move one task's embedded ``activities`` array into buckets.
+        The array is no longer written to, so bucket ids are derived from the
+        chunk position: re-runs and concurrent first views upsert the same
+        buckets, and only the run that removes the array bumps the counters.
+        """
+        task_id = str(task["_id"])
+        activities = task.get("activities") or []
+
+        buckets = []
+        for start in range(0, len(activities), TASK_ACTIVITY_BUCKET_SIZE):
+            chunk = activities[start:start + TASK_ACTIVITY_BUCKET_SIZE]
+            buckets.append({
+                "_id": f"{task_id}:migrated:{start // TASK_ACTIVITY_BUCKET_SIZE}",
+                "task_id": task_id,
+                "project_id": task.get("project_id"),
+                "started_at": _parse_timestamp(chunk[0].get("timestamp")) or task.get("created_at") or _now(),
+                "last_at": _parse_timestamp(chunk[-1].get("timestamp")) or task.get("updated_at") or _now(),
+                "count": len(chunk),
+                "activities": chunk,
+                # Closed to appends: live entries after the migration go to newer buckets
+                "migrated": True,
+            })
+        if buckets:
+            task_activity_buckets.bulk_write(
+                [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in buckets], ordered=False
+            )
+
+        result = tasks.update_one(
+            {"_id": task["_id"], "activities": {"$exists": True}},
+            {
+                "$unset": {"activities": ""},
+                # Older than anything appended since the deploy, so they go in front
+                "$push": {
+                    "recent_comments": {
+                        "$each": recent_comment_entries(activities)[-TASK_RECENT_COMMENTS:],
+                        "$position": 0,
+                        "$slice": -TASK_RECENT_COMMENTS,
+                    }
+                },
+                "$inc": {"activity_count": len(activities)},
+            }
+        )
+        return len(activities) if result.modified_count else 0
+
+    @staticmethod
+    def migrate_embedded_activities(batch_size=200):
+        """
+        Migration helper: move every task's embedded activities into buckets.
+        Run once after deploying; tasks opened before then migrate on read.
+        """
+        migrated_tasks = 0
+        migrated_entries = 0
+        while True:
+            batch = list(
+                tasks.find(
+                    {"activities": {"$exists": True}},
+                    {"activities": 1, "project_id": 1, "created_at": 1, "updated_at": 1}
+                ).limit(batch_size)
+            )
+            if not batch:
+                break
+            for task in batch:
+                migrated_entries += TaskActivity.migrate_task(task)
+                migrated_tasks += 1
+
+        print(f"✅ Migrated {migrated_tasks} tasks ({migrated_entries} activities) to task_activity_buckets")
+        return migrated_tasks
@@ -2,6 +2,7 @@ from database import users
 from bson import ObjectId
 import datetime
 from datetime import timezone
+from utils.user_display_cache import invalidate_user_display
 
 class User:
     @staticmethod
@@ -47,15 +48,19 @@ class User:
     @staticmethod
     def update(user_id, update_data):
         """Update user data"""
-        return users.update_one(
+        result = users.update_one(
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        invalidate_user_display(user_id)
+        return result
 
     @staticmethod
     def delete_by_id(user_id):
         """Delete user by ID"""
-        return users.delete_one({"_id": ObjectId(user_id)})
+        result = users.delete_one({"_id": ObjectId(user_id)})
+        invalidate_user_display(user_id)
+        return result
     
     @staticmethod
     def find_super_admins():
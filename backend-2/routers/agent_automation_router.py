@@ -23,6 +23,7 @@ from middleware.agent_auth import verify_agent_token, verify_agent_token_optiona
 from models.task import Task
 from controllers.agent_task_controller import (
     agent_create_task,
+    agent_bulk_create_tasks,
     agent_assign_task,
     agent_update_task,
     agent_bulk_update_task_due_dates,
@@ -87,6 +88,26 @@ class CreateTaskRequest(BaseModel):
     labels: Optional[List[str]] = []
 
 
+class BulkCreateTaskItem(BaseModel):
+    title: str
+    description: Optional[str] = ""
+    assignee_email: Optional[EmailStr] = None
+    assignee_name: Optional[str] = None
+    priority: Optional[str] = "Medium"
+    status: Optional[str] = "To Do"
+    due_date: Optional[str] = None
+    issue_type: Optional[str] = "task"
+    labels: Optional[List[str]] = []
+    idempotency_key: Optional[str] = None  # Retrying with the same key returns the existing task
+
+
+class BulkCreateTasksRequest(BaseModel):
+    requesting_user: EmailStr
+    project_id: str
+    tasks: List[BulkCreateTaskItem]
+    idempotency_key: Optional[str] = None  # Per-item keys default to "{idempotency_key}:{index}"
+
+
 class AssignTaskRequest(BaseModel):
     requesting_user: EmailStr  # Email of user making the request
     assignee_identifier: str  # Email or name
@@ -549,6 +570,27 @@ async def approve_task_automation(
     return _unwrap_controller_response(response)
 
 
+@router.post("/tasks/bulk-create")
+async def bulk_create_tasks_automation(
+    request: BulkCreateTasksRequest,
+    agent_user_id: str = Depends(verify_agent_token),
+):
+    """
+    Create one or many tasks in a project in a single batch.
+
+    - Each task takes the same fields as POST /tasks.
+    - Send idempotency_key (per task or for the request) so a retried request
+      returns the tasks created the first time instead of duplicating them.
+    """
+    return agent_bulk_create_tasks(
+        requesting_user=request.requesting_user,
+        project_id=request.project_id,
+        tasks=[task.dict(exclude_none=True) for task in request.tasks],
+        user_id=agent_user_id,
+        idempotency_key=request.idempotency_key,
+    )
+
+
 @router.post("/tasks/bulk-update-due-date")
 async def bulk_update_due_date_automation(
     request: BulkUpdateDueDateRequest,
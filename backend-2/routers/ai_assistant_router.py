@@ -5,11 +5,14 @@ NOW with intelligent data-driven insights from MongoDB
 """
 
 import os
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
-from dependencies import get_current_user
+from dependencies import get_current_user, require_admin
 from controllers import ai_assistant_controller
+from utils.azure_ai_utils import get_azure_openai_metrics
+from utils.response_cache import get_response_cache_stats
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -65,17 +68,21 @@ async def get_messages(
 async def send_message(
     conversation_id: str,
     request: SendMessageRequest,
+    http_request: Request,
     current_user: str = Depends(get_current_user),
 ):
     """
     Send a message and get AI response
     🆕 ENHANCED: Now includes intelligent insights from user's data
     """
-    return ai_assistant_controller.send_message(
+    # Context building is synchronous (Mongo + analysis) — keep it off the event loop.
+    return await run_in_threadpool(
+        ai_assistant_controller.send_message,
         conversation_id=conversation_id,
         user_id=current_user,
         content=request.content,
         stream=request.stream,
+        request=http_request,
     )
 
 
@@ -179,3 +186,10 @@ async def health_check():
             "⚡ Fast response times",
         ],
     }
+
+
+@router.get("/metrics")
+async def llm_metrics(user_id: str = Depends(require_admin)):
+    """Per-deployment Azure OpenAI latency / token metrics, client-pool settings
+    and response-cache hit rate / tokens saved (admins only)"""
+    return {**get_azure_openai_metrics(), "response_cache": get_response_cache_stats()}
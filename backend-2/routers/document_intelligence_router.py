@@ -4,8 +4,17 @@ Base path: /api/document-intelligence
 
 Endpoints:
   POST /analyze          - Upload file or pass URL → returns InsightReport JSON
+  POST /jobs             - Same inputs as /analyze → returns a job id immediately
+  GET  /jobs/{id}        - Job status, stage history and (when done) the InsightReport
+  GET  /jobs/{id}/events - SSE stream of stage changes (parsing → extracting → rendering)
+  GET  /jobs/{id}/pdf    - PDF for a completed job (rendered once, then cached)
   POST /export-pdf       - Accept InsightReport JSON → returns PDF binary
   GET  /health           - Service health check
+  GET  /cache            - Parse / insight / PDF cache statistics
+  DELETE /cache          - Clear the cache (optionally one kind)
+
+Parsed text, insights and rendered PDFs are cached by content hash;
+pass refresh=true to /analyze or /export-pdf to bypass the cache.
 
 Supported file types: PDF, PPTX, DOCX, TXT, CSV, XLSX, XLS, JPEG, PNG, TIFF
 Parser priority:
@@ -14,18 +23,30 @@ Parser priority:
   3. Pandas                      → CSV, XLSX, XLS
 """
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from typing import Annotated, Optional
 from pathlib import Path
+import asyncio
 import io
+import json
 
+from dependencies import require_admin
 from document_intelligence import (
     InsightReport,
     analyze_document_from_file,
     analyze_document_from_url,
     get_document_intelligence_llm_config,
-    generate_pdf_report,
+    render_pdf_report,
+)
+from utils.document_cache import clear_document_cache, get_document_cache_stats
+from utils.document_jobs import (
+    DOC_INTEL_JOB_STREAM_TIMEOUT_SECONDS,
+    TERMINAL_STATUSES,
+    get_document_job,
+    get_document_job_pdf,
+    submit_document_job,
 )
 from datetime import datetime
 
@@ -61,11 +82,25 @@ AZURE_DI_EXTENSIONS = {
 }
 
 
+def _validate_analyze_input(file: Optional[UploadFile], url: str) -> None:
+    if not file and not url.strip():
+        raise HTTPException(400, "Provide either a file upload or a URL.")
+
+    if file:
+        ext = Path(file.filename).suffix.lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            raise HTTPException(
+                400,
+                f"Unsupported file type '{ext}'. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
+            )
+
+
 @router.post("/analyze", response_model=InsightReport)
 async def analyze_document(
     file: Annotated[Optional[UploadFile], File()] = None,
     url: Annotated[str, Form()] = "",
     question: Annotated[str, Form()] = "",
+    refresh: Annotated[bool, Form()] = False,
 ):
     """
     Accepts a file upload OR a URL and returns a structured InsightReport JSON.
@@ -74,38 +109,145 @@ async def analyze_document(
     - PDF / DOCX / DOC / Images → Azure Document Intelligence (OCR, tables, key-value pairs)
     - PPTX / TXT / URL          → Docling
     - CSV / XLSX / XLS          → Pandas (stats, rankings, distributions)
-    """
-    if not file and not url.strip():
-        raise HTTPException(400, "Provide either a file upload or a URL.")
 
-    if file:
-        ext = Path(file.filename).suffix.lower()
-        if ext not in ALLOWED_EXTENSIONS:
-            raise HTTPException(
-                400,
-                f"Unsupported file type '{ext}'. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
-            )
+    Re-uploads of the same bytes (or the same URL + ETag) reuse the cached
+    parse and insights unless refresh=true.
+
+    The analysis runs in a worker thread so the event loop stays free; for
+    long documents prefer POST /jobs, which returns immediately.
+    """
+    _validate_analyze_input(file, url)
 
     try:
         if file:
             file_bytes = await file.read()
-            return analyze_document_from_file(file_bytes, file.filename, question)
+            return await run_in_threadpool(
+                analyze_document_from_file,
+                file_bytes,
+                file.filename,
+                question,
+                use_cache=not refresh,
+            )
         else:
-            return analyze_document_from_url(url.strip(), question)
+            return await run_in_threadpool(
+                analyze_document_from_url,
+                url.strip(),
+                question,
+                use_cache=not refresh,
+            )
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/jobs", status_code=202)
+async def submit_analysis_job(
+    file: Annotated[Optional[UploadFile], File()] = None,
+    url: Annotated[str, Form()] = "",
+    question: Annotated[str, Form()] = "",
+    refresh: Annotated[bool, Form()] = False,
+):
+    """Queue an analysis and return its job id without waiting for the result."""
+    _validate_analyze_input(file, url)
+
+    file_bytes = await file.read() if file else None
+    job_id = await run_in_threadpool(
+        submit_document_job,
+        file_bytes=file_bytes,
+        filename=file.filename if file else None,
+        url=None if file else url.strip(),
+        question=question,
+        use_cache=not refresh,
+    )
+    base = "/api/document-intelligence/jobs"
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"{base}/{job_id}",
+        "events_url": f"{base}/{job_id}/events",
+        "pdf_url": f"{base}/{job_id}/pdf",
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = await run_in_threadpool(get_document_job, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found or expired.")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str, request: Request):
+    """
+    Server-Sent Events: one `data:` frame per stage change, ending with the
+    terminal frame (completed → includes the report, failed → includes error).
+    Job state is read from Mongo, so this works from any API worker. Streams
+    end after DOC_INTEL_JOB_STREAM_TIMEOUT_SECONDS with a timeout frame.
+    """
+    if not await run_in_threadpool(get_document_job, job_id):
+        raise HTTPException(404, "Job not found or expired.")
+
+    async def events():
+        last_stage = None
+        deadline = asyncio.get_running_loop().time() + DOC_INTEL_JOB_STREAM_TIMEOUT_SECONDS
+        while True:
+            if await request.is_disconnected():
+                return
+            if asyncio.get_running_loop().time() > deadline:
+                frame = {"job_id": job_id, "error": "Stream timed out; poll the job status instead"}
+                yield f"data: {json.dumps(frame)}\n\n"
+                return
+            job = await run_in_threadpool(get_document_job, job_id)
+            if not job:
+                yield f"data: {json.dumps({'error': 'Job expired'})}\n\n"
+                return
+            if job["stage"] != last_stage:
+                last_stage = job["stage"]
+                frame = {"job_id": job_id, "status": job["status"], "stage": job["stage"]}
+                if job["status"] == "completed":
+                    frame["result"] = job.get("result")
+                elif job["status"] == "failed":
+                    frame["error"] = job.get("error")
+                yield f"data: {json.dumps(frame, default=str)}\n\n"
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/jobs/{job_id}/pdf")
+async def export_job_pdf(job_id: str):
+    pdf_bytes = await run_in_threadpool(get_document_job_pdf, job_id)
+    if pdf_bytes is None:
+        raise HTTPException(404, "Job not found or not completed yet.")
+    return StreamingResponse(
+        io.BytesIO(pdf_bytes),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="insights_{job_id}.pdf"'},
+    )
+
+
 @router.post("/export-pdf")
-async def export_pdf(report: InsightReport):
+async def export_pdf(report: InsightReport, refresh: bool = Query(False)):
     """
     Accept the InsightReport JSON (from /analyze) and return a
     dark-branded PDF binary built with ReportLab.
     """
     try:
-        pdf_bytes = generate_pdf_report(report)
+        pdf_bytes = await run_in_threadpool(
+            render_pdf_report, report, use_cache=not refresh
+        )
         filename = f"insights_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         return StreamingResponse(
             io.BytesIO(pdf_bytes),
@@ -141,3 +283,16 @@ def health():
             "3. Pandas → CSV, XLSX, XLS",
         ],
     }
+
+
+@router.get("/cache")
+def cache_stats():
+    return get_document_cache_stats()
+
+
+@router.delete("/cache")
+def clear_cache(
+    kind: Optional[str] = Query(None, pattern="^(parse|insights|pdf)$"),
+    user_id: str = Depends(require_admin),
+):
+    return {"deleted": clear_document_cache(kind)}
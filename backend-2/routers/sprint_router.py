@@ -72,6 +72,18 @@ async def complete_sprint(sprint_id: str, user_id: str = Depends(get_current_use
     response = sprint_controller.complete_sprint(sprint_id, user_id)
     return handle_controller_response(response)
 
+@router.get("/sprints/{sprint_id}/burndown")
+async def get_sprint_burndown(sprint_id: str, user_id: str = Depends(get_current_user)):
+    """Sprint burndown series"""
+    response = sprint_controller.get_sprint_burndown_chart(sprint_id, user_id)
+    return handle_controller_response(response)
+
+@router.get("/projects/{project_id}/velocity")
+async def get_project_velocity(project_id: str, limit: int = 8, user_id: str = Depends(get_current_user)):
+    """Velocity over the last completed sprints"""
+    response = sprint_controller.get_project_velocity_chart(project_id, user_id, limit)
+    return handle_controller_response(response)
+
 @router.post("/sprints/{sprint_id}/tasks")
 async def add_task_to_sprint(sprint_id: str, data: AddTaskToSprintRequest, user_id: str = Depends(get_current_user)):
     """Add task to sprint"""
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from controllers import system_dashboard_controller
 from dependencies import require_super_admin
 from utils.router_helpers import handle_controller_response
+from utils.query_profiler import get_query_profiler_stats, reset_query_profiler_stats
 
 router = APIRouter()
 
@@ -9,4 +10,16 @@ router = APIRouter()
 async def get_system_analytics(user_id: str = Depends(require_super_admin)):
     """Get system analytics (super-admin only)"""
     response = system_dashboard_controller.get_system_analytics(user_id)
-    return handle_controller_response(response)
\ No newline at end of file
+    return handle_controller_response(response)
+
+@router.get("/system/queries")
+async def get_query_stats(user_id: str = Depends(require_super_admin)):
+    """Per-route Mongo query counts, DB time and budget overruns (super-admin only)"""
+    return get_query_profiler_stats()
+
+
+@router.delete("/system/queries")
+async def reset_query_stats(user_id: str = Depends(require_super_admin)):
+    """Reset the per-route query counters (super-admin only)"""
+    reset_query_profiler_stats()
+    return {"reset": True}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from schemas import (
     TaskCreate, TaskUpdate, AddLabelRequest, AddAttachmentRequest,
     RemoveAttachmentRequest, AddLinkRequest, RemoveLinkRequest, AddCommentRequest
@@ -8,14 +9,41 @@ from dependencies import get_current_user
 from utils.router_helpers import handle_controller_response
 from utils.websocket_manager import manager
 from utils.auth_utils import verify_token_for_websocket
+from models.board_change import BoardChange
 import json
+from typing import Optional
 
 router = APIRouter()
 
+def _parse_since(value) -> Optional[int]:
+    """Client resume version; None (full resync) when it is not a non-negative integer"""
+    try:
+        since = int(value)
+    except (TypeError, ValueError):
+        return None
+    return since if since >= 0 else None
+
+async def _send_board_delta(websocket: WebSocket, project_id: str, since: Optional[int]):
+    """Send the board changes after ``since`` (the whole board for None) as board_delta messages"""
+    while True:
+        # Blocking Mongo reads (a full board load on reset) stay off the event loop
+        delta = await run_in_threadpool(task_controller.board_delta, project_id, since)
+        await websocket.send_json({"type": "board_delta", "project_id": project_id, **delta})
+        # Stop when caught up, or when a change is still being written (next broadcast resumes)
+        if not delta["has_more"] or delta["version"] == since:
+            return
+        since = delta["version"]
+
 # WebSocket endpoint for real-time Kanban board updates
 @router.websocket("/ws/project/{project_id}")
-async def kanban_websocket(websocket: WebSocket, project_id: str, token: str):
-    """WebSocket for real-time Kanban board collaboration"""
+async def kanban_websocket(websocket: WebSocket, project_id: str, token: str, since: Optional[str] = None):
+    """
+    WebSocket for real-time Kanban board collaboration.
+    since: last board version the client applied (resume token); the changes
+    after it are sent as board_delta messages right after connecting. The
+    client sends {"type": "resume", "since": N} when it sees a version gap.
+    An invalid since gets the whole board.
+    """
     # Verify token
     user_id = verify_token_for_websocket(token)
     if not user_id:
@@ -38,8 +66,11 @@ async def kanban_websocket(websocket: WebSocket, project_id: str, token: str):
             "type": "connection",
             "channel_id": channel_id,
             "project_id": project_id,
+            "version": await run_in_threadpool(BoardChange.current_version, project_id),
             "message": "Connected to Kanban board"
         })
+        if since is not None:
+            await _send_board_delta(websocket, project_id, _parse_since(since))
         
         # Keep connection alive and handle incoming messages
         while True:
@@ -48,6 +79,8 @@ async def kanban_websocket(websocket: WebSocket, project_id: str, token: str):
             # Handle heartbeat
             if data.get("type") == "ping":
                 await websocket.send_json({"type": "pong"})
+            elif data.get("type") == "resume":
+                await _send_board_delta(websocket, project_id, _parse_since(data.get("since")))
                 
     except WebSocketDisconnect:
         manager.disconnect(channel_id, user_id)
@@ -81,9 +114,33 @@ async def get_closed_tasks(user_id: str = Depends(get_current_user)):
     return handle_controller_response(response)
 
 @router.get("/project/{project_id}")
-async def get_project_tasks(project_id: str, user_id: str = Depends(get_current_user)):
-    """Get all tasks for a project"""
-    response = task_controller.get_project_tasks(project_id, user_id)
+async def get_project_tasks(
+    project_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    status: Optional[str] = None,
+    assignee_id: Optional[str] = None,
+    sprint_id: Optional[str] = None,
+    label: Optional[str] = None,
+    issue_type: Optional[str] = None,
+    updated_since: Optional[str] = None,
+    fields: Optional[str] = None,
+    per_column: Optional[int] = None,
+    user_id: str = Depends(get_current_user),
+):
+    """Get tasks for a project; any query parameter switches to the paginated/filtered listing"""
+    params = {
+        "cursor": cursor, "limit": limit, "status": status, "assignee_id": assignee_id,
+        "sprint_id": sprint_id, "label": label, "issue_type": issue_type,
+        "updated_since": updated_since, "fields": fields, "per_column": per_column,
+    }
+    response = task_controller.get_project_tasks(project_id, user_id, params)
+    return handle_controller_response(response)
+
+@router.get("/project/{project_id}/changes")
+async def get_board_changes(project_id: str, since: int = 0, user_id: str = Depends(get_current_user)):
+    """Kanban delta sync: tasks changed after board version ``since``"""
+    response = task_controller.get_board_changes(project_id, user_id, since)
     return handle_controller_response(response)
 
 @router.get("/{task_id}")
@@ -165,6 +222,13 @@ async def approve_task(task_id: str, user_id: str = Depends(get_current_user)):
     response = task_controller.approve_task(task_id, user_id)
     return handle_controller_response(response)
 
+# Activity log
+@router.get("/{task_id}/activities")
+async def get_task_activities(task_id: str, offset: int = 0, limit: int = 50, user_id: str = Depends(get_current_user)):
+    """Page through task activity, newest first"""
+    response = task_controller.get_task_activities(task_id, user_id, offset, limit)
+    return handle_controller_response(response)
+
 # Comments
 @router.post("/{task_id}/comments")
 async def add_comment(task_id: str, data: AddCommentRequest, user_id: str = Depends(get_current_user)):
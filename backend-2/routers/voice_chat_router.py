@@ -7,9 +7,16 @@ DOIT Voice Chat — Full Pipeline
 Endpoints
 ---------
 POST /api/voice-chat/voice/chat        — Full round-trip (audio in → audio out)
+WS   /api/voice-chat/voice/ws          — Streaming voice loop (pipelined STT → LLM → TTS)
 POST /api/voice-chat/voice/transcribe  — Whisper STT only
 POST /api/voice-chat/voice/synthesize  — Azure TTS only
-GET  /api/voice-chat/voice/health      — Service status
+GET  /api/voice-chat/voice/health      — Service status + time-to-first-audio stats
+
+Whisper and TTS calls share one keep-alive httpx.AsyncClient. The headline
+latency metric is time-to-first-audio (TTFA): end of the user's utterance →
+first reply audio byte sent. The HTTP round-trip can only send audio once the
+whole reply is synthesized; the WebSocket loop starts TTS per sentence while
+the LLM is still generating and streams audio back as it is produced.
 """
 
 import os
@@ -19,10 +26,22 @@ import logging
 import asyncio
 import time
 import httpx
+from collections import deque
 from pathlib import Path
+from typing import Optional
 from urllib.parse import quote
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi import (
+    APIRouter,
+    Depends,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -34,11 +53,15 @@ logger = logging.getLogger(__name__)
 # ── Auth dependency (mirrors the rest of the app) ─────────────────────────────
 try:
     from dependencies import get_current_user
+    from utils.auth_utils import verify_token_for_websocket
 except ImportError:
 
     async def get_current_user(request=None):
         return "dev-user"
 
+    def verify_token_for_websocket(token):
+        return "dev-user"
+
 
 # ── Azure config ──────────────────────────────────────────────────────────────
 WHISPER_ENDPOINT = os.getenv("WHISPER_ENDPOINT")  # full URL with ?api-version=…
@@ -49,7 +72,10 @@ TTS_API_KEY = os.getenv("TTS_API_KEY") or os.getenv("AZURE_OPENAI_KEY")
 
 # DOIT AI Assistant (existing fast LLM path)
 try:
-    from controllers.ai_assistant_controller import generate_voice_assistant_reply
+    from controllers.ai_assistant_controller import (
+        generate_voice_assistant_reply,
+        stream_voice_assistant_reply,
+    )
 
     ASSISTANT_AVAILABLE = True
     logger.info("✅ DOIT AI Assistant controller imported")
@@ -61,6 +87,21 @@ VOICE_AGENT_TIMEOUT_SECONDS = float(os.getenv("VOICE_AGENT_TIMEOUT_SECONDS", "3.
 VOICE_MAX_HISTORY_ITEMS = int(os.getenv("VOICE_MAX_HISTORY_ITEMS", "4"))
 VOICE_HISTORY_MSG_MAX_CHARS = int(os.getenv("VOICE_HISTORY_MSG_MAX_CHARS", "140"))
 VOICE_RESPONSE_MAX_CHARS = int(os.getenv("VOICE_RESPONSE_MAX_CHARS", "200"))
+VOICE_HTTP_TIMEOUT_SECONDS = float(os.getenv("VOICE_HTTP_TIMEOUT_SECONDS", "60"))
+VOICE_HTTP_MAX_CONNECTIONS = int(os.getenv("VOICE_HTTP_MAX_CONNECTIONS", "20"))
+# Streaming loop: sentences shorter than this are merged with the next one,
+# the first chunk may break at a clause once it is this long, and at most
+# VOICE_TTS_CONCURRENCY sentences are synthesized ahead of playback.
+VOICE_TTS_MIN_CHARS = int(os.getenv("VOICE_TTS_MIN_CHARS", "24"))
+VOICE_FIRST_CHUNK_MIN_CHARS = int(os.getenv("VOICE_FIRST_CHUNK_MIN_CHARS", "30"))
+VOICE_TTS_CONCURRENCY = int(os.getenv("VOICE_TTS_CONCURRENCY", "2"))
+VOICE_MAX_AUDIO_BYTES = int(os.getenv("VOICE_MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+
+VOICE_UNAVAILABLE_REPLY = (
+    "I'm sorry, the AI agent is currently unavailable. "
+    "Please check that the DOIT AI Assistant service is configured correctly."
+)
+VOICE_TIMEOUT_REPLY = "I need a bit more time to answer that. Please try a shorter question."
 
 # ── Voice personas → TTS voice mapping ───────────────────────────────────────
 PERSONA_VOICES = {
@@ -73,6 +114,50 @@ PERSONA_VOICES = {
 router = APIRouter()
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# SHARED HTTP CLIENT + LATENCY STATS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_http_client: Optional[httpx.AsyncClient] = None
+_ttfa_samples = {"http": deque(maxlen=500), "ws": deque(maxlen=500)}
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by Whisper and TTS calls (created on the app loop)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=VOICE_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=VOICE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=VOICE_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_voice_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _record_ttfa(mode: str, ttfa_ms: int) -> None:
+    _ttfa_samples[mode].append(ttfa_ms)
+
+
+def _ttfa_summary(mode: str) -> dict:
+    ordered = sorted(_ttfa_samples[mode])
+    if not ordered:
+        return {"turns": 0}
+    return {
+        "turns": len(ordered),
+        "p50_ms": ordered[len(ordered) // 2],
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELPER: Azure Whisper STT
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -187,13 +272,12 @@ async def transcribe_audio(
         f"🎤 Transcribing {len(audio_bytes)} bytes | file={safe_filename} | mime={mime}"
     )
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(
-            WHISPER_ENDPOINT,
-            headers={"api-key": WHISPER_API_KEY},
-            files={"file": (safe_filename, audio_bytes, mime)},
-            data={"response_format": "json"},
-        )
+    resp = await _get_http_client().post(
+        WHISPER_ENDPOINT,
+        headers={"api-key": WHISPER_API_KEY},
+        files={"file": (safe_filename, audio_bytes, mime)},
+        data={"response_format": "json"},
+    )
 
     if resp.status_code != 200:
         logger.error(f"Whisper error {resp.status_code}: {resp.text[:300]}")
@@ -224,10 +308,7 @@ async def query_foundry_agent(
     Send transcript to the existing DOIT AI Assistant and return text reply.
     """
     if not ASSISTANT_AVAILABLE:
-        return (
-            "I'm sorry, the AI agent is currently unavailable. "
-            "Please check that the DOIT AI Assistant service is configured correctly."
-        )
+        return VOICE_UNAVAILABLE_REPLY
 
     # Build context string from recent conversation history
     context = {
@@ -258,7 +339,7 @@ async def query_foundry_agent(
             VOICE_AGENT_TIMEOUT_SECONDS,
             user_id,
         )
-        return "I need a bit more time to answer that. Please try a shorter question."
+        return VOICE_TIMEOUT_REPLY
 
     if not result.get("success"):
         err = result.get("error", "Unknown agent error")
@@ -276,35 +357,35 @@ async def query_foundry_agent(
 # ═══════════════════════════════════════════════════════════════════════════════
 
 
-async def synthesize_speech(text: str, voice: str = "alloy") -> bytes:
-    """
-    Send text to Azure TTS and return raw MP3 audio bytes.
-    Uses the TTS_ENDPOINT from .env (already includes deployment + api-version).
-    """
+def _tts_request(text: str, voice: str) -> dict:
     if not TTS_ENDPOINT or not TTS_API_KEY:
         raise HTTPException(
             status_code=503,
             detail="TTS endpoint/key not configured (TTS_ENDPOINT, TTS_API_KEY)",
         )
 
-    payload = {
-        "model": "tts",
-        "input": text,
-        "voice": voice,
-        "response_format": "mp3",
+    logger.info(f"🔊 Synthesizing {len(text)} chars with voice '{voice}'")
+    return {
+        "url": TTS_ENDPOINT,
+        "headers": {
+            "api-key": TTS_API_KEY,
+            "Content-Type": "application/json",
+        },
+        "json": {
+            "model": "tts",
+            "input": text,
+            "voice": voice,
+            "response_format": "mp3",
+        },
     }
 
-    logger.info(f"🔊 Synthesizing {len(text)} chars with voice '{voice}'")
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        resp = await client.post(
-            TTS_ENDPOINT,
-            headers={
-                "api-key": TTS_API_KEY,
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
+async def synthesize_speech(text: str, voice: str = "alloy") -> bytes:
+    """
+    Send text to Azure TTS and return raw MP3 audio bytes.
+    Uses the TTS_ENDPOINT from .env (already includes deployment + api-version).
+    """
+    resp = await _get_http_client().post(**_tts_request(text, voice))
 
     if resp.status_code != 200:
         logger.error(f"TTS error {resp.status_code}: {resp.text[:300]}")
@@ -317,6 +398,20 @@ async def synthesize_speech(text: str, voice: str = "alloy") -> bytes:
     return audio_bytes
 
 
+async def synthesize_speech_stream(text: str, voice: str = "alloy"):
+    """Like synthesize_speech, but yields MP3 chunks as Azure TTS produces them."""
+    async with _get_http_client().stream("POST", **_tts_request(text, voice)) as resp:
+        if resp.status_code != 200:
+            body = await resp.aread()
+            logger.error(f"TTS error {resp.status_code}: {body[:300]!r}")
+            raise HTTPException(
+                status_code=502, detail=f"TTS synthesis failed: HTTP {resp.status_code}"
+            )
+        async for chunk in resp.aiter_bytes():
+            if chunk:
+                yield chunk
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENDPOINT: Full voice round-trip
 # POST /api/voice-chat/voice/chat
@@ -384,6 +479,8 @@ async def voice_chat(
         agent_ms,
         tts_ms,
     )
+    # The whole reply is synthesized before any audio leaves: TTFA == total.
+    _record_ttfa("http", total_ms)
 
     # ── 6. Stream audio back with metadata headers ────────────────────────────
     safe_transcript = _safe_header_value(transcript, 500)
@@ -399,11 +496,308 @@ async def voice_chat(
             "X-Voice-Latency-Stt-Ms": str(stt_ms),
             "X-Voice-Latency-Agent-Ms": str(agent_ms),
             "X-Voice-Latency-Tts-Ms": str(tts_ms),
+            "X-Voice-Ttfa-Ms": str(total_ms),
             "Cache-Control": "no-cache",
         },
     )
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINT: Streaming voice loop
+# WS /api/voice-chat/voice/ws?token=…
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _split_speakable(buffer: str, first: bool) -> tuple[list, str]:
+    """
+    Split complete sentences off the front of ``buffer``.
+    Returns (sentences, remainder). Short sentences stay attached to the next
+    one; for the first chunk of a reply a clause break is enough, so TTS can
+    start as early as possible.
+    """
+    sentences: list = []
+    start = 0
+    for match in _SENTENCE_END.finditer(buffer):
+        piece = buffer[start : match.start()].strip()
+        if len(piece) >= VOICE_TTS_MIN_CHARS:
+            sentences.append(piece)
+            start = match.end()
+
+    if not sentences and first:
+        for match in _CLAUSE_END.finditer(buffer):
+            if match.start() >= VOICE_FIRST_CHUNK_MIN_CHARS:
+                sentences.append(buffer[: match.start()].strip())
+                start = match.end()
+                break
+
+    return sentences, buffer[start:]
+
+
+async def _reply_deltas(user_id: str, transcript: str, history: list):
+    """Reply text deltas; falls back to a spoken notice if the LLM is slow to start."""
+    if not ASSISTANT_AVAILABLE:
+        yield VOICE_UNAVAILABLE_REPLY
+        return
+
+    stream = stream_voice_assistant_reply(
+        user_id=user_id,
+        content=transcript,
+        conversation_history=_compact_conversation_history(history),
+        max_tokens=120,
+    )
+    try:
+        try:
+            first = await asyncio.wait_for(
+                stream.__anext__(), timeout=VOICE_AGENT_TIMEOUT_SECONDS
+            )
+        except StopAsyncIteration:
+            return
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Voice agent first token timeout after %.2fs for user %s",
+                VOICE_AGENT_TIMEOUT_SECONDS,
+                user_id,
+            )
+            yield VOICE_TIMEOUT_REPLY
+            return
+        yield first
+        async for delta in stream:
+            yield delta
+    finally:
+        await stream.aclose()
+
+
+async def _synthesize_into(
+    text: str, voice: str, chunks: asyncio.Queue, slots: asyncio.Semaphore
+) -> None:
+    try:
+        async with slots:
+            async for chunk in synthesize_speech_stream(text, voice):
+                await chunks.put(chunk)
+    except Exception as exc:
+        await chunks.put(exc)
+    finally:
+        await chunks.put(None)
+
+
+class _VoiceSocket:
+    """Serializes sends from the text and audio halves of a turn."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._lock = asyncio.Lock()
+
+    async def send_json(self, data: dict) -> None:
+        async with self._lock:
+            await self.websocket.send_json(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        async with self._lock:
+            await self.websocket.send_bytes(data)
+
+
+async def _run_voice_turn(
+    sock: _VoiceSocket,
+    user_id: str,
+    audio_bytes: bytes,
+    session: dict,
+    utterance_end: float,
+) -> None:
+    """
+    One utterance → reply. STT runs on the buffered utterance (Whisper has no
+    streaming input); reply tokens are split into sentences as they arrive,
+    each sentence is synthesized as soon as it is complete (up to
+    VOICE_TTS_CONCURRENCY ahead) and its audio is forwarded in order while
+    later sentences are still being generated.
+    """
+    metrics = {"ttfa_ms": None, "sentences": 0, "audio_bytes": 0}
+    pending: asyncio.Queue = asyncio.Queue()
+    slots = asyncio.Semaphore(VOICE_TTS_CONCURRENCY)
+    voice = PERSONA_VOICES.get(session["persona"], "alloy")
+    tts_tasks: list = []
+
+    def elapsed_ms() -> int:
+        return int((time.perf_counter() - utterance_end) * 1000)
+
+    async def play() -> None:
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            seq, text, chunks = item
+            await sock.send_json({"type": "audio", "seq": seq, "text": text})
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    logger.error(f"Voice TTS failed for sentence {seq}: {chunk}")
+                    await sock.send_json({"type": "error", "seq": seq, "error": "TTS failed"})
+                    continue
+                if metrics["ttfa_ms"] is None:
+                    metrics["ttfa_ms"] = elapsed_ms()
+                metrics["audio_bytes"] += len(chunk)
+                await sock.send_bytes(chunk)
+            await sock.send_json({"type": "audio_end", "seq": seq})
+
+    def speak(text: str) -> None:
+        text = _normalize_voice_text(text)
+        if not text:
+            return
+        chunks: asyncio.Queue = asyncio.Queue()
+        tts_tasks.append(asyncio.create_task(_synthesize_into(text, voice, chunks, slots)))
+        pending.put_nowait((metrics["sentences"], text, chunks))
+        metrics["sentences"] += 1
+
+    player = asyncio.create_task(play())
+    deltas = None
+    try:
+        # ── 1. Whisper STT on the buffered utterance ─────────────────────────
+        filename, _ = _normalise_audio_filename("blob", session["content_type"])
+        stt_result = await transcribe_audio(audio_bytes, filename, session["content_type"])
+        metrics["stt_ms"] = elapsed_ms()
+        transcript = stt_result["text"]
+        await sock.send_json({"type": "transcript", "text": transcript})
+        if not transcript:
+            await sock.send_json({"type": "error", "error": "No speech detected in audio"})
+            return
+
+        # ── 2. LLM tokens → sentences → TTS, all overlapped ──────────────────
+        buffer, spoken, reply = "", 0, []
+        deltas = _reply_deltas(user_id, transcript, session["history"])
+        async for delta in deltas:
+            if "llm_first_token_ms" not in metrics:
+                metrics["llm_first_token_ms"] = elapsed_ms()
+            reply.append(delta)
+            await sock.send_json({"type": "text", "delta": delta})
+            sentences, buffer = _split_speakable(buffer + delta, first=metrics["sentences"] == 0)
+            for sentence in sentences:
+                speak(sentence)
+                spoken += len(sentence)
+            if spoken >= VOICE_RESPONSE_MAX_CHARS:
+                buffer = ""
+                break
+        speak(buffer)
+        pending.put_nowait(None)
+        await player
+
+        metrics["total_ms"] = elapsed_ms()
+        if metrics["ttfa_ms"] is not None:
+            _record_ttfa("ws", metrics["ttfa_ms"])
+        logger.info(
+            "🎯 Voice stream | ttfa=%sms stt=%sms first_token=%sms total=%sms sentences=%d",
+            metrics["ttfa_ms"],
+            metrics["stt_ms"],
+            metrics.get("llm_first_token_ms"),
+            metrics["total_ms"],
+            metrics["sentences"],
+        )
+        session["history"] = session["history"][-VOICE_MAX_HISTORY_ITEMS:] + [
+            {"role": "user", "content": transcript},
+            {"role": "assistant", "content": "".join(reply)},
+        ]
+        await sock.send_json({"type": "done", "transcript": transcript, "metrics": metrics})
+    except asyncio.CancelledError:
+        raise
+    except HTTPException as exc:
+        await sock.send_json({"type": "error", "error": exc.detail})
+    except Exception as exc:
+        logger.error(f"Voice stream turn failed: {exc}", exc_info=True)
+        await sock.send_json({"type": "error", "error": str(exc)})
+    finally:
+        if deltas is not None:
+            await deltas.aclose()
+        player.cancel()
+        for task in tts_tasks:
+            task.cancel()
+
+
+@router.websocket("/voice/ws")
+async def voice_chat_ws(websocket: WebSocket, token: str = Query(...)):
+    """
+    Streaming voice mode — one connection, many turns.
+
+    client → {"type": "start", "persona"?, "conversation_history"?, "content_type"?}
+    client → binary audio chunks while the user is speaking
+    client → {"type": "stop"}     end of utterance, starts the reply
+    client → {"type": "cancel"}   barge-in: abort the reply in progress
+    server → {"type": "transcript", "text"}
+    server → {"type": "text", "delta"}   reply tokens as they arrive
+    server → {"type": "audio", "seq", "text"}, binary MP3 chunks, {"type": "audio_end", "seq"}
+    server → {"type": "done", "metrics": {"ttfa_ms", "stt_ms", "llm_first_token_ms", …}}
+
+    ttfa_ms is measured from the "stop" message to the first audio byte sent.
+    The server keeps the conversation history for the connection; a "start"
+    with conversation_history replaces it.
+    """
+    try:
+        user_id = verify_token_for_websocket(token)
+    except Exception as exc:
+        logger.warning(f"Voice WS authentication failed: {exc}")
+        user_id = None
+    if not user_id:
+        await websocket.close(code=1008, reason="Invalid or expired token")
+        return
+
+    await websocket.accept()
+    sock = _VoiceSocket(websocket)
+    session = {"persona": "friendly", "content_type": "audio/webm", "history": []}
+    audio = bytearray()
+    turn: Optional[asyncio.Task] = None
+
+    def cancel_turn() -> None:
+        if turn is not None and not turn.done():
+            turn.cancel()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                if len(audio) + len(message["bytes"]) > VOICE_MAX_AUDIO_BYTES:
+                    await sock.send_json({"type": "error", "error": "Utterance too long"})
+                    audio = bytearray()
+                    continue
+                audio.extend(message["bytes"])
+                continue
+
+            try:
+                data = json.loads(message.get("text") or "{}")
+            except json.JSONDecodeError:
+                continue
+            kind = data.get("type")
+
+            if kind == "start":
+                cancel_turn()
+                audio = bytearray()
+                session["persona"] = data.get("persona", session["persona"])
+                session["content_type"] = data.get("content_type", session["content_type"])
+                if isinstance(data.get("conversation_history"), list):
+                    session["history"] = data["conversation_history"]
+            elif kind == "stop":
+                cancel_turn()
+                if not audio:
+                    await sock.send_json({"type": "error", "error": "Empty audio"})
+                    continue
+                turn = asyncio.create_task(
+                    _run_voice_turn(sock, user_id, bytes(audio), session, time.perf_counter())
+                )
+                audio = bytearray()
+            elif kind == "cancel":
+                cancel_turn()
+            elif kind == "ping":
+                await sock.send_json({"type": "pong"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        cancel_turn()
+        logger.info(f"🔌 Voice WS closed for user {user_id}")
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENDPOINT: Whisper STT only
 # POST /api/voice-chat/voice/transcribe
@@ -481,6 +875,10 @@ async def voice_health():
             "endpoint": (TTS_ENDPOINT or "")[:60] + "…" if TTS_ENDPOINT else None,
         },
         "voice_presets": list(PERSONA_VOICES.keys()),
+        "time_to_first_audio": {
+            "http": _ttfa_summary("http"),
+            "ws": _ttfa_summary("ws"),
+        },
     }
 
     all_ok = (
@@ -25,37 +25,46 @@ def make_aware(dt):
     return None
 
 
+DONE_STATUSES = ["Done", "Closed"]
+
+
+def _as_date(field: str) -> dict:
+    """Aggregation expression coercing a stored date (datetime or ISO string) to a date."""
+    return {"$convert": {"input": field, "to": "date", "onError": None, "onNull": None}}
+
+
+def _count_if(condition: dict) -> dict:
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
 def analyze_user_data_for_ai(user_id: str) -> dict:
     """
     Comprehensive user data analysis for AI Assistant context
     Returns structured data that AI can use to provide intelligent insights
+
+    All counting happens in MongoDB: one aggregation for sprints and one $facet
+    aggregation over the user's tasks + project tasks, so only aggregates and
+    the 10 most recent tasks cross the wire. Callers should go through
+    utils.user_context_service.get_user_snapshot(), which caches the result.
     """
     try:
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = db.users.find_one(
+            {"_id": ObjectId(user_id)}, {"name": 1, "email": 1, "role": 1}
+        )
         if not user:
             return None
 
         user_projects = list(
             db.projects.find(
-                {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]}
+                {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]},
+                {"name": 1, "user_id": 1, "members.user_id": 1},
             )
         )
 
         project_ids = [str(p["_id"]) for p in user_projects]
 
-        task_projection = {
-            "activities": 0,
-            "attachments": 0,
-            "links": 0,
-        }
-
-        my_tasks = list(db.tasks.find({"assignee_id": user_id}, task_projection))
-        all_tasks = list(
-            db.tasks.find({"project_id": {"$in": project_ids}}, task_projection)
-        )
-        sprints = list(db.sprints.find({"project_id": {"$in": project_ids}}))
-
-        now = datetime.now(timezone.utc)
+        # Naive UTC, matching how timestamps are stored.
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
 
         def format_date(dt):
             if not dt:
@@ -65,49 +74,189 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
                 return str(dt)
             return aware.strftime("%Y-%m-%d")
 
-        def days_ago(dt):
-            aware = make_aware(dt)
-            if aware is None:
-                return None
-            return (now - aware).days
-
-        # Task Statistics
-        task_stats = {
-            "total": len(my_tasks),
-            "by_status": {},
-            "by_priority": {},
-            "overdue_count": 0,
-            "due_soon_count": 0,
-            "completed_this_week": 0,
-            "completed_this_month": 0,
+        # ── Sprints: status counts + the first active sprint ─────────────────
+        sprint_facet = next(
+            db.sprints.aggregate(
+                [
+                    {"$match": {"project_id": {"$in": project_ids}}},
+                    {
+                        "$facet": {
+                            "by_status": [
+                                {"$group": {"_id": "$status", "n": {"$sum": 1}}}
+                            ],
+                            "active": [
+                                {"$match": {"status": "active"}},
+                                {"$limit": 1},
+                                {
+                                    "$project": {
+                                        "name": 1,
+                                        "goal": 1,
+                                        "start_date": 1,
+                                        "end_date": 1,
+                                    }
+                                },
+                            ],
+                        }
+                    },
+                ]
+            ),
+            {"by_status": [], "active": []},
+        )
+        sprint_counts = {s["_id"]: s["n"] for s in sprint_facet["by_status"]}
+        active = sprint_facet["active"][0] if sprint_facet["active"] else None
+
+        # ── Tasks: my tasks and project tasks in a single round trip ─────────
+        is_done = {"$in": ["$status", DONE_STATUSES]}
+        is_open = {"$not": is_done}
+        has_due = {"$ne": ["$due", None]}
+        mine = {"$match": {"assignee_id": user_id}}
+        in_projects = {"$match": {"project_id": {"$in": project_ids}}}
+
+        facets = {
+            "my_status": [
+                mine,
+                {"$group": {"_id": "$status", "n": {"$sum": 1}}},
+            ],
+            "my_priority": [
+                mine,
+                {"$group": {"_id": "$priority", "n": {"$sum": 1}}},
+            ],
+            "my_counts": [
+                mine,
+                {
+                    "$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "overdue": _count_if(
+                            {"$and": [is_open, has_due, {"$lt": ["$due", now]}]}
+                        ),
+                        "due_soon": _count_if(
+                            {
+                                "$and": [
+                                    is_open,
+                                    has_due,
+                                    {"$gte": ["$due", now]},
+                                    {"$lt": ["$due", now + timedelta(days=7)]},
+                                ]
+                            }
+                        ),
+                        "done_week": _count_if(
+                            {
+                                "$and": [
+                                    is_done,
+                                    {"$gt": ["$updated", now - timedelta(days=7)]},
+                                ]
+                            }
+                        ),
+                        "done_month": _count_if(
+                            {
+                                "$and": [
+                                    is_done,
+                                    {"$gt": ["$updated", now - timedelta(days=30)]},
+                                ]
+                            }
+                        ),
+                    }
+                },
+            ],
+            "my_recent": [mine, {"$sort": {"updated": -1}}, {"$limit": 10}],
+            "by_project": [
+                in_projects,
+                {
+                    "$group": {
+                        "_id": "$project_id",
+                        "total": {"$sum": 1},
+                        "completed": _count_if(is_done),
+                    }
+                },
+            ],
+            "by_assignee": [
+                in_projects,
+                {"$match": {"assignee_id": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$assignee_id", "n": {"$sum": 1}}},
+                {"$sort": {"n": -1}},
+            ],
+            "project_counts": [
+                in_projects,
+                {
+                    "$group": {
+                        "_id": None,
+                        "blocked": _count_if({"$in": ["blocked-by", "$link_types"]}),
+                        "blocking": _count_if({"$in": ["blocks", "$link_types"]}),
+                        # Matches the previous "updated <= 30 whole days ago".
+                        "velocity": _count_if(
+                            {
+                                "$and": [
+                                    is_done,
+                                    {"$gt": ["$updated", now - timedelta(days=31)]},
+                                ]
+                            }
+                        ),
+                    }
+                },
+            ],
         }
+        if active:
+            facets["active_sprint"] = [
+                in_projects,
+                {"$match": {"sprint_id": str(active["_id"])}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "done": _count_if({"$eq": ["$status", "Done"]}),
+                    }
+                },
+            ]
 
-        for task in my_tasks:
-            status = task.get("status", "To Do")
-            priority = task.get("priority", "Medium")
-
-            task_stats["by_status"][status] = task_stats["by_status"].get(status, 0) + 1
-            task_stats["by_priority"][priority] = (
-                task_stats["by_priority"].get(priority, 0) + 1
-            )
+        task_facet = next(
+            db.tasks.aggregate(
+                [
+                    {
+                        "$match": {
+                            "$or": [
+                                {"assignee_id": user_id},
+                                {"project_id": {"$in": project_ids}},
+                            ]
+                        }
+                    },
+                    {
+                        "$project": {
+                            "ticket_id": 1,
+                            "title": 1,
+                            "project_id": 1,
+                            "sprint_id": 1,
+                            "assignee_id": 1,
+                            "issue_type": 1,
+                            "labels": 1,
+                            "due_date": 1,
+                            "status": {"$ifNull": ["$status", "To Do"]},
+                            "priority": {"$ifNull": ["$priority", "Medium"]},
+                            "due": _as_date("$due_date"),
+                            "updated": _as_date("$updated_at"),
+                            "link_types": {"$ifNull": ["$links.type", []]},
+                        }
+                    },
+                    {"$facet": facets},
+                ]
+            ),
+            {},
+        )
 
-            due = task.get("due_date")
-            if due and status not in ["Done", "Closed"]:
-                due_dt = make_aware(due)
-                if due_dt is not None:
-                    if due_dt < now:
-                        task_stats["overdue_count"] += 1
-                    elif due_dt < now + timedelta(days=7):
-                        task_stats["due_soon_count"] += 1
-
-            completed = task.get("updated_at")
-            if status in ["Done", "Closed"] and completed:
-                completed_aware = make_aware(completed)
-                if completed_aware is not None:
-                    if completed_aware > now - timedelta(days=7):
-                        task_stats["completed_this_week"] += 1
-                    if completed_aware > now - timedelta(days=30):
-                        task_stats["completed_this_month"] += 1
+        def first(name):
+            rows = task_facet.get(name) or []
+            return rows[0] if rows else {}
+
+        my_counts = first("my_counts")
+        project_counts = first("project_counts")
+        by_project = {p["_id"]: p for p in task_facet.get("by_project", [])}
+        assignee_workload = [
+            (a["_id"], a["n"]) for a in task_facet.get("by_assignee", [])
+        ]
+        total_tasks_in_projects = sum(p["total"] for p in by_project.values())
+        total_collaborators = len(
+            [uid for uid, _ in assignee_workload if uid != user_id]
+        )
 
         # Team & Collaboration
         team_stats = {}
@@ -124,50 +273,10 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
                 "members_list": member_ids[:8],
             }
 
-        all_assignees = {t["assignee_id"] for t in all_tasks if t.get("assignee_id")}
-        total_collaborators = len(all_assignees - {user_id})
-
-        assignee_workload = {}
-        for task in all_tasks:
-            assignee = task.get("assignee_id")
-            if assignee:
-                assignee_workload[assignee] = assignee_workload.get(assignee, 0) + 1
-
-        top_assignees = sorted(
-            assignee_workload.items(), key=lambda x: x[1], reverse=True
-        )[:5]
-
-        blocked_count = 0
-        blocking_count = 0
-        for task in all_tasks:
-            links = task.get("links", [])
-            if any(l.get("type") == "blocked-by" for l in links):
-                blocked_count += 1
-            if any(l.get("type") == "blocks" for l in links):
-                blocking_count += 1
-
-        # Velocity (last 30 days)
-        completed_last_30d = sum(
-            1
-            for t in all_tasks
-            if t.get("status") in ["Done", "Closed"]
-            and t.get("updated_at")
-            and days_ago(t["updated_at"]) is not None
-            and days_ago(t["updated_at"]) <= 30
-        )
-
-        # Recent tasks
-        def safe_updated_at(task):
-            val = task.get("updated_at")
-            aware = make_aware(val)
-            return (
-                aware
-                if aware is not None
-                else datetime.min.replace(tzinfo=timezone.utc)
-            )
+        completed_last_30d = project_counts.get("velocity", 0)
 
         recent_tasks = []
-        for task in sorted(my_tasks, key=safe_updated_at, reverse=True)[:10]:
+        for task in task_facet.get("my_recent", []):
             recent_tasks.append(
                 {
                     "ticket_id": task.get("ticket_id", ""),
@@ -184,21 +293,18 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
         # Top projects
         top_projects = []
         for p in user_projects[:8]:
-            project_tasks = [
-                t for t in all_tasks if t.get("project_id") == str(p["_id"])
-            ]
-            completed = len(
-                [t for t in project_tasks if t.get("status") in ["Done", "Closed"]]
-            )
+            counts = by_project.get(str(p["_id"]), {})
+            task_count = counts.get("total", 0)
+            completed = counts.get("completed", 0)
 
             top_projects.append(
                 {
                     "name": p.get("name", "Unnamed Project"),
                     "id": str(p["_id"]),
-                    "taskCount": len(project_tasks),
+                    "taskCount": task_count,
                     "completedCount": completed,
                     "progress": round(
-                        (completed / len(project_tasks) * 100) if project_tasks else 0,
+                        (completed / task_count * 100) if task_count else 0,
                         1,
                     ),
                 }
@@ -206,29 +312,23 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
 
         # Sprint insights
         sprint_insights = {
-            "total": len(sprints),
-            "active": sum(1 for s in sprints if s.get("status") == "active"),
-            "completed": sum(1 for s in sprints if s.get("status") == "completed"),
-            "planned": sum(1 for s in sprints if s.get("status") == "planned"),
+            "total": sum(sprint_counts.values()),
+            "active": sprint_counts.get("active", 0),
+            "completed": sprint_counts.get("completed", 0),
+            "planned": sprint_counts.get("planned", 0),
         }
 
         active_sprint = None
-        for s in sprints:
-            if s.get("status") == "active":
-                sprint_tasks = [
-                    t for t in all_tasks if t.get("sprint_id") == str(s["_id"])
-                ]
-                active_sprint = {
-                    "name": s.get("name"),
-                    "goal": s.get("goal", ""),
-                    "start_date": format_date(s.get("start_date")),
-                    "end_date": format_date(s.get("end_date")),
-                    "total_tasks": len(sprint_tasks),
-                    "completed_tasks": len(
-                        [t for t in sprint_tasks if t.get("status") == "Done"]
-                    ),
-                }
-                break
+        if active:
+            sprint_tasks = first("active_sprint")
+            active_sprint = {
+                "name": active.get("name"),
+                "goal": active.get("goal", ""),
+                "start_date": format_date(active.get("start_date")),
+                "end_date": format_date(active.get("end_date")),
+                "total_tasks": sprint_tasks.get("total", 0),
+                "completed_tasks": sprint_tasks.get("done", 0),
+            }
 
         return {
             "user": {
@@ -241,15 +341,15 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
                 "projects_team_info": team_stats,
             },
             "workload_distribution": {
-                "total_tasks_in_projects": len(all_tasks),
+                "total_tasks_in_projects": total_tasks_in_projects,
                 "top_assignees": [
                     {"user_id": uid, "task_count": count}
-                    for uid, count in top_assignees
+                    for uid, count in assignee_workload[:5]
                 ],
             },
             "blockers": {
-                "blocked_tasks": blocked_count,
-                "blocking_tasks": blocking_count,
+                "blocked_tasks": project_counts.get("blocked", 0),
+                "blocking_tasks": project_counts.get("blocking", 0),
             },
             "velocity": {
                 "completed_last_30_days": completed_last_30d,
@@ -259,13 +359,17 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
             },
             "stats": {
                 "tasks": {
-                    "total": task_stats["total"],
-                    "overdue": task_stats["overdue_count"],
-                    "dueSoon": task_stats["due_soon_count"],
-                    "completedWeek": task_stats["completed_this_week"],
-                    "completedMonth": task_stats["completed_this_month"],
-                    "statusBreakdown": task_stats["by_status"],
-                    "priorityBreakdown": task_stats["by_priority"],
+                    "total": my_counts.get("total", 0),
+                    "overdue": my_counts.get("overdue", 0),
+                    "dueSoon": my_counts.get("due_soon", 0),
+                    "completedWeek": my_counts.get("done_week", 0),
+                    "completedMonth": my_counts.get("done_month", 0),
+                    "statusBreakdown": {
+                        s["_id"]: s["n"] for s in task_facet.get("my_status", [])
+                    },
+                    "priorityBreakdown": {
+                        s["_id"]: s["n"] for s in task_facet.get("my_priority", [])
+                    },
                 },
                 "projects": {
                     "total": len(user_projects),
@@ -276,9 +380,7 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
                         1 for p in user_projects if p.get("user_id") != user_id
                     ),
                     "withTasks": sum(
-                        1
-                        for p in user_projects
-                        if any(t["project_id"] == str(p["_id"]) for t in all_tasks)
+                        1 for p in user_projects if str(p["_id"]) in by_project
                     ),
                 },
                 "sprints": sprint_insights,
@@ -296,9 +398,11 @@ def analyze_user_data_for_ai(user_id: str) -> dict:
         return None
 
 
-def build_ai_system_prompt(user_data: dict) -> str:
+def build_ai_system_prompt(user_data: dict, include_data: bool = True) -> str:
     """
-    Build comprehensive system prompt with user's data context
+    Build comprehensive system prompt with user's data context.
+    include_data=False leaves the data block out so it can be passed
+    separately (build_ai_user_data_prompt) and budgeted on its own.
     """
     if not user_data:
         return """You are DOIT AI Assistant, a helpful and intelligent AI integrated into the DOIT project management system.
@@ -310,65 +414,10 @@ You help users with:
 
 Be concise, helpful, and professional."""
 
-    tasks = user_data["stats"]["tasks"]
-    projects = user_data["stats"]["projects"]
-    sprints = user_data["stats"]["sprints"]
-    user_info = user_data["user"]
-
-    prompt = f"""You are DOIT AI Assistant, an intelligent AI integrated into the DOIT project management system. You have access to the user's complete project and task data to provide personalized insights and recommendations.
-
-## USER PROFILE
-- **Name:** {user_info["name"]}
-- **Role:** {user_info["role"]}
-- **Email:** {user_info["email"]}
-
-## TASK ANALYTICS
-- **Total Tasks Assigned:** {tasks["total"]}
-- **Status Distribution:** Done: {tasks["statusBreakdown"].get("Done", 0)}, In Progress: {tasks["statusBreakdown"].get("In Progress", 0)}, To Do: {tasks["statusBreakdown"].get("To Do", 0)}, Closed: {tasks["statusBreakdown"].get("Closed", 0)}
-- **Priority Distribution:** High: {tasks["priorityBreakdown"].get("High", 0)}, Medium: {tasks["priorityBreakdown"].get("Medium", 0)}, Low: {tasks["priorityBreakdown"].get("Low", 0)}
-- **Critical Metrics:**
-  - Overdue Tasks: {tasks["overdue"]}
-  - Due Within 7 Days: {tasks["dueSoon"]}
-  - Completed This Week: {tasks["completedWeek"]}
-  - Completed This Month: {tasks["completedMonth"]}
-
-## PROJECT OVERVIEW
-- **Total Projects:** {projects["total"]}
-- **Owned Projects:** {projects["owned"]}
-- **Member In:** {projects["memberOf"]}
-- **Active Projects:** {projects["withTasks"]}
-
-## SPRINT STATUS
-- **Total Sprints:** {sprints["total"]}
-- **Active Sprints:** {sprints["active"]}
-- **Completed Sprints:** {sprints["completed"]}
-- **Planned Sprints:** {sprints["planned"]}
-
-## TEAM COLLABORATION
-- **Total Collaborators:** {user_data["team"]["total_collaborators"]}
-- **Blocked Tasks:** {user_data["blockers"]["blocked_tasks"]}
-- **Blocking Tasks:** {user_data["blockers"]["blocking_tasks"]}
-
-## VELOCITY METRICS
-- **Completed Last 30 Days:** {user_data["velocity"]["completed_last_30_days"]}
-- **Average Per Week:** {user_data["velocity"]["avg_per_week"]}
-
-## RECENT ACTIVITY (Last 10 Tasks)
-{format_recent_tasks(user_data["recentTasks"])}
-
-## TOP PROJECTS
-{format_top_projects(user_data["topProjects"])}
-"""
-
-    if user_data.get("activeSprint"):
-        sprint = user_data["activeSprint"]
-        prompt += f"""
-## ACTIVE SPRINT
-- **Name:** {sprint["name"]}
-- **Goal:** {sprint["goal"]}
-- **Duration:** {sprint["start_date"]} to {sprint["end_date"]}
-- **Progress:** {sprint["completed_tasks"]}/{sprint["total_tasks"]} tasks completed
+    prompt = """You are DOIT AI Assistant, an intelligent AI integrated into the DOIT project management system. You have access to the user's complete project and task data to provide personalized insights and recommendations.
 """
+    if include_data:
+        prompt += "\n" + build_ai_user_data_prompt(user_data)
 
     prompt += """
 ## RESPONSE GUIDELINES
@@ -434,6 +483,72 @@ You have complete visibility into their task ecosystem. Use this to provide holi
     return prompt
 
 
+def build_ai_user_data_prompt(user_data: dict) -> str:
+    """
+    User data block of the system prompt: profile, task / project / sprint
+    analytics, recent tasks and top projects.
+    """
+    tasks = user_data["stats"]["tasks"]
+    projects = user_data["stats"]["projects"]
+    sprints = user_data["stats"]["sprints"]
+    user_info = user_data["user"]
+
+    prompt = f"""## USER PROFILE
+- **Name:** {user_info["name"]}
+- **Role:** {user_info["role"]}
+- **Email:** {user_info["email"]}
+
+## TASK ANALYTICS
+- **Total Tasks Assigned:** {tasks["total"]}
+- **Status Distribution:** Done: {tasks["statusBreakdown"].get("Done", 0)}, In Progress: {tasks["statusBreakdown"].get("In Progress", 0)}, To Do: {tasks["statusBreakdown"].get("To Do", 0)}, Closed: {tasks["statusBreakdown"].get("Closed", 0)}
+- **Priority Distribution:** High: {tasks["priorityBreakdown"].get("High", 0)}, Medium: {tasks["priorityBreakdown"].get("Medium", 0)}, Low: {tasks["priorityBreakdown"].get("Low", 0)}
+- **Critical Metrics:**
+  - Overdue Tasks: {tasks["overdue"]}
+  - Due Within 7 Days: {tasks["dueSoon"]}
+  - Completed This Week: {tasks["completedWeek"]}
+  - Completed This Month: {tasks["completedMonth"]}
+
+## PROJECT OVERVIEW
+- **Total Projects:** {projects["total"]}
+- **Owned Projects:** {projects["owned"]}
+- **Member In:** {projects["memberOf"]}
+- **Active Projects:** {projects["withTasks"]}
+
+## SPRINT STATUS
+- **Total Sprints:** {sprints["total"]}
+- **Active Sprints:** {sprints["active"]}
+- **Completed Sprints:** {sprints["completed"]}
+- **Planned Sprints:** {sprints["planned"]}
+
+## TEAM COLLABORATION
+- **Total Collaborators:** {user_data["team"]["total_collaborators"]}
+- **Blocked Tasks:** {user_data["blockers"]["blocked_tasks"]}
+- **Blocking Tasks:** {user_data["blockers"]["blocking_tasks"]}
+
+## VELOCITY METRICS
+- **Completed Last 30 Days:** {user_data["velocity"]["completed_last_30_days"]}
+- **Average Per Week:** {user_data["velocity"]["avg_per_week"]}
+
+## RECENT ACTIVITY (Last 10 Tasks)
+{format_recent_tasks(user_data["recentTasks"])}
+
+## TOP PROJECTS
+{format_top_projects(user_data["topProjects"])}
+"""
+
+    if user_data.get("activeSprint"):
+        sprint = user_data["activeSprint"]
+        prompt += f"""
+## ACTIVE SPRINT
+- **Name:** {sprint["name"]}
+- **Goal:** {sprint["goal"]}
+- **Duration:** {sprint["start_date"]} to {sprint["end_date"]}
+- **Progress:** {sprint["completed_tasks"]}/{sprint["total_tasks"]} tasks completed
+"""
+
+    return prompt
+
+
 def format_recent_tasks(tasks):
     """Format recent tasks for AI prompt"""
     if not tasks:
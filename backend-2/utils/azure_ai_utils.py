@@ -1,11 +1,22 @@
 """
 Azure AI Foundry Integration Utilities
 For Azure OpenAI chat and FLUX-1.1-pro image generation
+
+Azure OpenAI clients are long-lived and shared: one client per
+(endpoint, api_version, deployment) on top of one pooled HTTP connection pool
+per endpoint, so calls reuse keep-alive connections. The last api-version
+that worked for an (endpoint, deployment) pair is remembered, so the 404
+fallback probing only happens once per process.
 """
-from openai import AzureOpenAI, NotFoundError
+from openai import AsyncAzureOpenAI, AzureOpenAI, NotFoundError
+import httpx
 import requests
 import base64
-from typing import List, Dict, Optional, Tuple
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, List, Dict, Optional, Tuple
 import os
 from datetime import datetime
 from dotenv import load_dotenv
@@ -33,6 +44,14 @@ AZURE_OPENAI_ENDPOINT_GPT_4_MINI = os.getenv("AZURE_OPENAI_ENDPOINT_GPT_4_mini")
 AZURE_OPENAI_API_VERSION_GPT_4_MINI = os.getenv("AZURE_OPENAI_API_VERSION_GPT_4_mini") or os.getenv("AZURE_OPENAI_API_VERSION_GPT_4_MINI")
 AZURE_OPENAI_DEPLOYMENT_GPT_4_MINI = os.getenv("AZURE_OPENAI_DEPLOYMENT_GPT_4_mini") or os.getenv("AZURE_OPENAI_DEPLOYMENT_GPT_4_MINI")
 
+# Shared client / connection pool settings
+AZURE_OPENAI_TIMEOUT_SECONDS = float(os.getenv("AZURE_OPENAI_TIMEOUT_SECONDS", "60"))
+AZURE_OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("AZURE_OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+AZURE_OPENAI_MAX_RETRIES = int(os.getenv("AZURE_OPENAI_MAX_RETRIES", "2"))
+AZURE_OPENAI_MAX_CONNECTIONS = int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "50"))
+AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+AZURE_OPENAI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("AZURE_OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
 # Azure AI FLUX Configuration for image generation
 AZURE_FLUX_ENDPOINT = os.getenv("AZURE_FLUX_ENDPOINT")
 AZURE_FLUX_KEY = os.getenv("AZURE_FLUX_KEY")
@@ -46,14 +65,197 @@ print(f"  API_VERSION: {AZURE_OPENAI_API_VERSION}")
 print(f"  KEY: {'✅ Loaded' if AZURE_OPENAI_KEY else '❌ Missing'}")
 
 
-def _create_azure_client(api_version: str) -> AzureOpenAI:
-    return AzureOpenAI(
-        api_version=api_version,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        api_key=AZURE_OPENAI_KEY,
+# ============================================================================
+# SHARED CLIENT REGISTRY
+# ============================================================================
+
+_client_lock = threading.Lock()
+_http_clients: Dict[str, httpx.Client] = {}
+_async_http_clients: Dict[str, httpx.AsyncClient] = {}
+_sync_clients: Dict[Tuple[str, str, Optional[str]], AzureOpenAI] = {}
+_async_clients: Dict[Tuple[str, str, Optional[str]], AsyncAzureOpenAI] = {}
+_last_good_api_versions: Dict[Tuple[str, Optional[str]], str] = {}
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(AZURE_OPENAI_TIMEOUT_SECONDS, connect=AZURE_OPENAI_CONNECT_TIMEOUT_SECONDS)
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=AZURE_OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=AZURE_OPENAI_KEEPALIVE_EXPIRY_SECONDS,
     )
 
 
+def get_azure_client(
+    api_version: str,
+    endpoint: Optional[str] = None,
+    deployment: Optional[str] = None,
+) -> AzureOpenAI:
+    """Return the shared sync client for (endpoint, api_version, deployment)."""
+    endpoint = endpoint or AZURE_OPENAI_ENDPOINT
+    key = (endpoint, api_version, deployment)
+    client = _sync_clients.get(key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            http_client = _http_clients.get(endpoint)
+            if http_client is None:
+                http_client = httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+                _http_clients[endpoint] = http_client
+            client = AzureOpenAI(
+                api_version=api_version,
+                azure_endpoint=endpoint,
+                api_key=AZURE_OPENAI_KEY,
+                timeout=_http_timeout(),
+                max_retries=AZURE_OPENAI_MAX_RETRIES,
+                http_client=http_client,
+            )
+            _sync_clients[key] = client
+    return client
+
+
+def get_async_azure_client(
+    api_version: str,
+    endpoint: Optional[str] = None,
+    deployment: Optional[str] = None,
+) -> AsyncAzureOpenAI:
+    """
+    Return the shared async client for (endpoint, api_version, deployment).
+    Async connection pools are bound to the event loop they were first used
+    on — call this from the application loop, not from ad-hoc asyncio.run().
+    """
+    endpoint = endpoint or AZURE_OPENAI_ENDPOINT
+    key = (endpoint, api_version, deployment)
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _async_clients.get(key)
+        if client is None:
+            http_client = _async_http_clients.get(endpoint)
+            if http_client is None:
+                http_client = httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout())
+                _async_http_clients[endpoint] = http_client
+            client = AsyncAzureOpenAI(
+                api_version=api_version,
+                azure_endpoint=endpoint,
+                api_key=AZURE_OPENAI_KEY,
+                timeout=_http_timeout(),
+                max_retries=AZURE_OPENAI_MAX_RETRIES,
+                http_client=http_client,
+            )
+            _async_clients[key] = client
+    return client
+
+
+def _create_azure_client(api_version: str) -> AzureOpenAI:
+    return get_azure_client(api_version)
+
+
+# ============================================================================
+# PER-DEPLOYMENT METRICS
+# ============================================================================
+
+_LATENCY_WINDOW = 500
+_metrics_lock = threading.Lock()
+_deployment_metrics: Dict[str, Dict[str, Any]] = {}
+
+
+def _record_llm_call(
+    deployment: Optional[str],
+    api_version: str,
+    seconds: float,
+    usage: Any = None,
+    error: bool = False,
+    stream: bool = False,
+) -> None:
+    with _metrics_lock:
+        m = _deployment_metrics.setdefault(
+            deployment or "<unknown>",
+            {
+                "calls": 0,
+                "errors": 0,
+                "streams": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_latency_seconds": 0.0,
+                "latencies": deque(maxlen=_LATENCY_WINDOW),
+                "api_version": None,
+            },
+        )
+        m["calls"] += 1
+        m["api_version"] = api_version
+        if error:
+            m["errors"] += 1
+            return
+        if stream:
+            m["streams"] += 1
+        m["total_latency_seconds"] += seconds
+        m["latencies"].append(seconds)
+        if usage is not None:
+            m["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            m["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+
+def record_stream_usage(deployment: Optional[str], usage: Any) -> None:
+    """Add token usage reported at the end of a stream (stream_options.include_usage)."""
+    if usage is None:
+        return
+    with _metrics_lock:
+        m = _deployment_metrics.get(deployment or "<unknown>")
+        if m is not None:
+            m["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            m["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 3)
+
+
+def get_azure_openai_metrics() -> Dict[str, Any]:
+    """
+    Latency (p50/p95 over the last calls) and token totals per deployment,
+    busiest first. Endpoint URLs and deployment names are left out.
+    """
+    with _metrics_lock:
+        snapshot = []
+        for m in _deployment_metrics.values():
+            latencies = sorted(m["latencies"])
+            successes = m["calls"] - m["errors"]
+            snapshot.append({
+                "calls": m["calls"],
+                "errors": m["errors"],
+                "streams": m["streams"],
+                "prompt_tokens": m["prompt_tokens"],
+                "completion_tokens": m["completion_tokens"],
+                "avg_latency_seconds": round(m["total_latency_seconds"] / successes, 3) if successes else None,
+                "p50_latency_seconds": _percentile(latencies, 50),
+                "p95_latency_seconds": _percentile(latencies, 95),
+                "api_version": m["api_version"],
+            })
+    return {
+        "deployments": sorted(snapshot, key=lambda d: -d["calls"]),
+        "pool": {
+            "sync_clients": len(_sync_clients),
+            "async_clients": len(_async_clients),
+            "max_connections": AZURE_OPENAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            "timeout_seconds": AZURE_OPENAI_TIMEOUT_SECONDS,
+            "max_retries": AZURE_OPENAI_MAX_RETRIES,
+        },
+    }
+
+
 def _normalize_azure_chat_endpoint(endpoint_raw: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Accept either:
@@ -104,8 +306,16 @@ def get_gpt4_mini_chat_config() -> Dict[str, Optional[str]]:
     }
 
 
-def _api_version_candidates() -> List[str]:
-    candidates = [AZURE_OPENAI_API_VERSION, *AZURE_OPENAI_API_VERSION_FALLBACKS]
+def _api_version_candidates(
+    preferred: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    deployment: Optional[str] = None,
+) -> List[str]:
+    """Last-known-good version first, then the preferred/configured ones and fallbacks."""
+    known = _last_good_api_versions.get(
+        (endpoint or AZURE_OPENAI_ENDPOINT, deployment or AZURE_OPENAI_DEPLOYMENT)
+    )
+    candidates = [known, preferred, AZURE_OPENAI_API_VERSION, *AZURE_OPENAI_API_VERSION_FALLBACKS]
     unique = []
     for version in candidates:
         if version and version not in unique:
@@ -113,49 +323,136 @@ def _api_version_candidates() -> List[str]:
     return unique
 
 
-def _chat_completions_create(request_kwargs: Dict):
-    """Create chat completion with automatic api-version fallback on 404."""
-    global azure_client, AZURE_OPENAI_API_VERSION
+def _version_not_found_error(endpoint: str, deployment: str, tried_versions: List[str]) -> Exception:
+    return Exception(
+        "Azure OpenAI returned 404 (Resource not found). "
+        f"Deployment '{deployment}' was not reachable at endpoint '{endpoint}'. "
+        "Verify that AZURE_OPENAI_DEPLOYMENT is the Azure deployment name (not just model name), "
+        "the deployment exists in this exact Azure OpenAI resource, and API version is supported. "
+        f"API versions tried: {', '.join(tried_versions)}"
+    )
+
+
+def _remember_api_version(endpoint: str, deployment: str, api_version: str, preferred: Optional[str]) -> None:
+    key = (endpoint, deployment)
+    if _last_good_api_versions.get(key) != api_version:
+        _last_good_api_versions[key] = api_version
+        if preferred and api_version != preferred:
+            print(f"⚠️ Azure 404 recovered by switching API version to: {api_version}")
+
 
-    if azure_client is None:
+def _chat_completions_create(
+    request_kwargs: Dict,
+    endpoint: Optional[str] = None,
+    preferred_api_version: Optional[str] = None,
+):
+    """
+    Create chat completion on the shared client, with automatic api-version
+    fallback on 404. Only 404s rotate the version — transient errors are
+    already retried by the SDK (AZURE_OPENAI_MAX_RETRIES).
+    """
+    endpoint = endpoint or AZURE_OPENAI_ENDPOINT
+    if not endpoint or not AZURE_OPENAI_KEY:
         raise Exception("Azure OpenAI client not initialized. Check environment variables.")
 
-    try:
-        return azure_client.chat.completions.create(**request_kwargs)
-    except NotFoundError as original_error:
-        tried_versions = [AZURE_OPENAI_API_VERSION]
+    deployment = request_kwargs.get("model", "<unknown>")
+    stream = bool(request_kwargs.get("stream"))
+    tried_versions = []
+    last_error = None
+
+    for api_version in _api_version_candidates(preferred_api_version, endpoint, deployment):
+        tried_versions.append(api_version)
+        client = get_azure_client(api_version, endpoint, deployment)
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(**request_kwargs)
+        except NotFoundError as e:
+            last_error = e
+            _record_llm_call(deployment, api_version, 0, error=True)
+            continue
+        except Exception:
+            _record_llm_call(deployment, api_version, 0, error=True)
+            raise
+
+        _remember_api_version(endpoint, deployment, api_version, preferred_api_version or AZURE_OPENAI_API_VERSION)
+        _record_llm_call(
+            deployment,
+            api_version,
+            time.perf_counter() - started,
+            usage=None if stream else getattr(response, "usage", None),
+            stream=stream,
+        )
+        return response
 
-        for api_version in _api_version_candidates():
-            if api_version == AZURE_OPENAI_API_VERSION:
-                continue
+    raise _version_not_found_error(endpoint, deployment, tried_versions) from last_error
 
-            tried_versions.append(api_version)
 
-            try:
-                trial_client = _create_azure_client(api_version)
-                response = trial_client.chat.completions.create(**request_kwargs)
-
-                azure_client = trial_client
-                AZURE_OPENAI_API_VERSION = api_version
-                print(f"⚠️ Azure 404 recovered by switching API version to: {api_version}")
-                return response
-            except NotFoundError:
-                continue
-
-        deployment = request_kwargs.get("model", "<unknown>")
-        raise Exception(
-            "Azure OpenAI returned 404 (Resource not found). "
-            f"Deployment '{deployment}' was not reachable at endpoint '{AZURE_OPENAI_ENDPOINT}'. "
-            "Verify that AZURE_OPENAI_DEPLOYMENT is the Azure deployment name (not just model name), "
-            "the deployment exists in this exact Azure OpenAI resource, and API version is supported. "
-            f"API versions tried: {', '.join(tried_versions)}"
-        ) from original_error
+async def _achat_completions_create(
+    request_kwargs: Dict,
+    endpoint: Optional[str] = None,
+    preferred_api_version: Optional[str] = None,
+):
+    """Async twin of _chat_completions_create on the shared AsyncAzureOpenAI clients."""
+    endpoint = endpoint or AZURE_OPENAI_ENDPOINT
+    if not endpoint or not AZURE_OPENAI_KEY:
+        raise Exception("Azure OpenAI client not initialized. Check environment variables.")
+
+    deployment = request_kwargs.get("model", "<unknown>")
+    stream = bool(request_kwargs.get("stream"))
+    tried_versions = []
+    last_error = None
+
+    for api_version in _api_version_candidates(preferred_api_version, endpoint, deployment):
+        tried_versions.append(api_version)
+        client = get_async_azure_client(api_version, endpoint, deployment)
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(**request_kwargs)
+        except NotFoundError as e:
+            last_error = e
+            _record_llm_call(deployment, api_version, 0, error=True)
+            continue
+        except Exception:
+            _record_llm_call(deployment, api_version, 0, error=True)
+            raise
+
+        _remember_api_version(endpoint, deployment, api_version, preferred_api_version or AZURE_OPENAI_API_VERSION)
+        _record_llm_call(
+            deployment,
+            api_version,
+            time.perf_counter() - started,
+            usage=None if stream else getattr(response, "usage", None),
+            stream=stream,
+        )
+        return response
+
+    raise _version_not_found_error(endpoint, deployment, tried_versions) from last_error
+
+
+def _format_completion(response) -> Dict:
+    return {
+        "content": response.choices[0].message.content,
+        "model": response.model,
+        "tokens": {
+            "prompt": response.usage.prompt_tokens,
+            "completion": response.usage.completion_tokens,
+            "total": response.usage.total_tokens,
+        },
+        "finish_reason": response.choices[0].finish_reason,
+    }
 
 
 # Initialize Azure OpenAI client (for text chat)
 try:
-    azure_client = _create_azure_client(AZURE_OPENAI_API_VERSION)
-    print("✅ Azure OpenAI client initialized successfully")
+    azure_client = (
+        get_azure_client(AZURE_OPENAI_API_VERSION, deployment=AZURE_OPENAI_DEPLOYMENT)
+        if AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY
+        else None
+    )
+    if azure_client is not None:
+        print("✅ Azure OpenAI client initialized successfully")
+    else:
+        print("❌ Failed to initialize Azure OpenAI client: endpoint or key missing")
 except Exception as e:
     print(f"❌ Failed to initialize Azure OpenAI client: {e}")
     azure_client = None
@@ -204,16 +501,7 @@ def chat_completion(
         print(f"📥 Received response: {response.choices[0].message.content[:100]}...")
 
         # Non-streaming response
-        return {
-            "content": response.choices[0].message.content,
-            "model": response.model,
-            "tokens": {
-                "prompt": response.usage.prompt_tokens,
-                "completion": response.usage.completion_tokens,
-                "total": response.usage.total_tokens,
-            },
-            "finish_reason": response.choices[0].finish_reason,
-        }
+        return _format_completion(response)
 
     except Exception as e:
         print(f"❌ Error in chat_completion: {str(e)}")
@@ -221,81 +509,23 @@ def chat_completion(
         raise
 
 
-def chat_completion_gpt4_mini(
+async def achat_completion(
     messages: List[Dict[str, str]],
     max_tokens: int = 2000,
     temperature: float = 1.0,
-    stream: bool = False,
 ) -> Dict:
-    """
-    Chat completion that uses the dedicated GPT-4.1-mini profile from .env.
-    Falls back to default profile values when dedicated vars are not set.
-    """
+    """Async chat_completion on the shared AsyncAzureOpenAI client."""
     try:
-        cfg = get_gpt4_mini_chat_config()
-        endpoint = cfg.get("endpoint")
-        deployment = cfg.get("deployment")
-        preferred_api_version = cfg.get("api_version")
-
-        if not endpoint:
-            raise Exception("Azure endpoint is not configured for GPT-4.1-mini profile")
-        if not deployment:
-            raise Exception("Azure deployment is not configured for GPT-4.1-mini profile")
-        if not AZURE_OPENAI_KEY:
-            raise Exception("AZURE_OPENAI_KEY is missing")
-
-        version_candidates = [preferred_api_version, AZURE_OPENAI_API_VERSION, "2024-12-01-preview", "2024-10-21"]
-        unique_versions = []
-        for version in version_candidates:
-            if version and version not in unique_versions:
-                unique_versions.append(version)
-
-        last_error = None
-        for api_version in unique_versions:
-            try:
-                client = AzureOpenAI(
-                    api_version=api_version,
-                    azure_endpoint=endpoint,
-                    api_key=AZURE_OPENAI_KEY,
-                )
-
-                response = client.chat.completions.create(
-                    model=deployment,
-                    messages=messages,
-                    max_completion_tokens=max_tokens,
-                    stream=stream,
-                )
-
-                if stream:
-                    return response
-
-                if api_version != preferred_api_version:
-                    print(f"⚠️ GPT-4.1-mini call recovered with API version: {api_version}")
-
-                return {
-                    "content": response.choices[0].message.content,
-                    "model": response.model,
-                    "tokens": {
-                        "prompt": response.usage.prompt_tokens,
-                        "completion": response.usage.completion_tokens,
-                        "total": response.usage.total_tokens,
-                    },
-                    "finish_reason": response.choices[0].finish_reason,
-                }
-            except NotFoundError as e:
-                last_error = e
-                continue
-            except Exception as e:
-                last_error = e
-                continue
-
-        raise Exception(
-            "Failed to call GPT-4.1-mini profile. "
-            f"Endpoint='{endpoint}', Deployment='{deployment}', API versions tried={unique_versions}. "
-            f"Last error: {last_error}"
+        response = await _achat_completions_create(
+            {
+                "model": AZURE_OPENAI_DEPLOYMENT,
+                "messages": messages,
+                "max_completion_tokens": max_tokens,
+            }
         )
+        return _format_completion(response)
     except Exception as e:
-        print(f"❌ Error in chat_completion_gpt4_mini: {str(e)}")
+        print(f"❌ Error in achat_completion: {str(e)}")
         raise
 
 
@@ -324,63 +554,21 @@ def chat_completion_gpt4_mini(
         if not AZURE_OPENAI_KEY:
             raise Exception("AZURE_OPENAI_KEY is missing")
 
-        version_candidates = [
-            preferred_api_version,
-            AZURE_OPENAI_API_VERSION,
-            "2024-12-01-preview",
-            "2024-10-21",
-        ]
-        unique_versions = []
-        for version in version_candidates:
-            if version and version not in unique_versions:
-                unique_versions.append(version)
-
-        last_error = None
-        for api_version in unique_versions:
-            try:
-                client = AzureOpenAI(
-                    api_version=api_version,
-                    azure_endpoint=endpoint,
-                    api_key=AZURE_OPENAI_KEY,
-                )
-
-                response = client.chat.completions.create(
-                    model=deployment,
-                    messages=messages,
-                    max_completion_tokens=max_tokens,
-                    stream=stream,
-                )
-
-                if stream:
-                    return response
-
-                if api_version != preferred_api_version:
-                    print(
-                        f"⚠️ GPT-4.1-mini call recovered with API version: {api_version}"
-                    )
+        response = _chat_completions_create(
+            {
+                "model": deployment,
+                "messages": messages,
+                "max_completion_tokens": max_tokens,
+                "stream": stream,
+            },
+            endpoint=endpoint,
+            preferred_api_version=preferred_api_version,
+        )
 
-                return {
-                    "content": response.choices[0].message.content,
-                    "model": response.model,
-                    "tokens": {
-                        "prompt": response.usage.prompt_tokens,
-                        "completion": response.usage.completion_tokens,
-                        "total": response.usage.total_tokens,
-                    },
-                    "finish_reason": response.choices[0].finish_reason,
-                }
-            except NotFoundError as e:
-                last_error = e
-                continue
-            except Exception as e:
-                last_error = e
-                continue
+        if stream:
+            return response
 
-        raise Exception(
-            "Failed to call GPT-4.1-mini profile. "
-            f"Endpoint='{endpoint}', Deployment='{deployment}', API versions tried={unique_versions}. "
-            f"Last error: {last_error}"
-        )
+        return _format_completion(response)
     except Exception as e:
         print(f"❌ Error in chat_completion_gpt4_mini: {str(e)}")
         raise
@@ -415,6 +603,49 @@ def chat_completion_streaming(
         raise
 
 
+async def achat_completion_streaming(
+    messages: List[Dict[str, str]],
+    max_tokens: int = 2000,
+    temperature: float = 1.0,
+    usage_out: Optional[Dict[str, Any]] = None,
+):
+    """
+    Async generator over content deltas from the shared AsyncAzureOpenAI client.
+
+    Closing the generator early (client disconnect, cancellation) closes the
+    upstream HTTP stream, so Azure stops generating. When ``usage_out`` is a
+    dict it receives the final token usage reported by the service.
+    """
+    response = await _achat_completions_create(
+        {
+            "model": AZURE_OPENAI_DEPLOYMENT,
+            "messages": messages,
+            "max_completion_tokens": max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+    )
+    try:
+        async for chunk in response:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                record_stream_usage(AZURE_OPENAI_DEPLOYMENT, usage)
+                if usage_out is not None:
+                    usage_out.update(
+                        {
+                            "prompt": usage.prompt_tokens,
+                            "completion": usage.completion_tokens,
+                            "total": usage.total_tokens,
+                        }
+                    )
+            if chunk.choices:
+                delta = chunk.choices[0].delta
+                if getattr(delta, "content", None):
+                    yield delta.content
+    finally:
+        await response.close()
+
+
 def generate_image(
     prompt: str, save_to_file: bool = True, output_dir: str = "uploads/ai_images"
 ) -> Dict:
@@ -541,31 +772,41 @@ def generate_image(
         return {"success": False, "error": str(e)}
 
 
-def format_conversation_history(messages: List[Dict]) -> List[Dict[str, str]]:
+def format_conversation_history(messages: List[Dict]) -> List[Dict[str, Any]]:
     """
     Format conversation history for Azure OpenAI API
 
-    Converts database messages to API format
+    Converts database messages to API format. Keys starting with ``_`` are
+    budgeting metadata for truncate_context(), which strips them.
     """
     formatted = []
 
     for msg in messages:
         formatted.append(
-            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            {
+                "role": msg.get("role", "user"),
+                "content": msg.get("content", ""),
+                "_section": "attachments" if msg.get("attachments") else "history",
+                "_created_at": msg.get("created_at"),
+            }
         )
 
     return formatted
 
 
 def get_context_with_system_prompt(
-    conversation_messages: List[Dict], system_prompt: Optional[str] = None
-) -> List[Dict[str, str]]:
+    conversation_messages: List[Dict],
+    system_prompt: Optional[str] = None,
+    user_data_prompt: Optional[str] = None,
+) -> List[Dict[str, Any]]:
     """
     Create full context with system prompt for API call
 
     Args:
         conversation_messages: Previous messages from database
         system_prompt: Custom system prompt (optional)
+        user_data_prompt: User data block, budgeted separately from the
+            instructions by truncate_context() (optional)
 
     Returns:
         Formatted messages including system prompt
@@ -582,7 +823,11 @@ You help users with:
 
 Be concise, helpful, and professional. When users ask you to generate images, acknowledge that you'll create them and describe what you're generating."""
 
-    messages = [{"role": "system", "content": system_prompt}]
+    messages = [{"role": "system", "content": system_prompt, "_section": "system"}]
+    if user_data_prompt:
+        messages.append(
+            {"role": "system", "content": user_data_prompt, "_section": "user_data"}
+        )
 
     # Add conversation history
     messages.extend(format_conversation_history(conversation_messages))
@@ -590,46 +835,236 @@ Be concise, helpful, and professional. When users ask you to generate images, ac
     return messages
 
 
+# ============================================================================
+# TOKEN BUDGETING
+# ============================================================================
+
+# Share of the prompt budget each section may use before it is compacted.
+# History is elastic: it gets everything the other sections leave unused.
+CONTEXT_SECTION_BUDGETS = {
+    "system": float(os.getenv("CONTEXT_BUDGET_SYSTEM", "0.20")),
+    "user_data": float(os.getenv("CONTEXT_BUDGET_USER_DATA", "0.30")),
+    "attachments": float(os.getenv("CONTEXT_BUDGET_ATTACHMENTS", "0.25")),
+}
+# Per-message framing overhead of the chat format (role, separators).
+MESSAGE_TOKEN_OVERHEAD = 4
+REPLY_TOKEN_OVERHEAD = 3
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def _get_encoding():
+    """tiktoken encoding for the chat deployment, or None if unavailable.
+
+    Loaded once; tiktoken fetches the BPE file on first use, so an offline
+    host falls back to the word-piece estimate instead of failing requests.
+    """
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                import tiktoken
+
+                try:
+                    _encoding = tiktoken.encoding_for_model(AZURE_OPENAI_DEPLOYMENT)
+                except KeyError:
+                    _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"⚠️  tiktoken unavailable, using estimated token counts: {e}")
+                _encoding = None
+            _encoding_loaded = True
+    return _encoding
+
+
 def estimate_tokens(text: str) -> int:
     """
-    Rough estimation of token count
-    (1 token ≈ 4 characters for English text)
+    Token count of ``text`` for the chat deployment's tokenizer.
+    Without tiktoken: one token per punctuation mark and per 4 characters of
+    each word, which tracks BPE counts far closer than len(text) / 4 on
+    code, JSON and markdown tables.
     """
-    return len(text) // 4
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum((len(piece) + 3) // 4 for piece in _WORD_PIECES.findall(text))
+
+
+def count_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Prompt tokens for a chat message list, including framing overhead."""
+    return REPLY_TOKEN_OVERHEAD + sum(
+        estimate_tokens(m.get("content") or "") + MESSAGE_TOKEN_OVERHEAD
+        for m in messages
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_lines: bool = False) -> str:
+    """
+    Cut ``text`` to at most ``max_tokens`` tokens, keeping the head.
+    keep_lines drops whole trailing lines instead (for markdown data dumps).
+    """
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    notice = "\n[... truncated to fit context]"
+    budget = max(max_tokens - estimate_tokens(notice), 0)
+
+    if keep_lines:
+        kept, used = [], 0
+        for line in text.splitlines():
+            line_tokens = estimate_tokens(line) + 1
+            if used + line_tokens > budget:
+                break
+            kept.append(line)
+            used += line_tokens
+        return "\n".join(kept) + notice
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:budget]) + notice
+    # Estimate-based cut: binary search the longest prefix that fits.
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + notice
 
 
 def truncate_context(
-    messages: List[Dict[str, str]], max_tokens: int = 8000
+    messages: List[Dict[str, Any]],
+    max_tokens: int = 8000,
+    summary: Optional[str] = None,
+    report: Optional[Dict[str, Any]] = None,
+    budgets: Optional[Dict[str, float]] = None,
 ) -> List[Dict[str, str]]:
     """
-    Truncate conversation history to fit within token limit
-    Always keeps system message if present
+    Fit a prompt into ``max_tokens`` using per-section budgets.
+
+    Sections come from each message's ``_section`` key (system, user_data,
+    attachments, history); untagged system messages count as system and
+    everything else as history. system / user_data / attachments are capped
+    at their CONTEXT_SECTION_BUDGETS share and trimmed when over it; history
+    gets whatever is left, newest first. The latest message is always kept.
+
+    ``summary`` (the rolling summary of turns older than ``messages``) is
+    injected as a system message if it fits in a quarter of the budget.
+    ``budgets`` overrides CONTEXT_SECTION_BUDGETS shares for this call. When
+    ``report`` is a dict it receives per-section token counts, tokens_saved
+    and evicted_messages (how many of the oldest conversation messages were
+    dropped) so the caller can fold them into the next summary.
     """
     if not messages:
         return messages
 
-    # Always keep system message
-    result = []
-    system_msg = None
-    other_messages = []
+    def section(msg):
+        if msg.get("_section"):
+            return msg["_section"]
+        return "system" if msg.get("role") == "system" else "history"
+
+    shares = {**CONTEXT_SECTION_BUDGETS, **(budgets or {})}
+    original_tokens = count_message_tokens(messages)
+    budget = max_tokens - REPLY_TOKEN_OVERHEAD
+    sections: Dict[str, Dict[str, int]] = {}
+
+    def account(name, before, after):
+        entry = sections.setdefault(name, {"tokens": 0, "trimmed": 0})
+        entry["tokens"] += after
+        entry["trimmed"] += before - after
+
+    # ── Fixed sections: system instructions, then user data ───────────────
+    head: List[Dict[str, Any]] = []
+    for name in ("system", "user_data"):
+        cap = int(max_tokens * shares[name])
+        for msg in (m for m in messages if section(m) == name):
+            content = msg.get("content") or ""
+            before = estimate_tokens(content)
+            content = truncate_to_tokens(
+                content, min(cap, budget) - MESSAGE_TOKEN_OVERHEAD, keep_lines=name == "user_data"
+            )
+            after = estimate_tokens(content)
+            cap -= after + MESSAGE_TOKEN_OVERHEAD
+            budget -= after + MESSAGE_TOKEN_OVERHEAD
+            account(name, before, after)
+            if content:
+                head.append({**msg, "content": content})
+
+    # ── Conversation: latest message always, then newest first ────────────
+    conversation = [m for m in messages if section(m) not in ("system", "user_data")]
+    kept: List[Dict[str, Any]] = []
+    evicted: List[Dict[str, Any]] = []
+    attachment_cap = int(max_tokens * shares["attachments"])
+    summary_tokens = (
+        estimate_tokens(summary) + MESSAGE_TOKEN_OVERHEAD if summary else 0
+    )
+    if summary_tokens > budget // 4:
+        summary, summary_tokens = None, 0
+    budget -= summary_tokens
+
+    for index in range(len(conversation) - 1, -1, -1):
+        msg = conversation[index]
+        name = section(msg)
+        content = msg.get("content") or ""
+        before = estimate_tokens(content)
+        is_latest = index == len(conversation) - 1
+        room = budget
+        if name == "attachments":
+            room = min(room, attachment_cap)
+        limit = room - MESSAGE_TOKEN_OVERHEAD
+
+        if before > limit:
+            if is_latest:
+                content = truncate_to_tokens(content, max(limit, 1))
+            elif name == "attachments" and limit > 0:
+                content = truncate_to_tokens(content, limit)
+            else:
+                evicted = conversation[: index + 1]
+                break
 
-    for msg in messages:
-        if msg.get("role") == "system":
-            system_msg = msg
-        else:
-            other_messages.append(msg)
-
-    if system_msg:
-        result.append(system_msg)
-        max_tokens -= estimate_tokens(system_msg["content"])
-
-    # Add messages from most recent backwards until we hit limit
-    total_tokens = 0
-    for msg in reversed(other_messages):
-        msg_tokens = estimate_tokens(msg["content"])
-        if total_tokens + msg_tokens > max_tokens:
-            break
-        result.insert(1 if system_msg else 0, msg)
-        total_tokens += msg_tokens
+        after = estimate_tokens(content)
+        budget -= after + MESSAGE_TOKEN_OVERHEAD
+        if name == "attachments":
+            attachment_cap -= after + MESSAGE_TOKEN_OVERHEAD
+        account(name, before, after)
+        kept.append({**msg, "content": content})
+
+    kept.reverse()
+    if summary:
+        head.append(
+            {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary}",
+                "_section": "summary",
+            }
+        )
+        account("summary", summary_tokens, summary_tokens)
+
+    result = [
+        {k: v for k, v in msg.items() if not k.startswith("_")} for msg in head + kept
+    ]
+
+    if report is not None:
+        final_tokens = count_message_tokens(result)
+        report.update(
+            {
+                "budget": max_tokens,
+                "original_tokens": original_tokens,
+                "final_tokens": final_tokens,
+                "tokens_saved": max(original_tokens - final_tokens, 0),
+                "sections": sections,
+                "evicted_messages": len(evicted),
+                "summary_used": bool(summary),
+                "tokenizer": "tiktoken" if _get_encoding() is not None else "estimate",
+            }
+        )
 
     return result
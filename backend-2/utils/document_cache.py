@@ -0,0 +1,219 @@
+"""
+Persistent content-hash cache for Document Intelligence.
+
+Three kinds of entries live in the ``document_intel_cache`` collection:
+  - "parse"    → parsed text + parser name, keyed by SHA-256 of the file bytes
+                 (or URL + ETag/Last-Modified for remote documents)
+  - "insights" → raw insight JSON + pipeline stats, keyed by
+                 (text hash, question, model deployment)
+  - "pdf"      → rendered PDF bytes, keyed by SHA-256 of the InsightReport JSON
+
+Entries expire through a Mongo TTL index on ``expires_at``; the collection is
+additionally trimmed to DOC_INTEL_CACHE_MAX_ENTRIES / DOC_INTEL_CACHE_MAX_BYTES
+by evicting the least recently used entries.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from bson import Binary
+
+from database import db
+
+document_cache_collection = db.document_intel_cache
+
+DOC_INTEL_CACHE_ENABLED = os.getenv("DOC_INTEL_CACHE_ENABLED", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+DOC_INTEL_CACHE_TTL_SECONDS = int(os.getenv("DOC_INTEL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# URLs without an ETag/Last-Modified can change underneath us — keep them briefly.
+DOC_INTEL_CACHE_URL_TTL_SECONDS = int(os.getenv("DOC_INTEL_CACHE_URL_TTL_SECONDS", "3600"))
+DOC_INTEL_CACHE_MAX_ENTRIES = int(os.getenv("DOC_INTEL_CACHE_MAX_ENTRIES", "500"))
+DOC_INTEL_CACHE_MAX_BYTES = int(os.getenv("DOC_INTEL_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Stay well below Mongo's 16MB document limit.
+_MAX_ENTRY_BYTES = 12 * 1024 * 1024
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+# ── Key builders ──────────────────────────────────────────────────────────
+def file_parse_key(file_bytes: bytes, filename: str) -> str:
+    # The extension picks the parser, so the same bytes under .csv vs .txt differ.
+    suffix = os.path.splitext(filename)[1].lower()
+    return f"file:{sha256_hex(file_bytes)}:{suffix}"
+
+
+def url_parse_key(url: str) -> Tuple[str, int]:
+    """
+    Build a parse key for a URL from a HEAD request's ETag / Last-Modified.
+    Returns (key, ttl_seconds); validator-less URLs get the short URL TTL.
+    """
+    validator = ""
+    try:
+        head = requests.head(url, allow_redirects=True, timeout=5)
+        validator = head.headers.get("ETag") or head.headers.get("Last-Modified") or ""
+    except Exception as e:
+        print(f"⚠️  Document cache HEAD failed for {url}: {e}")
+
+    if validator:
+        return f"url:{sha256_hex(url + '|' + validator)}", DOC_INTEL_CACHE_TTL_SECONDS
+    return f"url:{sha256_hex(url)}", DOC_INTEL_CACHE_URL_TTL_SECONDS
+
+
+def insights_key(doc_text: str, question: str, model: str) -> str:
+    return sha256_hex(f"{sha256_hex(doc_text)}|{(question or '').strip()}|{model or ''}")
+
+
+def pdf_key(report_json: str) -> str:
+    return sha256_hex(report_json)
+
+
+# ── Core get/set ──────────────────────────────────────────────────────────
+def _get(kind: str, key: str) -> Optional[Dict[str, Any]]:
+    if not DOC_INTEL_CACHE_ENABLED:
+        return None
+    try:
+        now = _now()
+        entry = document_cache_collection.find_one_and_update(
+            {"kind": kind, "key": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_accessed_at": now}, "$inc": {"hits": 1}},
+        )
+        return entry
+    except Exception as e:
+        print(f"⚠️  Document cache read failed ({kind}): {e}")
+        return None
+
+
+def _set(kind: str, key: str, payload: Dict[str, Any], size_bytes: int, ttl: Optional[int] = None) -> None:
+    if not DOC_INTEL_CACHE_ENABLED or size_bytes > _MAX_ENTRY_BYTES:
+        return
+    try:
+        now = _now()
+        document_cache_collection.update_one(
+            {"kind": kind, "key": key},
+            {
+                "$set": {
+                    **payload,
+                    "size_bytes": size_bytes,
+                    "created_at": now,
+                    "last_accessed_at": now,
+                    "expires_at": now + timedelta(seconds=ttl or DOC_INTEL_CACHE_TTL_SECONDS),
+                },
+                "$setOnInsert": {"hits": 0},
+            },
+            upsert=True,
+        )
+        _evict_if_needed()
+    except Exception as e:
+        print(f"⚠️  Document cache write failed ({kind}): {e}")
+
+
+def _evict_if_needed() -> None:
+    """Drop least-recently-used entries until entry-count and byte budgets hold."""
+    totals = list(
+        document_cache_collection.aggregate(
+            [{"$group": {"_id": None, "count": {"$sum": 1}, "bytes": {"$sum": "$size_bytes"}}}]
+        )
+    )
+    if not totals:
+        return
+    count, total_bytes = totals[0]["count"], totals[0]["bytes"]
+    if count <= DOC_INTEL_CACHE_MAX_ENTRIES and total_bytes <= DOC_INTEL_CACHE_MAX_BYTES:
+        return
+
+    evict_ids = []
+    cursor = document_cache_collection.find({}, {"_id": 1, "size_bytes": 1}).sort("last_accessed_at", 1)
+    for entry in cursor:
+        if count <= DOC_INTEL_CACHE_MAX_ENTRIES and total_bytes <= DOC_INTEL_CACHE_MAX_BYTES:
+            break
+        evict_ids.append(entry["_id"])
+        count -= 1
+        total_bytes -= entry.get("size_bytes", 0)
+
+    if evict_ids:
+        document_cache_collection.delete_many({"_id": {"$in": evict_ids}})
+        print(f"🧹 Document cache evicted {len(evict_ids)} entries")
+
+
+# ── Typed helpers ─────────────────────────────────────────────────────────
+def get_parsed(key: str) -> Optional[Tuple[str, str]]:
+    entry = _get("parse", key)
+    if not entry:
+        return None
+    return entry["text"], entry.get("parser_used", "unknown")
+
+
+def set_parsed(key: str, text: str, parser_used: str, ttl: Optional[int] = None) -> None:
+    _set("parse", key, {"text": text, "parser_used": parser_used}, len(text.encode("utf-8")), ttl)
+
+
+def get_insights(key: str) -> Optional[Tuple[dict, dict]]:
+    entry = _get("insights", key)
+    if not entry:
+        return None
+    return entry["raw"], entry.get("stats") or {}
+
+
+def set_insights(key: str, raw: dict, stats: dict) -> None:
+    size = len(str(raw)) + len(str(stats))
+    _set("insights", key, {"raw": raw, "stats": stats}, size)
+
+
+def get_pdf(key: str) -> Optional[bytes]:
+    entry = _get("pdf", key)
+    return bytes(entry["pdf"]) if entry else None
+
+
+def set_pdf(key: str, pdf_bytes: bytes) -> None:
+    _set("pdf", key, {"pdf": Binary(pdf_bytes)}, len(pdf_bytes))
+
+
+def clear_document_cache(kind: Optional[str] = None) -> int:
+    """Delete cached entries (optionally a single kind). Returns the count removed."""
+    query = {"kind": kind} if kind else {}
+    return document_cache_collection.delete_many(query).deleted_count
+
+
+def get_document_cache_stats() -> Dict[str, Any]:
+    by_kind = {
+        row["_id"]: {"entries": row["count"], "bytes": row["bytes"], "hits": row["hits"]}
+        for row in document_cache_collection.aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": "$kind",
+                        "count": {"$sum": 1},
+                        "bytes": {"$sum": "$size_bytes"},
+                        "hits": {"$sum": "$hits"},
+                    }
+                }
+            ]
+        )
+    }
+    return {
+        "enabled": DOC_INTEL_CACHE_ENABLED,
+        "ttl_seconds": DOC_INTEL_CACHE_TTL_SECONDS,
+        "max_entries": DOC_INTEL_CACHE_MAX_ENTRIES,
+        "max_bytes": DOC_INTEL_CACHE_MAX_BYTES,
+        "kinds": by_kind,
+    }
+
+
+def ensure_document_cache_indexes() -> None:
+    document_cache_collection.create_index([("kind", 1), ("key", 1)], unique=True)
+    document_cache_collection.create_index("expires_at", expireAfterSeconds=0)
+    document_cache_collection.create_index("last_accessed_at")
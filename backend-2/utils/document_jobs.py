@@ -0,0 +1,195 @@
+"""
+Background job runner for Document Intelligence.
+
+Analysis (Azure DI polling, Docling, LLM map-reduce, PDF rendering) is slow
+and fully synchronous, so it runs on a bounded thread pool instead of the
+event loop. Job state lives in the ``document_intel_jobs`` collection so any
+API worker can report progress / results; jobs expire after
+DOC_INTEL_JOB_TTL_SECONDS via a TTL index.
+
+Stages: queued → parsing → extracting → rendering → completed | failed
+
+Jobs run in-process, so a restart or worker crash strands them mid-stage.
+A job whose updated_at is older than DOC_INTEL_JOB_STALE_SECONDS is reported
+(and stored) as failed; a late stage write cannot revive it.
+"""
+
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from database import db
+from document_intelligence import (
+    InsightReport,
+    analyze_document_from_file,
+    analyze_document_from_url,
+    render_pdf_report,
+)
+
+document_jobs_collection = db.document_intel_jobs
+
+DOC_INTEL_JOB_WORKERS = int(os.getenv("DOC_INTEL_JOB_WORKERS", "4"))
+DOC_INTEL_JOB_TTL_SECONDS = int(os.getenv("DOC_INTEL_JOB_TTL_SECONDS", str(24 * 3600)))
+# No stage change for this long means the worker running the job is gone
+DOC_INTEL_JOB_STALE_SECONDS = int(os.getenv("DOC_INTEL_JOB_STALE_SECONDS", "900"))
+# Upper bound for one /jobs/{id}/events stream
+DOC_INTEL_JOB_STREAM_TIMEOUT_SECONDS = int(os.getenv("DOC_INTEL_JOB_STREAM_TIMEOUT_SECONDS", "1800"))
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+_executor = ThreadPoolExecutor(
+    max_workers=DOC_INTEL_JOB_WORKERS, thread_name_prefix="doc-intel-job"
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _set_stage(job_id: str, stage: str, **fields) -> None:
+    now = _now()
+    # A job already failed as stale stays failed
+    document_jobs_collection.update_one(
+        {"_id": job_id, "status": {"$nin": list(TERMINAL_STATUSES)}},
+        {
+            "$set": {
+                "stage": stage,
+                "status": fields.pop("status", "running"),
+                "updated_at": now,
+                **fields,
+            },
+            "$push": {"stages": {"stage": stage, "at": now}},
+        },
+    )
+
+
+def _run_job(
+    job_id: str,
+    file_bytes: Optional[bytes],
+    filename: Optional[str],
+    url: Optional[str],
+    question: str,
+    use_cache: bool,
+) -> None:
+    started = time.perf_counter()
+
+    def on_progress(stage: str) -> None:
+        _set_stage(job_id, stage)
+
+    try:
+        if file_bytes is not None:
+            report = analyze_document_from_file(
+                file_bytes, filename, question, use_cache=use_cache, on_progress=on_progress
+            )
+        else:
+            report = analyze_document_from_url(
+                url, question, use_cache=use_cache, on_progress=on_progress
+            )
+
+        # Render once up front so /jobs/{id}/pdf is served from the PDF cache.
+        _set_stage(job_id, "rendering")
+        render_pdf_report(report)
+
+        _set_stage(
+            job_id,
+            "completed",
+            status="completed",
+            result=report.model_dump(),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+        print(f"✅ Document Intelligence job {job_id} completed in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        print(f"❌ Document Intelligence job {job_id} failed: {detail}")
+        traceback.print_exc()
+        _set_stage(
+            job_id,
+            "failed",
+            status="failed",
+            error=str(detail),
+            duration_seconds=round(time.perf_counter() - started, 3),
+        )
+
+
+def submit_document_job(
+    file_bytes: Optional[bytes] = None,
+    filename: Optional[str] = None,
+    url: Optional[str] = None,
+    question: str = "",
+    use_cache: bool = True,
+) -> str:
+    """Queue an analysis job and return its id immediately."""
+    job_id = uuid.uuid4().hex
+    now = _now()
+    document_jobs_collection.insert_one(
+        {
+            "_id": job_id,
+            "doc_name": filename or url,
+            "question": question,
+            "status": "queued",
+            "stage": "queued",
+            "stages": [{"stage": "queued", "at": now}],
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=DOC_INTEL_JOB_TTL_SECONDS),
+        }
+    )
+    _executor.submit(_run_job, job_id, file_bytes, filename, url, question, use_cache)
+    return job_id
+
+
+def _fail_if_stale(job: Dict[str, Any]) -> Dict[str, Any]:
+    if job.get("status") in TERMINAL_STATUSES or not isinstance(job.get("updated_at"), datetime):
+        return job
+    now = _now()
+    if (now - job["updated_at"]).total_seconds() <= DOC_INTEL_JOB_STALE_SECONDS:
+        return job
+    error = f"Job stalled in stage '{job.get('stage')}' (worker restarted or crashed)"
+    stale = document_jobs_collection.find_one_and_update(
+        {"_id": job["_id"], "updated_at": job["updated_at"], "status": {"$nin": list(TERMINAL_STATUSES)}},
+        {
+            "$set": {"stage": "failed", "status": "failed", "error": error, "updated_at": now},
+            "$push": {"stages": {"stage": "failed", "at": now}},
+        },
+        projection={"expires_at": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    if stale:
+        print(f"⚠️  Document Intelligence job {job['_id']} marked failed: {error}")
+        return stale
+    # A stage write won the race; report what is stored now
+    return document_jobs_collection.find_one({"_id": job["_id"]}, {"expires_at": 0}) or job
+
+
+def get_document_job(job_id: str) -> Optional[Dict[str, Any]]:
+    job = document_jobs_collection.find_one({"_id": job_id}, {"expires_at": 0})
+    if not job:
+        return None
+    job = _fail_if_stale(job)
+    job["job_id"] = job.pop("_id")
+    for key in ("created_at", "updated_at"):
+        if isinstance(job.get(key), datetime):
+            job[key] = job[key].isoformat()
+    job["stages"] = [
+        {"stage": s["stage"], "at": s["at"].isoformat() if isinstance(s["at"], datetime) else s["at"]}
+        for s in job.get("stages", [])
+    ]
+    return job
+
+
+def get_document_job_pdf(job_id: str) -> Optional[bytes]:
+    """PDF for a completed job — served from the content-hash PDF cache."""
+    job = document_jobs_collection.find_one({"_id": job_id, "status": "completed"}, {"result": 1})
+    if not job or not job.get("result"):
+        return None
+    return render_pdf_report(InsightReport(**job["result"]))
+
+
+def ensure_document_job_indexes() -> None:
+    document_jobs_collection.create_index("expires_at", expireAfterSeconds=0)
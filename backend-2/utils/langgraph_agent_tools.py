@@ -11,8 +11,10 @@ import smtplib
 import os
 
 import mimetypes
+import hashlib
 import json
 import re
+from contextvars import ContextVar
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -33,23 +35,44 @@ from utils.notification_utils import (
 
 logger = logging.getLogger(__name__)
 
-# ─── Global context for tools (set per request) ───────────────────────────────
-_tool_context = {}
+# ─── Per-request context for tools ────────────────────────────────────────────
+# A ContextVar rather than a module global: the compiled agent is shared across
+# concurrent requests, and LangChain copies the context into tool executor threads.
+_tool_context: ContextVar[dict] = ContextVar("langgraph_tool_context", default={})
 
 
-def set_tool_context(user_id: str, user_email: str, user_role: str):
+def set_tool_context(
+    user_id: str, user_email: str, user_role: str, conversation_id: Optional[str] = None
+):
     """Set context that tools can access."""
-    global _tool_context
-    _tool_context = {
-        "user_id": user_id,
-        "user_email": user_email,
-        "user_role": user_role,
-    }
+    _tool_context.set(
+        {
+            "user_id": user_id,
+            "user_email": user_email,
+            "user_role": user_role,
+            "conversation_id": conversation_id,
+        }
+    )
 
 
 def get_tool_context():
     """Get current tool context."""
-    return _tool_context
+    return _tool_context.get()
+
+
+def _tool_idempotency_key(tool_name: str, *parts) -> str:
+    """
+    Idempotency key for tasks a tool creates. The same tool call repeated in
+    one conversation (an LLM retry) maps to the same keys, so the retry gets
+    the tasks the first call created instead of duplicates. Without a
+    conversation the scope is the user and the current UTC day.
+    """
+    ctx = get_tool_context()
+    scope = ctx.get("conversation_id") or (
+        f"{ctx.get('user_id')}:{datetime.utcnow().strftime('%Y-%m-%d')}"
+    )
+    raw = "|".join([tool_name, scope, *[str(p).strip().lower() for p in parts]])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
 
 
 import requests
@@ -840,7 +863,7 @@ def create_multiple_tasks_tool(
         Summary of created tasks
     """
     try:
-        from controllers.agent_task_controller import agent_create_task_sync
+        from controllers.agent_task_controller import agent_bulk_create_tasks_sync
         from utils.langgraph_agent_automation import resolve_project_id
 
         ctx = get_tool_context()
@@ -855,26 +878,36 @@ def create_multiple_tasks_tool(
         if not task_titles:
             return "❌ No tasks to create."
 
-        created = []
-        failed = []
-
+        # One batch; a retried call maps each line to the same key
+        seen = {}
+        items = []
         for title in task_titles:
-            try:
-                result = agent_create_task_sync(
-                    requesting_user=user_email,
-                    title=title,
-                    project_id=project_id,
-                    user_id=user_id,
-                    status="To Do",
-                    issue_type="task",
-                )
-                created.append(result.get("ticket_id", title))
-            except Exception as e:
-                failed.append(f"{title}: {str(e)}")
+            seen[title.lower()] = seen.get(title.lower(), 0) + 1
+            items.append(
+                {
+                    "title": title,
+                    "status": "To Do",
+                    "issue_type": "task",
+                    "idempotency_key": _tool_idempotency_key(
+                        "create_multiple_tasks", project_id, title, seen[title.lower()]
+                    ),
+                }
+            )
+
+        result = agent_bulk_create_tasks_sync(
+            requesting_user=user_email,
+            project_id=project_id,
+            user_id=user_id,
+            tasks=items,
+        )
+        created = [t["ticket_id"] or task_titles[t["index"]] for t in result["created_tasks"]]
+        failed = [f"{e['title']}: {e['error']}" for e in result["errors"]]
 
         msg = f"✅ Created {len(created)} tasks in {project_name}"
         if created:
             msg += f"\nTickets: {', '.join(created)}"
+        if result["replayed_count"]:
+            msg += f"\n(ℹ️ {result['replayed_count']} already existed from an earlier attempt)"
         if failed:
             msg += f"\n❌ Failed ({len(failed)}): {', '.join(failed[:3])}"
 
@@ -1137,6 +1170,7 @@ def delete_task_tool(task_identifier: str) -> str:
         Success message
     """
     try:
+        from models.task import Task
         from utils.langgraph_agent_automation import find_task_by_title_or_id
 
         ctx = get_tool_context()
@@ -1146,7 +1180,8 @@ def delete_task_tool(task_identifier: str) -> str:
         if not task:
             return f"❌ Task '{task_identifier}' not found."
 
-        db.tasks.delete_one({"_id": ObjectId(task["_id"])})
+        # Model delete also drops the activity buckets and publishes the event
+        Task.delete(str(task["_id"]))
         return f"✅ Task '{task['title']}' deleted successfully"
 
     except Exception as e:
@@ -1360,9 +1395,12 @@ def list_sprints_tool(
         if not sprints:
             return "No sprints found."
 
+        from utils.sprint_stats import get_sprint_stats_map
+
+        stats = get_sprint_stats_map(sprint["_id"] for sprint in sprints)
         result = f"Found {len(sprints)} sprint(s):\n\n"
         for sprint in sprints:
-            task_count = db.tasks.count_documents({"sprint_id": sprint["_id"]})
+            task_count = stats[str(sprint["_id"])]["total_tasks"]
             result += (
                 f"• {sprint.get('name')} - Status: {sprint.get('status', 'planned')}\n"
             )
@@ -2369,7 +2407,7 @@ def breakdown_epic_tool(
         Return the result ONLY as a JSON list of objects, each with:
         "title": (string)
         "description": (string, 1-2 sentences of detail)
-        "priority": (Low, Medium, High, Critical)
+        "priority": (Low, Medium, High)
         
         ONLY return valid JSON array.
         """
@@ -2378,7 +2416,7 @@ def breakdown_epic_tool(
         content = response.content.strip().replace("```json", "").replace("```", "")
         tasks_data = json.loads(content)
 
-        from controllers.agent_task_controller import agent_create_task_sync
+        from controllers.agent_task_controller import agent_bulk_create_tasks_sync
         from utils.langgraph_agent_automation import resolve_project_id
 
         ctx = get_tool_context()
@@ -2389,24 +2427,38 @@ def breakdown_epic_tool(
         if not pid:
             return f"❌ Project '{project_name}' not found. Epic breakdown aborted."
 
+        # Keyed by epic and position: a retried breakdown returns the first run's tasks
+        items = [
+            {
+                "title": t["title"],
+                "description": t.get("description", ""),
+                "priority": "High" if t.get("priority") == "Critical" else t.get("priority", "Medium"),
+                "status": "To Do",
+                "issue_type": "task",
+                "idempotency_key": _tool_idempotency_key(
+                    "breakdown_epic", pid, epic_title, epic_description, index
+                ),
+            }
+            for index, t in enumerate(tasks_data)
+        ]
+        result = agent_bulk_create_tasks_sync(
+            requesting_user=user_email,
+            project_id=pid,
+            user_id=user_id,
+            tasks=items,
+        )
+
         results = []
-        for t in tasks_data:
-            try:
-                res = agent_create_task_sync(
-                    requesting_user=user_email,
-                    title=t["title"],
-                    project_id=pid,
-                    user_id=user_id,
-                    description=t.get("description", ""),
-                    priority=t.get("priority", "Medium"),
-                    status="To Do",
-                    issue_type="task",
-                )
+        created = {t["index"]: t for t in result["created_tasks"]}
+        failed = {e["index"]: e["error"] for e in result["errors"]}
+        for index, t in enumerate(tasks_data):
+            if index in created:
+                task = created[index]
                 results.append(
-                    f"• ✅ {t['title']} (Ticket: {res.get('ticket_id', 'N/A')})"
+                    f"• ✅ {task['task'].get('title', t['title'])} (Ticket: {task.get('ticket_id') or 'N/A'})"
                 )
-            except Exception as task_err:
-                results.append(f"• ❌ Failed to create '{t['title']}': {str(task_err)}")
+            else:
+                results.append(f"• ❌ Failed to create '{t['title']}': {failed.get(index)}")
 
         return (
             f"🚀 **Epic Breakdown Complete for '{epic_title}'**\n\nGenerated {len(tasks_data)} tasks in project '{project_name}':\n"
@@ -2512,52 +2564,42 @@ def auto_triage_task_tool(task_title: str, task_description: str) -> str:
 
 
 @tool
-def search_project_knowledge_tool(query: str) -> str:
+def search_project_knowledge_tool(query: str, page: int = 1) -> str:
     """
     Search across historical tasks, project descriptions, and comments for specific technical
     solutions, previous decisions, or historical context. Used for 'Knowledge Retrieval'.
+
+    Args:
+        query: Keywords or a question describing what to look for
+        page: Result page (6 results per page), for "show more"
     """
     try:
+        from utils.task_search import search_tasks
+
         ctx = get_tool_context()
         user_id = ctx.get("user_id")
 
-        # Resolve projects accessible by user
-        projects = list(
-            db.projects.find(
-                {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]}
-            )
-        )
-        pids = [str(p["_id"]) for p in projects]
-
-        # Regex search in tasks for similar patterns (Hybrid search)
-        tasks = list(
-            db.tasks.find(
-                {
-                    "project_id": {"$in": pids},
-                    "$or": [
-                        {"title": {"$regex": query, "$options": "i"}},
-                        {"description": {"$regex": query, "$options": "i"}},
-                        {"comments.text": {"$regex": query, "$options": "i"}},
-                    ],
-                }
-            )
-            .sort("updated_at", -1)
-            .limit(6)
-        )
+        found = search_tasks(user_id, query, page=page, page_size=6)
+        tasks = found["results"]
 
         if not tasks:
             return f"No historical knowledge found for your query: '{query}'"
 
-        result = f"📚 **Historical Knowledge & Context Found**\nFound {len(tasks)} relevant items from your project history:\n\n"
+        result = (
+            f"📚 **Historical Knowledge & Context Found**\n"
+            f"Showing {len(tasks)} of {found['total']} relevant items from your project history "
+            f"(page {found['page']}):\n\n"
+        )
         for t in tasks:
-            result += (
-                f"• **[{t.get('ticket_id', 'N/A')}] {t['title']}** ({t['status']})\n"
-            )
-            if t.get("description"):
-                snippet = t["description"][:120].replace("\n", " ") + "..."
-                result += f"  > {snippet}\n"
+            # The title already bolds its matched terms; bold only the ticket id
+            result += f"• **[{t.get('ticket_id') or 'N/A'}]** {t['title']} ({t['status']})\n"
+            if t.get("snippet"):
+                prefix = "💬 " if t["matched_in"] == "comment" else ""
+                result += f"  > {prefix}{t['snippet']}\n"
             result += "\n"
 
+        if found["total"] > found["page"] * found["page_size"]:
+            result += f"➡️ More results available — ask for page {found['page'] + 1}.\n"
         result += (
             "💡 *Tip: You can ask me to summarize a specific ticket for more details.*"
         )
@@ -9,18 +9,30 @@ Provides advanced agentic automation with:
 """
 
 import os
+import hashlib
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Optional, Dict, Any, List
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 from urllib.parse import urlparse, parse_qs
 from openai import NotFoundError, BadRequestError
 from langchain_openai import AzureChatOpenAI
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.prebuilt import create_react_agent
 
+from database import db
+from utils.response_cache import (
+    is_read_only_turn,
+    lookup_response,
+    response_cache_key,
+    store_response,
+)
+
 load_dotenv(override=True)
 
 logger = logging.getLogger(__name__)
@@ -42,6 +54,12 @@ AZURE_OPENAI_API_VERSION_FALLBACKS = [
 
 LANGGRAPH_AGENT_TIMEOUT = int(os.getenv("LANGGRAPH_AGENT_TIMEOUT", "120"))
 LANGGRAPH_TOOLS_POLICY_VERSION = "readonly-v1"
+# "mongo" persists threads across restarts/workers; "memory" keeps MemorySaver.
+LANGGRAPH_CHECKPOINTER = os.getenv("LANGGRAPH_CHECKPOINTER", "mongo").strip().lower()
+LANGGRAPH_MAX_CACHED_AGENTS = int(os.getenv("LANGGRAPH_MAX_CACHED_AGENTS", "32"))
+LANGGRAPH_HISTORY_TTL_SECONDS = int(
+    os.getenv("LANGGRAPH_HISTORY_TTL_SECONDS", str(14 * 24 * 3600))
+)
 LANGGRAPH_CONTENT_FILTER_RETRY = os.getenv(
     "LANGGRAPH_CONTENT_FILTER_RETRY", "true"
 ).strip().lower() in {"1", "true", "yes", "on"}
@@ -106,13 +124,26 @@ You have access to advanced tools for:
 
 Remember: You can see the user's current tasks, projects, team context, and can perform read-only GitHub analysis on their behalf. Use this information to provide personalized, context-aware assistance."""
 
+# Used for the single content-filter retry; deliberately omits user context.
+LANGGRAPH_SANITIZED_SYSTEM_PROMPT = (
+    "You are a DOIT project management assistant. "
+    "Execute legitimate productivity requests with available tools. "
+    "If details are unclear, ask a concise clarification question."
+)
+
 # ─── Lazy singletons ──────────────────────────────────────────────────────────
 _llm = None  # Active LLM client
 _llm_provider = None  # Active provider name
 _llm_model = None  # Active model/deployment name
 _llm_api_version = None  # Active Azure API version (if provider=azure)
-_checkpointer = None  # LangGraph memory checkpointer
-_agents = {}  # Cache of agents per user
+_checkpointer = None  # LangGraph checkpointer (Mongo or in-memory)
+# Compiled agents, LRU-bounded, one per (model, api-version, tool set).
+# Conversation state lives in the checkpointer (thread_id) and user context is
+# injected per request through the run config, so agents are shared by everyone.
+_agents: "OrderedDict[str, Any]" = OrderedDict()
+_agents_lock = threading.Lock()
+_bound_llms: Dict[str, Any] = {}  # llm.bind_tools(...) per (api-version, tool set)
+_turn_timings = {"cold": deque(maxlen=50), "warm": deque(maxlen=200)}
 
 # ─── Client initialization ──────────────────────────────────────────────────
 
@@ -231,6 +262,7 @@ def _try_rotate_azure_api_version() -> bool:
             _llm_api_version = candidate
             # Existing cached agents hold old model objects; clear to force rebind.
             _agents.clear()
+            _bound_llms.clear()
             logger.warning(
                 "LangGraph Azure retry: switched api-version to %s for deployment=%s endpoint=%s",
                 candidate,
@@ -459,39 +491,219 @@ def get_llm():
 
 
 def get_checkpointer():
-    """Return (and lazily init) the LangGraph memory checkpointer."""
+    """Return (and lazily init) the LangGraph checkpointer."""
     global _checkpointer
     if _checkpointer is not None:
         return _checkpointer
 
-    _checkpointer = MemorySaver()
-    logger.info("✅ LangGraph MemorySaver ready")
+    if LANGGRAPH_CHECKPOINTER == "memory":
+        _checkpointer = MemorySaver()
+        logger.info("✅ LangGraph MemorySaver ready")
+    else:
+        from utils.langgraph_checkpointer import MongoCheckpointSaver
+
+        _checkpointer = MongoCheckpointSaver()
+        logger.info("✅ LangGraph Mongo checkpointer ready")
     return _checkpointer
 
 
-# ─── In-memory chat history (per conversation) ──────────────────────────────
-_chat_histories: Dict[str, List[Dict[str, str]]] = {}
+def _short_hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+
+
+def _tools_signature(tools: List[Any]) -> str:
+    tool_names = ",".join(sorted(getattr(t, "name", str(t)) for t in tools or []))
+    return _short_hash(tool_names)
+
+
+def _agent_cache_key(tools: List[Any]) -> str:
+    return ":".join(
+        [
+            LANGGRAPH_TOOLS_POLICY_VERSION,
+            str(_llm_model),
+            str(_llm_api_version),
+            _tools_signature(tools),
+        ]
+    )
+
+
+def _render_context_summary(context: Optional[Dict[str, Any]]) -> str:
+    if not context:
+        return ""
+    summary = f"""
+
+Current User Context:
+- User: {context.get("user_name")} ({context.get("user_role")})
+- Tasks: {context.get("tasks_total")} total, {context.get("tasks_overdue")} overdue, {context.get("tasks_due_soon")} due soon
+- Projects: {context.get("projects_total")}
+- Active Sprints: {context.get("sprints_active")}
+- Completed this week: {context.get("tasks_done_week")}
+
+Recent Tasks:
+"""
+    for task in context.get("recent_tasks", [])[:5]:
+        summary += f"- [{task.get('ticket')}] {task.get('title')} ({task.get('status')})\n"
+    return summary
+
+
+def _agent_prompt(state, config) -> List[Any]:
+    """
+    Build the model input for every agent step from the run config, so one
+    compiled graph serves all users. ``user_context`` is passed as a dict so it
+    is not copied into checkpoint metadata.
+    """
+    configurable = (config or {}).get("configurable", {})
+    if configurable.get("prompt_variant") == "sanitized":
+        system_prompt = LANGGRAPH_SANITIZED_SYSTEM_PROMPT
+    else:
+        system_prompt = LANGGRAPH_AGENT_SYSTEM_PROMPT + _render_context_summary(
+            configurable.get("user_context")
+        )
+    messages = state["messages"] if isinstance(state, dict) else state.messages
+    return [SystemMessage(content=system_prompt)] + list(messages)
+
+
+def _get_bound_llm(llm, tools: List[Any]):
+    """Bind the tool schemas once per (api-version, tool set) instead of per compile."""
+    key = f"{_llm_api_version}:{_tools_signature(tools)}"
+    bound = _bound_llms.get(key)
+    if bound is None:
+        bound = llm.bind_tools(tools)
+        _bound_llms[key] = bound
+    return bound
+
+
+def _get_or_create_agent(llm, tools: List[Any]):
+    """Return the shared compiled ReAct agent, compiling it on a cache miss."""
+    key = _agent_cache_key(tools)
+    with _agents_lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return agent
+
+    started = time.perf_counter()
+    agent = create_react_agent(
+        model=_get_bound_llm(llm, tools),
+        tools=tools,
+        checkpointer=get_checkpointer(),
+        prompt=_agent_prompt,
+    )
+    with _agents_lock:
+        _agents[key] = agent
+        _agents.move_to_end(key)
+        while len(_agents) > LANGGRAPH_MAX_CACHED_AGENTS:
+            _agents.popitem(last=False)
+    logger.info(
+        "✅ Compiled LangGraph agent %s in %.0fms (%d cached)",
+        key,
+        (time.perf_counter() - started) * 1000,
+        len(_agents),
+    )
+    return agent
+
+
+def _record_turn_timing(cold: bool, seconds: float) -> None:
+    _turn_timings["cold" if cold else "warm"].append(seconds)
+
+
+def _timing_summary(samples) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"turns": 0}
+    return {
+        "turns": len(ordered),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+def get_langgraph_state_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {
+        "cached_agents": len(_agents),
+        "max_cached_agents": LANGGRAPH_MAX_CACHED_AGENTS,
+        "bound_tool_sets": len(_bound_llms),
+        "checkpointer": LANGGRAPH_CHECKPOINTER,
+        "turn_latency": {
+            "cold": _timing_summary(_turn_timings["cold"]),
+            "warm": _timing_summary(_turn_timings["warm"]),
+        },
+    }
+    if LANGGRAPH_CHECKPOINTER != "memory":
+        from utils.langgraph_checkpointer import get_checkpoint_stats
+
+        try:
+            stats["checkpoints"] = get_checkpoint_stats()
+        except Exception as exc:
+            stats["checkpoints"] = {"error": str(exc)}
+    return stats
+
+
+# ─── Chat history (per conversation, persisted) ─────────────────────────────
+chat_histories_collection = db.langgraph_chat_histories
 MAX_HISTORY = 20  # keep last N turns
 
 
 def get_chat_history(conversation_id: str) -> List[Dict[str, str]]:
     """Get chat history for a conversation."""
-    return _chat_histories.get(conversation_id, [])
+    doc = chat_histories_collection.find_one(
+        {"_id": conversation_id}, {"messages": 1}
+    )
+    return doc.get("messages", []) if doc else []
 
 
 def append_to_history(conversation_id: str, role: str, content: str):
-    """Append a message to conversation history."""
-    history = _chat_histories.setdefault(conversation_id, [])
-    history.append({"role": role, "content": content})
-
-    # Trim to MAX_HISTORY turns
-    if len(history) > MAX_HISTORY * 2:
-        _chat_histories[conversation_id] = history[-(MAX_HISTORY * 2) :]
+    """Append a message to conversation history, trimmed to MAX_HISTORY turns."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    chat_histories_collection.update_one(
+        {"_id": conversation_id},
+        {
+            "$push": {
+                "messages": {
+                    "$each": [{"role": role, "content": content}],
+                    "$slice": -(MAX_HISTORY * 2),
+                }
+            },
+            "$set": {
+                "updated_at": now,
+                "expires_at": now + timedelta(seconds=LANGGRAPH_HISTORY_TTL_SECONDS),
+            },
+        },
+        upsert=True,
+    )
 
 
 def clear_chat_history(conversation_id: str):
-    """Clear chat history for a conversation."""
-    _chat_histories.pop(conversation_id, None)
+    """Clear chat history and agent memory (checkpointed thread) for a conversation."""
+    chat_histories_collection.delete_one({"_id": conversation_id})
+    try:
+        get_checkpointer().delete_thread(conversation_id)
+    except Exception as exc:
+        logger.warning("LangGraph thread cleanup failed for %s: %s", conversation_id, exc)
+
+
+def ensure_langgraph_state_indexes() -> None:
+    from utils.langgraph_checkpointer import ensure_langgraph_checkpoint_indexes
+
+    ensure_langgraph_checkpoint_indexes()
+    chat_histories_collection.create_index("expires_at", expireAfterSeconds=0)
+
+
+def _record_cached_turn(
+    agent, config: Dict[str, Any], conversation_id: str, message: str, response_text: str
+) -> None:
+    """Write a cache-served turn into history and the agent thread so later
+    follow-ups see it exactly as if the agent had answered."""
+    append_to_history(conversation_id, "user", message)
+    append_to_history(conversation_id, "assistant", response_text)
+    try:
+        agent.update_state(
+            config,
+            {"messages": [HumanMessage(content=message), AIMessage(content=response_text)]},
+            as_node="agent",
+        )
+    except Exception as exc:
+        logger.warning("LangGraph cached-turn state update failed for %s: %s", conversation_id, exc)
 
 
 # ─── Core: send message to LangGraph agent ─────────────────────────────────
@@ -524,46 +736,45 @@ def send_message_to_langgraph_agent(
         }
     """
     try:
+        turn_started = time.perf_counter()
         llm = get_llm()
-        checkpointer = get_checkpointer()
 
-        # ── Build context-enriched system prompt ───────────────────────────
-        system_prompt = LANGGRAPH_AGENT_SYSTEM_PROMPT
+        # ── Retrieve (or compile) the shared agent ─────────────────────────
+        cold = _agent_cache_key(tools) not in _agents
+        agent = _get_or_create_agent(llm, tools)
 
-        if context:
-            context_summary = f"""
-
-Current User Context:
-- User: {context.get("user_name")} ({context.get("user_role")})
-- Tasks: {context.get("tasks_total")} total, {context.get("tasks_overdue")} overdue, {context.get("tasks_due_soon")} due soon
-- Projects: {context.get("projects_total")}
-- Active Sprints: {context.get("sprints_active")}
-- Completed this week: {context.get("tasks_done_week")}
-
-Recent Tasks:
-"""
-            for task in context.get("recent_tasks", [])[:5]:
-                context_summary += f"- [{task.get('ticket')}] {task.get('title')} ({task.get('status')})\n"
-
-            system_prompt += context_summary
-
-        # ── Create or retrieve agent for this conversation ─────────────────
-        agent_key = f"{LANGGRAPH_TOOLS_POLICY_VERSION}_{user_id}_{conversation_id}"
-
-        if agent_key not in _agents:
-            agent = create_react_agent(
-                model=llm,
-                tools=tools,
-                checkpointer=checkpointer,
-                prompt=system_prompt,
-            )
-            _agents[agent_key] = agent
-            logger.info(f"✅ Created new LangGraph agent for {agent_key}")
-        else:
-            agent = _agents[agent_key]
+        # ── Invoke agent with message + per-request context ────────────────
+        config = {
+            "configurable": {
+                "thread_id": conversation_id,
+                "user_context": context or {},
+            }
+        }
 
-        # ── Invoke agent with message ──────────────────────────────────────
-        config = {"configurable": {"thread_id": conversation_id}}
+        # ── Response cache: repeated read-only questions skip the agent ────
+        cache_handle = response_cache_key(
+            "langgraph",
+            user_id,
+            message,
+            f"{_llm_model}:{_tools_signature(tools)}:{int(bool(context))}",
+            has_history=bool(get_chat_history(conversation_id)),
+        )
+        cached = lookup_response(cache_handle)
+        if cached:
+            _record_cached_turn(agent, config, conversation_id, message, cached["content"])
+            return {
+                "success": True,
+                "response": cached["content"],
+                "model": _llm_model,
+                "provider": _llm_provider,
+                "tool_calls": [],
+                "tokens": {},
+                "cached": True,
+                "timings": {
+                    "cold": cold,
+                    "turn_ms": round((time.perf_counter() - turn_started) * 1000, 1),
+                },
+            }
 
         invoke_payload = {"messages": [HumanMessage(content=message)]}
         try:
@@ -574,14 +785,8 @@ Recent Tasks:
                 logger.warning(
                     "LangGraph Azure 404 recovered via api-version fallback retry"
                 )
-                llm = get_llm()
-                agent = create_react_agent(
-                    model=llm,
-                    tools=tools,
-                    checkpointer=checkpointer,
-                    prompt=system_prompt,
-                )
-                _agents[agent_key] = agent
+                cold = True
+                agent = _get_or_create_agent(get_llm(), tools)
                 result = agent.invoke(invoke_payload, config=config)
             else:
                 raise exc
@@ -591,25 +796,19 @@ Recent Tasks:
                     "LangGraph Azure content filter hit (jailbreak=%s). Retrying once with sanitized prompt.",
                     _is_jailbreak_heuristic_trigger(exc),
                 )
-                sanitized_prompt = (
-                    "You are a DOIT project management assistant. "
-                    "Execute legitimate productivity requests with available tools. "
-                    "If details are unclear, ask a concise clarification question."
-                )
-                retry_agent = create_react_agent(
-                    model=llm,
-                    tools=tools,
-                    checkpointer=checkpointer,
-                    prompt=sanitized_prompt,
-                )
+                retry_config = {
+                    "configurable": {
+                        **config["configurable"],
+                        "prompt_variant": "sanitized",
+                    }
+                }
                 retry_payload = {
                     "messages": [
                         HumanMessage(content=_build_sanitized_retry_message(message))
                     ]
                 }
                 try:
-                    result = retry_agent.invoke(retry_payload, config=config)
-                    _agents[agent_key] = retry_agent
+                    result = agent.invoke(retry_payload, config=retry_config)
                 except BadRequestError as retry_exc:
                     if _is_azure_content_filter_error(retry_exc):
                         direct_fallback = _try_direct_task_create_fallback(
@@ -670,14 +869,30 @@ Recent Tasks:
 
         # ── Token estimation (if available) ────────────────────────────────
         tokens = {}
-        if hasattr(last_message, "usage_metadata"):
-            usage = last_message.usage_metadata
+        usage = getattr(last_message, "usage_metadata", None)
+        if usage:
             tokens = {
                 "prompt": usage.get("input_tokens", 0),
                 "completion": usage.get("output_tokens", 0),
                 "total": usage.get("total_tokens", 0),
             }
 
+        # Cache the answer only when this turn's tools were all read-only
+        turn_start = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+        turn_tools = [
+            tc.get("name")
+            for m in messages[turn_start:]
+            for tc in (getattr(m, "tool_calls", None) or [])
+        ]
+        if is_read_only_turn(turn_tools):
+            store_response(cache_handle, response_text, tokens)
+
+        turn_seconds = time.perf_counter() - turn_started
+        _record_turn_timing(cold, turn_seconds)
+
         return {
             "success": True,
             "response": response_text,
@@ -685,6 +900,7 @@ Recent Tasks:
             "provider": _llm_provider,
             "tool_calls": tool_calls,
             "tokens": tokens,
+            "timings": {"cold": cold, "turn_ms": round(turn_seconds * 1000, 1)},
         }
 
     except Exception as exc:
@@ -0,0 +1,316 @@
+"""
+MongoDB-backed LangGraph checkpointer.
+
+Replaces the in-process MemorySaver so agent threads survive restarts and are
+shared across API workers. Two collections:
+  - ``langgraph_checkpoints``       → one document per checkpoint
+                                      (serialized checkpoint + metadata)
+  - ``langgraph_checkpoint_writes`` → pending writes attached to a checkpoint
+
+Bounded storage:
+  - only the newest LANGGRAPH_CHECKPOINT_KEEP checkpoints of a thread are kept
+    (older ones and their writes are compacted away after every put)
+  - every document carries ``expires_at``; a Mongo TTL index prunes threads
+    that have been idle for LANGGRAPH_THREAD_TTL_SECONDS
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from bson import Binary
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from pymongo import DESCENDING, UpdateOne
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+checkpoints_collection = db.langgraph_checkpoints
+checkpoint_writes_collection = db.langgraph_checkpoint_writes
+
+LANGGRAPH_THREAD_TTL_SECONDS = int(
+    os.getenv("LANGGRAPH_THREAD_TTL_SECONDS", str(14 * 24 * 3600))
+)
+# ReAct turns only ever resume from the latest checkpoint; a few parents are
+# kept so get_state_history() stays useful for debugging.
+LANGGRAPH_CHECKPOINT_KEEP = int(os.getenv("LANGGRAPH_CHECKPOINT_KEEP", "5"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _expires_at() -> datetime:
+    return _now() + timedelta(seconds=LANGGRAPH_THREAD_TTL_SECONDS)
+
+
+class MongoCheckpointSaver(BaseCheckpointSaver):
+    """Synchronous pymongo checkpointer; async methods delegate to the sync ones."""
+
+    def __init__(self, checkpoints=None, writes=None, keep: Optional[int] = None):
+        super().__init__()
+        self.checkpoints = checkpoints if checkpoints is not None else checkpoints_collection
+        self.writes = writes if writes is not None else checkpoint_writes_collection
+        self.keep = keep or LANGGRAPH_CHECKPOINT_KEEP
+
+    # ── Serialization helpers ─────────────────────────────────────────────
+    def _dump(self, value: Any) -> Tuple[str, Binary]:
+        type_, data = self.serde.dumps_typed(value)
+        return type_, Binary(data)
+
+    def _load(self, type_: str, data: Any) -> Any:
+        return self.serde.loads_typed((type_, bytes(data)))
+
+    def _load_writes(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> list:
+        cursor = self.writes.find(
+            {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        ).sort([("task_id", 1), ("idx", 1)])
+        return [
+            (w["task_id"], w["channel"], self._load(w["type"], w["value"]))
+            for w in cursor
+        ]
+
+    def _to_tuple(self, doc: Dict[str, Any]) -> CheckpointTuple:
+        thread_id = doc["thread_id"]
+        checkpoint_ns = doc["checkpoint_ns"]
+        parent_id = doc.get("parent_checkpoint_id")
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": doc["checkpoint_id"],
+                }
+            },
+            checkpoint=self._load(doc["type"], doc["checkpoint"]),
+            metadata=self._load(doc["metadata_type"], doc["metadata"]),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=self._load_writes(
+                thread_id, checkpoint_ns, doc["checkpoint_id"]
+            ),
+        )
+
+    # ── BaseCheckpointSaver API ───────────────────────────────────────────
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        query = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+        }
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query["checkpoint_id"] = checkpoint_id
+        doc = self.checkpoints.find_one(query, sort=[("checkpoint_id", DESCENDING)])
+        return self._to_tuple(doc) if doc else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query: Dict[str, Any] = {}
+        if config:
+            configurable = config["configurable"]
+            query["thread_id"] = configurable["thread_id"]
+            if configurable.get("checkpoint_ns") is not None:
+                query["checkpoint_ns"] = configurable["checkpoint_ns"]
+            if checkpoint_id := get_checkpoint_id(config):
+                query["checkpoint_id"] = checkpoint_id
+        if before and (before_id := get_checkpoint_id(before)):
+            query.setdefault("checkpoint_id", {})
+            if isinstance(query["checkpoint_id"], dict):
+                query["checkpoint_id"]["$lt"] = before_id
+
+        remaining = limit
+        cursor = self.checkpoints.find(query).sort("checkpoint_id", DESCENDING)
+        for doc in cursor:
+            if filter:
+                metadata = self._load(doc["metadata_type"], doc["metadata"])
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                remaining -= 1
+            yield self._to_tuple(doc)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = checkpoint["id"]
+
+        type_, data = self._dump(checkpoint)
+        metadata_type, metadata_data = self._dump(
+            get_checkpoint_metadata(config, metadata)
+        )
+        self.checkpoints.update_one(
+            {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            },
+            {
+                "$set": {
+                    "parent_checkpoint_id": configurable.get("checkpoint_id"),
+                    "type": type_,
+                    "checkpoint": data,
+                    "metadata_type": metadata_type,
+                    "metadata": metadata_data,
+                    "updated_at": _now(),
+                    "expires_at": _expires_at(),
+                }
+            },
+            upsert=True,
+        )
+        self._compact(thread_id, checkpoint_ns)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        base = {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": configurable["checkpoint_id"],
+            "task_id": task_id,
+        }
+        expires_at = _expires_at()
+        operations = []
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            type_, data = self._dump(value)
+            fields = {
+                "channel": channel,
+                "type": type_,
+                "value": data,
+                "task_path": task_path,
+                "expires_at": expires_at,
+            }
+            # Special channels (errors, interrupts, ...) overwrite; regular
+            # writes are first-writer-wins, matching MemorySaver.
+            update = {"$set": fields} if write_idx < 0 else {"$setOnInsert": fields}
+            operations.append(
+                UpdateOne({**base, "idx": write_idx}, update, upsert=True)
+            )
+        if operations:
+            self.writes.bulk_write(operations, ordered=False)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.checkpoints.delete_many({"thread_id": thread_id})
+        self.writes.delete_many({"thread_id": thread_id})
+
+    def _compact(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop all but the newest ``keep`` checkpoints of a thread (and their writes)."""
+        stale = [
+            doc["checkpoint_id"]
+            for doc in self.checkpoints.find(
+                {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns},
+                {"checkpoint_id": 1},
+            )
+            .sort("checkpoint_id", DESCENDING)
+            .skip(self.keep)
+        ]
+        if not stale:
+            return
+        scope = {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": {"$in": stale},
+        }
+        self.checkpoints.delete_many(scope)
+        self.writes.delete_many(scope)
+
+    # ── Async API (pymongo is sync; the agent is invoked from a threadpool) ──
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+def get_checkpoint_stats() -> Dict[str, Any]:
+    return {
+        "threads": len(checkpoints_collection.distinct("thread_id")),
+        "checkpoints": checkpoints_collection.estimated_document_count(),
+        "pending_writes": checkpoint_writes_collection.estimated_document_count(),
+        "keep_per_thread": LANGGRAPH_CHECKPOINT_KEEP,
+        "thread_ttl_seconds": LANGGRAPH_THREAD_TTL_SECONDS,
+    }
+
+
+def ensure_langgraph_checkpoint_indexes() -> None:
+    checkpoints_collection.create_index(
+        [("thread_id", 1), ("checkpoint_ns", 1), ("checkpoint_id", -1)], unique=True
+    )
+    checkpoints_collection.create_index("expires_at", expireAfterSeconds=0)
+    checkpoint_writes_collection.create_index(
+        [
+            ("thread_id", 1),
+            ("checkpoint_ns", 1),
+            ("checkpoint_id", 1),
+            ("task_id", 1),
+            ("idx", 1),
+        ],
+        unique=True,
+    )
+    checkpoint_writes_collection.create_index("expires_at", expireAfterSeconds=0)
@@ -12,7 +12,6 @@ Ollama: https://ollama.ai  →  ollama pull llama3
 """
 
 import os
-import time
 import logging
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
@@ -160,112 +159,17 @@ def get_vector_index():
 
 def index_user_context(user_id: str, context: Dict[str, Any]) -> bool:
     """
-    Embed and store the user's current DOIT context (tasks, projects, sprints)
-    into ChromaDB so the RAG query engine can retrieve relevant chunks.
+    Synchronously bring the user's DOIT documents (summary, tasks, projects,
+    sprints) in ChromaDB up to date. Only documents whose content hash changed
+    are re-embedded — see utils.local_rag_indexer.
 
-    Called before each message so the index always has fresh data.
-    Returns False if RAG indexing fails, but this is non-fatal — the agent
-    will still work without RAG.
+    The chat path does not call this; it queues the sync with
+    schedule_context_index() so a message never waits on embedding.
+    Returns False if RAG indexing fails, but this is non-fatal.
     """
-    try:
-        from llama_index.core import (
-            Document,
-            VectorStoreIndex,
-            StorageContext,
-            Settings,
-        )
-        from llama_index.vector_stores.chroma import ChromaVectorStore
-        import chromadb
-
-        Settings.llm = get_llm()
-        Settings.embed_model = get_embed_model()
-
-        chroma_col = get_chroma_collection()
+    from utils.local_rag_indexer import sync_user_index
 
-        # Build plain-text documents from the context dict
-        docs: List[Document] = []
-
-        # Summary document
-        summary = (
-            f"User: {context.get('user_name')} ({context.get('user_role')})\n"
-            f"Tasks: {context.get('tasks_total')} total, "
-            f"{context.get('tasks_overdue')} overdue, "
-            f"{context.get('tasks_due_soon')} due soon, "
-            f"{context.get('tasks_done_week')} completed this week\n"
-            f"Projects: {context.get('projects_total')}\n"
-            f"Active sprints: {context.get('sprints_active')}\n"
-            f"Velocity (30d): {context.get('velocity_30d')} tasks\n"
-            f"Blocked tasks: {context.get('blocked_tasks')}\n"
-            f"Status breakdown: {context.get('status_breakdown')}\n"
-            f"Priority breakdown: {context.get('priority_breakdown')}"
-        )
-        docs.append(
-            Document(
-                text=summary,
-                metadata={
-                    "user_id": user_id,
-                    "type": "summary",
-                    "ts": str(time.time()),
-                },
-            )
-        )
-
-        # Individual recent task documents
-        for task in context.get("recent_tasks", []):
-            task_text = (
-                f"Task [{task.get('ticket')}]: {task.get('title')}\n"
-                f"Status: {task.get('status')}  Due: {task.get('due')}"
-            )
-            docs.append(
-                Document(
-                    text=task_text,
-                    metadata={
-                        "user_id": user_id,
-                        "type": "task",
-                        "ticket": task.get("ticket", ""),
-                    },
-                )
-            )
-
-        # Delete stale entries for this user before re-indexing
-        try:
-            existing = chroma_col.get(where={"user_id": user_id})
-            if existing and existing.get("ids"):
-                chroma_col.delete(ids=existing["ids"])
-        except Exception:
-            pass  # Collection might be empty
-
-        # Index fresh documents
-        vector_store = ChromaVectorStore(chroma_collection=chroma_col)
-        storage_ctx = StorageContext.from_defaults(vector_store=vector_store)
-        VectorStoreIndex.from_documents(docs, storage_context=storage_ctx)
-
-        # Refresh the singleton index
-        global _index, _vector_store
-        _vector_store = vector_store
-        _index = VectorStoreIndex.from_vector_store(
-            vector_store=vector_store,
-            storage_context=storage_ctx,
-        )
-
-        logger.info(f"📚 Indexed {len(docs)} context docs for user {user_id}")
-        return True
-
-    except ImportError as exc:
-        # ChromaDB dependency issue (Pydantic/Python compatibility)
-        logger.warning(
-            f"⚠️  RAG unavailable (ChromaDB import failed): {exc}. "
-            "Agent will work without vector search. "
-            "Fix: pip install --upgrade chromadb llama-index"
-        )
-        return False
-    except Exception as exc:
-        # Other runtime errors
-        logger.warning(
-            f"⚠️  RAG indexing failed (non-fatal): {type(exc).__name__}: {exc}. "
-            "Agent will work without vector search."
-        )
-        return False
+    return sync_user_index(user_id, context)
 
 
 # ─── In-memory chat history (per user) ───────────────────────────────────────
@@ -320,14 +224,25 @@ def send_message_to_local_agent(
         rag_used = False
         rag_context_text = ""
         if context:
-            indexed = index_user_context(user_id, context)
-            if indexed:
+            from utils.local_rag_indexer import is_user_indexed, schedule_context_index
+
+            # Queue an incremental re-index in the background — never wait on it.
+            schedule_context_index(user_id, context)
+            if is_user_indexed(user_id):
                 # RAG: retrieve top-3 relevant chunks for this query
                 try:
+                    from llama_index.core.vector_stores import (
+                        MetadataFilter,
+                        MetadataFilters,
+                    )
+
                     index = get_vector_index()
                     query_engine = index.as_query_engine(
                         llm=llm,
                         similarity_top_k=3,
+                        filters=MetadataFilters(
+                            filters=[MetadataFilter(key="user_id", value=user_id)]
+                        ),
                     )
                     rag_result = query_engine.query(message)
                     rag_context_text = str(rag_result)
@@ -407,6 +322,12 @@ def send_message_to_local_agent(
 # ─── Health check ─────────────────────────────────────────────────────────────
 
 
+def _rag_indexer_stats() -> Dict[str, Any]:
+    from utils.local_rag_indexer import get_rag_indexer_stats
+
+    return get_rag_indexer_stats()
+
+
 def check_local_agent_health() -> Dict[str, Any]:
     """Verify Ollama is reachable and the model is available."""
     import urllib.request
@@ -425,6 +346,7 @@ def check_local_agent_health() -> Dict[str, Any]:
                 "model_available": model_ok,
                 "available_models": models,
                 "chroma_path": CHROMA_DB_PATH,
+                "rag_indexer": _rag_indexer_stats(),
                 "error": None
                 if model_ok
                 else f"Model '{OLLAMA_MODEL}' not pulled yet. Run: ollama pull {OLLAMA_MODEL}",
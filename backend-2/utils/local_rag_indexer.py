@@ -0,0 +1,401 @@
+"""
+Incremental RAG indexer for the local (Ollama + LlamaIndex + ChromaDB) agent.
+
+Every indexed entity is one Chroma document with a stable id
+(``<user_id>:<type>:<entity_id>``) and a ``content_hash`` in its metadata.
+A user sync renders the summary, tasks, projects and sprints, diffs the hashes
+against Chroma and only embeds what changed; documents that disappeared are
+deleted. Task create/update/delete events re-sync just the affected task.
+
+Embedding runs on a single background worker draining a coalescing queue in
+batches — the chat path only enqueues and never waits on indexing.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import db
+from utils.task_events import subscribe_task_events
+
+logger = logging.getLogger(__name__)
+
+# Wait this long after the first queued item so bursts coalesce into one batch.
+LOCAL_RAG_BATCH_WAIT_SECONDS = float(os.getenv("LOCAL_RAG_BATCH_WAIT_SECONDS", "0.5"))
+LOCAL_RAG_EMBED_BATCH_SIZE = int(os.getenv("LOCAL_RAG_EMBED_BATCH_SIZE", "32"))
+LOCAL_RAG_MAX_TASKS = int(os.getenv("LOCAL_RAG_MAX_TASKS", "200"))
+# Minimum interval between full user syncs; task events keep tasks fresh in between.
+LOCAL_RAG_RESYNC_SECONDS = int(os.getenv("LOCAL_RAG_RESYNC_SECONDS", "60"))
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_pending_users: Dict[str, Dict[str, Any]] = {}  # user_id → latest context
+_pending_tasks: Dict[str, str] = {}  # task_id → latest event
+_last_synced: Dict[str, float] = {}  # user_id → time of last completed sync
+_worker: Optional[threading.Thread] = None
+_vector_store = None
+_stats = {
+    "batches": 0,
+    "user_syncs": 0,
+    "task_events": 0,
+    "embedded": 0,
+    "unchanged": 0,
+    "deleted": 0,
+    "errors": 0,
+    "last_batch_ms": 0.0,
+}
+
+# (doc_id, text, metadata)
+IndexDoc = Tuple[str, str, Dict[str, Any]]
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _make_doc(user_id: str, doc_type: str, entity_id: str, text: str) -> IndexDoc:
+    return (
+        f"{user_id}:{doc_type}:{entity_id}",
+        text,
+        {
+            "user_id": user_id,
+            "type": doc_type,
+            "entity_id": entity_id,
+            "content_hash": _content_hash(text),
+        },
+    )
+
+
+# ─── Rendering ────────────────────────────────────────────────────────────────
+
+
+def _render_summary(context: Dict[str, Any]) -> str:
+    return (
+        f"User: {context.get('user_name')} ({context.get('user_role')})\n"
+        f"Tasks: {context.get('tasks_total')} total, "
+        f"{context.get('tasks_overdue')} overdue, "
+        f"{context.get('tasks_due_soon')} due soon, "
+        f"{context.get('tasks_done_week')} completed this week\n"
+        f"Projects: {context.get('projects_total')}\n"
+        f"Active sprints: {context.get('sprints_active')}\n"
+        f"Velocity (30d): {context.get('velocity_30d')} tasks\n"
+        f"Blocked tasks: {context.get('blocked_tasks')}\n"
+        f"Status breakdown: {context.get('status_breakdown')}\n"
+        f"Priority breakdown: {context.get('priority_breakdown')}"
+    )
+
+
+def _render_task(task: Dict[str, Any]) -> str:
+    text = (
+        f"Task [{task.get('ticket_id')}]: {task.get('title')}\n"
+        f"Status: {task.get('status')}  Priority: {task.get('priority')}  "
+        f"Due: {task.get('due_date')}  Assignee: {task.get('assignee_name')}"
+    )
+    description = (task.get("description") or "").strip()
+    if description:
+        text += f"\n{description[:500]}"
+    return text
+
+
+def _render_project(project: Dict[str, Any]) -> str:
+    text = f"Project: {project.get('name')} ({project.get('prefix', '')})"
+    description = (project.get("description") or "").strip()
+    if description:
+        text += f"\n{description[:500]}"
+    return text
+
+
+def _render_sprint(sprint: Dict[str, Any]) -> str:
+    return (
+        f"Sprint: {sprint.get('name')} [{sprint.get('status')}]\n"
+        f"Goal: {sprint.get('goal') or '-'}  "
+        f"Dates: {sprint.get('start_date')} → {sprint.get('end_date')}"
+    )
+
+
+_TASK_FIELDS = {
+    "ticket_id": 1,
+    "title": 1,
+    "status": 1,
+    "priority": 1,
+    "due_date": 1,
+    "assignee_id": 1,
+    "assignee_name": 1,
+    "description": 1,
+}
+
+
+def build_user_documents(user_id: str, context: Optional[Dict[str, Any]]) -> List[IndexDoc]:
+    """Render everything the local agent should be able to retrieve for a user."""
+    docs: List[IndexDoc] = []
+    if context:
+        docs.append(_make_doc(user_id, "summary", "summary", _render_summary(context)))
+
+    for task in (
+        db.tasks.find({"assignee_id": user_id}, _TASK_FIELDS)
+        .sort("updated_at", -1)
+        .limit(LOCAL_RAG_MAX_TASKS)
+    ):
+        docs.append(_make_doc(user_id, "task", str(task["_id"]), _render_task(task)))
+
+    projects = list(
+        db.projects.find(
+            {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]},
+            {"name": 1, "prefix": 1, "description": 1},
+        )
+    )
+    for project in projects:
+        docs.append(
+            _make_doc(user_id, "project", str(project["_id"]), _render_project(project))
+        )
+
+    project_ids = [str(p["_id"]) for p in projects]
+    if project_ids:
+        for sprint in db.sprints.find(
+            {"project_id": {"$in": project_ids}, "status": {"$in": ["active", "planned"]}},
+            {"name": 1, "status": 1, "goal": 1, "start_date": 1, "end_date": 1},
+        ):
+            docs.append(
+                _make_doc(user_id, "sprint", str(sprint["_id"]), _render_sprint(sprint))
+            )
+    return docs
+
+
+# ─── Diffing against Chroma ───────────────────────────────────────────────────
+
+
+def _existing_hashes(where: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    from utils.local_agent_utils import get_chroma_collection
+
+    existing = get_chroma_collection().get(where=where, include=["metadatas"])
+    return {
+        doc_id: (metadata or {}).get("content_hash")
+        for doc_id, metadata in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+    }
+
+
+def plan_user_sync(user_id: str, context: Optional[Dict[str, Any]]) -> Tuple[List[str], List[IndexDoc]]:
+    """Return (ids to delete, docs to embed) for a full user sync."""
+    docs = build_user_documents(user_id, context)
+    existing = _existing_hashes({"user_id": user_id})
+    wanted = {doc_id for doc_id, _, _ in docs}
+    changed = [d for d in docs if existing.get(d[0]) != d[2]["content_hash"]]
+    stale = [doc_id for doc_id in existing if doc_id not in wanted]
+    _stats["unchanged"] += len(docs) - len(changed)
+    return stale, changed
+
+
+def plan_task_sync(task_id: str, event: str) -> Tuple[List[str], List[IndexDoc]]:
+    """Return (ids to delete, docs to embed) for one task write event."""
+    from bson import ObjectId
+
+    existing = _existing_hashes({"entity_id": task_id})
+    task = None
+    if event != "deleted":
+        try:
+            task = db.tasks.find_one({"_id": ObjectId(task_id)}, _TASK_FIELDS)
+        except Exception:
+            task = None
+    if task is None:
+        return list(existing), []
+
+    users = {doc_id.split(":", 1)[0] for doc_id in existing}
+    # New assignee: only worth indexing if that user already uses the local agent.
+    if task.get("assignee_id") in _last_synced:
+        users.add(task["assignee_id"])
+
+    text = _render_task(task)
+    docs = [_make_doc(user_id, "task", task_id, text) for user_id in users]
+    changed = [d for d in docs if existing.get(d[0]) != d[2]["content_hash"]]
+    _stats["unchanged"] += len(docs) - len(changed)
+    return [], changed
+
+
+def _get_vector_store():
+    global _vector_store
+    if _vector_store is None:
+        from llama_index.vector_stores.chroma import ChromaVectorStore
+
+        from utils.local_agent_utils import get_chroma_collection
+
+        _vector_store = ChromaVectorStore(chroma_collection=get_chroma_collection())
+    return _vector_store
+
+
+def apply_index_plan(delete_ids: List[str], docs: List[IndexDoc]) -> None:
+    """Delete stale ids and embed + upsert changed docs in batches."""
+    from llama_index.core.schema import TextNode
+
+    from utils.local_agent_utils import get_chroma_collection, get_embed_model
+
+    collection = get_chroma_collection()
+    replace_ids = list(dict.fromkeys(delete_ids + [doc_id for doc_id, _, _ in docs]))
+    if replace_ids:
+        collection.delete(ids=replace_ids)
+    _stats["deleted"] += len(delete_ids)
+    if not docs:
+        return
+
+    # The same task text is often indexed for several members — embed it once.
+    unique_texts: Dict[str, str] = {}
+    for _, text, metadata in docs:
+        unique_texts.setdefault(metadata["content_hash"], text)
+    hashes = list(unique_texts)
+    embed_model = get_embed_model()
+    vectors: Dict[str, List[float]] = {}
+    for start in range(0, len(hashes), LOCAL_RAG_EMBED_BATCH_SIZE):
+        batch = hashes[start : start + LOCAL_RAG_EMBED_BATCH_SIZE]
+        embeddings = embed_model.get_text_embedding_batch([unique_texts[h] for h in batch])
+        vectors.update(zip(batch, embeddings))
+
+    nodes = [
+        TextNode(
+            id_=doc_id,
+            text=text,
+            metadata=metadata,
+            embedding=vectors[metadata["content_hash"]],
+        )
+        for doc_id, text, metadata in docs
+    ]
+    _get_vector_store().add(nodes)
+    _stats["embedded"] += len(hashes)
+
+
+def sync_user_index(user_id: str, context: Optional[Dict[str, Any]]) -> bool:
+    """Synchronous incremental sync of one user's documents."""
+    try:
+        stale, changed = plan_user_sync(user_id, context)
+        apply_index_plan(stale, changed)
+        _last_synced[user_id] = time.time()
+        _stats["user_syncs"] += 1
+        if stale or changed:
+            logger.info(
+                f"📚 RAG sync for {user_id}: {len(changed)} embedded, {len(stale)} removed"
+            )
+        return True
+    except Exception as exc:
+        _stats["errors"] += 1
+        logger.warning(
+            f"⚠️  RAG indexing failed (non-fatal): {type(exc).__name__}: {exc}. "
+            "Agent will work without vector search."
+        )
+        return False
+
+
+# ─── Background worker ────────────────────────────────────────────────────────
+
+
+def _drain_once() -> None:
+    time.sleep(LOCAL_RAG_BATCH_WAIT_SECONDS)
+    with _lock:
+        users = dict(_pending_users)
+        task_events = dict(_pending_tasks)
+        _pending_users.clear()
+        _pending_tasks.clear()
+        _wakeup.clear()
+
+    started = time.perf_counter()
+    for user_id, context in users.items():
+        sync_user_index(user_id, context)
+
+    if task_events:
+        delete_ids: List[str] = []
+        docs: List[IndexDoc] = []
+        for task_id, event in task_events.items():
+            try:
+                stale, changed = plan_task_sync(task_id, event)
+                delete_ids.extend(stale)
+                docs.extend(changed)
+            except Exception as exc:
+                _stats["errors"] += 1
+                logger.warning(f"⚠️  RAG task sync failed for {task_id}: {exc}")
+        try:
+            apply_index_plan(delete_ids, docs)
+            _stats["task_events"] += len(task_events)
+        except Exception as exc:
+            _stats["errors"] += 1
+            logger.warning(f"⚠️  RAG task batch failed (non-fatal): {exc}")
+
+    _stats["batches"] += 1
+    _stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _worker_loop() -> None:
+    while True:
+        _wakeup.wait()
+        try:
+            _drain_once()
+        except Exception as exc:
+            _stats["errors"] += 1
+            logger.warning(f"⚠️  RAG indexer batch crashed: {exc}")
+
+
+def _ensure_worker() -> None:
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_worker_loop, name="local-rag-indexer", daemon=True
+            )
+            _worker.start()
+
+
+def schedule_context_index(user_id: str, context: Optional[Dict[str, Any]], force: bool = False) -> bool:
+    """
+    Queue an incremental sync for a user. Returns immediately; returns False
+    when skipped because the user was synced within LOCAL_RAG_RESYNC_SECONDS.
+    """
+    last = _last_synced.get(user_id)
+    if not force and last and time.time() - last < LOCAL_RAG_RESYNC_SECONDS:
+        return False
+    with _lock:
+        _pending_users[user_id] = context or {}
+    _ensure_worker()
+    _wakeup.set()
+    return True
+
+
+def _on_task_event(event: str, task_id: str, task: Optional[Dict[str, Any]]) -> None:
+    # Nothing is indexed until someone has used the local agent in this process.
+    if not _last_synced:
+        return
+    with _lock:
+        _pending_tasks[task_id] = event
+    _ensure_worker()
+    _wakeup.set()
+
+
+subscribe_task_events(_on_task_event)
+
+
+_known_indexed: set = set()
+
+
+def is_user_indexed(user_id: str) -> bool:
+    """True once a user has documents in Chroma (from this or a previous process)."""
+    if user_id in _last_synced or user_id in _known_indexed:
+        return True
+    try:
+        from utils.local_agent_utils import get_chroma_collection
+
+        if get_chroma_collection().get(where={"user_id": user_id}, limit=1).get("ids"):
+            _known_indexed.add(user_id)
+            return True
+    except Exception:
+        pass
+    return False
+
+
+def get_rag_indexer_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "pending_users": len(_pending_users),
+        "pending_tasks": len(_pending_tasks),
+        "synced_users": len(_last_synced),
+        "worker_alive": bool(_worker and _worker.is_alive()),
+    }
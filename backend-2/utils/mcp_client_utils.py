@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import importlib
 import json
+import threading
 import os
 import shutil
 import sys
+import time
+import types
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import anyio
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -73,6 +79,44 @@ MCP_STDIO_COMMANDS: Dict[str, Dict[str, Any]] = _build_stdio_commands()
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 
+# ── Session pool settings ─────────────────────────────────────────────────────
+# Spawning a stdio server re-imports the whole controller stack, so sessions are
+# kept alive and reused. MCP_POOL_ENABLED=false restores spawn-per-call.
+MCP_POOL_ENABLED = os.getenv("MCP_POOL_ENABLED", "true").lower() in {"1", "true", "yes"}
+MCP_POOL_MAX_SESSIONS_PER_SERVER = int(os.getenv("MCP_POOL_MAX_SESSIONS_PER_SERVER", "2"))
+# In-flight JSON-RPC requests multiplexed over one session.
+MCP_POOL_MAX_CONCURRENT_CALLS = int(os.getenv("MCP_POOL_MAX_CONCURRENT_CALLS", "8"))
+MCP_POOL_IDLE_TIMEOUT_SECONDS = int(os.getenv("MCP_POOL_IDLE_TIMEOUT_SECONDS", "300"))
+# Sessions idle longer than this are pinged before being handed out again.
+MCP_POOL_HEALTHCHECK_INTERVAL_SECONDS = int(
+    os.getenv("MCP_POOL_HEALTHCHECK_INTERVAL_SECONDS", "30")
+)
+MCP_POOL_START_TIMEOUT_SECONDS = int(os.getenv("MCP_POOL_START_TIMEOUT_SECONDS", "60"))
+
+# First-party servers that only wrap controllers already importable in the API
+# process are dispatched in-process (no subprocess, no JSON-RPC framing). The
+# stdio entrypoints stay available for external MCP clients.
+MCP_INPROCESS_ENABLED = os.getenv("MCP_INPROCESS_ENABLED", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+MCP_INPROCESS_SERVERS = {
+    name.strip()
+    for name in os.getenv("MCP_INPROCESS_SERVERS", "task,sprint,project,member").split(",")
+    if name.strip()
+}
+
+# JSON-RPC code the SDK uses when the server side of the pipe goes away.
+_MCP_CONNECTION_CLOSED = -32000
+# Raised while *writing* to a dead transport — the request never reached the
+# server, so it is safe to retry on a fresh session.
+_MCP_SEND_FAILURES = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+)
+
 
 def _mcp_available() -> bool:
     return (
@@ -113,6 +157,10 @@ def get_mcp_runtime_diagnostics() -> Dict[str, Any]:
         "backend_root": str(BACKEND_ROOT),
         "mcp_python_executable_override": os.getenv("MCP_PYTHON_EXECUTABLE"),
         "command_servers": command_servers_status,
+        "session_pool": _session_pool.get_stats(),
+        "inprocess_servers": sorted(
+            name for name in MCP_INPROCESS_SERVERS if _use_inprocess(name)
+        ),
     }
 
 
@@ -200,6 +248,336 @@ async def _open_mcp_session(server_name: str) -> AsyncIterator[ClientSession]:
             yield session
 
 
+# ── In-process transport ──────────────────────────────────────────────────────
+_inprocess_servers: Dict[str, Any] = {}
+_inprocess_lock = threading.Lock()
+
+
+def _use_inprocess(server_name: str, inprocess: Optional[bool] = None) -> bool:
+    enabled = MCP_INPROCESS_ENABLED if inprocess is None else inprocess
+    return (
+        enabled
+        and server_name in MCP_INPROCESS_SERVERS
+        and server_name in MCP_SERVER_SCRIPTS
+        and _stdio_command_config(server_name) is None
+    )
+
+
+def _get_inprocess_server(server_name: str):
+    """Import the server module once and return its FastMCP instance."""
+    server = _inprocess_servers.get(server_name)
+    if server is not None:
+        return server
+    with _inprocess_lock:
+        if server_name not in _inprocess_servers:
+            module = importlib.import_module(
+                f"mcp_servers.{MCP_SERVER_SCRIPTS[server_name].stem}"
+            )
+            _inprocess_servers[server_name] = module.mcp
+        return _inprocess_servers[server_name]
+
+
+class _WorkerLoop:
+    """Event loop owned by one worker thread; closed when the thread exits."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+
+    def __del__(self):
+        self.loop.close()
+
+
+# One event loop per worker thread, reused across calls. A single shared loop
+# (blocking portal) would serialize every tool call: the tools are synchronous
+# and run inline on whichever loop drives FastMCP.call_tool.
+_inprocess_loops = threading.local()
+
+
+def _call_inprocess_tool_sync(server, tool_name: str, arguments: Dict[str, Any]):
+    worker = getattr(_inprocess_loops, "worker", None)
+    if worker is None:
+        worker = _inprocess_loops.worker = _WorkerLoop()
+    return worker.loop.run_until_complete(server.call_tool(tool_name, arguments))
+
+
+async def _call_inprocess_tool(
+    server_name: str, tool_name: str, arguments: Dict[str, Any]
+) -> Any:
+    """
+    Dispatch a FastMCP tool directly. Arguments are validated against the same
+    generated schema as over stdio. The tools are synchronous and hit Mongo, so
+    they run on a worker thread rather than blocking the API event loop.
+    """
+    server = await anyio.to_thread.run_sync(_get_inprocess_server, server_name)
+    result = await anyio.to_thread.run_sync(
+        _call_inprocess_tool_sync, server, tool_name, arguments
+    )
+    # Depending on the SDK version FastMCP returns a CallToolResult, content
+    # blocks, or (content, structured) for tools with an output schema.
+    if hasattr(result, "content"):
+        return result
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, dict):
+        return result
+    return types.SimpleNamespace(content=list(result or []))
+
+
+async def _list_inprocess_tools(server_name: str) -> List[str]:
+    server = await anyio.to_thread.run_sync(_get_inprocess_server, server_name)
+    tools = await server.list_tools()
+    return [getattr(tool, "name", str(tool)) for tool in tools]
+
+
+def _is_transport_failure(exc: BaseException) -> bool:
+    if isinstance(exc, _MCP_SEND_FAILURES):
+        return True
+    error = getattr(exc, "error", None)
+    return getattr(error, "code", None) == _MCP_CONNECTION_CLOSED
+
+
+class _PooledSession:
+    """
+    One long-lived MCP session.
+
+    stdio_client / ClientSession are anyio task-group contexts and must be
+    entered and exited by the same task, so a dedicated owner task holds the
+    context open until close() is called.
+    """
+
+    def __init__(self, server_name: str):
+        self.server_name = server_name
+        self.session: Optional[ClientSession] = None
+        self.semaphore = asyncio.Semaphore(MCP_POOL_MAX_CONCURRENT_CALLS)
+        self.in_flight = 0
+        self.calls = 0
+        self.broken = False
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            not self.broken
+            and self.session is not None
+            and self._task is not None
+            and not self._task.done()
+        )
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used_at
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(
+            self._run(), name=f"mcp-session-{self.server_name}"
+        )
+        try:
+            await asyncio.wait_for(self._ready.wait(), MCP_POOL_START_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError(
+                f"MCP server '{self.server_name}' did not start within "
+                f"{MCP_POOL_START_TIMEOUT_SECONDS}s."
+            )
+        if not self.alive:
+            raise RuntimeError(
+                f"MCP server '{self.server_name}' failed to start: {self._error}"
+            )
+
+    async def _run(self) -> None:
+        try:
+            async with _open_mcp_session(self.server_name) as session:
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as exc:
+            self._error = exc
+            if self._ready.is_set():
+                print(f"⚠️  MCP session '{self.server_name}' exited: {exc}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), 5)
+            return True
+        except Exception as exc:
+            print(f"⚠️  MCP session '{self.server_name}' failed health check: {exc}")
+            self.broken = True
+            return False
+
+    async def close(self) -> None:
+        self.broken = True
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), 10)
+        except Exception:
+            self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Per-server pool of long-lived MCP sessions.
+
+    - up to MCP_POOL_MAX_SESSIONS_PER_SERVER sessions per server; calls go to
+      the least-loaded one and a new session is only spawned once every
+      existing one is saturated
+    - each session multiplexes up to MCP_POOL_MAX_CONCURRENT_CALLS requests
+    - sessions idle past the health-check interval are pinged before reuse;
+      dead ones are replaced (restart-on-crash)
+    - a reaper closes sessions idle for MCP_POOL_IDLE_TIMEOUT_SECONDS
+
+    The pool is bound to the event loop it was first used on.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, List[_PooledSession]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[asyncio.Task] = None
+        self._stats = {"spawned": 0, "restarted": 0, "reaped": 0, "calls": 0}
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            print("⚠️  MCP session pool used from a new event loop — starting fresh")
+        self._loop = loop
+        self._sessions = {}
+        self._locks = {}
+        self._reaper = loop.create_task(self._reap_idle(), name="mcp-session-reaper")
+
+    async def _spawn(self, server_name: str) -> _PooledSession:
+        started = time.perf_counter()
+        pooled = _PooledSession(server_name)
+        await pooled.start()
+        self._stats["spawned"] += 1
+        print(
+            f"🔌 MCP session started for '{server_name}' in {time.perf_counter() - started:.2f}s"
+        )
+        return pooled
+
+    async def _acquire(self, server_name: str) -> _PooledSession:
+        lock = self._locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            sessions = self._sessions.setdefault(server_name, [])
+
+            for pooled in list(sessions):
+                if (
+                    pooled.alive
+                    and pooled.in_flight == 0
+                    and pooled.idle_seconds > MCP_POOL_HEALTHCHECK_INTERVAL_SECONDS
+                ):
+                    await pooled.ping()
+                if not pooled.alive:
+                    sessions.remove(pooled)
+                    self._stats["restarted"] += 1
+                    await pooled.close()
+
+            best = min(sessions, key=lambda s: s.in_flight, default=None)
+            if best is None or (
+                best.in_flight >= MCP_POOL_MAX_CONCURRENT_CALLS
+                and len(sessions) < MCP_POOL_MAX_SESSIONS_PER_SERVER
+            ):
+                best = await self._spawn(server_name)
+                sessions.append(best)
+
+            # Reserve the slot under the lock so concurrent callers spread out.
+            best.in_flight += 1
+            return best
+
+    @asynccontextmanager
+    async def session(self, server_name: str) -> AsyncIterator[ClientSession]:
+        self._bind_loop()
+        pooled = await self._acquire(server_name)
+        try:
+            async with pooled.semaphore:
+                if not pooled.alive:
+                    raise anyio.ClosedResourceError()
+                pooled.calls += 1
+                self._stats["calls"] += 1
+                yield pooled.session
+        except Exception as exc:
+            if _is_transport_failure(exc):
+                pooled.broken = True
+            raise
+        finally:
+            pooled.in_flight -= 1
+            pooled.last_used_at = time.monotonic()
+            if pooled.broken and pooled.in_flight == 0:
+                await pooled.close()
+
+    async def _reap_idle(self) -> None:
+        interval = max(1, min(MCP_POOL_IDLE_TIMEOUT_SECONDS, 30))
+        while True:
+            await asyncio.sleep(interval)
+            for server_name, sessions in list(self._sessions.items()):
+                for pooled in list(sessions):
+                    if pooled.in_flight:
+                        continue
+                    if pooled.alive and pooled.idle_seconds < MCP_POOL_IDLE_TIMEOUT_SECONDS:
+                        continue
+                    sessions.remove(pooled)
+                    self._stats["reaped"] += 1
+                    await pooled.close()
+
+    async def shutdown(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        sessions = [s for group in self._sessions.values() for s in group]
+        self._sessions = {}
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+        if sessions:
+            print(f"🔌 Closed {len(sessions)} pooled MCP session(s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": MCP_POOL_ENABLED,
+            "max_sessions_per_server": MCP_POOL_MAX_SESSIONS_PER_SERVER,
+            "max_concurrent_calls": MCP_POOL_MAX_CONCURRENT_CALLS,
+            "idle_timeout_seconds": MCP_POOL_IDLE_TIMEOUT_SECONDS,
+            **self._stats,
+            "servers": {
+                name: [
+                    {
+                        "alive": s.alive,
+                        "in_flight": s.in_flight,
+                        "calls": s.calls,
+                        "age_seconds": round(time.monotonic() - s.created_at, 1),
+                        "idle_seconds": round(s.idle_seconds, 1),
+                    }
+                    for s in sessions
+                ]
+                for name, sessions in self._sessions.items()
+            },
+        }
+
+
+_session_pool = MCPSessionPool()
+
+
+def _mcp_session(server_name: str, pooled: Optional[bool] = None):
+    """Pooled session by default; a throwaway subprocess when pooling is off."""
+    use_pool = MCP_POOL_ENABLED if pooled is None else pooled
+    if use_pool:
+        return _session_pool.session(server_name)
+    return _open_mcp_session(server_name)
+
+
+async def shutdown_mcp_session_pool() -> None:
+    await _session_pool.shutdown()
+
+
 def _extract_text_from_tool_result(result: Any) -> Dict[str, Any]:
     """
     Extract BOTH structured and text output from MCP result.
@@ -241,7 +619,11 @@ def _extract_text_from_tool_result(result: Any) -> Dict[str, Any]:
     return {"text": str(result), "data": None}
 
 
-async def list_mcp_tools(server_name: str) -> Dict[str, Any]:
+async def list_mcp_tools(
+    server_name: str,
+    pooled: Optional[bool] = None,
+    inprocess: Optional[bool] = None,
+) -> Dict[str, Any]:
     """List tools exposed by a configured MCP server (stdio or HTTP)."""
     if not _mcp_available():
         return {
@@ -262,18 +644,22 @@ async def list_mcp_tools(server_name: str) -> Dict[str, Any]:
         }
 
     try:
-        async with _open_mcp_session(server_name) as session:
-            tools_response = await session.list_tools()
+        if _use_inprocess(server_name, inprocess):
+            transport = "inprocess"
+            tool_names = await _list_inprocess_tools(server_name)
+        else:
+            async with _mcp_session(server_name, pooled) as session:
+                tools_response = await session.list_tools()
 
             tools = getattr(tools_response, "tools", []) or []
             tool_names = [getattr(tool, "name", str(tool)) for tool in tools]
 
-            return {
-                "success": True,
-                "server": server_name,
-                "transport": transport,
-                "tools": tool_names,
-            }
+        return {
+            "success": True,
+            "server": server_name,
+            "transport": transport,
+            "tools": tool_names,
+        }
     except Exception as exc:
         return {
             "success": False,
@@ -283,10 +669,33 @@ async def list_mcp_tools(server_name: str) -> Dict[str, Any]:
         }
 
 
+async def _call_stdio_tool(
+    server_name: str,
+    tool_name: str,
+    arguments: Dict[str, Any],
+    pooled: Optional[bool] = None,
+) -> Any:
+    use_pool = MCP_POOL_ENABLED if pooled is None else pooled
+    # A pooled session may have died while idle; requests that failed before
+    # reaching the server are retried once on a fresh session.
+    attempts = 2 if use_pool else 1
+
+    for attempt in range(attempts):
+        try:
+            async with _mcp_session(server_name, use_pool) as session:
+                return await session.call_tool(tool_name, arguments)
+        except _MCP_SEND_FAILURES:
+            if attempt + 1 >= attempts:
+                raise
+            print(f"🔁 MCP session '{server_name}' was closed — restarting for {tool_name}")
+
+
 async def call_mcp_tool(
     server_name: str,
     tool_name: str,
     arguments: Optional[Dict[str, Any]] = None,
+    pooled: Optional[bool] = None,
+    inprocess: Optional[bool] = None,
 ) -> Dict[str, Any]:
     """Call one MCP tool (stdio or HTTP) and normalize the response payload."""
     if not _mcp_available():
@@ -311,50 +720,57 @@ async def call_mcp_tool(
         }
 
     try:
-        async with _open_mcp_session(server_name) as session:
-            raw_result = await session.call_tool(tool_name, arguments or {})
-
-            extracted = _extract_text_from_tool_result(raw_result)
-            text_output = extracted["text"]
-            structured_data = extracted["data"]
-            parsed: Dict[str, Any] = {}
-
-            # Prefer structured data
-            if structured_data:
-                parsed = {
-                    "success": True,
-                    "data": structured_data,
-                    "summary": text_output,
-                }
-
-            else:
-                try:
-                    maybe_json = json.loads(text_output) if text_output else {}
-                    parsed = (
-                        maybe_json
-                        if isinstance(maybe_json, dict)
-                        else {"data": maybe_json}
-                    )
-                except Exception:
-                    parsed = {"output": text_output}
-
-            if "success" not in parsed:
-                parsed["success"] = True
-
-            formatted_output = _format_mcp_result(parsed)
-            tool_success = bool(parsed.get("success", True))
-            tool_error = parsed.get("error") if isinstance(parsed, dict) else None
-
-            return {
-                "success": tool_success,
-                "server": server_name,
-                "transport": transport,
-                "tool": tool_name,
-                "result": parsed,
-                "formatted": formatted_output,
-                "raw_text": text_output,
-                "error": tool_error,
+        if _use_inprocess(server_name, inprocess):
+            transport = "inprocess"
+            raw_result = await _call_inprocess_tool(
+                server_name, tool_name, arguments or {}
+            )
+        else:
+            raw_result = await _call_stdio_tool(
+                server_name, tool_name, arguments or {}, pooled
+            )
+
+        extracted = _extract_text_from_tool_result(raw_result)
+        text_output = extracted["text"]
+        structured_data = extracted["data"]
+        parsed: Dict[str, Any] = {}
+
+        # Prefer structured data
+        if structured_data:
+            parsed = {
+                "success": True,
+                "data": structured_data,
+                "summary": text_output,
             }
+
+        else:
+            try:
+                maybe_json = json.loads(text_output) if text_output else {}
+                parsed = (
+                    maybe_json
+                    if isinstance(maybe_json, dict)
+                    else {"data": maybe_json}
+                )
+            except Exception:
+                parsed = {"output": text_output}
+
+        if "success" not in parsed:
+            parsed["success"] = True
+
+        formatted_output = _format_mcp_result(parsed)
+        tool_success = bool(parsed.get("success", True))
+        tool_error = parsed.get("error") if isinstance(parsed, dict) else None
+
+        return {
+            "success": tool_success,
+            "server": server_name,
+            "transport": transport,
+            "tool": tool_name,
+            "result": parsed,
+            "formatted": formatted_output,
+            "raw_text": text_output,
+            "error": tool_error,
+        }
     except Exception as exc:
         return {
             "success": False,
@@ -0,0 +1,31 @@
+"""
+Helpers shared by the first-party MCP servers in mcp_servers/.
+
+A server module runs either as a stdio subprocess (``python
+mcp_servers/<name>.py``), where stdout carries the JSON-RPC frames, or
+in-process, imported by utils.mcp_client_utils.
+"""
+
+import contextlib
+import sys
+
+_stdio_server = False
+
+
+def run_stdio_server(mcp) -> None:
+    """Serve ``mcp`` over stdio; call from the server's ``__main__`` block."""
+    global _stdio_server
+    _stdio_server = True
+    mcp.run(transport="stdio")
+
+
+def run_silenced(func, *args, **kwargs):
+    """
+    Call a controller with its prints moved to stderr when stdout carries
+    JSON-RPC frames. In-process the call goes straight through, so the app's
+    global stdout is never swapped from worker threads.
+    """
+    if not _stdio_server:
+        return func(*args, **kwargs)
+    with contextlib.redirect_stdout(sys.stderr):
+        return func(*args, **kwargs)
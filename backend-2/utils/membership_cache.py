@@ -0,0 +1,127 @@
+"""
+Per-user project membership cache behind Project.is_member / get_member_role.
+
+One indexed query (projects owned by the user or listing them in
+members.user_id, projecting only _id and user_id) loads every project a user
+belongs to together with their role; later checks are a dict lookup instead
+of a full project document load. Entries are dropped by project
+create/update/delete and add_member/remove_member events.
+
+A cached "not a member" is confirmed with a single _id probe before it is
+returned, so memberships created by writes that bypass the models (raw
+db.projects updates in agent tools) are never denied. Removals made outside
+the models — or in another worker process — can be granted for at most
+MEMBERSHIP_CACHE_TTL_SECONDS; user deletion invalidates explicitly.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from database import projects
+from utils.cache_utils import TTLCache
+from utils.task_events import subscribe_project_events
+
+MEMBERSHIP_CACHE_TTL_SECONDS = int(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "30"))
+
+_roles = TTLCache(default_ttl=MEMBERSHIP_CACHE_TTL_SECONDS)
+_lock = threading.Lock()
+# project_id → users whose cached role map includes that project
+_project_users: Dict[str, Set[str]] = defaultdict(set)
+_stats = {"hits": 0, "loads": 0, "negative_probes": 0, "stale_negatives": 0, "invalidations": 0}
+
+
+def _role_for(project: Dict[str, Any], user_id: str) -> str:
+    return "owner" if project.get("user_id") == user_id else "member"
+
+
+def get_user_project_roles(user_id: str) -> Dict[str, str]:
+    """{project_id: "owner" | "member"} for every project the user belongs to."""
+    roles = _roles.get(user_id)
+    if roles is not None:
+        return roles
+
+    _stats["loads"] += 1
+    roles = {
+        str(p["_id"]): _role_for(p, user_id)
+        for p in projects.find(
+            {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]},
+            {"user_id": 1},
+        )
+    }
+    with _lock:
+        _roles.set(user_id, roles)
+        for project_id in roles:
+            _project_users[project_id].add(user_id)
+    return roles
+
+
+def get_project_role(project_id, user_id) -> Optional[str]:
+    """"owner", "member" or None when the user has no access to the project."""
+    if not project_id or not user_id:
+        return None
+    project_id = str(project_id)
+
+    role = get_user_project_roles(user_id).get(project_id)
+    if role is not None:
+        _stats["hits"] += 1
+        return role
+
+    # Confirm the negative: one probe on the primary key.
+    _stats["negative_probes"] += 1
+    try:
+        object_id = ObjectId(project_id)
+    except (InvalidId, TypeError):
+        return None
+    project = projects.find_one(
+        {"_id": object_id, "$or": [{"user_id": user_id}, {"members.user_id": user_id}]},
+        {"user_id": 1},
+    )
+    if project is None:
+        return None
+    _stats["stale_negatives"] += 1
+    invalidate_membership(user_id)
+    return _role_for(project, user_id)
+
+
+def invalidate_membership(user_id: Optional[str] = None) -> None:
+    """Drop the cached role map for one user (or everyone)."""
+    with _lock:
+        if user_id is None:
+            _roles.clear()
+            _project_users.clear()
+        else:
+            _roles.clear(user_id)
+    _stats["invalidations"] += 1
+
+
+def _on_project_event(event: str, project_id: str, project: Optional[Dict[str, Any]]) -> None:
+    # created: owner; member_added / member_removed: that member;
+    # updated: the new owner when ownership moved.
+    users = set(_project_users.pop(project_id, set()))
+    if (project or {}).get("user_id"):
+        users.add(project["user_id"])
+    for user_id in users:
+        invalidate_membership(user_id)
+
+
+subscribe_project_events(_on_project_event)
+
+
+def ensure_membership_indexes() -> None:
+    projects.create_index("user_id")
+    projects.create_index("members.user_id")
+
+
+def get_membership_stats() -> Dict[str, Any]:
+    checks = _stats["hits"] + _stats["negative_probes"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / checks, 3) if checks else None,
+        "cached_users": _roles.size(),
+        "ttl_seconds": MEMBERSHIP_CACHE_TTL_SECONDS,
+    }
@@ -0,0 +1,310 @@
+"""
+Request-scoped MongoDB query profiler.
+
+A pymongo CommandListener (registered on the client in database.py) attributes
+every command to the profile of the request or block that issued it, through
+a ContextVar. FastAPI copies the context into sync endpoints' worker threads
+and into tasks the request schedules, so all of the request's queries land
+in one profile.
+
+Per profile: command count, DB time, documents returned, and the most
+repeated (command, collection, filter shape). A repeated shape is the usual
+N+1 signature. Per route:
+  - a query budget (QUERY_BUDGET_DEFAULT, QUERY_BUDGETS overrides); requests
+    over it are logged with their most repeated shapes
+  - aggregate counters for get_query_profiler_stats()
+Single commands slower than QUERY_SLOW_MS are logged with their filter shape
+(values replaced by "?"), never with the values themselves.
+
+With QUERY_DEBUG_HEADERS=1 responses carry X-DB-Query-Count and a
+Server-Timing "db" entry. Tests and benchmarks use profile_queries().
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "1") == "1"
+QUERY_DEBUG_HEADERS = os.getenv("QUERY_DEBUG_HEADERS", "0") == "1"
+QUERY_SLOW_MS = int(os.getenv("QUERY_SLOW_MS", "100"))
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "40"))
+
+# Ceilings for the hot read paths; a request above them is almost always a
+# per-item lookup that crept back in. "METHOD route-template": max commands.
+_DEFAULT_BUDGETS = {
+    "GET /api/tasks/project/{project_id}": 15,
+    "GET /api/tasks/project/{project_id}/changes": 10,
+    "GET /api/tasks/{task_id}": 15,
+    "GET /api/dashboard/bootstrap": 25,
+    "GET /api/dashboard/analytics": 25,
+    "GET /api/team-chat/projects": 15,
+    "GET /api/team-chat/channels/{channel_id}/messages": 15,
+}
+QUERY_BUDGETS = {**_DEFAULT_BUDGETS, **json.loads(os.getenv("QUERY_BUDGETS", "{}"))}
+
+# Handshake/auth/session chatter, not application queries
+_IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo", "saslStart",
+    "saslContinue", "authenticate", "getnonce", "endSessions", "killCursors",
+}
+
+# Where each command keeps its filter
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+}
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+
+_route_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by profile_queries(budget=...) when the block issued more commands"""
+
+
+def filter_shape(value):
+    """The filter with every value replaced by "?" (operators and field names kept)"""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return [filter_shape(item) for item in value]
+    return "?"
+
+
+def _command_filter(command_name, command):
+    if command_name in _FILTER_FIELDS:
+        return command.get(_FILTER_FIELDS[command_name]) or {}
+    if command_name == "aggregate":
+        stages = command.get("pipeline") or [{}]
+        return stages[0].get("$match", {}) if stages else {}
+    if command_name in ("update", "delete"):
+        statements = command.get(command_name + "s") or [{}]
+        return statements[0].get("q", {})
+    return {}
+
+
+def _documents_returned(reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "values" in reply:
+        return len(reply["values"])
+    if isinstance(reply.get("n"), int):
+        return reply["n"]
+    return 1 if reply.get("value") else 0
+
+
+class QueryProfile:
+    """Commands issued by one request (or one profile_queries block)"""
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.failed = 0
+        self.db_ms = 0.0
+        self.docs = 0
+        self.shapes: Dict[str, int] = {}
+        self.slow = []
+        self._lock = threading.Lock()
+
+    def record(self, command_name, collection, shape, duration_ms, docs, ok):
+        key = f"{command_name} {collection} {json.dumps(shape, sort_keys=True)}"
+        with self._lock:
+            self.count += 1
+            self.failed += not ok
+            self.db_ms += duration_ms
+            self.docs += docs
+            self.shapes[key] = self.shapes.get(key, 0) + 1
+            if duration_ms >= QUERY_SLOW_MS:
+                self.slow.append({"query": key, "ms": round(duration_ms, 2), "docs": docs})
+
+    def top_shapes(self, limit=3):
+        return sorted(self.shapes.items(), key=lambda item: -item[1])[:limit]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "queries": self.count,
+            "failed": self.failed,
+            "db_ms": round(self.db_ms, 2),
+            "docs_returned": self.docs,
+            "top_shapes": [{"query": key, "count": n} for key, n in self.top_shapes()],
+            "slow": self.slow,
+        }
+
+
+class QueryProfilerListener(monitoring.CommandListener):
+    """Attributes each command to the QueryProfile active where it was issued"""
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        profile = _current.get()
+        if profile is None or event.command_name in _IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = command.get("collection")
+        self._pending[(event.connection_id, event.request_id)] = (
+            profile,
+            collection if isinstance(collection, str) else "",
+            filter_shape(_command_filter(event.command_name, command)),
+        )
+
+    def succeeded(self, event):
+        self._finish(event, _documents_returned(event.reply or {}), True)
+
+    def failed(self, event):
+        self._finish(event, 0, False)
+
+    def _finish(self, event, docs, ok):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        profile, collection, shape = pending
+        duration_ms = event.duration_micros / 1000
+        profile.record(event.command_name, collection, shape, duration_ms, docs, ok)
+        if duration_ms >= QUERY_SLOW_MS:
+            print(
+                f"🐢 Slow query ({duration_ms:.1f} ms, {docs} docs) in {profile.label}: "
+                f"{event.command_name} {collection} {json.dumps(shape, sort_keys=True)}"
+            )
+
+
+query_profiler_listener = QueryProfilerListener()
+
+
+def query_event_listeners():
+    """event_listeners for MongoClient (empty when QUERY_PROFILER_ENABLED=0)"""
+    return [query_profiler_listener] if QUERY_PROFILER_ENABLED else []
+
+
+def current_query_profile() -> Optional[QueryProfile]:
+    return _current.get()
+
+
+def _check_budget(route, profile):
+    budget = QUERY_BUDGETS.get(route, QUERY_BUDGET_DEFAULT)
+    over = profile.count > budget
+    if over:
+        repeated = ", ".join(f"{n}× {key}" for key, n in profile.top_shapes())
+        print(f"⚠️  Query budget exceeded for {route}: {profile.count} > {budget} ({repeated})")
+    return over
+
+
+def _record_route(route, profile, over_budget):
+    with _stats_lock:
+        stats = _route_stats.setdefault(route, {
+            "requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+            "docs_returned": 0, "over_budget": 0, "slow_queries": 0,
+        })
+        stats["requests"] += 1
+        stats["queries"] += profile.count
+        stats["max_queries"] = max(stats["max_queries"], profile.count)
+        stats["db_ms"] += profile.db_ms
+        stats["docs_returned"] += profile.docs
+        stats["over_budget"] += over_budget
+        stats["slow_queries"] += len(profile.slow)
+
+
+@contextmanager
+def profile_queries(label="block", budget=None):
+    """
+    Profile the commands issued inside the block (and the tasks/threads it
+    starts with the current context). With ``budget`` the block raises
+    QueryBudgetExceeded when it issued more commands than that.
+    """
+    profile = QueryProfile(label)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+    if budget is not None and profile.count > budget:
+        repeated = ", ".join(f"{n}× {key}" for key, n in profile.top_shapes())
+        raise QueryBudgetExceeded(f"{label}: {profile.count} queries > budget {budget} ({repeated})")
+
+
+def route_template(scope) -> Optional[str]:
+    """
+    Full template of the route that served the request ("/api/tasks/{task_id}"),
+    None when no route matched. The route's own path may lack the prefix of
+    the router it was included with, so the prefix is taken from the request
+    path in front of the part the route matched, behind the mount root_path.
+    """
+    route = scope.get("route")
+    template, regex = getattr(route, "path", None), getattr(route, "path_regex", None)
+    if not template or regex is None:
+        return None
+    root_path, path = scope.get("root_path", ""), scope.get("path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    start = 0
+    while start != -1:
+        if regex.match(path[start:]):
+            return root_path + path[:start] + template
+        start = path.find("/", start + 1)
+    return root_path + template
+
+
+async def query_profiler_middleware(request, call_next):
+    """HTTP middleware: one QueryProfile per request, budget check, debug headers"""
+    if not QUERY_PROFILER_ENABLED:
+        return await call_next(request)
+
+    profile = QueryProfile(f"{request.method} {request.url.path}")
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+
+    route_key = f"{request.method} {route_template(request.scope) or request.url.path}"
+    profile.label = route_key
+    _record_route(route_key, profile, _check_budget(route_key, profile))
+
+    if QUERY_DEBUG_HEADERS:
+        total_ms = (time.perf_counter() - started) * 1000
+        response.headers["X-DB-Query-Count"] = str(profile.count)
+        response.headers["Server-Timing"] = (
+            f'db;dur={profile.db_ms:.1f};desc="{profile.count} queries", app;dur={total_ms:.1f}'
+        )
+    return response
+
+
+def get_query_profiler_stats() -> Dict[str, Any]:
+    """Per-route query counters since start, heaviest routes first"""
+    with _stats_lock:
+        routes = {
+            route: {
+                **stats,
+                "db_ms": round(stats["db_ms"], 2),
+                "avg_queries": round(stats["queries"] / stats["requests"], 2),
+                "avg_db_ms": round(stats["db_ms"] / stats["requests"], 2),
+                "budget": QUERY_BUDGETS.get(route, QUERY_BUDGET_DEFAULT),
+            }
+            for route, stats in _route_stats.items()
+        }
+    return {
+        "enabled": QUERY_PROFILER_ENABLED,
+        "slow_ms": QUERY_SLOW_MS,
+        "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["avg_queries"])),
+    }
+
+
+def reset_query_profiler_stats() -> None:
+    with _stats_lock:
+        _route_stats.clear()
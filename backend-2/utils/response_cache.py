@@ -0,0 +1,223 @@
+"""
+Response cache for repeated read-only assistant questions.
+
+Entries are keyed by (surface, user, normalized prompt, model, user-context
+version, UTC day):
+  - the context version comes from utils.user_context_service and is bumped by
+    every task/sprint/project write that touches one of the user's projects,
+    so writes invalidate by project/user scope without scanning the cache
+  - the UTC day keeps "today"/"overdue" answers from outliving the date
+
+Only self-contained prompts are cached: no task commands, no attachments,
+and — once a conversation has history — no follow-ups that refer back to it
+("what about that one?"). Agent turns are cached only when every tool they
+called is read-only.
+
+With RESPONSE_CACHE_SEMANTIC=true and AZURE_OPENAI_EMBEDDING_DEPLOYMENT set,
+an exact-key miss falls back to cosine similarity over the user's live entries
+(same surface, version and day). Embeddings use AZURE_OPENAI_EMBEDDING_ENDPOINT
+and AZURE_OPENAI_EMBEDDING_API_VERSION, defaulting to the chat endpoint and
+AZURE_OPENAI_API_VERSION.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_MAX_PROMPT_CHARS = int(os.getenv("RESPONSE_CACHE_MAX_PROMPT_CHARS", "300"))
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))
+AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+AZURE_OPENAI_EMBEDDING_ENDPOINT = os.getenv("AZURE_OPENAI_EMBEDDING_ENDPOINT")
+AZURE_OPENAI_EMBEDDING_API_VERSION = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION")
+
+READ_ONLY_TOOL_PREFIXES = ("get_", "list_", "search_")
+
+_FILLER = re.compile(
+    r"^(?:(?:hey|hi|hello|ok|okay|please|pls|can you|could you|would you|tell me|show me|give me)\b[\s,]*)+"
+)
+# Words that make a prompt depend on earlier turns of the conversation.
+_REFERENTIAL = re.compile(
+    r"\b(it|its|that|this|those|these|them|they|above|previous|earlier|again|"
+    r"first one|second one|last one|same|more|else|instead)\b"
+)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_stats = {
+    "lookups": 0,
+    "hits": 0,
+    "semantic_hits": 0,
+    "stores": 0,
+    "uncacheable": 0,
+    "saved_tokens": 0,
+    "saved_ms": 0.0,
+}
+
+
+def normalize_prompt(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[‘’“”'\"`]", "", text)
+    text = re.sub(r"[^\w\s-]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return _FILLER.sub("", text).strip()
+
+
+def is_read_only_turn(tool_names: Iterable[str]) -> bool:
+    return all((name or "").startswith(READ_ONLY_TOOL_PREFIXES) for name in tool_names)
+
+
+def response_cache_key(
+    surface: str,
+    user_id: str,
+    prompt: str,
+    model: Optional[str],
+    has_history: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Build the cache handle for a prompt, or None when it must not be cached.
+    Pass the handle to lookup_response() and, after a miss, store_response().
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    normalized = normalize_prompt(prompt or "")
+    if (
+        not normalized
+        or len(prompt) > RESPONSE_CACHE_MAX_PROMPT_CHARS
+        or (has_history and _REFERENTIAL.search(normalized))
+    ):
+        _stats["uncacheable"] += 1
+        return None
+
+    from utils.user_context_service import get_user_context_version
+
+    scope = f"{surface}|{user_id}|{model}|{get_user_context_version(user_id)}|{datetime.now(timezone.utc).date()}"
+    return {
+        "key": hashlib.sha256(f"{scope}|{normalized}".encode("utf-8")).hexdigest(),
+        "scope": scope,
+        "user_id": user_id,
+        "normalized": normalized,
+        "started": time.perf_counter(),
+    }
+
+
+def _embed(text: str) -> Optional[List[float]]:
+    if not (RESPONSE_CACHE_SEMANTIC and AZURE_OPENAI_EMBEDDING_DEPLOYMENT):
+        return None
+    from utils.azure_ai_utils import AZURE_OPENAI_API_VERSION, get_azure_client
+
+    client = get_azure_client(
+        AZURE_OPENAI_EMBEDDING_API_VERSION or AZURE_OPENAI_API_VERSION,
+        endpoint=AZURE_OPENAI_EMBEDDING_ENDPOINT,
+        deployment=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+    )
+    response = client.embeddings.create(model=AZURE_OPENAI_EMBEDDING_DEPLOYMENT, input=text)
+    return response.data[0].embedding
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _live(entry: Dict[str, Any]) -> bool:
+    return entry["expires_at"] > time.time()
+
+
+def lookup_response(handle: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return {"content", "tokens", "match"} for a cached answer, else None."""
+    if handle is None:
+        return None
+    _stats["lookups"] += 1
+    match = "exact"
+    with _lock:
+        entry = _entries.get(handle["key"])
+        if entry is not None and not _live(entry):
+            _entries.pop(handle["key"], None)
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(handle["key"])
+
+    if entry is None and RESPONSE_CACHE_SEMANTIC:
+        try:
+            handle["embedding"] = _embed(handle["normalized"])
+        except Exception as exc:
+            print(f"⚠️  Response cache embedding failed: {exc}")
+            handle["embedding"] = None
+        if handle["embedding"]:
+            with _lock:
+                candidates = [
+                    e
+                    for e in _entries.values()
+                    if e["scope"] == handle["scope"] and e.get("embedding") and _live(e)
+                ]
+            scored = [(_cosine(handle["embedding"], e["embedding"]), e) for e in candidates]
+            best = max(scored, key=lambda s: s[0], default=(0.0, None))
+            if best[1] is not None and best[0] >= RESPONSE_CACHE_SIMILARITY:
+                entry, match = best[1], "semantic"
+
+    if entry is None:
+        return None
+    _stats["hits"] += 1
+    if match == "semantic":
+        _stats["semantic_hits"] += 1
+    _stats["saved_tokens"] += entry["tokens"].get("total", 0)
+    _stats["saved_ms"] += entry["elapsed_ms"]
+    return {"content": entry["content"], "tokens": entry["tokens"], "match": match}
+
+
+def store_response(
+    handle: Optional[Dict[str, Any]], content: str, tokens: Optional[Dict[str, Any]] = None
+) -> None:
+    if handle is None or not content:
+        return
+    entry = {
+        "scope": handle["scope"],
+        "content": content,
+        "tokens": tokens or {},
+        "embedding": handle.get("embedding"),
+        "elapsed_ms": round((time.perf_counter() - handle["started"]) * 1000, 1),
+        "expires_at": time.time() + RESPONSE_CACHE_TTL_SECONDS,
+    }
+    with _lock:
+        _entries[handle["key"]] = entry
+        _entries.move_to_end(handle["key"])
+        while len(_entries) > RESPONSE_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+    _stats["stores"] += 1
+
+
+def clear_response_cache() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    lookups = _stats["lookups"]
+    return {
+        **_stats,
+        "saved_ms": round(_stats["saved_ms"], 1),
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+        "entries": len(_entries),
+        "enabled": RESPONSE_CACHE_ENABLED,
+        "semantic": bool(RESPONSE_CACHE_SEMANTIC and AZURE_OPENAI_EMBEDDING_DEPLOYMENT),
+        "ttl_seconds": RESPONSE_CACHE_TTL_SECONDS,
+    }
@@ -0,0 +1,206 @@
+"""
+Sprint statistics from single aggregations over the tasks collection.
+
+Every sprint's status breakdown for a project (or an explicit list of sprints)
+comes from one $group on (sprint_id, status) instead of a count_documents per
+sprint per status. Burndown and velocity series are built from the same task
+data: burndown groups a sprint's finished tasks by completion day, velocity
+reuses the status breakdown of the project's completed sprints.
+
+Counts are computed on read rather than kept as counters on the sprint:
+tasks are also written by agent tools outside the models, and an indexed
+aggregation stays exact regardless of who wrote the task.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from database import db
+
+# Sprint stats keep their historical meaning: "completed" is status Done.
+# Burndown/velocity count work as finished once it is Done or Closed.
+FINISHED_STATUSES = ["Done", "Closed"]
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "total_tasks": 0,
+        "completed_tasks": 0,
+        "in_progress_tasks": 0,
+        "todo_tasks": 0,
+        "completion_percentage": 0,
+        "by_status": {},
+    }
+
+
+def _fold(rows: Iterable[Dict[str, Any]], sprint_ids: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+    stats = {sprint_id: _empty_stats() for sprint_id in sprint_ids}
+    for row in rows:
+        entry = stats.setdefault(row["_id"]["sprint_id"], _empty_stats())
+        entry["by_status"][row["_id"]["status"] or "To Do"] = row["n"]
+    for entry in stats.values():
+        by_status = entry["by_status"]
+        entry["total_tasks"] = sum(by_status.values())
+        entry["completed_tasks"] = by_status.get("Done", 0)
+        entry["in_progress_tasks"] = by_status.get("In Progress", 0)
+        entry["todo_tasks"] = by_status.get("To Do", 0)
+        if entry["total_tasks"]:
+            entry["completion_percentage"] = round(entry["completed_tasks"] / entry["total_tasks"] * 100, 1)
+    return stats
+
+
+def _group_by_sprint_and_status(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(
+        db.tasks.aggregate(
+            [
+                {"$match": match},
+                {"$group": {"_id": {"sprint_id": "$sprint_id", "status": "$status"}, "n": {"$sum": 1}}},
+            ]
+        )
+    )
+
+
+def get_sprint_stats_map(sprint_ids: Iterable) -> Dict[str, Dict[str, Any]]:
+    """{sprint_id: stats} for the given sprints (ObjectIds or strings), one aggregation."""
+    sprint_ids = [str(s) for s in sprint_ids if s]
+    if not sprint_ids:
+        return {}
+    return _fold(_group_by_sprint_and_status({"sprint_id": {"$in": sprint_ids}}), sprint_ids)
+
+
+def get_project_sprint_stats(project_id: str, sprint_ids: Iterable = ()) -> Dict[str, Dict[str, Any]]:
+    """{sprint_id: stats} for every sprint of a project that has tasks, one aggregation.
+    sprint_ids: sprints to include even when they have no tasks yet."""
+    rows = _group_by_sprint_and_status({"project_id": project_id, "sprint_id": {"$nin": [None, ""]}})
+    return _fold(rows, [str(s) for s in sprint_ids])
+
+
+def get_sprint_stats(sprint_id) -> Dict[str, Any]:
+    return get_sprint_stats_map([sprint_id]).get(str(sprint_id), _empty_stats())
+
+
+def _parse_day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def get_sprint_burndown(sprint: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Remaining-work series for a sprint, one point per day from start to end
+    (or today for a running sprint), with the ideal straight line.
+    Tasks finish on ``completed_at`` (set by update_task) or, for older
+    tasks, their last ``updated_at``.
+    """
+    sprint_id = str(sprint["_id"])
+    facet = next(
+        db.tasks.aggregate(
+            [
+                {"$match": {"sprint_id": sprint_id}},
+                {
+                    "$facet": {
+                        "total": [{"$count": "n"}],
+                        "finished": [
+                            {"$match": {"status": {"$in": FINISHED_STATUSES}}},
+                            {
+                                "$group": {
+                                    "_id": {
+                                        "$dateToString": {
+                                            "format": "%Y-%m-%d",
+                                            "date": {"$ifNull": ["$completed_at", "$updated_at"]},
+                                        }
+                                    },
+                                    "n": {"$sum": 1},
+                                }
+                            },
+                        ],
+                    }
+                },
+            ]
+        ),
+        {"total": [], "finished": []},
+    )
+    total = facet["total"][0]["n"] if facet["total"] else 0
+    # complete_sprint moves unfinished tasks back to the backlog
+    if sprint.get("status") == "completed":
+        total = max(total, sprint.get("total_tasks_snapshot") or 0)
+    finished_by_day = {row["_id"]: row["n"] for row in facet["finished"] if row["_id"]}
+
+    today = datetime.now(timezone.utc).date()
+    start = _parse_day(sprint.get("start_date")) or _parse_day(sprint.get("created_at")) or today
+    planned_end = max(
+        _parse_day(sprint.get("end_date")) or _parse_day(sprint.get("completed_at")) or today, start
+    )
+    planned_days = max((planned_end - start).days, 1)
+    # A running sprint's series stops at today; the ideal line still targets the planned end
+    end = planned_end if sprint.get("status") == "completed" else max(min(planned_end, today), start)
+
+    # Work finished before the sprint started burns down on day one
+    done = sum(n for day, n in finished_by_day.items() if day < start.isoformat())
+    series = []
+    day = start
+    while day <= end:
+        key = day.isoformat()
+        done += finished_by_day.get(key, 0)
+        elapsed = (day - start).days
+        series.append(
+            {
+                "date": key,
+                "completed": finished_by_day.get(key, 0),
+                "remaining": max(total - done, 0),
+                "ideal": round(max(total * (1 - elapsed / planned_days), 0), 1),
+            }
+        )
+        day += timedelta(days=1)
+
+    return {
+        "sprint_id": sprint_id,
+        "name": sprint.get("name"),
+        "status": sprint.get("status", "planned"),
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "total_tasks": total,
+        "series": series,
+    }
+
+
+def get_project_velocity(project_id: str, limit: int = 8) -> Dict[str, Any]:
+    """Finished vs committed tasks for the last ``limit`` completed sprints, oldest first."""
+    completed = list(
+        db.sprints.find(
+            {"project_id": project_id, "status": "completed"},
+            {"name": 1, "completed_at": 1, "total_tasks_snapshot": 1},
+        )
+        .sort("completed_at", -1)
+        .limit(limit)
+    )
+    completed.reverse()
+    stats = get_sprint_stats_map(s["_id"] for s in completed)
+
+    series = []
+    for sprint in completed:
+        by_status = stats.get(str(sprint["_id"]), {}).get("by_status", {})
+        finished = sum(by_status.get(status, 0) for status in FINISHED_STATUSES)
+        series.append(
+            {
+                "sprint_id": str(sprint["_id"]),
+                "name": sprint.get("name"),
+                "completed_at": sprint.get("completed_at"),
+                "completed": finished,
+                "committed": max(sprint.get("total_tasks_snapshot") or 0, finished),
+            }
+        )
+    recent = [point["completed"] for point in series[-3:]]
+    return {
+        "project_id": project_id,
+        "series": series,
+        "average_last_3": round(sum(recent) / len(recent), 1) if recent else 0,
+    }
+
+
+def ensure_sprint_stats_indexes() -> None:
+    db.tasks.create_index([("sprint_id", 1), ("status", 1)])
+    db.tasks.create_index([("project_id", 1), ("sprint_id", 1), ("status", 1)])
@@ -0,0 +1,63 @@
+"""
+In-process write events for tasks, sprints and projects.
+
+Models publish after a successful write; consumers (RAG indexer, context
+snapshot cache) subscribe with a callback. Callbacks run synchronously on the
+writer's thread, so they must only enqueue or invalidate — never block or
+raise into the write path.
+
+The payload is whatever the model already has in hand after the write (the
+full document on create, the changed fields plus ids on update/delete); it
+always carries ``project_id`` when the model knows it.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+TaskEventHandler = Callable[[str, str, Optional[Dict[str, Any]]], None]
+
+_subscribers: Dict[str, List[TaskEventHandler]] = {
+    "task": [],
+    "sprint": [],
+    "project": [],
+}
+
+
+def _subscribe(entity: str, handler: TaskEventHandler) -> None:
+    if handler not in _subscribers[entity]:
+        _subscribers[entity].append(handler)
+
+
+def _publish(entity: str, event: str, entity_id, doc: Optional[Dict[str, Any]]) -> None:
+    for handler in list(_subscribers[entity]):
+        try:
+            handler(event, str(entity_id), doc)
+        except Exception as e:
+            print(f"⚠️  {entity.title()} event handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+
+def subscribe_task_events(handler: TaskEventHandler) -> None:
+    """Register ``handler(event, task_id, task)``; event is created|updated|deleted."""
+    _subscribe("task", handler)
+
+
+def publish_task_event(event: str, task_id, task: Optional[Dict[str, Any]] = None) -> None:
+    _publish("task", event, task_id, task)
+
+
+def subscribe_sprint_events(handler: TaskEventHandler) -> None:
+    """Register ``handler(event, sprint_id, sprint)``."""
+    _subscribe("sprint", handler)
+
+
+def publish_sprint_event(event: str, sprint_id, sprint: Optional[Dict[str, Any]] = None) -> None:
+    _publish("sprint", event, sprint_id, sprint)
+
+
+def subscribe_project_events(handler: TaskEventHandler) -> None:
+    """Register ``handler(event, project_id, project)``; project may carry ``user_id``
+    of the owner or of the member that was added/removed."""
+    _subscribe("project", handler)
+
+
+def publish_project_event(event: str, project_id, project: Optional[Dict[str, Any]] = None) -> None:
+    _publish("project", event, project_id, project)
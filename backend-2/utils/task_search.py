@@ -0,0 +1,259 @@
+"""
+Task knowledge search.
+
+Lexical recall comes from a MongoDB text index over ticket id, title,
+description and recent comments (``recent_comments.comment``, the last
+TASK_RECENT_COMMENTS kept on the task; the full log lives in
+task_activity_buckets), ranked by textScore with field weights. Mongo
+maintains the index on every task/comment write, so there is no separate
+indexing job. The candidate set is scoped to the user's projects
+inside the same aggregation, and pagination + total count come back in one
+round trip via $facet.
+
+Optional semantic recall (TASK_SEARCH_SEMANTIC=true) reuses the local agent's
+per-user Chroma task documents (utils.local_rag_indexer, kept fresh by task
+write events) and merges both rankings with reciprocal rank fusion.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import OperationFailure
+
+from database import db
+
+TASK_SEARCH_INDEX_NAME = "task_search_text"
+TASK_SEARCH_SEMANTIC = os.getenv("TASK_SEARCH_SEMANTIC", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+TASK_SEARCH_MAX_PAGE_SIZE = int(os.getenv("TASK_SEARCH_MAX_PAGE_SIZE", "50"))
+# Reciprocal rank fusion constant (standard value from the RRF paper).
+_RRF_K = 60
+
+_RESULT_FIELDS = {
+    "ticket_id": 1,
+    "title": 1,
+    "status": 1,
+    "priority": 1,
+    "project_id": 1,
+    "description": 1,
+    "updated_at": 1,
+    "recent_comments.comment": 1,
+}
+
+
+def _user_project_ids(user_id: str) -> List[str]:
+    return [
+        str(p["_id"])
+        for p in db.projects.find(
+            {"$or": [{"user_id": user_id}, {"members.user_id": user_id}]}, {"_id": 1}
+        )
+    ]
+
+
+def _query_terms(query: str) -> List[str]:
+    return [t for t in re.findall(r"\w+", query.lower()) if len(t) > 1]
+
+
+def highlight(text: str, terms: List[str], width: int = 160) -> str:
+    """
+    Return a snippet of ``text`` around the first term hit, hits wrapped in **.
+    Bold markers already in the text are dropped so emphasis never nests.
+    """
+    if not text:
+        return ""
+    flat = " ".join(text.replace("**", "").replace("__", "").split())
+    if not terms:
+        return flat[:width] + ("..." if len(flat) > width else "")
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*", re.I)
+    first = pattern.search(flat)
+    start = max(0, first.start() - width // 3) if first else 0
+    snippet = flat[start : start + width]
+    snippet = pattern.sub(lambda m: f"**{m.group(0)}**", snippet)
+    return ("..." if start else "") + snippet + ("..." if start + width < len(flat) else "")
+
+
+def _best_comment(task: Dict[str, Any], terms: List[str]) -> str:
+    for activity in task.get("recent_comments") or []:
+        comment = activity.get("comment") or ""
+        if any(t in comment.lower() for t in terms):
+            return comment
+    return ""
+
+
+def _text_search(project_ids: List[str], query: str, skip: int, limit: int) -> Dict[str, Any]:
+    pipeline = [
+        {"$match": {"$text": {"$search": query}, "project_id": {"$in": project_ids}}},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1, "updated_at": -1}},
+        {
+            "$facet": {
+                "total": [{"$count": "n"}],
+                "items": [
+                    {"$skip": skip},
+                    {"$limit": limit},
+                    {"$project": {**_RESULT_FIELDS, "score": 1}},
+                ],
+            }
+        },
+    ]
+    facet = next(db.tasks.aggregate(pipeline), {"total": [], "items": []})
+    total = facet["total"][0]["n"] if facet["total"] else 0
+    return {"total": total, "items": facet["items"]}
+
+
+def _regex_search(project_ids: List[str], query: str, skip: int, limit: int) -> Dict[str, Any]:
+    """Fallback when the text index has not been created yet."""
+    pattern = {"$regex": re.escape(query), "$options": "i"}
+    match = {
+        "project_id": {"$in": project_ids},
+        "$or": [
+            {"ticket_id": pattern},
+            {"title": pattern},
+            {"description": pattern},
+            {"recent_comments.comment": pattern},
+        ],
+    }
+    items = list(
+        db.tasks.find(match, _RESULT_FIELDS).sort("updated_at", -1).skip(skip).limit(limit)
+    )
+    return {"total": db.tasks.count_documents(match), "items": items}
+
+
+def _semantic_task_ids(user_id: str, query: str, k: int) -> List[str]:
+    from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+    from utils.local_agent_utils import get_vector_index
+    from utils.local_rag_indexer import is_user_indexed
+
+    if not is_user_indexed(user_id):
+        return []
+    retriever = get_vector_index().as_retriever(
+        similarity_top_k=k,
+        filters=MetadataFilters(
+            filters=[
+                MetadataFilter(key="user_id", value=user_id),
+                MetadataFilter(key="type", value="task"),
+            ]
+        ),
+    )
+    return [hit.node.metadata.get("entity_id") for hit in retriever.retrieve(query)]
+
+
+def _fuse(lexical: List[Dict[str, Any]], semantic_ids: List[str], project_ids: List[str]) -> List[Dict[str, Any]]:
+    from bson import ObjectId
+
+    scores: Dict[str, float] = {}
+    by_id = {str(t["_id"]): t for t in lexical}
+    for rank, task in enumerate(lexical):
+        scores[str(task["_id"])] = 1 / (_RRF_K + rank + 1)
+    for rank, task_id in enumerate(semantic_ids):
+        scores[task_id] = scores.get(task_id, 0) + 1 / (_RRF_K + rank + 1)
+
+    missing = [ObjectId(t) for t in semantic_ids if t not in by_id and ObjectId.is_valid(t)]
+    if missing:
+        for task in db.tasks.find(
+            {"_id": {"$in": missing}, "project_id": {"$in": project_ids}}, _RESULT_FIELDS
+        ):
+            by_id[str(task["_id"])] = task
+    ranked = sorted((tid for tid in scores if tid in by_id), key=scores.get, reverse=True)
+    return [by_id[tid] for tid in ranked]
+
+
+def search_tasks(
+    user_id: str,
+    query: str,
+    page: int = 1,
+    page_size: int = 6,
+    project_id: Optional[str] = None,
+    semantic: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Search tasks visible to ``user_id``.
+
+    Returns {"query", "page", "page_size", "total", "mode", "results": [...]}
+    where each result carries a highlighted ``snippet`` (description or the
+    best matching comment).
+    """
+    page = max(1, page)
+    page_size = max(1, min(page_size, TASK_SEARCH_MAX_PAGE_SIZE))
+    project_ids = _user_project_ids(user_id)
+    if project_id:
+        project_ids = [p for p in project_ids if p == project_id]
+    empty = {"query": query, "page": page, "page_size": page_size, "total": 0, "mode": "none", "results": []}
+    if not project_ids or not query.strip():
+        return empty
+
+    skip = (page - 1) * page_size
+    use_semantic = TASK_SEARCH_SEMANTIC if semantic is None else semantic
+    # Fusion re-ranks the head of the lexical list, so fetch everything up to this page.
+    fetch_skip, fetch_limit = (0, skip + page_size) if use_semantic else (skip, page_size)
+
+    mode = "text"
+    try:
+        found = _text_search(project_ids, query, fetch_skip, fetch_limit)
+    except OperationFailure as exc:
+        if "text index" not in str(exc):
+            raise
+        mode = "regex"
+        found = _regex_search(project_ids, query, fetch_skip, fetch_limit)
+
+    items, total = found["items"], found["total"]
+    if use_semantic:
+        try:
+            semantic_ids = _semantic_task_ids(user_id, query, skip + page_size)
+            if semantic_ids:
+                fused = _fuse(items, semantic_ids, project_ids)
+                total = max(total, len(fused))
+                items = fused
+                mode += "+semantic"
+        except Exception as exc:
+            print(f"⚠️  Semantic task search unavailable: {exc}")
+        items = items[skip : skip + page_size]
+
+    terms = _query_terms(query)
+    results = []
+    for task in items:
+        description = task.get("description") or ""
+        comment = _best_comment(task, terms)
+        use_comment = bool(comment) and not any(t in description.lower() for t in terms)
+        source = comment if use_comment else description
+        results.append(
+            {
+                "id": str(task["_id"]),
+                "ticket_id": task.get("ticket_id"),
+                "title": highlight(task.get("title") or "", terms, width=200),
+                "status": task.get("status"),
+                "priority": task.get("priority"),
+                "project_id": task.get("project_id"),
+                "score": round(task["score"], 3) if "score" in task else None,
+                "matched_in": "comment" if use_comment else "description",
+                "snippet": highlight(source, terms),
+            }
+        )
+    return {**empty, "total": total, "mode": mode, "results": results}
+
+
+def ensure_task_search_indexes() -> None:
+    # A collection may only have one text index.
+    keys = [
+        ("ticket_id", "text"),
+        ("title", "text"),
+        ("description", "text"),
+        ("recent_comments.comment", "text"),
+    ]
+    options = {
+        "name": TASK_SEARCH_INDEX_NAME,
+        "weights": {"ticket_id": 10, "title": 8, "description": 3, "recent_comments.comment": 1},
+        "default_language": "english",
+    }
+    try:
+        db.tasks.create_index(keys, **options)
+    except OperationFailure:
+        # Older deployments indexed activities.comment under the same name
+        db.tasks.drop_index(TASK_SEARCH_INDEX_NAME)
+        db.tasks.create_index(keys, **options)
+    db.tasks.create_index([("project_id", 1), ("updated_at", -1)])
@@ -2,9 +2,18 @@
 Ticket ID Generator Utility
 Generates unique ticket IDs in format: PREFIX-NUMBER
 Example: TASK-001, BUG-123, PROJ-045
+
+Numbers come from a per-project counter in ticket_counters, so a batch of N
+tasks reserves N ids with one atomic $inc instead of counting and probing.
 """
-from database import tasks, projects
+import re
+
+from database import tasks, projects, db
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+ticket_counters = db.ticket_counters
 
 
 def generate_ticket_id(project_id, issue_type="task"):
@@ -20,29 +29,77 @@ def generate_ticket_id(project_id, issue_type="task"):
     Returns:
         str: Unique ticket ID like "PROJ-123"
     """
-    # Get project to extract prefix
-    project = projects.find_one({"_id": ObjectId(project_id)})
+    return reserve_ticket_ids(project_id, 1)[0]
+
+
+def _highest_ticket_number(project_id, prefix):
+    """Largest number among the project's existing {prefix}-N tickets (0 if none)"""
+    pattern = re.compile(rf"^{re.escape(prefix)}-(\d+)$")
+    highest = 0
+    for task in tasks.find(
+        {"project_id": str(project_id), "ticket_id": {"$regex": f"^{re.escape(prefix)}-"}},
+        {"ticket_id": 1, "_id": 0}
+    ):
+        match = pattern.match(task.get("ticket_id") or "")
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def _advance_counter(project_id, count):
+    """$inc the project's counter by count; returns the new value or None if it does not exist yet"""
+    counter = ticket_counters.find_one_and_update(
+        {"_id": str(project_id)},
+        {"$inc": {"seq": count}},
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] if counter else None
+
+
+def reserve_ticket_ids(project_id, count, project=None):
+    """
+    Reserve ``count`` consecutive ticket ids for a project.
+
+    The counter is seeded from the project's highest existing ticket number the
+    first time it is used, so projects created before the counter keep counting
+    from where they are. Ids already taken by another project with the same
+    prefix are skipped and replaced.
+
+    Args:
+        project_id: The project ObjectId or string
+        count: Number of ids to reserve
+        project: The project document, if already loaded (needs "name")
+
+    Returns:
+        list: Ticket ids like ["PROJ-124", "PROJ-125"], in reservation order
+    """
+    if count <= 0:
+        return []
+    if project is None:
+        project = projects.find_one({"_id": ObjectId(project_id)}, {"name": 1})
     if not project:
         raise ValueError(f"Project {project_id} not found")
-    
-    # Generate project prefix from project name
-    # Take first 4 letters (uppercase) or create from initials
-    project_name = project.get("name", "PROJ")
-    prefix = generate_project_prefix(project_name)
-    
-    # Count existing tasks in this project to determine next number
-    existing_count = tasks.count_documents({"project_id": str(project_id)})
-    next_number = existing_count + 1
-    
-    # Generate ticket ID with zero-padding (e.g., PROJ-001, PROJ-042)
-    ticket_id = f"{prefix}-{next_number:03d}"
-    
-    # Ensure uniqueness (in case of concurrent creation)
-    while tasks.find_one({"ticket_id": ticket_id}):
-        next_number += 1
-        ticket_id = f"{prefix}-{next_number:03d}"
-    
-    return ticket_id
+    prefix = generate_project_prefix(project.get("name", "PROJ"))
+
+    reserved = []
+    needed = count
+    while needed:
+        last = _advance_counter(project_id, needed)
+        if last is None:
+            try:
+                ticket_counters.insert_one(
+                    {"_id": str(project_id), "seq": _highest_ticket_number(project_id, prefix)}
+                )
+            except DuplicateKeyError:
+                pass  # Seeded concurrently
+            last = _advance_counter(project_id, needed)
+        ids = [f"{prefix}-{n:03d}" for n in range(last - needed + 1, last + 1)]
+
+        # Prefixes are not unique across projects: one probe for the whole batch
+        taken = {t["ticket_id"] for t in tasks.find({"ticket_id": {"$in": ids}}, {"ticket_id": 1, "_id": 0})}
+        reserved.extend(i for i in ids if i not in taken)
+        needed = len(taken)
+    return reserved
 
 
 def generate_project_prefix(project_name):
@@ -0,0 +1,178 @@
+"""
+Shared user-context snapshot for every AI entry point.
+
+get_user_snapshot() returns the analyze_user_data_for_ai() snapshot from a
+per-user cache; get_agent_context() derives the compact dict the LangGraph and
+local agents inject into their prompts. A snapshot is built at most once per
+user at a time (concurrent requests wait for the same build) and is dropped
+as soon as a task, sprint or project write touches one of the user's projects.
+USER_CONTEXT_TTL_SECONDS only bounds staleness from writes that bypass the
+models (raw db.tasks updates in tools and MCP servers).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from utils.ai_data_analyzer import analyze_user_data_for_ai
+from utils.cache_utils import TTLCache
+from utils.task_events import (
+    subscribe_project_events,
+    subscribe_sprint_events,
+    subscribe_task_events,
+)
+
+USER_CONTEXT_TTL_SECONDS = int(os.getenv("USER_CONTEXT_TTL_SECONDS", "120"))
+
+_snapshots = TTLCache(default_ttl=USER_CONTEXT_TTL_SECONDS)
+_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+# Bumped on every invalidation so a build that raced a write is not cached.
+_generations: Dict[str, int] = defaultdict(int)
+# user_id → content hash of the cached snapshot
+_content_hashes: Dict[str, str] = {}
+# project_id → users whose cached snapshot includes that project
+_project_users: Dict[str, Set[str]] = defaultdict(set)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0, "build_ms_total": 0.0}
+
+
+def get_user_snapshot(user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Cached analyze_user_data_for_ai(user_id). Treat the result as read-only —
+    it is shared between requests.
+    """
+    snapshot = _snapshots.get(user_id)
+    if snapshot is not None:
+        _stats["hits"] += 1
+        return snapshot
+
+    with _build_locks[user_id]:
+        snapshot = _snapshots.get(user_id)
+        if snapshot is not None:
+            _stats["hits"] += 1
+            return snapshot
+
+        _stats["misses"] += 1
+        generation = _generations[user_id]
+        started = time.perf_counter()
+        snapshot = analyze_user_data_for_ai(user_id)
+        _stats["build_ms_total"] += (time.perf_counter() - started) * 1000
+        if snapshot is None:
+            return None
+
+        with _lock:
+            if _generations[user_id] == generation:
+                _snapshots.set(user_id, snapshot)
+                _content_hashes[user_id] = hashlib.sha1(
+                    json.dumps(snapshot, sort_keys=True, default=str).encode("utf-8")
+                ).hexdigest()[:12]
+                for project_id in snapshot["team"]["projects_team_info"]:
+                    _project_users[project_id].add(user_id)
+        return snapshot
+
+
+def get_user_context_version(user_id: str) -> str:
+    """
+    Version stamp of the user's data: changes on every write event that touches
+    the user and whenever a rebuilt snapshot differs from the previous one.
+    """
+    get_user_snapshot(user_id)
+    return f"{_generations[user_id]}:{_content_hashes.get(user_id, '-')}"
+
+
+def get_agent_context(user_id: str) -> Optional[Dict[str, Any]]:
+    """Compact context injected into the LangGraph / local agent prompts."""
+    user_data = get_user_snapshot(user_id)
+    if not user_data:
+        return None
+
+    stats = user_data.get("stats", {})
+    tasks = stats.get("tasks", {})
+    projects = stats.get("projects", {})
+    sprints = stats.get("sprints", {})
+    velocity = user_data.get("velocity", {})
+    blockers = user_data.get("blockers", {})
+
+    return {
+        "user_name": user_data["user"]["name"],
+        "user_role": user_data["user"]["role"],
+        "tasks_total": tasks.get("total", 0),
+        "tasks_overdue": tasks.get("overdue", 0),
+        "tasks_due_soon": tasks.get("dueSoon", 0),
+        "tasks_done_week": tasks.get("completedWeek", 0),
+        "status_breakdown": tasks.get("statusBreakdown", {}),
+        "priority_breakdown": tasks.get("priorityBreakdown", {}),
+        "projects_total": projects.get("total", 0),
+        "sprints_active": sprints.get("active", 0),
+        "velocity_30d": velocity.get("completed_last_30_days", 0),
+        "blocked_tasks": blockers.get("blocked_tasks", 0),
+        "recent_tasks": [
+            {
+                "ticket": t.get("ticket_id"),
+                "title": t.get("title"),
+                "status": t.get("status"),
+                "due": t.get("dueDate"),
+            }
+            for t in user_data.get("recentTasks", [])[:8]
+        ],
+    }
+
+
+def invalidate_user_context(user_id: Optional[str] = None) -> None:
+    """Drop the cached snapshot for one user (or everyone)."""
+    with _lock:
+        if user_id is None:
+            for uid in list(_generations):
+                _generations[uid] += 1
+            _snapshots.clear()
+            _project_users.clear()
+            return
+        _generations[user_id] += 1
+        _snapshots.clear(user_id)
+    _stats["invalidations"] += 1
+
+
+def _invalidate_project(project_id: Optional[str], *extra_users: Optional[str]) -> None:
+    users = set()
+    if project_id:
+        with _lock:
+            users.update(_project_users.pop(str(project_id), set()))
+    users.update(u for u in extra_users if u)
+    for user_id in users:
+        invalidate_user_context(user_id)
+
+
+def _on_task_event(event: str, task_id: str, task: Optional[Dict[str, Any]]) -> None:
+    task = task or {}
+    _invalidate_project(
+        task.get("project_id"), task.get("assignee_id"), task.get("previous_assignee_id")
+    )
+
+
+def _on_sprint_event(event: str, sprint_id: str, sprint: Optional[Dict[str, Any]]) -> None:
+    _invalidate_project((sprint or {}).get("project_id"))
+
+
+def _on_project_event(event: str, project_id: str, project: Optional[Dict[str, Any]]) -> None:
+    # Owner on create, the added/removed member on membership changes.
+    _invalidate_project(project_id, (project or {}).get("user_id"))
+
+
+subscribe_task_events(_on_task_event)
+subscribe_sprint_events(_on_sprint_event)
+subscribe_project_events(_on_project_event)
+
+
+def get_user_context_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "build_ms_total": round(_stats["build_ms_total"], 1),
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+        "cached_users": _snapshots.size(),
+        "ttl_seconds": USER_CONTEXT_TTL_SECONDS,
+    }
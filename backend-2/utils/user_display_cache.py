@@ -0,0 +1,78 @@
+"""
+Name/email lookup cache for task payloads and activity entries.
+
+Task mutations and _enrich_task_display_fields only need a user's display
+name and email, yet each used to cost a full users.find_one. Entries live for
+USER_DISPLAY_CACHE_TTL_SECONDS and are dropped by User.update /
+User.delete_by_id, so a rename shows up immediately in this process and within
+the TTL in other workers.
+"""
+
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from database import users
+from utils.cache_utils import TTLCache
+
+USER_DISPLAY_CACHE_TTL_SECONDS = int(os.getenv("USER_DISPLAY_CACHE_TTL_SECONDS", "300"))
+
+_DISPLAY_FIELDS = {"name": 1, "email": 1}
+
+_displays = TTLCache(default_ttl=USER_DISPLAY_CACHE_TTL_SECONDS)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _to_display(user: Dict[str, Any]) -> Dict[str, str]:
+    return {"name": user.get("name", "Unknown"), "email": user.get("email", "")}
+
+
+def get_user_display(user_id) -> Optional[Dict[str, str]]:
+    """{"name", "email"} for a user, or None when the user does not exist."""
+    if not user_id:
+        return None
+    return get_user_displays([user_id]).get(str(user_id))
+
+
+def get_user_displays(user_ids: Iterable) -> Dict[str, Dict[str, str]]:
+    """Batch form of get_user_display; misses are loaded with one $in query."""
+    found: Dict[str, Dict[str, str]] = {}
+    missing = {}
+    for user_id in user_ids:
+        if not user_id:
+            continue
+        key = str(user_id)
+        display = _displays.get(key)
+        if display is not None:
+            _stats["hits"] += 1
+            found[key] = display
+            continue
+        try:
+            missing[key] = ObjectId(key)
+        except (InvalidId, TypeError):
+            continue
+
+    if missing:
+        _stats["misses"] += len(missing)
+        for user in users.find({"_id": {"$in": list(missing.values())}}, _DISPLAY_FIELDS):
+            key = str(user["_id"])
+            found[key] = _to_display(user)
+            _displays.set(key, found[key])
+    return found
+
+
+def invalidate_user_display(user_id=None) -> None:
+    _displays.clear(str(user_id) if user_id is not None else None)
+    _stats["invalidations"] += 1
+
+
+def get_user_display_stats() -> Dict[str, Any]:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else None,
+        "cached_users": _displays.size(),
+        "ttl_seconds": USER_DISPLAY_CACHE_TTL_SECONDS,
+    }
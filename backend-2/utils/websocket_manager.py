@@ -2,7 +2,7 @@
 WebSocket Connection Manager for Team Chat
 Handles WebSocket connections, broadcasting, and connection lifecycle
 """
-from typing import Dict, Set, List
+from typing import Dict, Set, List, Optional
 from fastapi import WebSocket
 import json
 import asyncio
@@ -18,10 +18,18 @@ class ConnectionManager:
         self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
         # Track user to channels mapping for cleanup
         self.user_channels: Dict[str, Set[str]] = {}
+        # Event loop that owns the sockets (bound at startup)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Record the app's event loop; broadcasts from other threads are sent there"""
+        self.loop = loop
     
     async def connect(self, websocket: WebSocket, channel_id: str, user_id: str):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
+        if self.loop is None:
+            self.bind_loop(asyncio.get_running_loop())
         
         # Initialize channel connections if not exists
         if channel_id not in self.active_connections:
@@ -108,6 +116,26 @@ class ConnectionManager:
         
         print(f"[WS] Broadcasted to {success_count} users in channel {channel_id}", file=sys.stderr)
     
+    def schedule_broadcast(self, message: dict, channel_id: str, exclude_user: str = None):
+        """
+        Fire-and-forget broadcast_to_channel, safe from any thread. Sockets
+        belong to the app loop, so callers on a worker thread or on a private
+        loop (in-process MCP tools) hand the broadcast over to it instead of
+        sending from their own. Without a running app loop it is dropped.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = self.loop
+        if loop is None or loop is running:
+            if running is not None:
+                running.create_task(self.broadcast_to_channel(message, channel_id, exclude_user))
+            return
+        if loop.is_closed() or not loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self.broadcast_to_channel(message, channel_id, exclude_user), loop)
+    
     async def broadcast_to_all_channels(self, message: dict, project_id: str = None):
         """Broadcast to all channels (optionally filtered by project)"""
         for channel_id in list(self.active_connections.keys()):
@@ -56,7 +56,7 @@ const getRequiredPreviousStatus = (targetStatus) => {
   return WORKFLOW_ORDER[index - 1];
 };
 
-function KanbanBoard({ projectId, initialTasks, onTaskUpdate, user, isOwner }) {
+function KanbanBoard({ projectId, initialTasks, boardVersion, onTaskUpdate, user, isOwner }) {
   const [tasks, setTasks] = useState(initialTasks || []);
   const [activeTask, setActiveTask] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -121,6 +121,53 @@ function KanbanBoard({ projectId, initialTasks, onTaskUpdate, user, isOwner }) {
         }
         break;
 
+      case 'tasks_bulk_updated': {
+        // One coalesced message for a bulk operation (agent/assistant bulk updates, sprint moves)
+        const changed = new Map(data.tasks.map(task => [task._id, task]));
+        setTasks(prev => prev.map(task => changed.get(task._id) || task));
+        if (onTaskUpdate) {
+          data.tasks.forEach(task => onTaskUpdate(task._id, task));
+        }
+        const currentUserId = localStorage.getItem('user_id');
+        if (data.user_name && data.user_id !== currentUserId) {
+          toast.info(`${data.user_name} updated ${data.tasks.length} task(s)`);
+        }
+        break;
+      }
+
+      case 'tasks_bulk_created': {
+        // One message for a batch of new tasks (agent bulk creation, epic breakdown)
+        setTasks(prev => {
+          const known = new Set(prev.map(task => task._id));
+          return [...prev, ...data.tasks.filter(task => !known.has(task._id))];
+        });
+        if (onTaskUpdate) {
+          data.tasks.forEach(task => onTaskUpdate(task._id, task));
+        }
+        if (data.user_name) {
+          toast.info(`${data.user_name} created ${data.tasks.length} task(s)`);
+        }
+        break;
+      }
+
+      case 'board_delta': {
+        // Changes missed while disconnected (the whole board when reset is set)
+        const changed = new Map(data.tasks.map(task => [task._id, task]));
+        const deleted = new Set(data.deleted);
+        setTasks(prev => {
+          if (data.reset) return data.tasks;
+          const kept = prev
+            .filter(task => !deleted.has(task._id))
+            .map(task => changed.get(task._id) || task);
+          const known = new Set(kept.map(task => task._id));
+          return [...kept, ...data.tasks.filter(task => !known.has(task._id))];
+        });
+        if (onTaskUpdate) {
+          data.tasks.forEach(task => onTaskUpdate(task._id, task));
+        }
+        break;
+      }
+
       case 'pong':
         // Heartbeat response
         break;
@@ -137,7 +184,8 @@ function KanbanBoard({ projectId, initialTasks, onTaskUpdate, user, isOwner }) {
     {
       enabled: Boolean(projectId),
       reconnectAttempts: 10,
-      reconnectInterval: 2000
+      reconnectInterval: 2000,
+      boardVersion,
     }
   );
 
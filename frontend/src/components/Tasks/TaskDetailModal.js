@@ -68,6 +68,21 @@ function TaskDetailModal({ task, onClose, onUpdate, isOwner, projectTasks = [] }
     }
   }, [task._id]);
 
+  // Append the next older page of activity (the detail payload only carries the latest entries)
+  const loadOlderActivities = async () => {
+    try {
+      const loaded = taskData.activities?.length || 0;
+      const page = await taskAPI.getActivities(task._id, loaded);
+      setTaskData((prev) => ({
+        ...prev,
+        activities: [...(page.activities || []), ...(prev.activities || [])],
+        activities_has_more: page.has_more,
+      }));
+    } catch (err) {
+      console.error("Failed to load older activity:", err);
+    }
+  };
+
   // Refresh task data when modal opens or task changes
   useEffect(() => {
     const loadTaskData = async () => {
@@ -1269,6 +1284,14 @@ useEffect(() => {
                     </button>
                   </div>
                 )}
+
+                {taskData.activities_has_more && (
+                  <div className="pagination-controls">
+                    <button className="pagination-btn" onClick={loadOlderActivities}>
+                      Load older activity
+                    </button>
+                  </div>
+                )}
               </div>
               </>
             )}
@@ -28,6 +28,7 @@ function TasksPage() {
 
   const [project, setProject] = useState(null);
   const [tasks, setTasks] = useState([]);
+  const [boardVersion, setBoardVersion] = useState(null);
   const [members, setMembers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -52,6 +53,7 @@ function TasksPage() {
 
       setProject(projectData.project);
       setTasks(tasksData.tasks || []);
+      setBoardVersion(tasksData.version ?? null);
       setMembers(membersData.members || []);
     } catch (err) {
       setError(err.message || "Failed to load project data");
@@ -110,6 +112,7 @@ function TasksPage() {
       if (!taskId) {
         const tasksData = await taskAPI.getByProject(projectId);
         setTasks(tasksData.tasks || []);
+        setBoardVersion(tasksData.version ?? null);
         
         if (selectedTask) {
           const updatedSelectedTask = tasksData.tasks.find(t => t._id === selectedTask._id);
@@ -328,6 +331,7 @@ function TasksPage() {
           <KanbanBoard
             projectId={projectId}
             initialTasks={tasks}
+            boardVersion={boardVersion}
             onTaskUpdate={handleKanbanTaskUpdate}
             user={user}
             isOwner={isOwner}
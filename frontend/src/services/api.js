@@ -837,6 +837,20 @@ export const taskAPI = {
     return requestPromise;
   },
 
+  // Server-side filtered/paginated listing. params: cursor, limit, status, assignee_id,
+  // sprint_id, label, issue_type, updated_since, fields, per_column
+  getByProjectPage: async (projectId, params = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== "")
+    ).toString();
+    const response = await fetch(`${API_BASE_URL}/api/tasks/project/${projectId}?${query}`, {
+      headers: getAuthHeaders(),
+    });
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || "Failed to fetch tasks");
+    return data;
+  },
+
   getById: async (taskId) => {
     const response = await fetch(`${API_BASE_URL}/api/tasks/${taskId}`, {
       headers: getAuthHeaders(),
@@ -846,6 +860,17 @@ export const taskAPI = {
     return data;
   },
 
+  // Older activity pages (newest first by offset); the task detail carries the latest page
+  getActivities: async (taskId, offset = 0, limit = 50) => {
+    const response = await fetch(
+      `${API_BASE_URL}/api/tasks/${taskId}/activities?offset=${offset}&limit=${limit}`,
+      { headers: getAuthHeaders() }
+    );
+    const data = await response.json();
+    if (!response.ok) throw new Error(data.error || "Failed to fetch task activity");
+    return data;
+  },
+
   getMyTasks: async (options = {}) => {
     const { forceRefresh = false } = options;
     const cacheKey = 'tasks:my';
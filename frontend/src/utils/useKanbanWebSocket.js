@@ -4,13 +4,19 @@ const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:800
 
 /**
  * Custom hook for Kanban board WebSocket connections
- * Handles real-time task updates across the board
+ * Handles real-time task updates across the board.
+ * Tracks the board version applied so far, seeded from the board load
+ * (options.boardVersion). A broadcast advances it only when it is the next
+ * version; any gap (changes that are logged but not broadcast) asks the server
+ * to resume from it. Reconnects resume from it too, so the server sends only
+ * the changes missed while disconnected (board_delta).
  */
 export default function useKanbanWebSocket(projectId, onMessage, options = {}) {
   const {
     enabled = true,
     reconnectAttempts = 10,
     reconnectInterval = 2000,
+    boardVersion = null,
   } = options;
 
   const [connectionStatus, setConnectionStatus] = useState('disconnected');
@@ -19,6 +25,17 @@ export default function useKanbanWebSocket(projectId, onMessage, options = {}) {
   const reconnectCountRef = useRef(0);
   const reconnectTimeoutRef = useRef(null);
   const heartbeatIntervalRef = useRef(null);
+  const versionRef = useRef(null);
+  const resumePendingRef = useRef(false);
+
+  // A later reload may only move the cursor back: the board keeps its own state
+  useEffect(() => {
+    if (typeof boardVersion === 'number') {
+      versionRef.current = versionRef.current === null
+        ? boardVersion
+        : Math.min(versionRef.current, boardVersion);
+    }
+  }, [boardVersion]);
 
   const connect = useCallback(() => {
     if (!enabled || !projectId) {
@@ -33,7 +50,8 @@ export default function useKanbanWebSocket(projectId, onMessage, options = {}) {
     }
 
     try {
-      const wsUrl = `${API_BASE_URL.replace('http', 'ws')}/api/tasks/ws/project/${projectId}?token=${token}`;
+      const resume = versionRef.current !== null ? `&since=${versionRef.current}` : '';
+      const wsUrl = `${API_BASE_URL.replace('http', 'ws')}/api/tasks/ws/project/${projectId}?token=${token}${resume}`;
       console.log('[KANBAN WS] Connecting to:', wsUrl);
 
       const ws = new WebSocket(wsUrl);
@@ -46,6 +64,7 @@ export default function useKanbanWebSocket(projectId, onMessage, options = {}) {
         setConnectionStatus('connected');
         setIsConnected(true);
         reconnectCountRef.current = 0;
+        resumePendingRef.current = false;
 
         // Start heartbeat
         heartbeatIntervalRef.current = setInterval(() => {
@@ -65,6 +84,23 @@ export default function useKanbanWebSocket(projectId, onMessage, options = {}) {
             return;
           }
 
+          // Advance the resume cursor without skipping changes
+          if (typeof data.version === 'number' && versionRef.current !== null) {
+            if (data.type === 'board_delta') {
+              versionRef.current = data.version;
+              resumePendingRef.current = false;
+            } else if (data.type !== 'connection') {
+              // Bulk messages carry one version for all of their tasks
+              const step = Array.isArray(data.tasks) ? data.tasks.length : 1;
+              if (data.version === versionRef.current + step) {
+                versionRef.current = data.version;
+              } else if (data.version > versionRef.current && !resumePendingRef.current) {
+                resumePendingRef.current = true;
+                ws.send(JSON.stringify({ type: 'resume', since: versionRef.current }));
+              }
+            }
+          }
+
           // Forward to message handler
           if (onMessage) {
             onMessage(data);